@@ -10,6 +10,7 @@ import { AltPanelLegacy } from "@/components/AltPanelLegacy";
 import { AUSTIN_CENTER } from "@/lib/locations";
 import { supabase } from "@/lib/supabase";
 import { getActiveMetroBySlug } from "@/lib/active-metros";
+import { attachStoreTestHook } from "@/lib/map-test-hook";
 
 function DeepLinkHandler() {
   const searchParams = useSearchParams();
@@ -172,6 +173,10 @@ export function HomeContent({ variant = "legacy" }: { variant?: "legacy" | "rede
     setReferencePoint(AUSTIN_CENTER);
   }, [setReferencePoint]);
 
+  useEffect(() => {
+    attachStoreTestHook(useVotesStore);
+  }, []);
+
   // Legacy panel reads citySummaries to populate its city-card list. Redesign uses ACTIVE_METROS.
   useEffect(() => {
     if (variant === "legacy") loadCitySummaries();
@@ -12,6 +12,8 @@ import { getInitialMapView, US_CENTER, US_ZOOM } from "@/lib/locations";
 import { sortMostSupport, sortMostViable, sortMostViableWithPriority, makeSortNearest } from "@/lib/sort";
 import { fetchIsochrone } from "@/lib/isochrone";
 import { pointInIsochrone } from "@/lib/geo";
+import { linkedView } from "@/lib/deep-link";
+import { attachMapTestHook } from "@/lib/map-test-hook";
 import "mapbox-gl/dist/mapbox-gl.css";
 import type { MapMouseEvent } from "react-map-gl/mapbox";
 
@@ -47,7 +49,7 @@ export function MapViewLegacy() {
     setMapCenter,
     setMapBounds,
     setReferencePoint,
-    fetchNearby,
+    scheduleFetchNearby,
     fetchNearbyForce,
     setUserLocationStore,
     showTopOnly,
@@ -74,7 +76,7 @@ export function MapViewLegacy() {
     setMapCenter: s.setMapCenter,
     setMapBounds: s.setMapBounds,
     setReferencePoint: s.setReferencePoint,
-    fetchNearby: s.fetchNearby,
+    scheduleFetchNearby: s.scheduleFetchNearby,
     fetchNearbyForce: s.fetchNearbyForce,
     // Include filter-related state so map re-renders when filters change
     showUnscored: s.showUnscored,
@@ -262,8 +264,10 @@ export function MapViewLegacy() {
     if (initialViewSetRef.current === "profile") return;
     const hasDeepLink = typeof window !== "undefined" && new URLSearchParams(window.location.search).has("location");
     if (hasDeepLink || flyToTarget) { initialViewSetRef.current = true; return; }
+    // ?metro= / ?view= links pick the view themselves and jump straight to it
+    const linked = typeof window !== "undefined" ? linkedView(window.location.search) : null;
 
-    const { center, zoom } = getInitialMapView(
+    const { center, zoom } = linked ?? getInitialMapView(
       initialViewLocation?.lat ?? null,
       initialViewLocation?.lng ?? null,
       citySummaries
@@ -277,7 +281,7 @@ export function MapViewLegacy() {
     mapRef.current?.flyTo({
       center: [center.lng, center.lat],
       zoom: adjustedZoom,
-      duration: 1500,
+      duration: linked ? 0 : 1500,
     });
 
     // If zooming to city level, fetch nearby locations and set bounds/center
@@ -309,7 +313,8 @@ export function MapViewLegacy() {
       }, 100);
     }
 
-    initialViewSetRef.current = userLocationSource === "profile" ? "profile" : true;
+    // A linked view is final: don't move off it when the profile location arrives
+    initialViewSetRef.current = linked || userLocationSource === "profile" ? "profile" : true;
   }, [initialViewLocation, userLocationSource, citySummaries, geoResolved, mapReady, locations, setReferencePoint, setMapBounds, setMapCenter, setZoomLevel, fetchNearbyForce]); // eslint-disable-line react-hooks/exhaustive-deps
 
   const flyToCoords = useCallback((coords: { lat: number; lng: number }, zoom?: number) => {
@@ -510,7 +515,7 @@ export function MapViewLegacy() {
     if (boxSelectBoundsRef.current) {
       setZoomLevel(zoom);
       if (zoom >= 9) {
-        fetchNearby({
+        scheduleFetchNearby({
           north: bounds.getNorth(),
           south: bounds.getSouth(),
           east: bounds.getEast(),
@@ -530,14 +535,14 @@ export function MapViewLegacy() {
     });
 
     if (zoom >= 9) {
-      fetchNearby({
+      scheduleFetchNearby({
         north: bounds.getNorth(),
         south: bounds.getSouth(),
         east: bounds.getEast(),
         west: bounds.getWest(),
       });
     }
-  }, [setMapCenter, setZoomLevel, setMapBounds, fetchNearby, setSelectedLocation]);
+  }, [setMapCenter, setZoomLevel, setMapBounds, scheduleFetchNearby, setSelectedLocation]);
 
   if (!MAPBOX_TOKEN) {
     return (
@@ -565,7 +570,10 @@ export function MapViewLegacy() {
       style={{ width: "100%", height: "100%" }}
       mapStyle="mapbox://styles/mapbox/streets-v12"
       mapboxAccessToken={MAPBOX_TOKEN}
-      onLoad={() => setMapReady(true)}
+      onLoad={(e) => {
+        attachMapTestHook(e.target);
+        setMapReady(true);
+      }}
       onClick={handleMapClick}
       onZoom={handleZoom}
       onMoveEnd={handleMoveEnd}
@@ -12,6 +12,8 @@ import { sortMostSupport, sortMostViable, sortMostViableWithPriority, makeSortNe
 import { fetchIsochrone } from "@/lib/isochrone";
 import { pointInIsochrone } from "@/lib/geo";
 import { ACTIVE_METROS, findActiveMetro } from "@/lib/active-metros";
+import { linkedView } from "@/lib/deep-link";
+import { attachMapTestHook } from "@/lib/map-test-hook";
 import "mapbox-gl/dist/mapbox-gl.css";
 import type { MapMouseEvent } from "react-map-gl/mapbox";
 
@@ -46,7 +48,7 @@ export function MapViewRedesign() {
     setMapCenter,
     setMapBounds,
     setReferencePoint,
-    fetchNearby,
+    scheduleFetchNearby,
     fetchNearbyForce,
     setUserLocationStore,
     showTopOnly,
@@ -72,7 +74,7 @@ export function MapViewRedesign() {
     setMapCenter: s.setMapCenter,
     setMapBounds: s.setMapBounds,
     setReferencePoint: s.setReferencePoint,
-    fetchNearby: s.fetchNearby,
+    scheduleFetchNearby: s.scheduleFetchNearby,
     fetchNearbyForce: s.fetchNearbyForce,
     // Include filter-related state so map re-renders when filters change
     showUnscored: s.showUnscored,
@@ -264,16 +266,18 @@ export function MapViewRedesign() {
     if (initialViewSetRef.current === "profile") return;
     const hasDeepLink = typeof window !== "undefined" && new URLSearchParams(window.location.search).has("location");
     if (hasDeepLink || flyToTarget) { initialViewSetRef.current = true; return; }
+    // ?metro= / ?view= links pick the view themselves and jump straight to it
+    const linked = typeof window !== "undefined" ? linkedView(window.location.search) : null;
 
     // Find the user's nearest active metro (profile > geo, captured upstream into initialViewLocation)
-    const matched = initialViewLocation
+    const matched = !linked && initialViewLocation
       ? findActiveMetro(initialViewLocation.lat, initialViewLocation.lng)
       : null;
 
-    const center = matched
+    const center = linked?.center ?? (matched
       ? { lat: matched.lat, lng: matched.lng }
-      : US_CENTER;
-    const zoom = matched ? matched.defaultZoom : US_ZOOM;
+      : US_CENTER);
+    const zoom = linked?.zoom ?? (matched ? matched.defaultZoom : US_ZOOM);
 
     setReferencePoint(center);
 
@@ -283,7 +287,7 @@ export function MapViewRedesign() {
     mapRef.current?.flyTo({
       center: [center.lng, center.lat],
       zoom: adjustedZoom,
-      duration: 1500,
+      duration: linked ? 0 : 1500,
     });
 
     if (zoom >= 9) {
@@ -310,7 +314,8 @@ export function MapViewRedesign() {
       }, 100);
     }
 
-    initialViewSetRef.current = userLocationSource === "profile" ? "profile" : true;
+    // A linked view is final: don't move off it when the profile location arrives
+    initialViewSetRef.current = linked || userLocationSource === "profile" ? "profile" : true;
   }, [initialViewLocation, userLocationSource, geoResolved, mapReady, locations, setReferencePoint, setMapBounds, setMapCenter, setZoomLevel, fetchNearbyForce]); // eslint-disable-line react-hooks/exhaustive-deps
 
   const flyToCoords = useCallback((coords: { lat: number; lng: number }, zoom?: number) => {
@@ -513,7 +518,7 @@ export function MapViewRedesign() {
     if (boxSelectBoundsRef.current) {
       setZoomLevel(zoom);
       if (zoom >= 9) {
-        fetchNearby({
+        scheduleFetchNearby({
           north: bounds.getNorth(),
           south: bounds.getSouth(),
           east: bounds.getEast(),
@@ -533,14 +538,14 @@ export function MapViewRedesign() {
     });
 
     if (zoom >= 9) {
-      fetchNearby({
+      scheduleFetchNearby({
         north: bounds.getNorth(),
         south: bounds.getSouth(),
         east: bounds.getEast(),
         west: bounds.getWest(),
       });
     }
-  }, [setMapCenter, setZoomLevel, setMapBounds, fetchNearby, setSelectedLocation]);
+  }, [setMapCenter, setZoomLevel, setMapBounds, scheduleFetchNearby, setSelectedLocation]);
 
   if (!MAPBOX_TOKEN) {
     return (
@@ -568,7 +573,10 @@ export function MapViewRedesign() {
       style={{ width: "100%", height: "100%" }}
       mapStyle="mapbox://styles/mapbox/streets-v12"
       mapboxAccessToken={MAPBOX_TOKEN}
-      onLoad={() => setMapReady(true)}
+      onLoad={(e) => {
+        attachMapTestHook(e.target);
+        setMapReady(true);
+      }}
       onClick={handleMapClick}
       onZoom={handleZoom}
       onMoveEnd={handleMoveEnd}
@@ -0,0 +1,44 @@
+import { describe, it, expect } from "vitest";
+import { linkedView } from "./deep-link";
+import { ALL_METROS } from "./active-metros";
+
+describe("linkedView", () => {
+  it("returns null without view parameters", () => {
+    expect(linkedView("")).toBeNull();
+    expect(linkedView("?location=abc&tab=other")).toBeNull();
+  });
+
+  it("resolves ?metro= to the metro's center and default zoom", () => {
+    const austin = ALL_METROS.find((m) => m.slug === "austin")!;
+    expect(linkedView("?metro=austin")).toEqual({
+      center: { lat: austin.lat, lng: austin.lng },
+      zoom: austin.defaultZoom,
+    });
+  });
+
+  it("resolves metros that are not currently enabled", () => {
+    expect(linkedView("?metro=nyc")).not.toBeNull();
+  });
+
+  it("ignores unknown metro slugs", () => {
+    expect(linkedView("?metro=atlantis")).toBeNull();
+  });
+
+  it("parses ?view=lat,lng,zoom", () => {
+    expect(linkedView("?view=30.27,-97.74,12.5")).toEqual({
+      center: { lat: 30.27, lng: -97.74 },
+      zoom: 12.5,
+    });
+  });
+
+  it("ignores malformed or out-of-range views", () => {
+    expect(linkedView("?view=30.27,-97.74")).toBeNull();
+    expect(linkedView("?view=abc,-97.74,10")).toBeNull();
+    expect(linkedView("?view=95,-97.74,10")).toBeNull();
+    expect(linkedView("?view=30.27,-97.74,30")).toBeNull();
+  });
+
+  it("falls back to ?view= when the metro slug is unknown", () => {
+    expect(linkedView("?metro=atlantis&view=30,-97,9")).toEqual({ center: { lat: 30, lng: -97 }, zoom: 9 });
+  });
+});
@@ -0,0 +1,37 @@
+import { ALL_METROS } from "./active-metros";
+
+export interface LinkedView {
+  center: { lat: number; lng: number };
+  zoom: number;
+}
+
+/**
+ * Camera position requested by the page URL, if any:
+ *   ?metro=<slug>        a metro from ALL_METROS at its default zoom
+ *   ?view=<lat>,<lng>,<zoom>
+ * The map jumps straight there instead of choosing an initial view, so a
+ * shared link (or a test) lands on the view without clicking through cards.
+ * Unknown slugs and malformed views are ignored.
+ */
+export function linkedView(search: string): LinkedView | null {
+  const params = new URLSearchParams(search);
+
+  const slug = params.get("metro");
+  if (slug) {
+    const metro = ALL_METROS.find((m) => m.slug === slug);
+    if (metro) return { center: { lat: metro.lat, lng: metro.lng }, zoom: metro.defaultZoom };
+  }
+
+  const view = params.get("view");
+  if (view) {
+    const parts = view.split(",").map(Number);
+    if (parts.length === 3 && parts.every(Number.isFinite)) {
+      const [lat, lng, zoom] = parts;
+      if (Math.abs(lat) <= 90 && Math.abs(lng) <= 180 && zoom >= 0 && zoom <= 22) {
+        return { center: { lat, lng }, zoom };
+      }
+    }
+  }
+
+  return null;
+}
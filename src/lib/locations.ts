@@ -513,7 +513,7 @@ function mapBoundsRows(rows: Record<string, unknown>[]): Location[] {
   });
 }
 
-export async function getLocationsInBounds(bounds: Bounds, releasedOnly?: boolean, opts?: { withRedesignFields?: boolean }): Promise<Location[]> {
+export async function getLocationsInBounds(bounds: Bounds, releasedOnly?: boolean, opts?: { withRedesignFields?: boolean; signal?: AbortSignal }): Promise<Location[]> {
   if (!isSupabaseConfigured || !supabase) {
     const locs = releasedOnly ? mockLocations.filter(l => l.released === true) : mockLocations;
     return locs.filter(l =>
@@ -531,14 +531,18 @@ export async function getLocationsInBounds(bounds: Bounds, releasedOnly?: boolea
     let hasMore = true;
 
     while (hasMore) {
-      const { data, error } = await supabase.rpc("get_locations_in_bounds", {
+      let query = supabase.rpc("get_locations_in_bounds", {
         min_lat: bounds.south,
         max_lat: bounds.north,
         min_lng: bounds.west,
         max_lng: bounds.east,
         released_only: releasedOnly ?? false,
       }).range(from, from + PAGE_SIZE - 1);
+      if (opts?.signal) query = query.abortSignal(opts.signal);
+      const { data, error } = await query;
 
+      // Superseded by a newer fetch: the caller discards whatever we return
+      if (opts?.signal?.aborted) return [];
       if (error) {
         console.error("Error fetching locations in bounds:", error);
         return allRows.length > 0 ? mapBoundsRows(allRows) : mockLocations;
@@ -553,6 +557,7 @@ export async function getLocationsInBounds(bounds: Bounds, releasedOnly?: boolea
     if (opts?.withRedesignFields) await attachChampions(locations);
     return locations;
   } catch (error) {
+    if (opts?.signal?.aborted) return [];
     console.error("Failed to fetch locations in bounds:", error);
     return mockLocations;
   }
@@ -0,0 +1,62 @@
+/**
+ * Test-mode readiness hook for the map.
+ *
+ * When the requirements suite sets `window.__PP_TEST__` (via a Playwright
+ * init script, before any app code runs) the mounted map publishes its
+ * instance and Mapbox event counters on `window.__ppMap`, so tests can wait
+ * on real `idle`/`moveend` events instead of sleeping. The votes store is
+ * published on `window.__ppStore`, so a test can put the page straight into a
+ * state (filters, admin view, ...) with `__ppStore.setState(...)` instead of
+ * clicking through the UI. Regular visitors never set the flag, so nothing is
+ * attached.
+ */
+
+import type { Map as MapboxMap } from "mapbox-gl";
+import type { useVotesStore } from "./votes";
+
+export interface MapTestState {
+  map: MapboxMap;
+  idles: number;
+  moveStarts: number;
+  moveEnds: number;
+  moving: boolean;
+  /** `performance.now()` at the first `idle`, i.e. ms since navigation start. */
+  firstIdleAt: number | null;
+}
+
+declare global {
+  interface Window {
+    __PP_TEST__?: boolean;
+    __ppMap?: MapTestState;
+    __ppStore?: typeof useVotesStore;
+  }
+}
+
+/** Publish `map` on `window.__ppMap` in test mode. Call from the map's onLoad. */
+export function attachMapTestHook(map: MapboxMap): void {
+  if (typeof window === "undefined" || !window.__PP_TEST__) return;
+
+  const state: MapTestState = { map, idles: 0, moveStarts: 0, moveEnds: 0, moving: map.isMoving(), firstIdleAt: null };
+  map.on("movestart", () => {
+    state.moving = true;
+    state.moveStarts += 1;
+  });
+  map.on("moveend", () => {
+    state.moving = false;
+    state.moveEnds += 1;
+  });
+  map.on("idle", () => {
+    state.idles += 1;
+    if (state.firstIdleAt === null) state.firstIdleAt = performance.now();
+  });
+  map.on("remove", () => {
+    if (window.__ppMap === state) delete window.__ppMap;
+  });
+  window.__ppMap = state;
+}
+
+/** Publish the votes store on `window.__ppStore` in test mode. */
+export function attachStoreTestHook(store: typeof useVotesStore): void {
+  if (typeof window === "undefined" || !window.__PP_TEST__) return;
+  window.__ppStore = store;
+}
@@ -9,6 +9,22 @@ import { getCategory } from "./sites";
 import { consolidateToMetros } from "./metros";
 
 let citySummarySeq = 0;
+// Quiet time after the last camera move before scheduleFetchNearby fetches,
+// so a burst of drags or wheel zooms costs one query instead of one per moveend
+export const FETCH_DEBOUNCE_MS = 250;
+// Location fetches: a newer one aborts the request of the one in flight
+// and supersedes a scheduled one
+let nearbySeq = 0;
+let nearbyAbort: AbortController | null = null;
+let nearbyTimer: ReturnType<typeof setTimeout> | null = null;
+
+function startNearbyFetch(): { seq: number; signal: AbortSignal } {
+  if (nearbyTimer) clearTimeout(nearbyTimer);
+  nearbyTimer = null;
+  nearbyAbort?.abort();
+  nearbyAbort = new AbortController();
+  return { seq: ++nearbySeq, signal: nearbyAbort.signal };
+}
 
 interface MapBounds {
   north: number;
@@ -114,6 +130,7 @@ interface VotesState {
   setShowCandidatesPanel: (show: boolean) => void;
   fetchNearby: (bounds: MapBounds) => Promise<void>;
   fetchNearbyForce: (bounds: MapBounds) => Promise<void>;
+  scheduleFetchNearby: (bounds: MapBounds) => void;
   loadCitySummaries: () => Promise<void>;
   loadUserVotes: (userId: string) => Promise<void>;
   clearUserVotes: () => void;
@@ -283,7 +300,9 @@ export const useVotesStore = create<VotesState>((set, get) => ({
     }
     const effectiveAdmin = isAdmin && !viewAsParent;
     const releasedOnly = !effectiveAdmin ? true : releasedFilter === "released" ? true : releasedFilter === "unreleased" ? false : undefined;
-    const fetched = await getLocationsInBounds(bounds, releasedOnly, { withRedesignFields: get().isRedesignVariant });
+    const { seq, signal } = startNearbyFetch();
+    const fetched = await getLocationsInBounds(bounds, releasedOnly, { withRedesignFields: get().isRedesignVariant, signal });
+    if (seq !== nearbySeq) return;
     // Preserve the deep-linked / selected location if it wasn't in the fetch results
     if (selectedLocationId && !fetched.some((l) => l.id === selectedLocationId)) {
       const kept = prev.find((l) => l.id === selectedLocationId);
@@ -296,7 +315,9 @@ export const useVotesStore = create<VotesState>((set, get) => ({
     const { isAdmin, viewAsParent, releasedFilter, selectedLocationId, locations: prev } = get();
     const effectiveAdmin = isAdmin && !viewAsParent;
     const releasedOnly = !effectiveAdmin ? true : releasedFilter === "released" ? true : releasedFilter === "unreleased" ? false : undefined;
-    const fetched = await getLocationsInBounds(bounds, releasedOnly, { withRedesignFields: get().isRedesignVariant });
+    const { seq, signal } = startNearbyFetch();
+    const fetched = await getLocationsInBounds(bounds, releasedOnly, { withRedesignFields: get().isRedesignVariant, signal });
+    if (seq !== nearbySeq) return;
     // Preserve the deep-linked / selected location if it wasn't in the fetch results
     if (selectedLocationId && !fetched.some((l) => l.id === selectedLocationId)) {
       const kept = prev.find((l) => l.id === selectedLocationId);
@@ -305,6 +326,15 @@ export const useVotesStore = create<VotesState>((set, get) => ({
     set({ locations: fetched, lastFetchBounds: bounds });
   },
 
+  // Debounced fetchNearby for camera moves
+  scheduleFetchNearby: (bounds) => {
+    if (nearbyTimer) clearTimeout(nearbyTimer);
+    nearbyTimer = setTimeout(() => {
+      nearbyTimer = null;
+      get().fetchNearby(bounds);
+    }, FETCH_DEBOUNCE_MS);
+  },
+
   loadCitySummaries: async () => {
     const seq = ++citySummarySeq;
     const { isAdmin, viewAsParent, releasedFilter, showUnscored } = get();
@@ -0,0 +1,136 @@
+"""Registry, runner and readiness waits for the requirements test suite."""
+
+from . import async_waits
+from .aio import AsyncExecutor, AsyncSession
+from .auth import ROLES, AuthStates, RoleUnavailable
+from .basemap import LocalBasemap
+from .cache import CachedFailure, ResultCache
+from .deps import DependencyRecorder, affected, changed_files, dependencies
+from .flakes import FlakeHistory, load_quarantine
+from .network import BudgetExceeded, NetworkRecorder, network
+
+from .registry import (
+    Registry,
+    TestCase,
+    condition,
+    fixture,
+    page_state,
+    registry,
+    requires,
+    retry,
+    section,
+    skip,
+    test,
+    touches,
+    use_state,
+)
+from .parallel import run_sharded
+from .perf import LOCATION_RPCS, click_latency, first_map_idle, reset_rpcs, rpc_stats, scroll_frames, watch_rpcs
+from .places import PlacesStandIn
+from .replay import SupabaseReplay
+from .reporting import JUnitReporter, NDJSONReporter, Reporter
+from .runner import Results, Runner, Session
+from .sources import SourceIndex, sources
+from .standin import SupabaseStandIn
+from .timing import Timeline, timeline
+from .vitals import VitalsRecorder, vitals
+from .watchdog import TestTimeout, time_limit
+from .waits import (
+    ANY_CARDS,
+    CITY_CARDS,
+    LOCATION_CARDS,
+    METRO_CARDS,
+    SUPABASE_REQUESTS,
+    WaitTimeout,
+    enable_test_hooks,
+    fetch_debounce_ms,
+    map_mark,
+    settle,
+    track_network,
+    wait_for_app,
+    wait_for_cards,
+    wait_for_dialog_closed,
+    wait_for_map_idle,
+    wait_for_map_settled,
+    wait_for_network_quiet,
+    wait_for_page,
+    wait_for_text_change,
+)
+
+__all__ = [
+    "ANY_CARDS",
+    "CITY_CARDS",
+    "LOCATION_CARDS",
+    "LOCATION_RPCS",
+    "METRO_CARDS",
+    "ROLES",
+    "SUPABASE_REQUESTS",
+    "AsyncExecutor",
+    "AsyncSession",
+    "AuthStates",
+    "BudgetExceeded",
+    "CachedFailure",
+    "DependencyRecorder",
+    "FlakeHistory",
+    "JUnitReporter",
+    "LocalBasemap",
+    "NDJSONReporter",
+    "NetworkRecorder",
+    "PlacesStandIn",
+    "Registry",
+    "Reporter",
+    "ResultCache",
+    "Results",
+    "RoleUnavailable",
+    "Runner",
+    "Session",
+    "SourceIndex",
+    "SupabaseReplay",
+    "SupabaseStandIn",
+    "TestCase",
+    "TestTimeout",
+    "Timeline",
+    "VitalsRecorder",
+    "WaitTimeout",
+    "affected",
+    "async_waits",
+    "changed_files",
+    "click_latency",
+    "condition",
+    "dependencies",
+    "enable_test_hooks",
+    "fetch_debounce_ms",
+    "first_map_idle",
+    "fixture",
+    "load_quarantine",
+    "map_mark",
+    "network",
+    "page_state",
+    "registry",
+    "requires",
+    "reset_rpcs",
+    "retry",
+    "rpc_stats",
+    "run_sharded",
+    "scroll_frames",
+    "section",
+    "settle",
+    "skip",
+    "sources",
+    "test",
+    "time_limit",
+    "timeline",
+    "touches",
+    "track_network",
+    "use_state",
+    "vitals",
+    "wait_for_app",
+    "wait_for_cards",
+    "wait_for_dialog_closed",
+    "wait_for_map_idle",
+    "wait_for_map_settled",
+    "wait_for_network_quiet",
+    "wait_for_page",
+    "wait_for_text_change",
+    "watch_rpcs",
+]
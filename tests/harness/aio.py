@@ -0,0 +1,112 @@
+"""
+Async execution for tests written as `async def`.
+
+Coroutine tests run on a private event loop in a background thread, with
+their own async fixtures (e.g. an async browser), so they never touch the
+synchronous session. In concurrent mode the runner submits every eligible
+async test up front and the loop runs them as tasks, at most N at a time,
+while the synchronous tests carry on; results are still reported in suite
+order. Each test's time limit is enforced on the loop: when it passes, the
+test's task is cancelled, which closes the contexts it opened with
+`async with`, and it fails with `TestTimeout`.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import threading
+
+from .registry import Registry
+from .watchdog import TestTimeout
+
+
+class AsyncSession:
+    """Session-scoped async fixtures, created once even under concurrent use."""
+
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        self._values = {}  # name -> Task resolving to the fixture value
+        self._teardowns = []
+
+    async def get(self, name: str):
+        if name not in self._values:
+            self._values[name] = asyncio.ensure_future(self._create(name))
+        return await self._values[name]
+
+    async def _create(self, name: str):
+        if name not in self.registry.fixtures:
+            raise LookupError(f"Unknown fixture '{name}'")
+        func = self.registry.fixtures[name].func
+        if not (inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)):
+            raise LookupError(f"Fixture '{name}' is synchronous and can't be used by an async test")
+        value = await self.call(func) if inspect.iscoroutinefunction(func) else self.call(func)
+        if inspect.isasyncgen(value):
+            generator = value
+            value = await generator.__anext__()
+            self._teardowns.append(generator)
+        return value
+
+    def call(self, func):
+        """Call `func` with its parameters resolved as async fixtures."""
+        async def resolve():
+            names = list(inspect.signature(func).parameters)
+            values = await asyncio.gather(*(self.get(n) for n in names))
+            return dict(zip(names, values))
+
+        if inspect.isasyncgenfunction(func):
+            # Async generators can't be awaited; resolve lazily on first step
+            async def gen():
+                kwargs = await resolve()
+                async for item in func(**kwargs):
+                    yield item
+            return gen()
+
+        async def run():
+            return await func(**(await resolve()))
+        return run()
+
+    async def close(self):
+        while self._teardowns:
+            generator = self._teardowns.pop()
+            try:
+                await generator.__anext__()
+            except StopAsyncIteration:
+                pass
+        self._values.clear()
+
+
+class AsyncExecutor:
+    """Runs async test functions on a background event loop."""
+
+    def __init__(self, registry: Registry, concurrency: int = 1):
+        self.session = AsyncSession(registry)
+        self.concurrency = max(1, concurrency)
+        self._loop = asyncio.new_event_loop()
+        self._limit = asyncio.Semaphore(self.concurrency)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-tests", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, scope=None, timeout=None):
+        """
+        Schedule `func`, inside context manager `scope` if given and limited
+        to `timeout` seconds once it starts; returns a
+        concurrent.futures.Future for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(self._run(func, scope, timeout), self._loop)
+
+    async def _run(self, func, scope, timeout):
+        async with self._limit:
+            with scope or contextlib.nullcontext():
+                try:
+                    return await asyncio.wait_for(self.session.call(func), timeout or None)
+                except asyncio.TimeoutError:
+                    raise TestTimeout(f"test exceeded its {timeout:g}s time limit") from None
+
+    def close(self):
+        """Tear down async fixtures and stop the loop."""
+        try:
+            asyncio.run_coroutine_threadsafe(self.session.close(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
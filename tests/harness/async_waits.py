@@ -0,0 +1,87 @@
+"""
+Async counterparts of the readiness waits in `waits.py`, for tests written
+against `playwright.async_api`. Each drives the same step generator as its
+sync counterpart, awaiting every Playwright call, so both flavours wait on
+exactly the same conditions and fail with the same messages.
+"""
+
+import inspect
+
+from .waits import (
+    _MAP_MARK,
+    _TEST_FLAG_SCRIPT,
+    ANY_CARDS,
+    CARDS_QUIET,
+    MAP_GRACE,
+    SETTLE_QUIET,
+    SUPABASE_REQUESTS,
+    _app,
+    _cards,
+    _map_idle,
+    _map_settled,
+    _network_quiet,
+    _page,
+    _settle,
+)
+
+
+async def _run(steps):
+    """Drive a wait's steps with the async API, awaiting each and sending back its result or error."""
+    result = error = None
+    while True:
+        try:
+            step = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result = error = None
+        try:
+            result = await step if inspect.isawaitable(step) else step
+        except Exception as e:
+            error = e
+
+
+async def enable_test_hooks(target):
+    """Set the app's test flag on a browser context or page before navigation."""
+    await target.add_init_script(_TEST_FLAG_SCRIPT)
+
+
+async def settle(page, quiet: int = SETTLE_QUIET, timeout: int = 5000):
+    """Wait until the DOM has stopped changing for `quiet` ms."""
+    await _run(_settle(page, quiet, timeout))
+
+
+async def wait_for_cards(page, selector: str = ANY_CARDS, min_count: int = 0,
+                         quiet: int = CARDS_QUIET, timeout: int = 15000) -> int:
+    """Wait for the card list to settle; returns the final card count."""
+    return await _run(_cards(page, selector, min_count, quiet, timeout))
+
+
+async def wait_for_network_quiet(page, pattern=SUPABASE_REQUESTS, quiet: int = None, timeout: int = 15000,
+                                 since: float = None):
+    """Wait until no matching request is in flight and none has moved for `quiet` ms (from `since` at the earliest)."""
+    await _run(_network_quiet(page, pattern, quiet, timeout, since))
+
+
+async def map_mark(page):
+    """Snapshot the map's move counter before an action that may move the camera."""
+    return await page.evaluate(_MAP_MARK)
+
+
+async def wait_for_map_idle(page, mark=None, grace: int = MAP_GRACE, timeout: int = 15000):
+    """Wait for Mapbox to be idle, after the move started since `mark` if any."""
+    await _run(_map_idle(page, mark, grace, timeout))
+
+
+async def wait_for_map_settled(page, mark=None, timeout: int = 15000):
+    """Wait for a camera move to finish: map idle, Supabase reads done, card list stable."""
+    await _run(_map_settled(page, mark, timeout))
+
+
+async def wait_for_app(page, cards: bool = True, timeout: int = 30000):
+    """Wait for the map page after navigation (see `waits.wait_for_app`)."""
+    await _run(_app(page, cards, timeout))
+
+
+async def wait_for_page(page, timeout: int = 15000):
+    """Wait for a non-map page after navigation: reads done, DOM settled."""
+    await _run(_page(page, timeout))
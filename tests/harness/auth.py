@@ -0,0 +1,194 @@
+"""
+Signed-in browser storage per role, for tests that act as a user.
+
+The app signs users in with an emailed one-time code, which a test can't
+read. Instead, `AuthStates` signs a role's test account in once through the
+Supabase Auth admin API: it generates a magic link with the service-role key
+and redeems the link's token for a session. The session is saved as a
+Playwright storage-state file, `tests/.cache/auth/<role>.json`, holding the
+localStorage entry supabase-js restores on load. A context created with
+`storage_state=auth.storage_state("parent")` therefore starts signed in, and
+later runs reuse the file until the session is within `margin` seconds of
+expiring. The margin is wide so that no context refreshes the shared session
+mid-run: a refresh rotates the refresh token, which would sign the others out.
+
+Roles and their accounts (which must already exist):
+- "anonymous": no account, empty storage.
+- "parent": TEST_PARENT_EMAIL.
+- "admin": TEST_ADMIN_EMAIL, which the app must list in
+  NEXT_PUBLIC_ADMIN_EMAILS and ADMIN_EMAILS.
+
+Settings come from the environment, falling back to the project's
+`.env.local` like the dev server. In the app's offline mode (Supabase not
+configured) nobody signs in and parents' actions are open to everyone, so
+"parent" gets empty storage and "admin" is unavailable.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .sources import PROJECT_ROOT
+
+AUTH_DIR = PROJECT_ROOT / "tests" / ".cache" / "auth"
+ROLES = ("anonymous", "parent", "admin")
+
+_EMAIL_VARS = {"parent": "TEST_PARENT_EMAIL", "admin": "TEST_ADMIN_EMAIL"}
+_EMPTY = {"cookies": [], "origins": []}
+
+
+class RoleUnavailable(LookupError):
+    """No account can be signed in for a role with the current settings."""
+
+
+def load_env(path: Path = PROJECT_ROOT / ".env.local") -> dict:
+    """`KEY=value` lines from `path`, overridden by the process environment."""
+    values = {}
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        lines = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        values[key.removeprefix("export ").strip()] = value.strip().strip("\"'")
+    values.update(os.environ)
+    return values
+
+
+class AuthStates:
+    """Storage-state files per role, signed in on first use and reused until near expiry."""
+
+    def __init__(self, base_url: str, directory: Path = AUTH_DIR, env: dict = None, margin: float = 1200):
+        split = urlsplit(base_url)
+        self.origin = f"{split.scheme}://{split.netloc}"
+        self.directory = directory
+        self.env = load_env() if env is None else env
+        self.margin = margin
+        self._lock = threading.Lock()
+
+    @property
+    def offline(self) -> bool:
+        """True when the app runs without Supabase (demo mode)."""
+        return not (self.env.get("NEXT_PUBLIC_SUPABASE_URL") and self.env.get("NEXT_PUBLIC_SUPABASE_ANON_KEY"))
+
+    @property
+    def local(self) -> bool:
+        """True when the app's Supabase is absent or a stand-in on this machine, so writes stay local."""
+        host = urlsplit(self.env.get("NEXT_PUBLIC_SUPABASE_URL", "")).hostname
+        return self.offline or host in ("localhost", "127.0.0.1", "::1")
+
+    def available(self, role: str) -> bool:
+        """True if contexts can be created for `role` (signed in where the app needs it)."""
+        try:
+            self._account(role)
+        except RoleUnavailable:
+            return False
+        return True
+
+    def signed_in(self, role: str) -> bool:
+        """True if `role` gets a real Supabase session (not anonymous, not offline)."""
+        return self.available(role) and self._account(role) is not None
+
+    def storage_state(self, role: str) -> str:
+        """Path of the storage-state file for `role`, signing in if it is missing or expiring."""
+        email = self._account(role)
+        path = self.directory / f"{role}.json"
+        with self._lock:
+            if email is None:
+                state = _EMPTY
+            else:
+                state = self._saved(path, email)
+                if state is not None:
+                    return str(path)
+                state = self._storage(self._sign_in(email))
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(state, indent=1))
+            temporary.replace(path)  # atomic, so concurrent workers never read half a file
+        return str(path)
+
+    def access_token(self, role: str):
+        """The role's Supabase access token, for calling the app's API directly; None if not signed in."""
+        if not self.signed_in(role):
+            return None
+        state = json.loads(Path(self.storage_state(role)).read_text())
+        return self._session(state)["access_token"]
+
+    def _account(self, role: str):
+        """The email to sign in as for `role`, or None for empty storage."""
+        if role not in ROLES:
+            raise ValueError(f"Unknown role '{role}' (expected one of {', '.join(ROLES)})")
+        if role == "anonymous":
+            return None
+        if self.offline:
+            if role == "admin":
+                raise RoleUnavailable("No admin in offline mode — configure Supabase to test admin features")
+            return None
+        email = self.env.get(_EMAIL_VARS[role])
+        if not email:
+            raise RoleUnavailable(f"Set {_EMAIL_VARS[role]} to sign tests in as {role}")
+        if not self.env.get("SUPABASE_SERVICE_ROLE_KEY"):
+            raise RoleUnavailable(f"Set SUPABASE_SERVICE_ROLE_KEY to sign tests in as {role}")
+        return email
+
+    def _saved(self, path: Path, email: str):
+        """The saved state at `path` if it is for `email` and not close to expiring."""
+        try:
+            state = json.loads(path.read_text())
+            session = self._session(state)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if (session.get("user") or {}).get("email", "").lower() != email.lower():
+            return None
+        if session.get("expires_at", 0) - time.time() < self.margin:
+            return None
+        return state
+
+    def _sign_in(self, email: str) -> dict:
+        link = self._post("/auth/v1/admin/generate_link", {"type": "magiclink", "email": email},
+                          self.env["SUPABASE_SERVICE_ROLE_KEY"])
+        token_hash = link.get("hashed_token") or link.get("properties", {}).get("hashed_token")
+        session = self._post("/auth/v1/verify", {"type": "magiclink", "token_hash": token_hash},
+                             self.env["NEXT_PUBLIC_SUPABASE_ANON_KEY"])
+        session.setdefault("expires_at", int(time.time()) + session["expires_in"])
+        return session
+
+    def _post(self, path: str, body: dict, key: str) -> dict:
+        request = urllib.request.Request(
+            self.env["NEXT_PUBLIC_SUPABASE_URL"].rstrip("/") + path,
+            data=json.dumps(body).encode(),
+            headers={"apikey": key, "Authorization": f"Bearer {key}", "Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"Supabase sign-in failed ({path}): {e.code} {e.read().decode(errors='replace')[:200]}")
+
+    @property
+    def _storage_key(self) -> str:
+        # supabase-js default: sb-<first label of the project host>-auth-token
+        host = urlsplit(self.env["NEXT_PUBLIC_SUPABASE_URL"]).hostname or ""
+        return f"sb-{host.split('.')[0]}-auth-token"
+
+    def _storage(self, session: dict) -> dict:
+        return {"cookies": [], "origins": [{
+            "origin": self.origin,
+            "localStorage": [{"name": self._storage_key, "value": json.dumps(session)}],
+        }]}
+
+    def _session(self, state: dict) -> dict:
+        for origin in state["origins"]:
+            if origin["origin"] == self.origin:
+                for item in origin["localStorage"]:
+                    if item["name"] == self._storage_key:
+                        return json.loads(item["value"])
+        raise KeyError(self._storage_key)
@@ -0,0 +1,115 @@
+"""
+Local stand-in for the Mapbox basemap.
+
+Before `.mapboxgl-canvas` settles, every page load fetches the
+streets-v12 style, its sprites and glyphs, and the vector tiles in view
+from api.mapbox.com. `LocalBasemap` routes that traffic to a minimal style
+generated here instead. It has a background, a GeoJSON source with an area
+and a centre dot for each metro in `src/lib/metros.ts` and
+`src/lib/active-metros.ts`, and empty glyph ranges so the app's own count
+labels still lay out. GeoJSON is tiled in the browser, so no tile is ever
+downloaded. Telemetry and session pings get an empty 204.
+
+Only the basemap is routed. Geocoding and isochrone calls (also on
+api.mapbox.com) are left alone.
+"""
+
+import json
+import re
+
+from .sources import PROJECT_ROOT
+
+MAPBOX_MODES = ("live", "local")
+
+# Style, glyph, sprite and raster/vector tile requests, plus telemetry
+BASEMAP_REQUESTS = re.compile(
+    r"^https://(api\.mapbox\.com/(styles|fonts|v4|map-sessions)/|events\.mapbox\.com/)"
+)
+
+# Metro catalogues the stand-in draws: `{ name: "Austin", ..., lat: 30.2, lng: -97.7 }`
+_METRO_FILES = ("src/lib/metros.ts", "src/lib/active-metros.ts")
+_METRO = re.compile(
+    r"""(?:name|displayName):\s*"([^"]+)".*?lat:\s*(-?[\d.]+),\s*lng:\s*(-?[\d.]+)"""
+)
+
+# Half-size in degrees of the square drawn for each metro
+_METRO_EXTENT = 0.35
+
+_CORS = {"access-control-allow-origin": "*"}
+
+
+class LocalBasemap:
+    """Routes Mapbox basemap requests to a bundled minimal style."""
+
+    def __init__(self, mode: str = "live"):
+        if mode not in MAPBOX_MODES:
+            raise ValueError(f"Unknown Mapbox mode '{mode}' (expected one of {', '.join(MAPBOX_MODES)})")
+        self.mode = mode
+        self._style = None
+
+    def attach(self, context):
+        """Route a sync-API context's basemap requests (no-op when live)."""
+        if self.mode != "live":
+            context.route(BASEMAP_REQUESTS, lambda route: route.fulfill(**self._answer(route.request.url)))
+
+    async def attach_async(self, context):
+        """Route an async-API context's basemap requests (no-op when live)."""
+        if self.mode != "live":
+            async def handle(route):
+                await route.fulfill(**self._answer(route.request.url))
+            await context.route(BASEMAP_REQUESTS, handle)
+
+    def style(self) -> dict:
+        """The stand-in style (built once from the metro catalogues)."""
+        if self._style is None:
+            self._style = _build_style(_metros())
+        return self._style
+
+    def _answer(self, url: str) -> dict:
+        """Keyword arguments for `route.fulfill`."""
+        path = url.split("?", 1)[0]
+        if "/styles/v1/" in path and not re.search(r"/sprite[^/]*$", path):
+            return {"status": 200, "headers": {**_CORS, "content-type": "application/json"},
+                    "body": json.dumps(self.style())}
+        if "/fonts/v1/" in path:
+            # An empty glyph range: labels lay out and collide as usual but draw nothing
+            return {"status": 200, "headers": {**_CORS, "content-type": "application/x-protobuf"}, "body": b""}
+        return {"status": 204, "headers": _CORS, "body": b""}
+
+
+def _metros() -> list:
+    """(name, lat, lng) for every catalogued metro, first occurrence per name."""
+    seen = {}
+    for relative in _METRO_FILES:
+        text = (PROJECT_ROOT / relative).read_text()
+        for name, lat, lng in _METRO.findall(text):
+            seen.setdefault(name, (name, float(lat), float(lng)))
+    return list(seen.values())
+
+
+def _build_style(metros: list) -> dict:
+    features = []
+    for name, lat, lng in metros:
+        d = _METRO_EXTENT
+        ring = [[lng - d, lat - d], [lng + d, lat - d], [lng + d, lat + d], [lng - d, lat + d], [lng - d, lat - d]]
+        features.append({"type": "Feature", "properties": {"name": name},
+                         "geometry": {"type": "Polygon", "coordinates": [ring]}})
+        features.append({"type": "Feature", "properties": {"name": name},
+                         "geometry": {"type": "Point", "coordinates": [lng, lat]}})
+    return {
+        "version": 8,
+        "name": "Parent Picker test basemap",
+        "glyphs": "mapbox://fonts/mapbox/{fontstack}/{range}.pbf",
+        "sources": {
+            "metros": {"type": "geojson", "data": {"type": "FeatureCollection", "features": features}},
+        },
+        "layers": [
+            {"id": "background", "type": "background", "paint": {"background-color": "#f2efe9"}},
+            {"id": "metro-area", "type": "fill", "source": "metros",
+             "filter": ["==", ["geometry-type"], "Polygon"],
+             "paint": {"fill-color": "#e4e0d8", "fill-outline-color": "#cfc9bd"}},
+            {"id": "metro-centre", "type": "circle", "source": "metros",
+             "filter": ["==", ["geometry-type"], "Point"],
+             "paint": {"circle-radius": 2, "circle-color": "#9a9385"}},
+        ],
+    }
@@ -0,0 +1,115 @@
+"""
+On-disk result cache for browser-free tests.
+
+A static case (see `TestCase.is_static`) is a pure function of its code
+and the project files it reads, so its last outcome can be replayed as long
+as neither has changed. Its code is not just its own source: helpers and
+constants in the suite module and the harness itself decide what it checks.
+Each entry stores a hash of the test's source together with its module and
+every `tests/harness/` module, a content hash of every file the case read
+(as recorded by `dependencies`, plus `@touches`) and the pass/fail outcome.
+Editing the suite or the harness therefore re-runs every static case once.
+Entries are evicted least recently used first once the cache holds more
+than `max_entries`.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import time
+from pathlib import Path
+
+from .deps import dependencies
+from .registry import TestCase
+from .sources import PROJECT_ROOT, sources
+
+CACHE_PATH = PROJECT_ROOT / "tests" / ".cache" / "results.json"
+HARNESS_DIR = Path(__file__).resolve().parent
+
+
+class CachedFailure(AssertionError):
+    """A failure replayed from the result cache."""
+
+
+class ResultCache:
+    """Outcomes of static cases keyed by TC-ID, code hash and input hashes."""
+
+    def __init__(self, path: Path = CACHE_PATH, max_entries: int = 2000):
+        self.path = path
+        self.max_entries = max_entries
+        try:
+            self.entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+        self._used = set()  # TC-IDs looked up or stored this run
+        self._digests = {}  # relpath -> (text, sha1) for this run
+
+    def lookup(self, case: TestCase):
+        """The cached entry for `case` if its code and inputs are unchanged, else None."""
+        entry = self.entries.get(case.id)
+        if entry is None or entry["code"] != _code_hash(case):
+            return None
+        if any(self._digest(relpath) != digest for relpath, digest in entry["inputs"].items()):
+            return None
+        entry["used"] = time.time()
+        self._used.add(case.id)
+        return entry
+
+    def store(self, case: TestCase, error=None):
+        """Record the outcome of a case that just ran."""
+        inputs = set(dependencies.files.get(case.id, ())) | set(case.touches)
+        self.entries[case.id] = {
+            "code": _code_hash(case),
+            "inputs": {relpath: self._digest(relpath) for relpath in sorted(inputs)},
+            "error": None if error is None else str(error),
+            "used": time.time(),
+        }
+        self._used.add(case.id)
+
+    def export(self, case_ids) -> dict:
+        """Entries used this run for `case_ids`, to hand back from a worker."""
+        return {i: self.entries[i] for i in case_ids if i in self._used}
+
+    def merge(self, entries: dict):
+        self.entries.update(entries)
+        self._used.update(entries)
+
+    def save(self):
+        """Write the cache, keeping the `max_entries` most recently used."""
+        keep = sorted(self.entries.items(), key=lambda item: item[1]["used"], reverse=True)
+        self.entries = dict(keep[:self.max_entries])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+
+    def _digest(self, relpath: str):
+        try:
+            text = sources.read(relpath)
+        except (OSError, UnicodeDecodeError):
+            return None  # missing or unreadable; matches only while it stays so
+        cached = self._digests.get(relpath)
+        if cached is None or cached[0] is not text:
+            cached = self._digests[relpath] = (text, hashlib.sha1(text.encode()).hexdigest())
+        return cached[1]
+
+
+def _code_hash(case: TestCase) -> str:
+    try:
+        code = inspect.getsource(case.func)
+    except (OSError, TypeError):
+        code = case.func.__code__.co_code.hex()
+    suite = _suite_hash(case.func.__code__.co_filename)
+    return hashlib.sha1(f"{case.id}\n{suite}\n{code}".encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _suite_hash(module_path: str) -> str:
+    """Content hash of a test module and the harness modules, once per run."""
+    digest = hashlib.sha1()
+    for path in [Path(module_path), *sorted(HARNESS_DIR.glob("*.py"))]:
+        digest.update(path.name.encode())
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            pass  # e.g. a test defined in an interactive session
+    return digest.hexdigest()
@@ -0,0 +1,271 @@
+"""
+Test → dependency map, and selection of the tests a git change affects.
+
+Every run records, per TC-ID, the project files the case read through
+`sources` and the app routes its pages requested (documents and `/api/`
+calls on the app's origin). `@touches` adds dependencies a test can't be seen
+using, e.g. a file checked by a subprocess. The map is kept in
+`tests/.cache/deps.json` and updated after each run.
+
+`affected()` expands the files changed since a git ref through the reverse
+import graph of `src/` (so a change to `ScoreBadge.tsx` reaches the pages
+that render it) and keeps the cases whose files or route entry points are
+hit. Cases with no recorded entry yet, or an empty one, are always kept,
+and any change under `tests/` keeps everything.
+
+Fixtures and page states are built once and shared: the page `desktop_page`
+loads serves every test that takes it. What a fixture or state reads and
+requests while it is being built is recorded under its own name, and the
+runner credits it to each case that uses it (`inherit()`), not only to the
+case that happened to build it.
+"""
+
+import contextlib
+import contextvars
+import json
+import re
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .sources import PROJECT_ROOT, sources
+
+DEPS_PATH = PROJECT_ROOT / "tests" / ".cache" / "deps.json"
+
+# Root-level build config that changes what every page renders
+_GLOBAL_CONFIG = {
+    "package.json", "package-lock.json", "next.config.ts", "tsconfig.json",
+    "postcss.config.mjs", "components.json",
+}
+
+_IMPORT = re.compile(r"""(?:\bfrom\s+|\bimport\s*\(?\s*)["']([^"']+)["']""")
+_EXTENSIONS = ("", ".ts", ".tsx", ".js", ".jsx", ".css", "/index.ts", "/index.tsx")
+
+
+class DependencyRecorder:
+    """Collects the files and routes each case uses while it runs."""
+
+    def __init__(self):
+        self.files = defaultdict(set)   # TC-ID -> project-relative paths
+        self.routes = defaultdict(set)  # TC-ID -> URL paths
+        self._setups = set()            # fixture/state names recorded like cases
+        self._sync_case = None
+        self._task_case = contextvars.ContextVar("case", default=None)
+
+    @contextlib.contextmanager
+    def recording(self, case_id: str, task_local: bool = False):
+        """
+        Attribute reads and requests to `case_id`. Async tests pass
+        `task_local` so concurrent tasks don't overwrite each other.
+        """
+        # A case that ran but used nothing still gets an (empty) entry
+        self.files.setdefault(case_id, set())
+        self.routes.setdefault(case_id, set())
+        with self._attributing(case_id, task_local):
+            yield
+
+    @contextlib.contextmanager
+    def setup(self, name: str):
+        """
+        Attribute reads and requests to the shared setup `name` (e.g.
+        "fixture desktop_page") while it is built, in place of the running case.
+        """
+        self._setups.add(name)
+        self.files.setdefault(name, set())
+        self.routes.setdefault(name, set())
+        with self._attributing(name, self._task_case.get() is not None):
+            yield
+
+    def inherit(self, case_id: str, setups):
+        """Credit `case_id` with what the setups it uses recorded while being built."""
+        for name in setups:
+            if name in self._setups:
+                self.files[case_id].update(self.files[name])
+                self.routes[case_id].update(self.routes[name])
+
+    @contextlib.contextmanager
+    def _attributing(self, key: str, task_local: bool):
+        if task_local:
+            token = self._task_case.set(key)
+            try:
+                yield
+            finally:
+                self._task_case.reset(token)
+        else:
+            previous, self._sync_case = self._sync_case, key
+            try:
+                yield
+            finally:
+                self._sync_case = previous
+
+    def current(self):
+        return self._task_case.get() or self._sync_case
+
+    def task_case(self):
+        """The async test whose task is running, if any."""
+        return self._task_case.get()
+
+    def file(self, relpath: str):
+        case_id = self.current()
+        if case_id:
+            self.files[case_id].add(relpath)
+
+    def watch(self, target, base_url: str):
+        """
+        Record app routes requested by a browser context or page. Requests
+        are attributed to the async test that called this, or else to
+        whichever synchronous case is running when they happen.
+        """
+        origin = urlsplit(base_url)[:2]
+        owner = self._task_case.get()
+
+        def on_request(request):
+            url = urlsplit(request.url)
+            if url[:2] != origin:
+                return
+            self.route(url.path, request.resource_type == "document", owner)
+
+        target.on("request", on_request)
+
+    def route(self, path: str, document: bool = True, owner: str = None):
+        """Record a request for an app `path`: documents and `/api/` calls only."""
+        if not (document or path.startswith("/api/")):
+            return
+        case_id = owner or self._sync_case
+        if case_id:
+            self.routes[case_id].add(path or "/")
+
+    def export(self, case_ids=None) -> dict:
+        """Recorded entries as JSON-ready data, optionally for some cases only."""
+        ids = [i for i in self.files if i not in self._setups] if case_ids is None else \
+            [i for i in case_ids if i in self.files]
+        return {
+            i: {"files": sorted(self.files[i]), "routes": sorted(self.routes[i])}
+            for i in ids
+        }
+
+    def merge(self, data: dict):
+        """Fold in entries recorded elsewhere (e.g. by a worker)."""
+        for case_id, entry in data.items():
+            self.files[case_id].update(entry["files"])
+            self.routes[case_id].update(entry["routes"])
+
+    def save(self, path: Path = DEPS_PATH):
+        """Write this run's entries over those of earlier runs."""
+        data = load_map(path)
+        data.update(self.export())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=1, sort_keys=True))
+
+
+def load_map(path: Path = DEPS_PATH) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def route_files(url_path: str, root: Path = PROJECT_ROOT) -> set:
+    """
+    App Router files serving `url_path`: the page or route handler plus,
+    for pages, every layout above it. Dynamic segments match `[param]`
+    directories.
+    """
+    page = not url_path.startswith("/api/")
+    found = set()
+    directory = root / "src" / "app"
+    for segment in [s for s in url_path.split("/") if s]:
+        layout = directory / "layout.tsx"
+        if page and layout.exists():
+            found.add(layout)
+        if (directory / segment).is_dir():
+            directory = directory / segment
+            continue
+        dynamic = sorted(d for d in directory.glob("[[]*[]]") if d.is_dir())
+        if not dynamic:
+            return {p.relative_to(root).as_posix() for p in found}
+        directory = dynamic[0]
+    for name in ("layout.tsx", "page.tsx") if page else ("route.ts",):
+        if (directory / name).exists():
+            found.add(directory / name)
+    return {p.relative_to(root).as_posix() for p in found}
+
+
+def import_graph(root: Path = PROJECT_ROOT) -> dict:
+    """Map each file under src/ to the project files it imports."""
+    graph = {}
+    src = root / "src"
+    for path in list(src.rglob("*.ts")) + list(src.rglob("*.tsx")):
+        relpath = path.relative_to(root).as_posix()
+        graph[relpath] = set()
+        for spec in _IMPORT.findall(path.read_text(encoding="utf-8", errors="replace")):
+            if spec.startswith("@/"):
+                base = src / spec[2:]
+            elif spec.startswith("."):
+                base = path.parent / spec
+            else:
+                continue
+            for ext in _EXTENSIONS:
+                candidate = Path(f"{base}{ext}").resolve()
+                if candidate.is_file():
+                    graph[relpath].add(candidate.relative_to(root).as_posix())
+                    break
+    return graph
+
+
+def impacted(changed: set, graph: dict) -> set:
+    """`changed` plus every file that imports one of them, transitively."""
+    importers = defaultdict(set)
+    for source, targets in graph.items():
+        for target in targets:
+            importers[target].add(source)
+    seen = set(changed)
+    stack = list(changed)
+    while stack:
+        for source in importers.get(stack.pop(), ()):
+            if source not in seen:
+                seen.add(source)
+                stack.append(source)
+    return seen
+
+
+def changed_files(ref: str, root: Path = PROJECT_ROOT) -> set:
+    """Files changed since `ref`: committed, staged, unstaged and untracked."""
+    def git(*args):
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ValueError(f"git {args[0]} failed: {result.stderr.strip().splitlines()[0]}")
+        return {line for line in result.stdout.splitlines() if line}
+    return git("diff", "--name-only", ref) | git("ls-files", "--others", "--exclude-standard")
+
+
+def affected(cases: list, changed: set, deps: dict = None, graph: dict = None) -> list:
+    """
+    The cases (in order) whose dependencies include a `changed` file, plus
+    those with no recorded dependencies: nothing says they are safe to skip.
+    """
+    deps = load_map() if deps is None else deps
+    if any(path.startswith("tests/") for path in changed):
+        return list(cases)
+    if changed & _GLOBAL_CONFIG:
+        changed = changed | {"src/app/layout.tsx"}
+    hit = impacted(changed, import_graph() if graph is None else graph)
+
+    selected = []
+    for case in cases:
+        entry = deps.get(case.id)
+        if entry is None or not (entry["files"] or entry["routes"] or case.touches):
+            selected.append(case)
+            continue
+        used = set(entry["files"]) | set(case.touches)
+        for route in entry["routes"]:
+            used |= route_files(route)
+        if used & hit:
+            selected.append(case)
+    return selected
+
+
+# Shared recorder; source reads are attributed to the running case
+dependencies = DependencyRecorder()
+sources.on_read = dependencies.file
@@ -0,0 +1,60 @@
+"""
+Flake history and quarantine.
+
+A test that fails and then passes on a retry is a flake. Every run adds its
+results to `tests/.cache/flakes.json` (runs, flakes and failures per TC-ID), so
+repeat offenders stand out. TC-IDs listed in `tests/quarantine.txt` still run,
+but their failures are reported separately and don't fail the build.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from .sources import PROJECT_ROOT
+
+FLAKES_PATH = PROJECT_ROOT / "tests" / ".cache" / "flakes.json"
+QUARANTINE_PATH = PROJECT_ROOT / "tests" / "quarantine.txt"
+
+
+def load_quarantine(path: Path = QUARANTINE_PATH) -> frozenset:
+    """TC-IDs from the quarantine file: one per line, `#` starts a comment."""
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return frozenset()
+    return frozenset(line.split("#", 1)[0].strip() for line in lines) - {""}
+
+
+class FlakeHistory:
+    """Per-test run, flake and failure counts across runs."""
+
+    def __init__(self, path: Path = FLAKES_PATH):
+        self.path = path
+        try:
+            self.entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def update(self, records: list):
+        """Count this run's results (records from `Results`)."""
+        now = time.time()
+        for record in records:
+            if record["outcome"] in ("skipped", "not_run") or record["cached"]:
+                continue
+            entry = self.entries.setdefault(record["id"], {"runs": 0, "flakes": 0, "failures": 0})
+            entry["runs"] += 1
+            if record["outcome"] == "passed" and record["attempts"] > 1:
+                entry["flakes"] += 1
+                entry["last_flake"] = now
+            elif record["outcome"] in ("failed", "quarantined"):
+                entry["failures"] += 1
+
+    def flaky(self, min_flakes: int = 2) -> list:
+        """TC-IDs that have flaked at least `min_flakes` times, worst first."""
+        ids = [i for i, e in self.entries.items() if e["flakes"] >= min_flakes]
+        return sorted(ids, key=lambda i: -self.entries[i]["flakes"])
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
@@ -0,0 +1,328 @@
+"""
+Bytes and requests per page load and per test.
+
+`network.watch(context)` records every request the context's pages make,
+once it finishes or fails: URL, resource type, origin, status, encoded
+(as transferred) and decoded body size, start and duration. Decoded sizes
+come from the pages' own Resource Timing entries, reported in batches by an
+init script, rather than by downloading each body again over the protocol.
+Where the browser hides them (cross-origin responses without
+`Timing-Allow-Origin`), the transferred size stands in. A page's
+main-frame document request starts a new navigation. Every request belongs
+to its page's current navigation and to the test running when it started,
+attributed like the routes in `deps.py`. Navigations made while a fixture or
+page state is built are handed to the test it was built for by `inherit()`,
+so that test's budget check covers the page it was given.
+
+A navigation's page load is its requests up to the first `LOAD_QUIET`
+seconds with none in flight after the document arrived. A map page that
+goes on fetching tiles while later tests pan it isn't charged for those.
+`budgets` maps an App Router route to limits on its page load: `requests`,
+`bytes` (encoded) and `decoded_bytes`. After a test passes, the runner calls
+`check()`, which fails it with the measured numbers if a page load the test
+started is over its route's budget.
+
+A test's totals, per origin, are added to its result record.
+`tests/.reports/network.json` lists every navigation with its requests and
+page-load totals, plus the totals per test and per origin over the run.
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .deps import dependencies
+from .timing import REPORTS_DIR
+from .vitals import _profile, route_of
+
+# Seconds with nothing in flight that end a page load
+LOAD_QUIET = 1.0
+
+_LIMITS = ("requests", "bytes", "decoded_bytes")
+
+
+class BudgetExceeded(AssertionError):
+    """A page load went over its route's request or byte budget."""
+
+
+# Report each batch of Resource Timing entries as [url, decodedBodySize]
+_SCRIPT = """() => {
+    if (window.__ppResources || !window.PerformanceObserver) return;
+    window.__ppResources = true;
+    const observe = type => new PerformanceObserver(list => {
+        if (typeof window.__ppNetworkReport === "function") {
+            window.__ppNetworkReport(list.getEntries().map(e => [e.name, e.decodedBodySize]));
+        }
+    }).observe({ type, buffered: true });
+    observe("navigation");
+    observe("resource");
+}"""
+
+
+class NetworkRecorder:
+    """Per-navigation and per-test request records, with per-route page-load budgets."""
+
+    def __init__(self, budgets: dict = None):
+        self.budgets = dict(budgets or {})  # route -> {requests, bytes, decoded_bytes}
+        self.navigations = []
+        self.requests = []
+        self._pages = weakref.WeakKeyDictionary()  # page -> its current navigation
+        self._decoded = defaultdict(list)  # (navigation, url) -> decoded sizes not yet matched
+        self._lock = threading.Lock()
+
+    def watch(self, context):
+        """Record the requests of a sync-API context's pages."""
+        owner = dependencies.task_case()
+        started = {}
+        context.expose_binding("__ppNetworkReport", self._reporter())
+        context.add_init_script(f"({_SCRIPT})()")
+
+        def on_request(request):
+            started[request] = self._start(request, owner)
+
+        def on_done(request):
+            start = started.pop(request, None)
+            if start is None:
+                return
+            response = sizes = None
+            if request.failure is None:
+                try:
+                    response = request.response()
+                    sizes = request.sizes()
+                except Exception:
+                    pass  # e.g. the page closed
+            self._finish(request, start, response, sizes)
+
+        context.on("request", on_request)
+        context.on("requestfinished", on_done)
+        context.on("requestfailed", on_done)
+
+    async def watch_async(self, context):
+        """Record the requests of an async-API context's pages."""
+        owner = dependencies.task_case()
+        started = {}
+        await context.expose_binding("__ppNetworkReport", self._reporter())
+        await context.add_init_script(f"({_SCRIPT})()")
+
+        def on_request(request):
+            started[request] = self._start(request, owner)
+
+        async def on_done(request):
+            start = started.pop(request, None)
+            if start is None:
+                return
+            response = sizes = None
+            if request.failure is None:
+                try:
+                    response = await request.response()
+                    sizes = await request.sizes()
+                except Exception:
+                    pass  # e.g. the page closed
+            self._finish(request, start, response, sizes)
+
+        context.on("request", on_request)
+        context.on("requestfinished", on_done)
+        context.on("requestfailed", on_done)
+
+    def page_load(self, navigation: dict) -> list:
+        """The navigation's requests up to its first `LOAD_QUIET` gap, in start order."""
+        with self._lock:
+            self._match_decoded()
+            requests = sorted((r for r in self.requests if r["navigation"] == navigation["id"]),
+                              key=lambda r: r["start"])
+        if not requests:
+            return []
+        load = requests[:1]
+        busy_until = _end(requests[0])
+        for request in requests[1:]:
+            if request["start"] - busy_until >= LOAD_QUIET:
+                break
+            load.append(request)
+            busy_until = max(busy_until, _end(request))
+        return load
+
+    def inherit(self, case_id: str, setups, since: float = 0.0):
+        """
+        Credit `case_id` with the navigations (and their requests) that the
+        setups it uses, e.g. "state city_zoom", started after `since`.
+        """
+        setups = set(setups)
+        with self._lock:
+            claimed = set()
+            for navigation in self.navigations:
+                if navigation["case"] in setups and navigation["started"] >= since:
+                    navigation["setup"], navigation["case"] = navigation["case"], case_id
+                    claimed.add(navigation["id"])
+            for request in self.requests:
+                if request["case"] in setups and request["navigation"] in claimed:
+                    request["case"] = case_id
+
+    def check(self, case_id: str, since: float = 0.0):
+        """Raise `BudgetExceeded` if a page load `case_id` started after `since` is over budget."""
+        with self._lock:
+            navigations = [n for n in self.navigations if n["case"] == case_id and n["started"] >= since]
+        problems = []
+        for navigation in navigations:
+            budget = self.budgets.get(navigation["route"])
+            if not budget:
+                continue
+            totals = _totals(self.page_load(navigation))
+            over = [_over(limit, totals[limit], budget[limit])
+                    for limit in _LIMITS if limit in budget and totals[limit] > budget[limit]]
+            if over:
+                problems.append(f"{navigation['path']} ({navigation['profile']}): {', '.join(over)}")
+        if problems:
+            raise BudgetExceeded(f"Page load over budget: {'; '.join(problems)}")
+
+    def for_case(self, case_id: str):
+        """Totals (overall and per origin) of the requests `case_id` made, or None."""
+        with self._lock:
+            self._match_decoded()
+            requests = [r for r in self.requests if r["case"] == case_id]
+        return _totals(requests, by_origin=True) if requests else None
+
+    def drain(self) -> dict:
+        """Remove and return everything recorded so far (a worker's hand-off)."""
+        with self._lock:
+            self._match_decoded()
+            data = {"navigations": self.navigations, "requests": self.requests}
+            self.navigations, self.requests = [], []
+        return data
+
+    def merge(self, data: dict):
+        """Fold in records made elsewhere (e.g. by a worker)."""
+        with self._lock:
+            self.navigations.extend(data["navigations"])
+            self.requests.extend(data["requests"])
+
+    def write(self, directory: Path = REPORTS_DIR):
+        """Write network.json (if anything was recorded); returns its path or None."""
+        with self._lock:
+            self._match_decoded()
+            navigations, requests = list(self.navigations), list(self.requests)
+        if not requests:
+            return None
+        by_navigation = defaultdict(list)
+        by_case = defaultdict(list)
+        for request in requests:
+            by_navigation[request["navigation"]].append(request)
+            by_case[request["case"]].append(request)
+        report = {
+            "origins": _totals(requests, by_origin=True)["origins"],
+            "tests": {case: _totals(group, by_origin=True) for case, group in sorted(by_case.items(), key=str)},
+            "navigations": [
+                {**n, "budget": self.budgets.get(n["route"]), "load": _totals(self.page_load(n)),
+                 "total": _totals(by_navigation[n["id"]]), "requests": by_navigation[n["id"]]}
+                for n in navigations
+            ],
+        }
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / "network.json"
+        path.write_text(json.dumps(report, indent=1))
+        return path
+
+    def _start(self, request, owner) -> dict:
+        """Note a request as it starts; a main-frame document begins a new navigation."""
+        case_id = owner or dependencies.current()
+        try:
+            frame = request.frame
+            page = frame.page
+        except Exception:
+            return {"case": case_id, "navigation": None, "queued": time.time()}  # e.g. a service worker's
+        with self._lock:
+            if request.is_navigation_request() and frame.parent_frame is None:
+                path = urlsplit(request.url).path or "/"
+                navigation = {
+                    "id": f"{os.getpid()}.{len(self.navigations)}",
+                    "case": case_id,
+                    "profile": _profile(page),
+                    "route": route_of(path),
+                    "path": path,
+                    "started": time.time(),
+                }
+                self.navigations.append(navigation)
+                self._pages[page] = navigation["id"]
+            return {"case": case_id, "navigation": self._pages.get(page), "queued": time.time()}
+
+    def _reporter(self):
+        def report(source, entries):
+            with self._lock:
+                navigation = self._pages.get(source["page"])
+                for url, decoded in entries:
+                    self._decoded[(navigation, url)].append(decoded)
+        return report
+
+    def _match_decoded(self):
+        """Give requests still without a decoded size the one their page reported (lock held)."""
+        for record in self.requests:
+            if record["decoded"] is not None:
+                continue
+            sizes = self._decoded.get((record["navigation"], record["url"]))
+            if sizes:
+                # Zero: the browser hides a cross-origin size, or there was no body
+                record["decoded"] = sizes.pop(0) or record["encoded"]
+
+    def _finish(self, request, start: dict, response, sizes):
+        timing = request.timing
+        url = urlsplit(request.url)
+        record = {
+            "url": request.url,
+            "type": request.resource_type,
+            "origin": f"{url.scheme}://{url.netloc}",
+            "method": request.method,
+            "status": response.status if response is not None else None,
+            "encoded": sizes["responseBodySize"] if sizes else 0,
+            "decoded": None if response is not None else 0,  # filled in by _match_decoded
+            "start": round(timing["startTime"] / 1000 if timing["startTime"] > 0 else start["queued"], 3),
+            "duration": round(timing["responseEnd"], 1) if timing["responseEnd"] >= 0 else None,
+            "failure": request.failure,
+            "case": start["case"],
+            "navigation": start["navigation"],
+        }
+        with self._lock:
+            self.requests.append(record)
+
+
+def _end(request: dict) -> float:
+    return request["start"] + (request["duration"] or 0) / 1000
+
+
+def _decoded(request: dict) -> int:
+    """Decoded size, or the transferred size while the page hasn't reported it."""
+    return request["encoded"] if request["decoded"] is None else request["decoded"]
+
+
+def _totals(requests: list, by_origin: bool = False) -> dict:
+    totals = {
+        "requests": len(requests),
+        "bytes": sum(r["encoded"] for r in requests),
+        "decoded_bytes": sum(_decoded(r) for r in requests),
+    }
+    if by_origin:
+        origins = {}
+        for request in requests:
+            entry = origins.setdefault(request["origin"], {"requests": 0, "bytes": 0, "decoded_bytes": 0})
+            entry["requests"] += 1
+            entry["bytes"] += request["encoded"]
+            entry["decoded_bytes"] += _decoded(request)
+        totals["origins"] = dict(sorted(origins.items(), key=lambda item: -item[1]["bytes"]))
+    return totals
+
+
+def _over(limit: str, value: int, budget: int) -> str:
+    if limit == "requests":
+        return f"{value} requests > {budget}"
+    label = "transferred" if limit == "bytes" else "decoded"
+    return f"{_size(value)} {label} > {_size(budget)}"
+
+
+def _size(count: int) -> str:
+    return f"{count / 1e6:.2f} MB" if count >= 1e6 else f"{count / 1e3:.1f} kB"
+
+
+network = NetworkRecorder()
@@ -0,0 +1,270 @@
+"""
+Sharded execution of the requirements suite across worker processes.
+
+Whole sections are grouped into units that can run on their own pages: a
+section whose first test inherits a page left by earlier sections stays in
+the same unit as the last section that used that page. Units are balanced
+over N spawned processes, each with its own browser and contexts.
+
+A worker sends each case's result back over a queue as soon as it has one,
+with everything recorded for it, and the parent hands it straight to the
+reporters (NDJSON, JUnit). A worker that dies loses only the case it was
+running; the parent reports that case and the rest of its shard as failed.
+Printed output is captured per section and replayed in suite order, so the
+merged report reads like a sequential run.
+"""
+
+import contextlib
+import importlib.util
+import inspect
+import io
+import multiprocessing
+import queue as queues
+
+from .cache import ResultCache
+from .deps import dependencies
+from .network import network
+from .registry import registry
+from .runner import Results, Runner, Session
+from .timing import timeline
+from .vitals import vitals
+
+
+class WorkerCrashed(RuntimeError):
+    """A worker process exited before reporting every case of its shard."""
+
+
+def group_sections(cases: list) -> list:
+    """Split an ordered selection into consecutive per-section lists."""
+    sections = []
+    for case in cases:
+        if sections and sections[-1][0].section == case.section:
+            sections[-1].append(case)
+        else:
+            sections.append([case])
+    return sections
+
+
+def plan_units(sections: list) -> list:
+    """
+    Group sections that share page state into units (lists of sections, in
+    suite order). Pages are the fixtures page states set up. A section joins
+    the unit of the last section that used a page when its first test on
+    that page inherits it, i.e. runs without a page state for that page.
+    """
+    page_fixtures = set().union(*(_params(state.func) for state in registry.states.values()))
+    group = list(range(len(sections)))
+
+    def root(i):
+        while group[i] != i:
+            i = group[i]
+        return i
+
+    last = {}  # page fixture -> index of the last section that used it
+    for i, section_cases in enumerate(sections):
+        first = {}  # page fixture -> first case of the section that uses it
+        for case in section_cases:
+            for name in case.fixtures:
+                if name in page_fixtures:
+                    first.setdefault(name, case)
+        for page, case in first.items():
+            if page in last and page not in _state_pages(case):
+                group[root(last[page])] = root(i)
+            last[page] = i
+    units = {}
+    for i, section_cases in enumerate(sections):
+        units.setdefault(root(i), []).append(section_cases)
+    return list(units.values())
+
+
+def _state_pages(case) -> set:
+    """Fixtures the case's page state sets up (none without a state)."""
+    state = registry.states.get(case.state)
+    return _params(state.func) if state else set()
+
+
+def _params(func) -> set:
+    return set(inspect.signature(func).parameters)
+
+
+def _weight(unit: list) -> float:
+    """Rough cost: browser-bound tests dominate, static ones are near free."""
+    weight = 0.0
+    for section_cases in unit:
+        for case in section_cases:
+            browser_bound = case.fixtures or case.state or case.requires
+            weight += 1.0 if browser_bound and not case.skip_reason else 0.05
+    return weight
+
+
+def balance(units: list, workers: int) -> list:
+    """Assign units to at most `workers` shards, heaviest first."""
+    shards = [[] for _ in range(min(workers, len(units)))]
+    loads = [0.0] * len(shards)
+    order = {id(unit): i for i, unit in enumerate(units)}
+    for unit in sorted(units, key=_weight, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(unit)
+        loads[i] += _weight(unit)
+    # Within a shard, keep suite order
+    return [
+        [s for unit in sorted(shard, key=lambda u: order[id(u)]) for s in unit]
+        for shard in shards
+    ]
+
+
+def _load_suite(suite_path: str):
+    """Import the suite in a worker unless spawn already re-ran it as __mp_main__."""
+    if registry.cases:
+        return
+    spec = importlib.util.spec_from_file_location("requirements_suite", suite_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+
+def _run_shard(suite_path: str, sections: list, results_queue, number: int, concurrency: int = 1,
+               use_cache: bool = True, retries: int = 0, quarantine=frozenset(), timeout: float = None,
+               deadline: float = None):
+    """
+    Worker entry point: run sections (lists of TC-IDs) on one session. After
+    each case, put a message on `results_queue` with its printed output and
+    everything the parent folds into its own results, dependency map, cache,
+    timeline, vitals and network records; after each section, one marking it
+    done (with any cases reported as not run).
+    """
+    _load_suite(suite_path)
+    cases = {case.id: case for case in registry.cases}
+    session = Session(registry)
+    # Workers read the cache; the parent merges their entries and saves it
+    cache = ResultCache() if use_cache else None
+    runner = Runner(registry, session, Results(), concurrency, cache, retries, quarantine, timeout, deadline)
+    buffer = io.StringIO()
+
+    def send(section_id: str, ids: list, done: bool = False):
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        results, runner.results = runner.results, Results()
+        results_queue.put({
+            "worker": number,
+            "section": section_id,
+            "done": done,
+            "text": text,
+            "counts": results.counts,
+            "failures": results.failures,
+            "records": results.records,
+            "deps": dependencies.export(ids),
+            "cache": cache.export(ids) if cache else {},
+            "spans": timeline.drain(),
+            "vitals": vitals.drain(),
+            "network": network.drain(),
+        })
+
+    try:
+        with contextlib.redirect_stdout(buffer):
+            for ids in sections:
+                runner.run([cases[i] for i in ids], after_case=lambda case: send(ids[0], [case.id]))
+                send(ids[0], ids, done=True)
+    finally:
+        runner.close()
+        session.close()
+
+
+def _crashed(section_cases: list, error: Exception, started: bool) -> dict:
+    """Report the cases of a section its dead worker never reported as failed."""
+    results = Results()
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        if not started:
+            print(f"\n## {section_cases[0].section}")
+        for case in section_cases:
+            results.failed(case, error)
+    return {"text": buffer.getvalue(), "counts": results.counts, "failures": results.failures,
+            "records": results.records, "deps": {}, "cache": {}, "spans": [], "vitals": [],
+            "network": {"navigations": [], "requests": []}}
+
+
+def run_sharded(cases: list, workers: int, suite_path: str, results: Results, concurrency: int = 1,
+                cache: ResultCache = None, retries: int = 0, quarantine=frozenset(), timeout: float = None,
+                deadline: float = None):
+    """
+    Run `cases` on `workers` processes and merge into `results` (and
+    `cache`, if given) as each case's result arrives. Sections are printed
+    in suite order as soon as every earlier section has finished.
+    """
+    sections = group_sections(cases)
+    shards = balance(plan_units(sections), workers)
+    texts = {s[0].id: [] for s in sections}  # section -> printed output so far
+    finished = set()
+    reported = set()
+    printed = 0
+
+    def merge(output: dict, lane: str):
+        results.merge(output["counts"], output["failures"], output["records"])
+        reported.update(record["id"] for record in output["records"])
+        dependencies.merge(output["deps"])
+        vitals.merge(output["vitals"])
+        network.merge(output["network"])
+        timeline.merge(output["spans"], lane=lane)
+        if cache is not None:
+            cache.merge(output["cache"])
+
+    def receive(message: dict):
+        merge(message, f"worker {message['worker']}")
+        texts[message["section"]].append(message["text"])
+        if message["done"]:
+            finished.add(message["section"])
+
+    def drain():
+        while True:
+            try:
+                receive(results_queue.get_nowait())
+            except queues.Empty:
+                return
+
+    # A process per shard, not a pool: a pool that loses one worker breaks
+    # every other worker's shard with it
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        results_queue = manager.Queue()
+        processes = {}
+        for number, shard in enumerate(shards, 1):
+            process = context.Process(
+                target=_run_shard, name=f"worker {number}",
+                args=(suite_path, [[c.id for c in s] for s in shard], results_queue, number, concurrency,
+                      cache is not None, retries, quarantine, timeout, deadline),
+            )
+            process.start()
+            processes[process] = shard
+        try:
+            pending = set(processes)
+            while pending:
+                try:
+                    receive(results_queue.get(timeout=0.2))
+                except queues.Empty:
+                    pass
+                exited = [process for process in pending if not process.is_alive()]
+                if exited:
+                    # Everything an exited worker sent is queued by now
+                    drain()
+                for process in exited:
+                    pending.discard(process)
+                    process.join()
+                    error = WorkerCrashed(f"{process.name} exited with code {process.exitcode}")
+                    for section_cases in processes[process]:
+                        section_id = section_cases[0].id
+                        if section_id in finished:
+                            continue
+                        lost = [c for c in section_cases if c.id not in reported]
+                        output = _crashed(lost, error, started=bool(texts[section_id]))
+                        merge(output, process.name)
+                        texts[section_id].append(output["text"])
+                        finished.add(section_id)
+                while printed < len(sections) and sections[printed][0].id in finished:
+                    print("".join(texts.pop(sections[printed][0].id)), end="")
+                    printed += 1
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
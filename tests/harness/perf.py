@@ -0,0 +1,200 @@
+"""
+In-page performance measurements for the requirements suite.
+
+Each helper takes its readings in the browser with `performance.now()` and
+rAF/MutationObserver callbacks, so the numbers describe the page itself and
+not the round trips between Playwright and the browser. All times are in ms.
+
+- `first_map_idle()` reads when Mapbox first went `idle` after navigation,
+  as recorded by the app's test hook (src/lib/map-test-hook.ts).
+- `scroll_frames()` scrolls an element a fixed step per animation frame and
+  reports the intervals between frames.
+- `click_latency()` clicks an element and reports the time from the click
+  event to the first DOM update it causes, and to the next paint after that.
+- `watch_rpcs()` wraps the page's `fetch` before its scripts run, so
+  `rpc_stats()` can report the location RPCs a map interaction fired: how
+  many, how many fetch rounds (a round's later calls page through
+  `.range()`), the bytes sent and received, how many were aborted, and the
+  most that were in flight at once.
+"""
+
+import json
+
+from .waits import WaitTimeout, _timeout_error
+
+# The RPCs the map calls for locations as the camera moves (src/lib/locations.ts)
+LOCATION_RPCS = ("get_locations_in_bounds", "get_nearby_locations")
+
+# Scroll `el` by `step` px per frame for `frames` frames, reversing at either
+# end, and resolve with the interval between consecutive frames
+_SCROLL_FRAMES = """(el, [frames, step]) => new Promise(resolve => {
+    const intervals = [];
+    const start = el.scrollTop;
+    let last = null, direction = 1, travelled = 0;
+    const tick = now => {
+        if (last !== null) intervals.push(now - last);
+        last = now;
+        if (intervals.length >= frames) {
+            el.scrollTop = start;
+            resolve({ intervals, travelled });
+            return;
+        }
+        const max = el.scrollHeight - el.clientHeight;
+        if ((direction > 0 && el.scrollTop >= max) || (direction < 0 && el.scrollTop <= 0)) direction = -direction;
+        const before = el.scrollTop;
+        el.scrollTop = before + direction * step;
+        travelled += Math.abs(el.scrollTop - before);
+        requestAnimationFrame(tick);
+    };
+    requestAnimationFrame(tick);
+})"""
+
+# Arm a one-shot probe: the next click's event time, the first DOM mutation
+# under `root` after it, and the end of the frame that mutation is painted in
+_ARM_CLICK = """root => {
+    const probe = window.__ppClickProbe = { clickAt: null, updateAt: null, paintAt: null };
+    const observer = new MutationObserver(() => {
+        if (probe.clickAt === null || probe.updateAt !== null) return;
+        probe.updateAt = performance.now();
+        observer.disconnect();
+        requestAnimationFrame(() => setTimeout(() => { probe.paintAt = performance.now(); }, 0));
+    });
+    observer.observe(document.querySelector(root) || document.body,
+                     { childList: true, subtree: true, attributes: true, characterData: true });
+    document.addEventListener("click", event => { probe.clickAt = event.timeStamp; }, { capture: true, once: true });
+}"""
+
+# Record each call to a watched RPC: start and end, outcome (ok, error or
+# aborted, the moment its signal fires), row offset and body sizes. A call
+# is in flight until its response body has been read in full or it fails.
+_RPC_PROBE = """names => {
+    if (window.__ppRpc) return;
+    const state = window.__ppRpc = { calls: [], inflight: 0, maxInflight: 0 };
+    const realFetch = window.fetch.bind(window);
+    window.fetch = (input, init = {}) => {
+        const url = new URL(typeof input === "string" ? input : input.url, location.href);
+        const name = url.pathname.split("/rest/v1/rpc/")[1];
+        if (!names.includes(name)) return realFetch(input, init);
+        const call = { name, offset: Number(url.searchParams.get("offset") || 0), start: performance.now(),
+                       end: null, outcome: null, status: null, sent: typeof init.body === "string" ? init.body.length : 0,
+                       received: 0 };
+        state.calls.push(call);
+        state.inflight += 1;
+        state.maxInflight = Math.max(state.maxInflight, state.inflight);
+        const finish = outcome => {
+            if (call.outcome !== null) return;
+            call.outcome = outcome;
+            call.end = performance.now();
+            state.inflight -= 1;
+        };
+        if (init.signal) init.signal.addEventListener("abort", () => finish("aborted"));
+        return realFetch(input, init).then(response => {
+            call.status = response.status;
+            response.clone().arrayBuffer().then(body => {
+                call.received = body.byteLength;
+                finish(response.ok ? "ok" : "error");
+            }, () => finish(init.signal && init.signal.aborted ? "aborted" : "error"));
+            return response;
+        }, error => {
+            finish(init.signal && init.signal.aborted ? "aborted" : "error");
+            throw error;
+        });
+    };
+}"""
+
+
+def first_map_idle(page, timeout: int = 30000) -> float:
+    """Ms from the start of the page's navigation to the map's first `idle`."""
+    try:
+        page.wait_for_function("() => window.__ppMap && window.__ppMap.firstIdleAt !== null",
+                               polling=50, timeout=timeout)
+    except _timeout_error():
+        if not page.evaluate("() => !!window.__ppMap"):
+            raise WaitTimeout(
+                "Map test hook missing (window.__ppMap); call enable_test_hooks() before navigating"
+            ) from None
+        raise WaitTimeout(f"Map not idle {timeout}ms after navigation") from None
+    return page.evaluate("() => window.__ppMap.firstIdleAt")
+
+
+def scroll_frames(locator, frames: int = 120, step: int = 40) -> dict:
+    """
+    Scroll `locator` programmatically by `step` px per animation frame for
+    `frames` frames (back and forth between its ends), then restore its
+    position. Returns the frame intervals' `p50`, `p95` and `max`, the
+    number of `frames` sampled and the px `travelled`.
+    """
+    sample = locator.evaluate(_SCROLL_FRAMES, [frames, step])
+    intervals = sorted(sample["intervals"])
+    return {
+        "frames": len(intervals),
+        "p50": _percentile(intervals, 50),
+        "p95": _percentile(intervals, 95),
+        "max": intervals[-1] if intervals else 0.0,
+        "travelled": sample["travelled"],
+    }
+
+
+def click_latency(page, locator, root: str = "body", timeout: int = 5000) -> dict:
+    """
+    Click `locator` and measure its effect on the DOM under `root`: `update`
+    is the ms from the click event to the first mutation, `paint` to the end
+    of the frame that shows it.
+    """
+    page.evaluate(_ARM_CLICK, root)
+    locator.click()
+    try:
+        page.wait_for_function("() => window.__ppClickProbe.paintAt !== null", polling=20, timeout=timeout)
+    except _timeout_error():
+        probe = page.evaluate("() => window.__ppClickProbe")
+        if probe["clickAt"] is None:
+            raise WaitTimeout("Click never reached the page") from None
+        raise WaitTimeout(f"No DOM update under {root} within {timeout}ms of the click") from None
+    probe = page.evaluate("() => window.__ppClickProbe")
+    return {"update": probe["updateAt"] - probe["clickAt"], "paint": probe["paintAt"] - probe["clickAt"]}
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def watch_rpcs(page, names=LOCATION_RPCS):
+    """Record calls to the `names` RPCs on the page's next navigations (call before navigating)."""
+    page.add_init_script(f"({_RPC_PROBE})({json.dumps(list(names))})")
+
+
+def reset_rpcs(page):
+    """Forget the calls recorded so far (those still in flight keep counting as in flight)."""
+    page.evaluate("() => { const s = window.__ppRpc; s.calls = []; s.maxInflight = s.inflight; }")
+
+
+def rpc_stats(page) -> dict:
+    """
+    The watched RPC calls since the last reset: `calls`, `rounds` (calls for
+    the first page of rows), `aborted`, `errors`, `pending`, `max_inflight`,
+    `sent` and `received` bytes, the `largest` response, and `min_gap`, the
+    shortest ms between the starts of consecutive rounds (None for fewer
+    than two).
+    """
+    state = page.evaluate("() => window.__ppRpc")
+    if state is None:
+        raise RuntimeError("RPC probe missing (window.__ppRpc); call watch_rpcs() before navigating")
+    calls = state["calls"]
+    starts = [c["start"] for c in calls if c["offset"] == 0]
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    return {
+        "calls": len(calls),
+        "rounds": len(starts),
+        "aborted": sum(c["outcome"] == "aborted" for c in calls),
+        "errors": sum(c["outcome"] == "error" for c in calls),
+        "pending": sum(c["outcome"] is None for c in calls),
+        "max_inflight": state["maxInflight"],
+        "sent": sum(c["sent"] for c in calls),
+        "received": sum(c["received"] for c in calls),
+        "largest": max((c["received"] for c in calls), default=0),
+        "min_gap": min(gaps) if gaps else None,
+    }
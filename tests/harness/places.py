@@ -0,0 +1,175 @@
+"""
+Local stand-in for the address-autocomplete backends.
+
+The suggest form's `AddressAutocomplete` queries Mapbox geocoding from the
+browser, and the profile page asks `/api/places-autocomplete` (which calls
+Google Places). With `PlacesStandIn` in "local" mode, an init script answers
+both from a canned corpus of addresses instead. Each answer arrives after
+`latency` ms plus up to `jitter` ms, drawn from a seeded generator so a run
+is repeatable. Matching works like a prefix search: every word of the query
+must start a word of the address or its state code. Mapbox's `limit`
+parameter is honoured up to its maximum of 10, and Places returns at most 5
+predictions.
+
+The script also records each request and, per keystroke, when the dropdown
+first shows an answer. `typing_stats()` types a string and reports how many
+requests it caused and the keystroke-to-dropdown latency, so tests can check
+debouncing and the suggestion cap without a network.
+"""
+
+import json
+
+PLACES_MODES = ("live", "local")
+
+# The dropdown AddressAutocomplete renders
+DROPDOWN = "[data-testid='autocomplete-dropdown']"
+
+_TEXAS = ("TX", "Texas")
+_FLORIDA = ("FL", "Florida")
+
+# (number, street, city, (state code, state), zip, lat, lng)
+CORPUS = [
+    *[(n, "Congress Ave", "Austin", _TEXAS, "78701", 30.2650 + n / 100000, -97.7441)
+      for n in (100, 200, 301, 401, 500, 600, 700, 800, 900, 1000, 1100, 1200)],
+    (123, "Main St", "Austin", _TEXAS, "78701", 30.2669, -97.7428),
+    (200, "Main St", "Dallas", _TEXAS, "75202", 32.7801, -96.8005),
+    (1500, "Main St", "Houston", _TEXAS, "77002", 29.7560, -95.3640),
+    (300, "Main St", "Fort Worth", _TEXAS, "76102", 32.7536, -97.3320),
+    (50, "Main St", "Boca Raton", _FLORIDA, "33432", 26.3510, -80.0830),
+    (12, "Main St", "Palm Beach", _FLORIDA, "33480", 26.7050, -80.0360),
+    (410, "Main St", "Tulsa", ("OK", "Oklahoma"), "74103", 36.1520, -95.9900),
+    (75, "Main St", "Greenwich", ("CT", "Connecticut"), "06830", 41.0280, -73.6270),
+    (1001, "Brickell Ave", "Miami", _FLORIDA, "33131", 25.7650, -80.1920),
+    (1601, "Collins Ave", "Miami Beach", _FLORIDA, "33139", 25.7890, -80.1300),
+    (2200, "Lamar Blvd", "Austin", _TEXAS, "78705", 30.2870, -97.7530),
+]
+
+_SCRIPT = """config => {
+    if (window.__ppPlaces) return;
+    const state = window.__ppPlaces = { requests: [], pending: 0, lastInput: null, answered: null, shown: null };
+    let seed = config.seed >>> 0;
+    const random = () => {  // mulberry32
+        seed = (seed + 0x6D2B79F5) >>> 0;
+        let t = Math.imul(seed ^ (seed >>> 15), seed | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+    const words = s => s.toLowerCase().replace(/[^a-z0-9 ]+/g, " ").split(/\\s+/).filter(Boolean);
+    const search = (query, limit) => {
+        const wanted = words(query);
+        return config.corpus.filter(e => {
+            const region = e.context.find(c => c.id.startsWith("region."));
+            const have = words(`${e.place_name} ${region.short_code.slice(3)}`);
+            return wanted.every(w => have.some(h => h.startsWith(w)));
+        }).slice(0, limit);
+    };
+    const GEOCODING = "/geocoding/v5/mapbox.places/";
+    const realFetch = window.fetch.bind(window);
+    window.fetch = (input, init) => {
+        const url = new URL(typeof input === "string" ? input : input.url, location.href);
+        let query, limit, body;
+        if (url.hostname === "api.mapbox.com" && url.pathname.startsWith(GEOCODING)) {
+            query = decodeURIComponent(url.pathname.slice(GEOCODING.length).replace(/\\.json$/, ""));
+            limit = Math.min(Number(url.searchParams.get("limit") || 5), 10);
+            body = { type: "FeatureCollection", query: words(query), features: search(query, limit) };
+        } else if (url.origin === location.origin && url.pathname === "/api/places-autocomplete") {
+            query = url.searchParams.get("input") || "";
+            limit = 5;
+            const found = query.length < 3 ? [] : search(query, limit);
+            body = { predictions: found.map(f => ({ description: f.place_name, place_id: f.id })) };
+        } else {
+            return realFetch(input, init);
+        }
+        state.requests.push({ query, limit, at: performance.now() });
+        state.pending += 1;
+        const delay = config.latency + random() * config.jitter;
+        return new Promise(resolve => setTimeout(() => {
+            state.pending -= 1;
+            state.answered = performance.now();
+            resolve(new Response(JSON.stringify(body), { status: 200, headers: { "content-type": "application/json" } }));
+        }, delay));
+    };
+    // Keystroke-to-dropdown: the first render of an answer that arrived after the last input
+    document.addEventListener("input", () => { state.lastInput = performance.now(); state.shown = null; }, true);
+    new MutationObserver(() => {
+        if (state.lastInput === null || state.shown !== null || !(state.answered > state.lastInput)) return;
+        const dropdown = document.querySelector(config.dropdown);
+        if (dropdown && dropdown.getClientRects().length > 0) state.shown = performance.now();
+    }).observe(document, { childList: true, subtree: true });
+}"""
+
+_RESET = """() => {
+    const state = window.__ppPlaces;
+    state.requests = [];
+    state.lastInput = state.answered = state.shown = null;
+}"""
+
+_QUIET = """quiet => {
+    const state = window.__ppPlaces;
+    return state.lastInput !== null && state.pending === 0 && performance.now() - state.lastInput >= quiet;
+}"""
+
+
+class PlacesStandIn:
+    """Answers address autocomplete from a canned corpus with injected latency."""
+
+    def __init__(self, mode: str = "live", latency: float = 150, jitter: float = 50, seed: int = 0):
+        if mode not in PLACES_MODES:
+            raise ValueError(f"Unknown places mode '{mode}' (expected one of {', '.join(PLACES_MODES)})")
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+
+    def attach(self, context):
+        """Install the stand-in on a sync-API context (no-op when live)."""
+        if self.mode != "live":
+            context.add_init_script(self.script())
+
+    async def attach_async(self, context):
+        """Install the stand-in on an async-API context (no-op when live)."""
+        if self.mode != "live":
+            await context.add_init_script(self.script())
+
+    def script(self) -> str:
+        config = {"latency": self.latency, "jitter": self.jitter, "seed": self.seed,
+                  "dropdown": DROPDOWN, "corpus": [_feature(i, entry) for i, entry in enumerate(CORPUS)]}
+        return f"({_SCRIPT})({json.dumps(config)})"
+
+    def typing_stats(self, page, locator, text: str, delay: int = 50, quiet: int = 600,
+                     timeout: int = 10000) -> dict:
+        """
+        Type `text` into `locator` key by key (`delay` ms apart), wait until
+        typing has been quiet for `quiet` ms with no request pending, and
+        report what it cost: `requests` (count), `queries`, `limits` and
+        `latency`, the ms from the last keystroke to the dropdown showing an
+        answer (None if it never did).
+        """
+        page.evaluate(_RESET)
+        locator.press_sequentially(text, delay=delay)
+        page.wait_for_function(_QUIET, arg=quiet, polling=50, timeout=timeout)
+        state = page.evaluate("() => window.__ppPlaces")
+        shown = state["shown"]
+        return {
+            "requests": len(state["requests"]),
+            "queries": [r["query"] for r in state["requests"]],
+            "limits": [r["limit"] for r in state["requests"]],
+            "latency": shown - state["lastInput"] if shown is not None else None,
+        }
+
+
+def _feature(index: int, entry: tuple) -> dict:
+    """A Mapbox geocoding feature for a corpus entry."""
+    number, street, city, (code, state), postcode, lat, lng = entry
+    return {
+        "id": f"address.{index}",
+        "text": street,
+        "address": str(number),
+        "place_name": f"{number} {street}, {city}, {state} {postcode}, United States",
+        "center": [lng, lat],
+        "context": [
+            {"id": f"postcode.{index}", "text": postcode},
+            {"id": f"place.{index}", "text": city},
+            {"id": f"region.{index}", "short_code": f"US-{code}", "text": state},
+        ],
+    }
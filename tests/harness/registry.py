@@ -0,0 +1,250 @@
+"""
+Test registry for the requirements suite.
+
+`@test` and `@skip` register cases instead of running them, so the suite can
+be listed, filtered and ordered before anything touches a browser. Each case
+records its TC-ID, section, description and the page state it needs; the
+runner establishes that state before executing it.
+"""
+
+import fnmatch
+import inspect
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Sentinel: a test without an explicit state inherits the current section's
+_INHERIT = object()
+
+
+@dataclass
+class TestCase:
+    """A registered TC-* case."""
+    id: str
+    description: str
+    section: str
+    func: Callable
+    state: Optional[str] = None
+    skip_reason: Optional[str] = None
+    requires: Optional[tuple] = None  # (condition name, skip reason)
+    touches: tuple = ()  # declared dependencies (project-relative paths)
+    retries: Optional[int] = None  # None: use the runner's default
+    timeout: Optional[float] = None  # seconds; None: use the runner's default
+
+    @property
+    def fixtures(self) -> tuple:
+        """Fixture names requested by the test function's parameters."""
+        return tuple(inspect.signature(self.func).parameters)
+
+    @property
+    def is_static(self) -> bool:
+        """
+        True for cases that need no browser: no fixtures and no runtime
+        condition (conditions probe a live page). A section's page state is
+        only established for cases that take a fixture.
+        """
+        return not self.fixtures and self.requires is None
+
+    @property
+    def is_async(self) -> bool:
+        """True for `async def` tests, which run on the async executor."""
+        return inspect.iscoroutinefunction(self.func)
+
+    @property
+    def section_number(self) -> str:
+        """'18.4' for section '18.4 Card V1/V2 Toggle'."""
+        return self.section.split(" ", 1)[0].rstrip(".")
+
+
+@dataclass
+class PageState:
+    """A named page state and the function that puts a page into it."""
+    name: str
+    func: Callable
+
+
+@dataclass
+class Condition:
+    """A runtime probe, evaluated once per run, that gates `@requires` tests."""
+    name: str
+    func: Callable
+    state: Optional[str] = None
+
+
+@dataclass
+class Fixture:
+    """A session-scoped resource, created on first use (may be a generator)."""
+    name: str
+    func: Callable
+    disposable: bool = False  # torn down after a test using it times out
+
+
+class Registry:
+    """Holds every registered case, page state, condition and fixture."""
+
+    def __init__(self):
+        self.cases: list = []
+        self.states: dict = {}
+        self.conditions: dict = {}
+        self.fixtures: dict = {}
+        self._ids: set = set()
+        self._section = ""
+        self._state = None
+        self._timeout = None
+
+    # ------------------------------------------------------------
+    # Declaration
+    # ------------------------------------------------------------
+
+    def section(self, title: str, state: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Start a section. Tests that follow inherit its page state and, if
+        given, its per-test time limit in seconds.
+        """
+        self._section = title
+        self._state = state
+        self._timeout = timeout
+
+    def use_state(self, state: Optional[str]):
+        """Change the page state for the remaining tests of the section."""
+        self._state = state
+
+    def test(self, test_id: str, description: str, state=_INHERIT):
+        """Register a test case."""
+        def decorator(func):
+            if test_id in self._ids:
+                raise ValueError(f"Duplicate test id: {test_id}")
+            self._ids.add(test_id)
+            case = TestCase(
+                id=test_id,
+                description=description,
+                section=self._section,
+                func=func,
+                state=self._state if state is _INHERIT else state,
+                skip_reason=getattr(func, "__skip_reason__", None),
+                requires=getattr(func, "__requires__", None),
+                touches=getattr(func, "__touches__", ()),
+                retries=getattr(func, "__retries__", None),
+                timeout=self._timeout,
+            )
+            self.cases.append(case)
+            return case
+        return decorator
+
+    def skip(self, reason: str):
+        """Mark a test as skipped. Works above or below `@test`."""
+        def decorator(target):
+            if isinstance(target, TestCase):
+                target.skip_reason = reason
+            else:
+                target.__skip_reason__ = reason
+            return target
+        return decorator
+
+    def requires(self, condition: str, reason: str):
+        """Skip a test with `reason` unless the named condition holds."""
+        def decorator(target):
+            if isinstance(target, TestCase):
+                target.requires = (condition, reason)
+            else:
+                target.__requires__ = (condition, reason)
+            return target
+        return decorator
+
+    def touches(self, *paths: str):
+        """Declare files a test depends on that it doesn't read via `sources`."""
+        def decorator(target):
+            if isinstance(target, TestCase):
+                target.touches += paths
+            else:
+                target.__touches__ = getattr(target, "__touches__", ()) + paths
+            return target
+        return decorator
+
+    def retry(self, times: int):
+        """Re-run a failing test up to `times` more times, resetting its page state first."""
+        def decorator(target):
+            if isinstance(target, TestCase):
+                target.retries = times
+            else:
+                target.__retries__ = times
+            return target
+        return decorator
+
+    def page_state(self, name: str):
+        """Register the function that puts the page into state `name`."""
+        def decorator(func):
+            self.states[name] = PageState(name, func)
+            return func
+        return decorator
+
+    def condition(self, name: str, state: Optional[str] = None):
+        """Register a runtime probe, evaluated in page state `state`."""
+        def decorator(func):
+            self.conditions[name] = Condition(name, func, state)
+            return func
+        return decorator
+
+    def fixture(self, func=None, *, disposable: bool = False):
+        """
+        Register a session fixture under the function's name. Mark per-test
+        resources such as browser contexts `disposable`: when a test using
+        one times out, it is torn down with everything built on it and
+        recreated on next use.
+        """
+        def decorator(func):
+            self.fixtures[func.__name__] = Fixture(func.__name__, func, disposable)
+            return func
+        return decorator(func) if func is not None else decorator
+
+    def requirements(self, names) -> set:
+        """The fixtures `names` depend on, transitively, including themselves."""
+        seen = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in seen or name not in self.fixtures:
+                continue
+            seen.add(name)
+            stack.extend(inspect.signature(self.fixtures[name].func).parameters)
+        return seen
+
+    # ------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------
+
+    def select(self, patterns=(), sections=(), static_only: bool = False) -> list:
+        """
+        Return registered cases in definition order, filtered by TC-ID globs
+        (e.g. 'TC-27.*', '4.3.1') and section numbers (e.g. '27', '18.4').
+        A section number also selects its subsections. `static_only` keeps
+        just the browser-free cases.
+        """
+        cases = list(self.cases)
+        if static_only:
+            cases = [c for c in cases if c.is_static]
+        if sections:
+            cases = [c for c in cases if any(_in_section(c, s) for s in sections)]
+        if patterns:
+            globs = [p if p.startswith("TC-") else f"TC-{p}" for p in patterns]
+            cases = [c for c in cases if any(fnmatch.fnmatchcase(c.id, g) for g in globs)]
+        return cases
+
+
+def _in_section(case: TestCase, section: str) -> bool:
+    number = section.rstrip(".")
+    return case.section_number == number or case.section_number.startswith(number + ".")
+
+
+# Default registry used by the module-level decorators
+registry = Registry()
+
+section = registry.section
+use_state = registry.use_state
+test = registry.test
+skip = registry.skip
+requires = registry.requires
+touches = registry.touches
+retry = registry.retry
+page_state = registry.page_state
+condition = registry.condition
+fixture = registry.fixture
@@ -0,0 +1,272 @@
+"""
+Hermetic Supabase reads from recorded fixtures.
+
+`SupabaseReplay` routes a browser context's PostgREST traffic (`/rest/v1/`:
+the RPCs and table reads of `src/lib/locations.ts` and `src/lib/votes.ts`)
+according to its mode:
+
+- "live": nothing is routed; the app talks to the real project.
+- "record": requests go to the real project and each response is saved.
+- "replay": requests are answered from the saved responses and never leave
+  the machine.
+
+Fixtures live in `tests/fixtures/supabase/`, one JSON file per endpoint
+(`rpc.get_nearby_locations.json`, `pp_votes.json`, ...), each holding the
+recorded request/response pairs. None ship with the repo: record a set
+against a project first (it holds that project's rows, so keep it out of
+version control unless the data is fit to publish). Replay refuses to start
+without one rather than answering every request with an error. The `format`
+field guards against replaying files written by an incompatible harness.
+
+A request is matched on its method, query and body. The map's bounds and
+centre vary with the viewport, so the spatial RPCs fall back to an answer
+derived from every row recorded for them: rows inside the requested bounds,
+the nearest rows to the requested centre, or the voters of the requested
+locations. Anything else without a fixture gets a 503 in PostgREST's error
+shape and is reported once on stderr, so a stale fixture set fails visibly.
+
+Auth (`/auth/v1/`) is not routed: signed-in roles still need the network.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from .sources import PROJECT_ROOT
+from .waits import SUPABASE_REQUESTS
+
+FIXTURES_DIR = PROJECT_ROOT / "tests" / "fixtures" / "supabase"
+MODES = ("live", "replay", "record")
+
+# Bump when the fixture file layout changes
+FORMAT = 1
+
+# Response headers worth replaying (supabase-js reads the count from Content-Range)
+_HEADERS = ("content-type", "content-range")
+
+# The app's page and the Supabase project are different origins
+_CORS = {"access-control-allow-origin": "*", "access-control-expose-headers": "content-range"}
+
+
+class SupabaseReplay:
+    """Routes PostgREST requests to recorded fixtures, or records them."""
+
+    def __init__(self, mode: str = "live", directory: Path = FIXTURES_DIR):
+        if mode not in MODES:
+            raise ValueError(f"Unknown Supabase mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.directory = directory
+        self.misses = set()
+        self._files = {}  # endpoint -> {key: entry}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise if replaying with no recorded fixtures to replay."""
+        if self.mode == "replay" and not any(self.directory.glob("*.json")):
+            raise RuntimeError(
+                f"No Supabase fixtures in {self.directory}; record a set first with --supabase record"
+            )
+
+    def attach(self, context):
+        """Route a sync-API context's Supabase requests (no-op when live)."""
+        if self.mode != "live":
+            self.check()
+            context.route(SUPABASE_REQUESTS, self._handle)
+
+    async def attach_async(self, context):
+        """Route an async-API context's Supabase requests (no-op when live)."""
+        if self.mode != "live":
+            self.check()
+            await context.route(SUPABASE_REQUESTS, self._handle_async)
+
+    def save(self):
+        """Write the fixture files that recording changed."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            if not dirty:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for endpoint in sorted(dirty):
+                entries = sorted(self._files[endpoint].items())
+                data = {"format": FORMAT, "endpoint": endpoint, "entries": [entry for _, entry in entries]}
+                self._path(endpoint).write_text(json.dumps(data, indent=1, sort_keys=True) + "\n")
+
+    # -- routing --------------------------------------------------------------
+
+    def _handle(self, route):
+        request = route.request
+        if self.mode == "record":
+            response = route.fetch()
+            self._record(request, response.status, response.headers, response.body())
+            route.fulfill(response=response)
+        else:
+            route.fulfill(**self._answer(request))
+
+    async def _handle_async(self, route):
+        request = route.request
+        if self.mode == "record":
+            response = await route.fetch()
+            self._record(request, response.status, response.headers, await response.body())
+            await route.fulfill(response=response)
+        else:
+            await route.fulfill(**self._answer(request))
+
+    def _record(self, request, status: int, headers: dict, body: bytes):
+        endpoint, key, described = _describe(request)
+        entry = {
+            "request": described,
+            "status": status,
+            "headers": {name: headers[name] for name in _HEADERS if name in headers},
+            "body": _decode(body),
+        }
+        with self._lock:
+            self._entries(endpoint)[key] = entry
+            self._dirty.add(endpoint)
+
+    def _answer(self, request) -> dict:
+        """Keyword arguments for `route.fulfill` from the fixtures."""
+        endpoint, key, described = _describe(request)
+        with self._lock:
+            entries = self._entries(endpoint)
+            entry = entries.get(key)
+            if entry is None and endpoint in _DERIVED:
+                entry = _DERIVED[endpoint](described, list(entries.values()))
+        if entry is None:
+            return self._miss(endpoint, described)
+        body = entry["body"]
+        return {
+            "status": entry["status"],
+            "headers": {**_CORS, **entry["headers"]},
+            "body": body if isinstance(body, str) else json.dumps(body),
+        }
+
+    def _miss(self, endpoint: str, described: dict) -> dict:
+        message = f"No Supabase fixture for {described['method']} {endpoint}"
+        report = f"{message} {json.dumps(described['query'])} {json.dumps(described['body'])[:200]}"
+        with self._lock:
+            first = report not in self.misses
+            self.misses.add(report)
+        if first:
+            print(f"  ⚠ {report}", file=sys.stderr)
+        return {
+            "status": 503,
+            "headers": {**_CORS, "content-type": "application/json"},
+            "body": json.dumps({"code": "FIXTURE", "message": message, "details": None, "hint": "run with --supabase record"}),
+        }
+
+    # -- storage --------------------------------------------------------------
+
+    def _entries(self, endpoint: str) -> dict:
+        """Recorded entries for `endpoint` by request key, loaded on first use."""
+        if endpoint not in self._files:
+            entries = {}
+            path = self._path(endpoint)
+            if path.exists():
+                data = json.loads(path.read_text())
+                if data.get("format") != FORMAT:
+                    raise RuntimeError(
+                        f"{path} is fixture format {data.get('format')}, expected {FORMAT}; re-record it"
+                    )
+                entries = {_key(e["request"]): e for e in data["entries"]}
+            self._files[endpoint] = entries
+        return self._files[endpoint]
+
+    def _path(self, endpoint: str) -> Path:
+        return self.directory / f"{endpoint.replace('/', '.')}.json"
+
+
+def _describe(request):
+    """(endpoint, key, request description) for a PostgREST request."""
+    split = urlsplit(request.url)
+    endpoint = split.path.split("/rest/v1/", 1)[1].strip("/")
+    query = sorted(parse_qsl(split.query, keep_blank_values=True))
+    body = request.post_data
+    if body:
+        try:
+            body = json.loads(body)
+        except ValueError:
+            pass
+    described = {"method": request.method, "query": query, "body": body}
+    return endpoint, _key(described), described
+
+
+def _key(described: dict) -> str:
+    return json.dumps([described["method"], [list(q) for q in described["query"]], described["body"]], sort_keys=True)
+
+
+def _decode(body: bytes):
+    text = body.decode("utf-8", errors="replace")
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+# -- answers derived from all recorded rows ----------------------------------
+
+def _rows(entries: list, same: dict) -> list:
+    """Rows from successful recordings whose request body agrees on the `same` fields."""
+    rows = []
+    for entry in entries:
+        body = entry["request"]["body"] or {}
+        if entry["status"] == 200 and isinstance(entry["body"], list) and all(body.get(k) == v for k, v in same.items()):
+            rows.extend(entry["body"])
+    return rows
+
+
+def _unique(rows: list, *fields) -> list:
+    seen = {}
+    for row in rows:
+        seen.setdefault(tuple(row.get(f) for f in fields), row)
+    return list(seen.values())
+
+
+def _page(rows: list, query: list) -> list:
+    """Apply PostgREST `offset`/`limit` query parameters."""
+    params = dict(query)
+    offset = int(params.get("offset", 0))
+    limit = int(params["limit"]) if "limit" in params else None
+    return rows[offset:offset + limit if limit is not None else None]
+
+
+def _ok(rows: list) -> dict:
+    return {"status": 200, "headers": {"content-type": "application/json; charset=utf-8"}, "body": rows}
+
+
+def _in_bounds(described: dict, entries: list):
+    args = described["body"] or {}
+    rows = _unique(_rows(entries, {"released_only": args.get("released_only")}), "id")
+    inside = [
+        r for r in rows
+        if args["min_lat"] <= float(r["lat"]) <= args["max_lat"] and args["min_lng"] <= float(r["lng"]) <= args["max_lng"]
+    ]
+    inside.sort(key=lambda r: r["id"])
+    return _ok(_page(inside, described["query"]))
+
+
+def _nearby(described: dict, entries: list):
+    args = described["body"] or {}
+    rows = _unique(_rows(entries, {"released_only": args.get("released_only")}), "id")
+
+    # The SQL function's ordering: plain squared degrees, longitude unscaled
+    def distance(row):
+        return (float(row["lat"]) - args["center_lat"]) ** 2 + (float(row["lng"]) - args["center_lng"]) ** 2
+
+    rows.sort(key=lambda r: (distance(r), r["id"]))
+    return _ok(_page(rows[:args.get("max_results", 500)], described["query"]))
+
+
+def _voters(described: dict, entries: list):
+    wanted = set((described["body"] or {}).get("location_ids") or ())
+    rows = _unique(_rows(entries, {}), "location_id", "user_id")
+    return _ok([r for r in rows if r["location_id"] in wanted])
+
+
+_DERIVED = {
+    "rpc/get_locations_in_bounds": _in_bounds,
+    "rpc/get_nearby_locations": _nearby,
+    "rpc/get_location_voters": _voters,
+}
@@ -0,0 +1,121 @@
+"""
+Streaming result reporters.
+
+`Results` hands each result to its reporters the moment it is known, as a
+record dict (id, description, section, outcome, message, duration, cached,
+attempts, plus `vitals` and `network` totals for tests that loaded pages).
+Quarantined failures and tests left unrun by the time budget are reported
+to JUnit as skipped.
+Both file reporters flush after every record, so a run that crashes or is
+killed halfway still leaves a usable report:
+
+- `NDJSONReporter` appends one JSON object per line.
+- `JUnitReporter` rewrites only the tail of the file, so the XML is
+  well-formed after every test; `close()` writes the final version with
+  per-suite counts.
+"""
+
+import json
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+
+class Reporter:
+    """Receives results as they complete. Subclasses override what they need."""
+
+    def result(self, record: dict):
+        pass
+
+    def close(self, counts: dict):
+        pass
+
+
+class NDJSONReporter(Reporter):
+    """One JSON object per result, then a final summary line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w", encoding="utf-8")
+        self._write({"event": "start", "time": time.time()})
+
+    def result(self, record: dict):
+        self._write({"event": "result", **record})
+
+    def close(self, counts: dict):
+        self._write({"event": "summary", "time": time.time(), **counts})
+        self._file.close()
+
+    def _write(self, data: dict):
+        self._file.write(json.dumps(data) + "\n")
+        self._file.flush()
+
+
+class JUnitReporter(Reporter):
+    """JUnit XML with one <testsuite> per section, valid after every result."""
+
+    def __init__(self, path, name: str = "requirements"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.records = []
+        self._file = self.path.open("w", encoding="utf-8")
+        self._file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name={quoteattr(name)}>\n')
+        self._body_end = self._file.tell()
+        self._section = None
+        self._write_tail()
+
+    def result(self, record: dict):
+        self.records.append(record)
+        self._file.seek(self._body_end)
+        if record["section"] != self._section:
+            if self._section is not None:
+                self._file.write("  </testsuite>\n")
+            self._file.write(f"  <testsuite name={quoteattr(record['section'])}>\n")
+            self._section = record["section"]
+        self._file.write(_testcase(record))
+        self._body_end = self._file.tell()
+        self._write_tail()
+
+    def close(self, counts: dict):
+        """Rewrite the file in full, with test/failure/skip counts per suite."""
+        self._file.close()
+        sections = {}
+        for record in self.records:
+            sections.setdefault(record["section"], []).append(record)
+        lines = [f'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name={quoteattr(self.name)}'
+                 f' tests="{len(self.records)}" failures="{counts["failed"]}"'
+                 f' skipped="{counts["skipped"] + counts["quarantined"] + counts["not_run"]}">\n']
+        for section, records in sections.items():
+            failures = sum(r["outcome"] == "failed" for r in records)
+            skipped = sum(r["outcome"] in ("skipped", "quarantined", "not_run") for r in records)
+            seconds = sum(r["duration"] or 0 for r in records)
+            lines.append(f'  <testsuite name={quoteattr(section)} tests="{len(records)}" failures="{failures}"'
+                         f' skipped="{skipped}" time="{seconds:.3f}">\n')
+            lines.extend(_testcase(r) for r in records)
+            lines.append("  </testsuite>\n")
+        lines.append("</testsuites>\n")
+        self.path.write_text("".join(lines), encoding="utf-8")
+
+    def _write_tail(self):
+        tail = "  </testsuite>\n</testsuites>\n" if self._section is not None else "</testsuites>\n"
+        self._file.write(tail)
+        self._file.truncate()
+        self._file.flush()
+
+
+def _testcase(record: dict) -> str:
+    attrs = f'classname={quoteattr(record["section"])} name={quoteattr(record["id"] + ": " + record["description"])}'
+    if record["duration"] is not None:
+        attrs += f' time="{record["duration"]:.3f}"'
+    if record["outcome"] == "passed":
+        return f"    <testcase {attrs}/>\n"
+    if record["outcome"] in ("skipped", "not_run"):
+        return f"    <testcase {attrs}><skipped message={quoteattr(record['message'] or '')}/></testcase>\n"
+    if record["outcome"] == "quarantined":
+        message = f"quarantined: {(record['message'] or '').splitlines()[0] if record['message'] else ''}"
+        return f"    <testcase {attrs}><skipped message={quoteattr(message)}/></testcase>\n"
+    message = record["message"] or ""
+    return (f"    <testcase {attrs}><failure message={quoteattr(message.splitlines()[0] if message else '')}>"
+            f"{escape(message)}</failure></testcase>\n")
@@ -0,0 +1,418 @@
+"""
+Runner for registered test cases.
+
+The session creates fixtures on first use and tears them down in reverse
+order. The runner walks a selection in order, puts the page into each case's
+required state, evaluates `@requires` conditions once per run, and records
+results in the suite's existing ✓/✗/⊘ report format. A case that passes
+still fails if a page load it started is over its route's network budget.
+What a fixture or page state reads and requests while being built is
+credited to the dependencies of every case that uses it, and the page
+loads it starts count against the budget of the case it was built for.
+
+Each test runs under a wall-clock limit (per section, or the runner's
+default). A test that hits it fails with `TestTimeout`; its disposable
+fixtures (browser contexts) are torn down and the page state is rebuilt
+for the next test. Past an overall `deadline`, no further tests start and
+the rest are reported as not run.
+
+`async def` tests own their browser contexts and take no page state; they run
+on an `AsyncExecutor`. With `concurrency` > 1 they are all started when the
+run begins and execute alongside the synchronous tests, up to that many at a
+time, while results are still reported in selection order.
+"""
+
+import contextlib
+import inspect
+import time
+
+from .aio import AsyncExecutor
+from .cache import CachedFailure, ResultCache
+from .deps import dependencies
+from .network import network
+from .registry import Registry, TestCase
+from .timing import timeline
+from .vitals import vitals
+from .watchdog import TestTimeout, time_limit
+
+
+class Session:
+    """Session-scoped fixture values, created lazily by name."""
+
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        self._values = {}
+        self._errors = {}
+        self._teardowns = []
+
+    def get(self, name: str):
+        """Return fixture `name`, creating it (and its dependencies) if needed."""
+        if name in self._values:
+            return self._values[name]
+        if name in self._errors:
+            # Don't retry an expensive setup (e.g. a browser launch) per test
+            raise self._errors[name]
+        if name not in self.registry.fixtures:
+            raise LookupError(f"Unknown fixture '{name}'")
+        try:
+            with timeline.span("fixture", name), dependencies.setup(f"fixture {name}"):
+                value = self.call(self.registry.fixtures[name].func)
+                if inspect.isgenerator(value):
+                    generator = value
+                    value = next(generator)
+                    self._teardowns.append((name, generator))
+        except Exception as e:
+            self._errors[name] = e
+            raise
+        self._values[name] = value
+        return value
+
+    def call(self, func):
+        """Call `func` with its parameters resolved as fixtures."""
+        kwargs = {name: self.get(name) for name in inspect.signature(func).parameters}
+        return func(**kwargs)
+
+    def discard(self, names):
+        """
+        Tear down fixtures `names` and every created fixture that depends on
+        them, so they are recreated on next use. Teardown errors are ignored:
+        this runs to recover from a test that was aborted.
+        """
+        names = set(names)
+        doomed = {n for n in self._values if self.registry.requirements([n]) & names}
+        for entry in reversed(self._teardowns[:]):
+            if entry[0] in doomed:
+                self._teardowns.remove(entry)
+                with contextlib.suppress(Exception):
+                    next(entry[1], None)
+        for name in doomed:
+            del self._values[name]
+        for name in names:
+            self._errors.pop(name, None)
+
+    def close(self):
+        """Tear down generator fixtures, most recently created first."""
+        while self._teardowns:
+            _, generator = self._teardowns.pop()
+            try:
+                next(generator)
+            except StopIteration:
+                pass
+        self._values.clear()
+        self._errors.clear()
+
+
+class Results:
+    """Pass/fail/skip counts plus failure details, streamed to reporters."""
+
+    def __init__(self, reporters=()):
+        self.counts = {"passed": 0, "failed": 0, "skipped": 0, "quarantined": 0, "not_run": 0}
+        self.failures = []
+        self.records = []
+        self.reporters = list(reporters)
+
+    def passed(self, case: TestCase, cached: bool = False, attempts: int = 1):
+        self.counts["passed"] += 1
+        note = " (cached)" if cached else f" (passed on attempt {attempts})" if attempts > 1 else ""
+        print(f"  ✓ {case.id}: {case.description}{note}")
+        self._record(case, "passed", None, cached, attempts)
+
+    def retrying(self, case: TestCase, attempt: int, error: Exception):
+        print(f"  ↻ {case.id}: attempt {attempt} failed, retrying — {error}")
+
+    def failed(self, case: TestCase, error: Exception, cached: bool = False):
+        self.counts["failed"] += 1
+        self.failures.append((case.id, case.description, str(error)))
+        print(f"  ✗ {case.id}: {case.description}{' (cached)' if cached else ''}")
+        print(f"    Error: {error}")
+        self._record(case, "failed", str(error), cached)
+
+    def quarantined(self, case: TestCase, error: Exception, attempts: int = 1):
+        """A failure of a quarantined test: reported, but doesn't fail the run."""
+        self.counts["quarantined"] += 1
+        print(f"  ⚠ {case.id}: {case.description} (quarantined)")
+        print(f"    Error: {error}")
+        self._record(case, "quarantined", str(error), attempts=attempts)
+
+    def skipped(self, case: TestCase, reason: str):
+        self.counts["skipped"] += 1
+        print(f"  ⊘ SKIPPED — {reason}")
+        self._record(case, "skipped", reason)
+
+    def not_run(self, cases: list, reason: str):
+        """Cases never started, e.g. because the time budget ran out."""
+        self.counts["not_run"] += len(cases)
+        print(f"\n  ⏱ {reason}: {len(cases)} tests not run")
+        for case in cases:
+            self._record(case, "not_run", reason)
+
+    def merge(self, counts: dict, failures: list, records: list = ()):
+        """Fold in results produced elsewhere (e.g. a worker) and report them."""
+        for key, value in counts.items():
+            self.counts[key] += value
+        self.failures.extend(failures)
+        for record in records:
+            self._emit(record)
+
+    def close(self):
+        """Finish every reporter's output."""
+        for reporter in self.reporters:
+            reporter.close(self.counts)
+
+    def _record(self, case: TestCase, outcome: str, message, cached: bool = False, attempts: int = 1):
+        span = timeline.last("test", case.id)
+        record = {
+            "id": case.id,
+            "description": case.description,
+            "section": case.section,
+            "outcome": outcome,
+            "message": message,
+            "duration": None if span is None else round(span["end"] - span["start"], 4),
+            "cached": cached,
+            "attempts": attempts,
+        }
+        navigations = vitals.for_case(case.id)
+        if navigations:
+            record["vitals"] = navigations
+        requests = network.for_case(case.id)
+        if requests:
+            record["network"] = requests
+        self._emit(record)
+
+    def _emit(self, record: dict):
+        self.records.append(record)
+        for reporter in self.reporters:
+            reporter.result(record)
+
+    @property
+    def ok(self) -> bool:
+        return self.counts["failed"] == 0
+
+    def print_summary(self):
+        counts = self.counts
+        print("\n" + "="*60)
+        print("TEST RESULTS SUMMARY")
+        print("="*60)
+        print(f"Passed:  {counts['passed']}")
+        print(f"Failed:  {counts['failed']}")
+        print(f"Skipped: {counts['skipped']}")
+        if counts["quarantined"]:
+            print(f"Quarantined failures: {counts['quarantined']} (not counted as failed)")
+        total = counts['passed'] + counts['failed'] + counts['skipped'] + counts['quarantined']
+        print(f"Total:   {total}")
+        if total > 0:
+            coverage = (counts['passed'] + counts['skipped']) / total * 100
+            print(f"Coverage: {coverage:.0f}% ({counts['passed']} pass + {counts['skipped']} skip of {total})")
+        if counts["not_run"]:
+            print(f"Not run: {counts['not_run']} (time budget exhausted)")
+        print("="*60)
+
+        if self.failures:
+            print("\nFailed Tests:")
+            for test_id, desc, error in self.failures:
+                print(f"  - {test_id}: {desc}")
+                print(f"    {error}")
+
+        flaky = [r for r in self.records if r["outcome"] == "passed" and r["attempts"] > 1]
+        if flaky:
+            print("\nFlaky (passed on retry):")
+            for record in flaky:
+                print(f"  - {record['id']}: passed on attempt {record['attempts']}")
+        quarantined = [r for r in self.records if r["outcome"] == "quarantined"]
+        if quarantined:
+            print("\nQuarantined failures (see tests/quarantine.txt):")
+            for record in quarantined:
+                print(f"  - {record['id']}: {record['description']}")
+                print(f"    {record['message']}")
+        not_run = [r["id"] for r in self.records if r["outcome"] == "not_run"]
+        if not_run:
+            print(f"\nNot run: {', '.join(not_run)}")
+
+
+class Runner:
+    """Executes a selection of cases against one session."""
+
+    def __init__(self, registry: Registry, session: Session, results: Results, concurrency: int = 1,
+                 cache: ResultCache = None, retries: int = 0, quarantine=frozenset(), timeout: float = None,
+                 deadline: float = None):
+        self.registry = registry
+        self.session = session
+        self.results = results
+        self.concurrency = concurrency
+        self.cache = cache
+        self.retries = retries  # default for cases without @retry
+        self.quarantine = quarantine
+        self.timeout = timeout  # seconds per test, for sections without their own
+        self.deadline = deadline  # time.time() after which no test starts
+        self._section = None
+        self._state_key = None
+        self._conditions = {}
+        self._executor = None
+        self._launched = {}  # TC-ID -> future of an async case started early
+
+    def run(self, cases: list, after_case=None):
+        """Run `cases` in order, calling `after_case(case)` once each has its result."""
+        if self.concurrency > 1:
+            for case in cases:
+                if case.is_async and not case.skip_reason and not case.requires:
+                    self._launched[case.id] = self._submit(case)
+        for index, case in enumerate(cases):
+            if self.deadline is not None and time.time() >= self.deadline:
+                self.results.not_run(cases[index:], "Time budget exhausted")
+                break
+            if case.section != self._section:
+                self._section = case.section
+                print(f"\n## {case.section}")
+            self.run_case(case)
+            if after_case is not None:
+                after_case(case)
+
+    def run_case(self, case: TestCase):
+        if case.skip_reason:
+            self.results.skipped(case, case.skip_reason)
+            return
+        cacheable = self.cache is not None and case.is_static
+        if cacheable:
+            entry = self.cache.lookup(case)
+            if entry is not None:
+                if entry["error"] is None:
+                    self.results.passed(case, cached=True)
+                else:
+                    self.results.failed(case, CachedFailure(entry["error"]), cached=True)
+                return
+        try:
+            if case.requires and not self._condition(case):
+                self.results.skipped(case, case.requires[1])
+                return
+        except Exception as e:
+            if isinstance(e, TestTimeout):
+                self._recover(case)
+            self.results.failed(case, e)
+            return
+
+        attempts = 1 + (self.retries if case.retries is None else case.retries)
+        for attempt in range(1, attempts + 1):
+            error = self._attempt(case, retry=attempt > 1)
+            if error is None or attempt == attempts:
+                break
+            self.results.retrying(case, attempt, error)
+
+        if error is not None and case.id in self.quarantine:
+            self.results.quarantined(case, error, attempt)
+            return
+        if cacheable:
+            self.cache.store(case, error)
+        if error is None:
+            self.results.passed(case, attempts=attempt)
+        else:
+            self.results.failed(case, error)
+
+    def _attempt(self, case: TestCase, retry: bool = False):
+        """
+        Run `case` once; returns the exception it raised, or None. A retry
+        first re-establishes the section's page state from scratch.
+        """
+        started = time.time()
+        try:
+            if case.is_async:
+                future = None if retry else self._launched.pop(case.id, None)
+                (future or self._submit(case)).result()
+            else:
+                with dependencies.recording(case.id), time_limit(self._timeout(case), case.id):
+                    if case.fixtures:
+                        if retry:
+                            self._state_key = None
+                        self._ensure_state(case.section, case.state)
+                    with timeline.span("test", case.id, case.section) as span:
+                        span["outcome"] = "failed"
+                        try:
+                            self.session.call(case.func)
+                        finally:
+                            self._inherit(case, started)
+                        network.check(case.id, since=started)
+                        span["outcome"] = "passed"
+        except Exception as e:
+            if isinstance(e, TestTimeout) and not case.is_async:
+                self._recover(case)
+            return e
+        return None
+
+    def _timeout(self, case: TestCase):
+        return self.timeout if case.timeout is None else case.timeout
+
+    def _recover(self, case: TestCase):
+        """
+        After a timeout, tear down the disposable fixtures (browser contexts)
+        behind the case and its page state, and rebuild the state next time.
+        """
+        fixtures, _ = self._setups(case)
+        self.session.discard(n for n in fixtures if self.registry.fixtures[n].disposable)
+        self._state_key = None
+
+    def _inherit(self, case: TestCase, since: float):
+        """Credit `case` with what its fixtures and page state recorded while being built."""
+        fixtures, states = self._setups(case)
+        setups = [f"fixture {n}" for n in fixtures] + [f"state {n}" for n in states]
+        dependencies.inherit(case.id, setups)
+        network.inherit(case.id, setups, since=since)
+
+    def _setups(self, case: TestCase):
+        """The fixtures (transitively) and page states behind a case."""
+        names = set(case.fixtures)
+        states = set()
+        for key in (case.state, case.requires and self.registry.conditions[case.requires[0]].state):
+            if key in self.registry.states:
+                states.add(key)
+                names |= set(inspect.signature(self.registry.states[key].func).parameters)
+        return self.registry.requirements(names), states
+
+    def close(self):
+        """Stop the async executor, if one was started, and its fixtures."""
+        for future in self._launched.values():
+            future.cancel()
+        self._launched.clear()
+        if self._executor is not None:
+            self._executor.close()
+            self._executor = None
+
+    def _submit(self, case: TestCase):
+        if self._executor is None:
+            self._executor = AsyncExecutor(self.registry, self.concurrency)
+        return self._executor.submit(case.func, self._async_scope(case), self._timeout(case))
+
+    @contextlib.contextmanager
+    def _async_scope(self, case: TestCase):
+        """Recording and timing for an async case, entered inside its task."""
+        with dependencies.recording(case.id, task_local=True), \
+                timeline.span("test", case.id, case.section, lane="async") as span:
+            span["outcome"] = "failed"
+            started = time.time()
+            yield
+            network.check(case.id, since=started)
+            span["outcome"] = "passed"
+
+    def _ensure_state(self, section: str, state):
+        """
+        Put the page into `state` once per section. Later tests in the same
+        section share the page as the previous test left it, exactly like the
+        inline setup blocks this replaces.
+        """
+        if state is None or self._state_key == (section, state):
+            return
+        self._state_key = None
+        with timeline.span("state", state, section), dependencies.setup(f"state {state}"):
+            self.session.call(self.registry.states[state].func)
+        self._state_key = (section, state)
+
+    def _condition(self, case: TestCase) -> bool:
+        name = case.requires[0]
+        if name not in self._conditions:
+            condition = self.registry.conditions[name]
+            with time_limit(self._timeout(case), f"condition '{name}'"):
+                self._ensure_state(case.section, condition.state)
+                with timeline.span("condition", name, case.section):
+                    self._conditions[name] = bool(self.session.call(condition.func))
+            if condition.state is None and inspect.signature(condition.func).parameters:
+                # A stateless probe of a page may have navigated; re-establish next time
+                self._state_key = None
+        return self._conditions[name]
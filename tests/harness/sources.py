@@ -0,0 +1,76 @@
+"""
+Cached source reader for the code-review tests.
+
+Many cases assert on the contents of files under `src/` and `sql/`, and the
+same few files are read by dozens of them. `SourceIndex` reads each file once
+per run and keeps its text keyed by path and mtime, so a file edited during a
+run is re-read and everything else is served from memory. Paths are relative
+to the project root, in POSIX form: `sources.read("src/lib/votes.ts")`.
+"""
+
+import os
+import re
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class SourceIndex:
+    """File contents under a root, cached by (path, mtime)."""
+
+    def __init__(self, root=PROJECT_ROOT):
+        self.root = Path(root)
+        self.on_read = None  # called with each relative path read or checked
+        self._files = {}  # relative path -> (mtime_ns, text)
+
+    def path(self, relpath: str) -> Path:
+        """Absolute path of `relpath`."""
+        return self.root / relpath
+
+    def exists(self, relpath: str) -> bool:
+        if self.on_read:
+            self.on_read(relpath)
+        return self.path(relpath).exists()
+
+    def read(self, relpath: str) -> str:
+        """Text of `relpath`, re-read only when its mtime has changed."""
+        if self.on_read:
+            self.on_read(relpath)
+        mtime = os.stat(self.path(relpath)).st_mtime_ns
+        cached = self._files.get(relpath)
+        if cached is None or cached[0] != mtime:
+            text = self.path(relpath).read_text(encoding="utf-8")
+            cached = self._files[relpath] = (mtime, text)
+        return cached[1]
+
+    def contains(self, relpath: str, *needles: str) -> bool:
+        """True if every needle occurs in the file."""
+        text = self.read(relpath)
+        return all(needle in text for needle in needles)
+
+    def search(self, relpath: str, pattern, flags: int = 0):
+        """First regex match in the file, or None."""
+        return re.search(pattern, self.read(relpath), flags)
+
+    def findall(self, relpath: str, pattern, flags: int = 0) -> list:
+        return re.findall(pattern, self.read(relpath), flags)
+
+    def section(self, relpath: str, start: str, end=None) -> str:
+        """
+        The slice of the file from the first `start` marker up to the next
+        `end` marker after it (or end of file). Empty if `start` is absent,
+        e.g. `section(path, "Popup V1", "Popup V2")`.
+        """
+        text = self.read(relpath)
+        begin = text.find(start)
+        if begin < 0:
+            return ""
+        stop = text.find(end, begin + len(start)) if end else -1
+        return text[begin:stop] if stop >= 0 else text[begin:]
+
+    def clear(self):
+        self._files.clear()
+
+
+# Shared index used by the suite
+sources = SourceIndex()
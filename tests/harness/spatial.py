@@ -0,0 +1,154 @@
+"""
+In-memory spatial index for the Supabase stand-in's location RPCs.
+
+`get_nearby_locations` orders by `(lat - center_lat)^2 + (lng - center_lng)^2`
+and `get_locations_in_bounds` filters on a lat/lng rectangle. Scanning 200k
+rows for either takes hundreds of milliseconds in Python, which would swamp
+the app's own latency in any measurement taken against the stand-in.
+`SpatialIndex` is a bucketed 2-d tree built once over (lat, lng) points:
+
+- `nearest()` is a best-first search, visiting buckets in order of their
+  boxes' distance from the centre and stopping once the n-th nearest point
+  found so far is closer than every unvisited box. It uses the SQL's plain
+  squared-degree distance, so the ordering is exactly the database's (ties
+  broken by insertion order).
+- `within()` descends only into boxes that overlap the rectangle and takes
+  whole buckets without testing points once a box lies inside it. Results
+  keep insertion order, so `.range()` pages are stable.
+
+Each point carries a bit set of flags (the stand-in's are active, listed and
+released) and both queries take a `mask` of the flags a point must have, so
+the RPCs' row filters cost a bit test rather than a function call per point.
+`reflag()` updates a point's flags in place; points added after the build go
+to a short list that queries also scan.
+"""
+
+import heapq
+from itertools import count
+
+# Points per bucket: small enough to skip most of a metro, large enough to keep the tree shallow
+BUCKET = 32
+
+
+class _Node:
+    __slots__ = ("south", "west", "north", "east", "low", "high", "points")
+
+    def __init__(self, points: list):
+        lats = [p[0] for p in points]
+        lngs = [p[1] for p in points]
+        self.south, self.north = min(lats), max(lats)
+        self.west, self.east = min(lngs), max(lngs)
+        self.low = self.high = self.points = None
+
+
+class SpatialIndex:
+    """Exact nearest-n and rectangle queries over (lat, lng, flags, value) points."""
+
+    def __init__(self, items):
+        self._seq = count()
+        # [lat, lng, seq, flags, value]: a list so reflag() can change it in place
+        points = [[float(lat), float(lng), next(self._seq), flags, value] for lat, lng, flags, value in items]
+        self._points = {id(p[4]): p for p in points}
+        self._root = _build(points) if points else None
+        self._extra = []
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def add(self, lat: float, lng: float, flags: int, value):
+        """Index one more point (after all existing ones in insertion order)."""
+        point = [float(lat), float(lng), next(self._seq), flags, value]
+        self._points[id(value)] = point
+        self._extra.append(point)
+
+    def reflag(self, value, flags: int):
+        """Replace the flags of the point holding `value`."""
+        self._points[id(value)][3] = flags
+
+    def nearest(self, lat: float, lng: float, n: int, mask: int = 0) -> list:
+        """Values of the `n` nearest points having every flag in `mask`, nearest first."""
+        if n <= 0:
+            return []
+
+        def near(points):
+            return [((a - lat) * (a - lat) + (b - lng) * (b - lng), seq, value)
+                    for a, b, seq, flags, value in points if flags & mask == mask]
+
+        # (distance, seq, value) candidates; seq is unique, so values are never compared
+        found = near(self._extra)
+        if self._root is not None:
+            # Take buckets nearest-box-first. Once n points are in hand, the n-th
+            # distance bounds the answer: only boxes within it can still hold one.
+            # Whenever the candidates grow by half again, trim them and tighten the bound.
+            limit = None
+            tie = count()
+            queue = [(0.0, next(tie), self._root)]
+            while queue:
+                reach, _, node = heapq.heappop(queue)
+                if limit is not None and reach > limit:
+                    break
+                if node.points is not None:
+                    found.extend(near(node.points))
+                    if len(found) >= n + n // 2:
+                        found.sort()
+                        del found[n:]
+                        limit = found[-1][0]
+                    continue
+                for child in (node.low, node.high):
+                    heapq.heappush(queue, (_reach(child, lat, lng), next(tie), child))
+        found.sort()
+        return [value for _, _, value in found[:n]]
+
+    def within(self, south: float, north: float, west: float, east: float, mask: int = 0) -> list:
+        """Values of the points inside the rectangle (edges included) having every flag in `mask`, in insertion order."""
+        found = [p for p in self._extra if south <= p[0] <= north and west <= p[1] <= east]
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.north < south or node.south > north or node.east < west or node.west > east:
+                continue
+            if south <= node.south and node.north <= north and west <= node.west and node.east <= east:
+                _collect(node, found)
+            elif node.points is not None:
+                found.extend(p for p in node.points if south <= p[0] <= north and west <= p[1] <= east)
+            else:
+                stack.append(node.low)
+                stack.append(node.high)
+        found = [p for p in found if p[3] & mask == mask]
+        found.sort(key=_seq)
+        return [p[4] for p in found]
+
+
+def _build(points: list) -> _Node:
+    """A subtree over `points`, split at the median of its box's longer side."""
+    node = _Node(points)
+    if len(points) <= BUCKET:
+        node.points = points
+        return node
+    axis = 0 if node.north - node.south >= node.east - node.west else 1
+    points.sort(key=lambda p: p[axis])
+    middle = len(points) // 2
+    node.low, node.high = _build(points[:middle]), _build(points[middle:])
+    return node
+
+
+def _reach(node: _Node, lat: float, lng: float) -> float:
+    """Squared distance from (lat, lng) to the nearest point of the node's box."""
+    dlat = max(node.south - lat, 0.0, lat - node.north)
+    dlng = max(node.west - lng, 0.0, lng - node.east)
+    return dlat * dlat + dlng * dlng
+
+
+def _seq(point: list) -> int:
+    return point[2]
+
+
+def _collect(node: _Node, found: list):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.points is not None:
+            found.extend(node.points)
+        else:
+            stack.append(node.low)
+            stack.append(node.high)
@@ -0,0 +1,885 @@
+"""
+Local Supabase stand-in with a seeded synthetic dataset.
+
+The list, the map, pagination (TC-22) and the city bubbles (TC-20, TC-25)
+behave differently at 10k, 100k or 200k locations, the thresholds named in
+`docs/scaling-plan-static-geojson.md`. `SupabaseStandIn` serves the part of
+Supabase the app uses from memory, over a dataset generated from a seed, so
+the dev server and the suite can be pointed at any scale:
+
+- PostgREST (`/rest/v1/`): table reads with `select` (columns, aliases and
+  one level of embedding, including `count`), the usual filters (`eq`, `neq`,
+  `gt`/`gte`/`lt`/`lte`, `like`/`ilike`, `in`, `is`, `not.`, `or=`), `order`,
+  `limit`/`offset`, exact counts and single-object responses, plus inserts,
+  upserts, updates and deletes. Tables the generator doesn't fill start
+  empty; `pp_locations_with_votes` and `pp_location_scores` are derived from
+  `pp_locations` and `pp_votes` like the real views.
+- The RPCs `get_nearby_locations`, `get_locations_in_bounds`,
+  `get_location_cities` and `get_location_voters`, with the filters and
+  ordering of their SQL definitions under `sql/`. The spatial two are
+  answered from a `SpatialIndex` (harness/spatial.py) and city summaries are
+  cached until a location or vote changes, so the stand-in stays out of the
+  way of latency measurements; each RPC response reports its own time in a
+  `Server-Timing: rpc;dur=<ms>` header.
+- Enough of Auth (`/auth/v1/`) for `AuthStates` and the app's API routes:
+  magic links through the admin API, OTP sign-in (any code is accepted),
+  token refresh and `getUser`. Tokens are HS256 JWTs signed with
+  `JWT_SECRET`; users are created on first sign-in with a `pp_profiles` row.
+
+There is no row-level security: every key acts as the service role.
+
+The generator spreads locations over the metros of `src/lib/metros.ts`, each
+with a core city and a few suburbs, so city summaries consolidate the way the
+real data does. Scores, sizes, release flags and votes are drawn from the
+same seeded generator, so a given (size, seed) always produces the same rows.
+
+Run it with `tests/supabase_standin.py`, which prints the environment for the
+dev server and the suite.
+"""
+
+import base64
+import fnmatch
+import hashlib
+import hmac
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .sources import PROJECT_ROOT
+from .spatial import SpatialIndex
+
+# Dataset sizes named in the scaling plan
+SIZES = {"10k": 10_000, "100k": 100_000, "200k": 200_000}
+
+JWT_SECRET = "parent-picker-standin"
+
+# PostgREST's page cap (the app pages with .range() because of it)
+MAX_ROWS = 1000
+
+# `{ name: "Austin", state: "TX", lat: 30.2672, lng: -97.7431 }` in US_METROS
+_METRO = re.compile(r'\{\s*name:\s*"([^"]+)",\s*state:\s*"([A-Z]{2})",\s*lat:\s*(-?[\d.]+),\s*lng:\s*(-?[\d.]+)')
+
+# `lat: 30.2672, lng: -97.7431` in ALL_METROS
+_ACTIVE_FILE = "src/lib/active-metros.ts"
+_ACTIVE = re.compile(r"slug:.*?lat:\s*(-?[\d.]+),\s*lng:\s*(-?[\d.]+)")
+
+_SUBURBS = ("Heights", "Park", "Hills", "Springs", "Grove", "Lakes", "Village", "Ridge", "Meadows", "Crossing")
+_STREETS = ("Oak", "Maple", "Cedar", "Elm", "Pine", "Main", "Park", "Lake", "Hill", "Washington", "Lincoln",
+            "Jackson", "Sunset", "Ridge", "Highland", "Church", "Mill", "River", "Spring", "Willow")
+_STREET_TYPES = ("St", "Ave", "Blvd", "Dr", "Ln", "Rd", "Way", "Pkwy")
+_FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn")
+_LAST_NAMES = ("Garcia", "Smith", "Nguyen", "Patel", "Johnson", "Kim", "Lopez", "Brown", "Davis", "Martin")
+
+# (overall color, weight); None is unscored
+_COLORS = (("GREEN", 30), ("YELLOW", 25), ("AMBER", 10), ("RED", 20), (None, 15))
+_SUBSCORE_COLORS = ("GREEN", "YELLOW", "AMBER", "RED")
+_SIZES = {"Micro": 25, "Micro2": 50, "Growth": 150, "Full Size": 250, "Red (Reject)": None}
+
+# Columns of the location RPCs (sql/2026-05-18-location-overrides.sql), in order
+_LOCATION_RPC_COLUMNS = (
+    "id", "name", "address", "city", "state", "zip", "lat", "lng", "vote_count", "not_here_count",
+    "source", "released", "overall_color", "overall_score", "overall_details_url",
+    "price_color", "zoning_color", "neighborhood_color", "play_area_color", "building_color",
+    "school_size_category", "capacity", "proposed", "property_source_key", "feedback_deadline", "is_bridge",
+    "opened_at", "upgrade_for_location_id", "regulatory_required", "permits_required", "summer_program",
+    "capacity_override", "target_open_date_override", "max_cap_capacity_override", "max_cap_date_override",
+    "leasing_status", "leasing_details", "loi_status", "strategy_status",
+    "dd_fast_open_capacity", "dd_fast_open_proj_open_date", "dd_max_cap_capacity", "dd_max_cap_proj_open_date",
+)
+
+# Location columns the generator leaves at their defaults
+_LOCATION_DEFAULTS = {
+    "zip": None, "notes": None, "suggested_by": None, "rebl3_site_id": None, "property_source_key": None,
+    "feedback_deadline": None, "is_bridge": False, "opened_at": None, "upgrade_for_location_id": None,
+    "regulatory_required": None, "permits_required": None, "summer_program": None,
+    "zoning_cleared": None, "regulatory_approved": None, "permits_acquired": None,
+    "capacity_override": None, "target_open_date_override": None, "max_cap_capacity_override": None,
+    "max_cap_date_override": None, "leasing_status": None, "leasing_details": None, "loi_status": None,
+    "strategy_status": None, "dd_fast_open_capacity": None, "dd_fast_open_proj_open_date": None,
+    "dd_max_cap_capacity": None, "dd_max_cap_proj_open_date": None, "overall_details_url": None,
+    "overall_color": None, "overall_score": None, "price_color": None, "zoning_color": None,
+    "neighborhood_color": None, "play_area_color": None, "building_color": None,
+    "demographics_color": None, "size_classification": None, "capacity": None,
+    "released": False, "proposed": False, "status": "active", "source": "rebl3",
+}
+
+# Score columns that live in pp_location_scores rather than pp_locations
+_SCORE_COLUMNS = ("overall_score", "overall_color", "overall_details_url", "price_color", "zoning_color",
+                  "neighborhood_color", "play_area_color", "building_color", "demographics_color",
+                  "size_classification")
+
+# Views: name -> the tables they read
+_VIEWS = {
+    "pp_locations_with_votes": ("pp_locations", "pp_votes"),
+    "pp_location_scores": ("pp_locations",),
+}
+
+# (table, column) -> referenced table, for embedding
+_FOREIGN_KEYS = {
+    ("pp_votes", "location_id"): "pp_locations",
+    ("pp_votes", "user_id"): "pp_profiles",
+    ("pp_contributions", "location_id"): "pp_locations",
+    ("pp_contributions", "user_id"): "pp_profiles",
+    ("pp_admin_actions", "location_id"): "pp_locations",
+    ("pp_site_champions", "site_id"): "pp_locations",
+    ("pp_site_champions", "user_id"): "pp_profiles",
+    ("pp_help_requests", "location_id"): "pp_locations",
+    ("pp_location_photos", "location_id"): "pp_locations",
+    ("pp_location_overrides", "location_id"): "pp_locations",
+    ("pp_site_problems", "site_id"): "pp_locations",
+    ("pp_problem_owners", "problem_id"): "pp_site_problems",
+    ("pp_problem_updates", "problem_id"): "pp_site_problems",
+}
+
+# Unique keys besides `id`, for upserts and duplicate inserts
+_UNIQUE = {"pp_votes": ("location_id", "user_id"), "pp_location_overrides": ("location_id",)}
+
+_CORS = {
+    "access-control-allow-origin": "*",
+    "timing-allow-origin": "*",
+    "access-control-allow-methods": "GET, POST, PATCH, PUT, DELETE, HEAD, OPTIONS",
+    "access-control-expose-headers": "content-range, content-profile",
+    "access-control-max-age": "86400",
+}
+_JSON = "application/json; charset=utf-8"
+_OBJECT = "application/vnd.pgrst.object+json"
+
+
+# Spatial index flags: the location RPCs' row filters
+ACTIVE = 1  # status = 'active'
+LISTED = 2  # released or proposed (get_locations_in_bounds with released_only)
+RELEASED = 4  # released (get_nearby_locations with released_only)
+
+
+def _flags(row: dict) -> int:
+    flags = ACTIVE if row.get("status", "active") == "active" else 0
+    if row.get("released") or row.get("proposed"):
+        flags |= LISTED
+    if row.get("released"):
+        flags |= RELEASED
+    return flags
+
+
+class QueryError(Exception):
+    """A request PostgREST would reject; rendered in its error shape."""
+
+    def __init__(self, status: int, code: str, message: str, details=None, hint=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": hint}
+
+
+def parse_size(text: str) -> int:
+    """A dataset size: a key of SIZES ("100k") or a plain number of locations."""
+    return SIZES.get(text.lower()) or int(text.replace("_", "").replace(",", ""))
+
+
+# -- synthetic data ----------------------------------------------------------
+
+def metros() -> list:
+    """(name, state, lat, lng) for each metro in src/lib/metros.ts."""
+    text = (PROJECT_ROOT / "src/lib/metros.ts").read_text()
+    return [(name, state, float(lat), float(lng)) for name, state, lat, lng in _METRO.findall(text)]
+
+
+def generate(locations: int, seed: int = 0) -> dict:
+    """
+    Tables for a dataset of `locations` locations: pp_locations, pp_profiles
+    and pp_votes. The same (locations, seed) always gives the same rows.
+    """
+    rng = random.Random(seed)
+    epoch = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def ident():
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def stamp():
+        return (epoch - timedelta(seconds=rng.randrange(365 * 86400))).isoformat()
+
+    # Each metro: a core city and a few suburbs 8-30 miles out, with a popularity
+    # weight; metros the app features (active-metros.ts) get the most locations
+    active = [(float(lat), float(lng)) for lat, lng in _ACTIVE.findall((PROJECT_ROOT / _ACTIVE_FILE).read_text())]
+    cities, weights = [], []
+    for name, state, lat, lng in metros():
+        core = name.split("-")[0]
+        weight = min(rng.paretovariate(1.2), 20)
+        if any(abs(lat - a) < 0.5 and abs(lng - b) < 0.5 for a, b in active):
+            weight *= 4
+        cities.append((core, state, lat, lng, 0.06))
+        weights.append(weight * 2)
+        for suffix in rng.sample(_SUBURBS, rng.randint(2, 6)):
+            miles, bearing = rng.uniform(8, 30), rng.uniform(0, 2 * math.pi)
+            cities.append((f"{core} {suffix}", state, lat + miles / 69 * math.cos(bearing),
+                           lng + miles / (69 * math.cos(math.radians(lat))) * math.sin(bearing), 0.03))
+            weights.append(weight / 3)
+
+    rows = []
+    colors, color_weights = zip(*_COLORS)
+    for city, state, lat, lng, spread in rng.choices(cities, weights, k=locations):
+        address = f"{rng.randint(100, 19999)} {rng.choice(_STREETS)} {rng.choice(_STREET_TYPES)}"
+        row = {
+            "id": ident(), "name": address, "address": address, "city": city, "state": state,
+            "zip": f"{rng.randint(10000, 99999)}",
+            "lat": round(rng.gauss(lat, spread), 6), "lng": round(rng.gauss(lng, spread), 6),
+            "created_at": stamp(),
+        }
+        if rng.random() < 0.03:
+            row["status"] = "pending_scoring"
+        if rng.random() < 0.08:
+            row["source"] = "parent_suggested"
+        if rng.random() < 0.6:
+            row["released"] = True
+        elif rng.random() < 0.05:
+            row["proposed"] = True
+        color = rng.choices(colors, color_weights)[0]
+        if color is not None:
+            size = rng.choice(tuple(_SIZES))
+            row.update({
+                "overall_color": color,
+                "overall_score": {"GREEN": 85, "YELLOW": 65, "AMBER": 50, "RED": 25}[color] + rng.randint(-10, 10),
+                "size_classification": size, "capacity": _SIZES[size],
+                **{f"{part}_color": rng.choice(_SUBSCORE_COLORS)
+                   for part in ("price", "zoning", "neighborhood", "building", "demographics")},
+            })
+        rows.append(row)
+
+    profiles = []
+    for n in range(max(50, locations // 20)):
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        profiles.append({"id": ident(), "email": f"parent{n}@example.test", "display_name": f"{first} {last}",
+                         "home_address": None, "home_lat": None, "home_lng": None,
+                         "drive_time_minutes": None, "created_at": stamp()})
+
+    # Most locations have no votes; a few have dozens
+    votes = []
+    for row in rows:
+        count = min(int(rng.expovariate(1.2)), len(profiles))
+        for profile in rng.sample(profiles, count) if count else ():
+            votes.append({"id": ident(), "location_id": row["id"], "user_id": profile["id"],
+                          "vote_type": "not_here" if rng.random() < 0.1 else "in",
+                          "comment": None, "created_at": stamp()})
+
+    return {"pp_locations": rows, "pp_profiles": profiles, "pp_votes": votes}
+
+
+# -- the stand-in -------------------------------------------------------------
+
+class SupabaseStandIn:
+    """PostgREST, the app's RPCs and a sliver of Auth over in-memory tables."""
+
+    def __init__(self, locations: int = SIZES["10k"], seed: int = 0):
+        self.size = locations
+        self.seed = seed
+        self.tables = generate(locations, seed)
+        self.users = {}  # auth user id -> user
+        self.refresh_tokens = {}  # refresh token -> user id
+        self._ids = {}  # table -> {id: row}, built on first lookup
+        self._versions = {}  # table -> write count, for the derived caches
+        self._derived = {}  # cache key -> (versions, value)
+        self._spatial = None  # SpatialIndex over pp_locations, built on first use
+        self._lock = threading.RLock()
+
+    @property
+    def anon_key(self) -> str:
+        return self._jwt({"role": "anon", "iss": "supabase-standin"}, lifetime=10 * 365 * 86400)
+
+    @property
+    def service_key(self) -> str:
+        return self._jwt({"role": "service_role", "iss": "supabase-standin"}, lifetime=10 * 365 * 86400)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 54321, verbose: bool = False) -> ThreadingHTTPServer:
+        """An HTTP server for the stand-in (call `serve_forever()` on it)."""
+        server = ThreadingHTTPServer((host, port), _handler(self, verbose))
+        server.daemon_threads = True
+        return server
+
+    def handle(self, method: str, url: str, headers: dict, body: bytes = b"") -> tuple:
+        """(status, headers, body) for a request; `headers` keys are lower-case."""
+        split = urlsplit(url)
+        query = parse_qsl(split.query, keep_blank_values=True)
+        try:
+            if method == "OPTIONS":
+                allow = headers.get("access-control-request-headers", "*")
+                return 204, {**_CORS, "access-control-allow-headers": allow}, b""
+            payload = json.loads(body) if body else None
+            with self._lock:
+                if split.path.startswith("/rest/v1/rpc/"):
+                    status, extra, result = self._rpc(method, split.path[len("/rest/v1/rpc/"):], query, headers, payload)
+                elif split.path.startswith("/rest/v1/"):
+                    status, extra, result = self._table(method, split.path[len("/rest/v1/"):], query, headers, payload)
+                elif split.path.startswith("/auth/v1/"):
+                    status, extra, result = self._auth(method, split.path[len("/auth/v1/"):], query, headers, payload)
+                else:
+                    raise QueryError(404, "PGRST125", f"Invalid path {split.path}")
+        except QueryError as e:
+            status, extra, result = e.status, {}, e.body
+        except ValueError as e:
+            status, extra, result = 400, {}, {"code": "PGRST102", "message": str(e), "details": None, "hint": None}
+        out = b"" if result is None or method == "HEAD" else json.dumps(result, separators=(",", ":")).encode()
+        return status, {**_CORS, "content-type": _JSON, **extra}, out
+
+    # -- rows -------------------------------------------------------------------
+
+    def rows(self, name: str) -> list:
+        """Every row of a table or view (views built from the current tables)."""
+        if name == "pp_locations_with_votes":
+            return self._cached(name, self._view_with_votes)
+        if name == "pp_location_scores":
+            return self._cached(name, self._view_scores)
+        return self.tables.setdefault(name, [])
+
+    def location(self, row: dict) -> dict:
+        """A pp_locations row with its defaults and vote counts filled in."""
+        counts = self._vote_counts().get(row["id"], (0, 0))
+        return {**_LOCATION_DEFAULTS, **row, "vote_count": counts[0], "not_here_count": counts[1]}
+
+    def _by_id(self, name: str) -> dict:
+        if name not in self._ids:
+            self._ids[name] = {row["id"]: row for row in self.rows(name) if "id" in row}
+        return self._ids[name]
+
+    def _changed(self, name: str):
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self._ids.pop(name, None)
+
+    def _cached(self, key: str, build):
+        """`build()`, reused until a table behind `key` changes."""
+        tables = _VIEWS.get(key, ("pp_locations", "pp_votes"))
+        versions = tuple(self._versions.get(t, 0) for t in tables)
+        hit = self._derived.get(key)
+        if hit is None or hit[0] != versions:
+            hit = self._derived[key] = (versions, build())
+        return hit[1]
+
+    def _vote_counts(self) -> dict:
+        def build():
+            counts = {}
+            for vote in self.tables["pp_votes"]:
+                pair = counts.setdefault(vote["location_id"], [0, 0])
+                pair[vote["vote_type"] == "not_here"] += 1
+            return counts
+        return self._cached("vote_counts", build)
+
+    def _view_with_votes(self) -> list:
+        views = []
+        for row in self.tables["pp_locations"]:
+            view = self.location(row)
+            view["votes"] = view.pop("vote_count")
+            views.append(view)
+        return views
+
+    def _view_scores(self) -> list:
+        return [
+            {"id": row["id"], "location_id": row["id"], **{c: row.get(c) for c in _SCORE_COLUMNS},
+             "updated_at": row.get("created_at")}
+            for row in self.tables["pp_locations"] if row.get("overall_color")
+        ]
+
+    # -- RPCs -------------------------------------------------------------------
+
+    def _rpc(self, method: str, name: str, query: list, headers: dict, args) -> tuple:
+        function = _RPCS.get(name)
+        if function is None:
+            raise QueryError(404, "PGRST202", f"Could not find the function public.{name} in the schema cache")
+        if method in ("GET", "HEAD"):
+            names = _RPC_ARGS[name]
+            args = {k: _argument(v) for k, v in query if k in names}
+            query = [(k, v) for k, v in query if k not in names]
+        started = time.perf_counter()
+        rows = function(self, args or {})
+        elapsed = (time.perf_counter() - started) * 1000
+        status, extra, body = self._respond(200, rows, query, headers, table=None)
+        return status, {**extra, "server-timing": f"rpc;dur={elapsed:.3f}"}, body
+
+    def nearby(self, args: dict) -> list:
+        """get_nearby_locations: active locations by squared lat/lng distance."""
+        lat, lng = float(args["center_lat"]), float(args["center_lng"])
+        limit = int(args.get("max_results", 500))
+        released_only = bool(args.get("released_only"))
+        mask = ACTIVE | RELEASED if released_only else ACTIVE
+        return self._rpc_rows(self.spatial.nearest(lat, lng, limit, mask), proposed=False)
+
+    def in_bounds(self, args: dict) -> list:
+        """get_locations_in_bounds: active locations inside the box, released or proposed when asked."""
+        south, north = float(args["min_lat"]), float(args["max_lat"])
+        west, east = float(args["min_lng"]), float(args["max_lng"])
+        released_only = bool(args.get("released_only"))
+        mask = ACTIVE | LISTED if released_only else ACTIVE
+        return self._rpc_rows(self.spatial.within(south, north, west, east, mask))
+
+    def cities(self, args: dict) -> list:
+        """get_location_cities: active locations grouped by (city, state)."""
+        key = json.dumps(args, sort_keys=True)
+        return self._cached(f"cities {key}", lambda: self._cities(args))
+
+    def _cities(self, args: dict) -> list:
+        released_only = bool(args.get("released_only"))
+        exclude_red = bool(args.get("exclude_red"))
+        exclude_unscored = bool(args.get("exclude_unscored"))
+        counts = self._vote_counts()
+        groups = {}
+        for row in self.tables["pp_locations"]:
+            if row.get("status", "active") != "active" or (released_only and not row.get("released")):
+                continue
+            color = row.get("overall_color")
+            if exclude_red and (color == "RED" or row.get("size_classification") == "Red (Reject)"):
+                continue
+            if exclude_unscored and color is None:
+                continue
+            group = groups.setdefault((row["city"], row["state"]), [0.0, 0.0, 0, 0])
+            group[0] += row["lat"]
+            group[1] += row["lng"]
+            group[2] += 1
+            group[3] += counts.get(row["id"], (0, 0))[0]
+        return [
+            {"city": city, "state": state, "lat": lat / n, "lng": lng / n, "location_count": n, "total_votes": votes}
+            for (city, state), (lat, lng, n, votes) in groups.items()
+        ]
+
+    def voters(self, args: dict) -> list:
+        """get_location_voters: each vote on the given locations with the voter's profile."""
+        wanted = set(args.get("location_ids") or ())
+        profiles = self._by_id("pp_profiles")
+        rows = []
+        for vote in self.tables["pp_votes"]:
+            if vote["location_id"] in wanted:
+                profile = profiles.get(vote["user_id"], {})
+                rows.append({"location_id": vote["location_id"], "user_id": vote["user_id"],
+                             "vote_type": vote["vote_type"], "display_name": profile.get("display_name"),
+                             "email": profile.get("email"), "comment": vote.get("comment"),
+                             "created_at": vote.get("created_at")})
+        return rows
+
+    def _rpc_rows(self, rows: list, proposed: bool = True) -> list:
+        """Location RPC result rows, each built once until a location or vote changes."""
+        built = self._cached(f"rpc rows {proposed}", dict)
+        out = []
+        for row in rows:
+            result = built.get(row["id"])
+            if result is None:
+                location = self.location(row)
+                location["school_size_category"] = location["size_classification"]
+                result = built[row["id"]] = {c: location.get(c) for c in _LOCATION_RPC_COLUMNS
+                                             if proposed or c != "proposed"}
+            out.append(result)
+        return out
+
+    # -- tables -----------------------------------------------------------------
+
+    def _table(self, method: str, name: str, query: list, headers: dict, payload) -> tuple:
+        if method in ("GET", "HEAD"):
+            rows = [row for row in self.rows(name) if _matches(row, _filters(query))]
+            return self._respond(200, rows, query, headers, table=name)
+        if name in _VIEWS:
+            raise QueryError(405, "PGRST100", f"Cannot write to the view {name}")
+        prefer = headers.get("prefer", "")
+        if method == "POST":
+            changed = self._insert(name, payload, query, prefer)
+        elif method == "PATCH":
+            changed = [row for row in self.rows(name) if _matches(row, _filters(query))]
+            for row in changed:
+                row.update(payload or {})
+        elif method == "DELETE":
+            doomed = {id(row) for row in self.rows(name) if _matches(row, _filters(query))}
+            changed = [row for row in self.rows(name) if id(row) in doomed]
+            self.tables[name] = [row for row in self.rows(name) if id(row) not in doomed]
+        else:
+            raise QueryError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+        self._changed(name)
+        if name == "pp_locations":
+            self._track(method, changed, payload, prefer)
+        if "return=representation" not in prefer:
+            return 201 if method == "POST" else 204, {}, None
+        select = [(k, v) for k, v in query if k == "select"]
+        return self._respond(201 if method == "POST" else 200, changed, select, headers, table=name)
+
+    @property
+    def spatial(self) -> SpatialIndex:
+        """The index behind the location RPCs, built over pp_locations on first use."""
+        if self._spatial is None:
+            self._spatial = SpatialIndex(
+                (row["lat"], row["lng"], _flags(row), row)
+                for row in self.tables["pp_locations"] if row.get("lat") is not None
+            )
+        return self._spatial
+
+    def _track(self, method: str, changed: list, payload, prefer: str):
+        """Keep the spatial index in step with a write to pp_locations."""
+        if self._spatial is None:
+            return
+        if method == "POST" and "resolution=" not in prefer:
+            for row in changed:
+                if row.get("lat") is not None:
+                    self._spatial.add(row["lat"], row["lng"], _flags(row), row)
+        elif method == "PATCH" and not {"lat", "lng"} & (payload or {}).keys():
+            for row in changed:
+                self._spatial.reflag(row, _flags(row))
+        else:
+            self._spatial = None  # rows left, moved or were upserted: rebuild on the next query
+
+    def _insert(self, name: str, payload, query: list, prefer: str) -> list:
+        incoming = payload if isinstance(payload, list) else [payload or {}]
+        on_conflict = dict(query).get("on_conflict")
+        keys = tuple(on_conflict.split(",")) if on_conflict else _UNIQUE.get(name, ("id",))
+        table = self.rows(name)
+        existing = {tuple(row.get(k) for k in keys): row for row in table}
+        changed = []
+        for values in incoming:
+            key = tuple(values.get(k) for k in keys)
+            match = existing.get(key) if all(v is not None for v in key) else None
+            if match is None and "id" in values:
+                match = self._by_id(name).get(values["id"])
+            if match is not None:
+                if "resolution=merge-duplicates" in prefer:
+                    match.update(values)
+                    changed.append(match)
+                elif "resolution=ignore-duplicates" not in prefer:
+                    raise QueryError(409, "23505", f'duplicate key value violates unique constraint "{name}_key"',
+                                     details=f"Key ({', '.join(keys)})=({', '.join(map(str, key))}) already exists.")
+                continue
+            row = {"id": str(uuid.uuid4()), "created_at": _now(), **values}
+            table.append(row)
+            existing[key] = row
+            changed.append(row)
+        return changed
+
+    # -- responses --------------------------------------------------------------
+
+    def _respond(self, status: int, rows: list, query: list, headers: dict, table) -> tuple:
+        """Order, page and project `rows` as PostgREST would, with Content-Range and counts."""
+        params = dict(query)
+        if table is None:  # RPC results can be filtered like a table
+            rows = [row for row in rows if _matches(row, _filters(query))]
+        if "order" in params:
+            rows = _order(rows, params["order"])
+        total = len(rows)
+        offset, limit = int(params.get("offset", 0)), params.get("limit")
+        if "range" in headers:
+            start, _, end = headers["range"].partition("-")
+            offset = int(start)
+            limit = int(end) - offset + 1 if end else None
+        limit = min(int(limit), MAX_ROWS) if limit is not None else MAX_ROWS
+        page = rows[offset:offset + limit]
+        counted = re.search(r"count=(exact|planned|estimated)", headers.get("prefer", ""))
+        extent = f"{offset}-{offset + len(page) - 1}" if page else "*"
+        extra = {"content-range": f"{extent}/{total if counted else '*'}"}
+        body = self._project(table, page, params.get("select", "*"))
+        if _OBJECT in headers.get("accept", ""):
+            if len(body) != 1:
+                raise QueryError(406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                                 details=f"The result contains {len(body)} rows")
+            return status, {**extra, "content-type": f"{_OBJECT}; charset=utf-8"}, body[0]
+        return status, extra, body
+
+    def _project(self, table, rows: list, select: str) -> list:
+        fields = _parse_select(select)
+        if fields == [("*", "*", None)]:
+            return [self.location(r) if table == "pp_locations" else dict(r) for r in rows]
+        out = []
+        for row in rows:
+            full = self.location(row) if table == "pp_locations" else row
+            item = {}
+            for alias, column, embed in fields:
+                if embed is not None:
+                    item[alias] = self._embed(table, row, column, embed)
+                elif column == "*":
+                    item.update(full)
+                else:
+                    item[alias] = full.get(column)
+            out.append(item)
+        return out
+
+    def _embed(self, table, row: dict, target: str, select: str):
+        """Embedded rows of `target`: the referenced row, or the rows referencing this one."""
+        base = "pp_locations" if table in _VIEWS else table
+        for (source, column), referenced in _FOREIGN_KEYS.items():
+            if source == base and referenced == target:  # many-to-one: an object
+                parent = self._by_id(target).get(row.get(column))
+                return self._project(target, [parent], select)[0] if parent else None
+        for (source, column), referenced in _FOREIGN_KEYS.items():
+            if source == target and referenced == base:  # one-to-many: a list
+                children = [child for child in self.rows(target) if child.get(column) == row.get("id")]
+                if select.strip() == "count":
+                    return [{"count": len(children)}]
+                return self._project(target, children, select)
+        raise QueryError(400, "PGRST200", f"Could not find a relationship between '{table}' and '{target}'")
+
+    # -- auth -------------------------------------------------------------------
+
+    def _auth(self, method: str, path: str, query: list, headers: dict, payload) -> tuple:
+        payload = payload or {}
+        if path == "admin/generate_link":
+            user = self._user(payload["email"])
+            token = self._jwt({"sub": user["id"], "kind": "link"}, lifetime=3600)
+            return 200, {}, {**user, "hashed_token": token, "properties": {"hashed_token": token}}
+        if path == "otp":
+            self._user(payload["email"])
+            return 200, {}, {}
+        if path == "verify":
+            if payload.get("token_hash"):
+                claims = self._claims(payload["token_hash"])
+                return 200, {}, self._session(self.users[claims["sub"]])
+            return 200, {}, self._session(self._user(payload["email"]))
+        if path == "token" and dict(query).get("grant_type") == "refresh_token":
+            user_id = self.refresh_tokens.pop(payload.get("refresh_token"), None)
+            if user_id is None:
+                raise QueryError(400, "refresh_token_not_found", "Invalid Refresh Token: Refresh Token Not Found")
+            return 200, {}, self._session(self.users[user_id])
+        if path == "user":
+            claims = self._claims(headers.get("authorization", "").removeprefix("Bearer "))
+            if claims.get("sub") not in self.users:
+                raise QueryError(401, "bad_jwt", "invalid JWT: unable to parse or verify signature")
+            return 200, {}, self.users[claims["sub"]]
+        if path == "logout":
+            return 204, {}, None
+        if path.startswith("admin/users/") and method == "GET":
+            user = self.users.get(path.rsplit("/", 1)[1])
+            if user is None:
+                raise QueryError(404, "user_not_found", "User not found")
+            return 200, {}, user
+        raise QueryError(404, "not_found", f"The stand-in doesn't implement /auth/v1/{path}")
+
+    def _user(self, email: str) -> dict:
+        """The auth user for `email`, created (with a profile) on first use."""
+        for user in self.users.values():
+            if user["email"].lower() == email.lower():
+                return user
+        profile = next((p for p in self.rows("pp_profiles") if p.get("email", "").lower() == email.lower()), None)
+        if profile is None:
+            profile = {"id": str(uuid.uuid4()), "email": email, "display_name": email.split("@")[0],
+                       "created_at": _now()}
+            self.rows("pp_profiles").append(profile)
+            self._changed("pp_profiles")
+        user = {"id": profile["id"], "aud": "authenticated", "role": "authenticated", "email": email,
+                "email_confirmed_at": profile["created_at"], "app_metadata": {"provider": "email"},
+                "user_metadata": {}, "created_at": profile["created_at"]}
+        self.users[user["id"]] = user
+        return user
+
+    def _session(self, user: dict, lifetime: int = 3600) -> dict:
+        refresh = uuid.uuid4().hex
+        self.refresh_tokens[refresh] = user["id"]
+        return {
+            "access_token": self._jwt({"sub": user["id"], "email": user["email"], "role": "authenticated",
+                                       "aud": "authenticated", "session_id": uuid.uuid4().hex}, lifetime),
+            "token_type": "bearer", "expires_in": lifetime, "expires_at": int(time.time()) + lifetime,
+            "refresh_token": refresh, "user": user,
+        }
+
+    def _jwt(self, claims: dict, lifetime: int) -> str:
+        now = int(time.time())
+        parts = [_b64({"alg": "HS256", "typ": "JWT"}), _b64({**claims, "iat": now, "exp": now + lifetime})]
+        signature = hmac.new(JWT_SECRET.encode(), ".".join(parts).encode(), hashlib.sha256).digest()
+        return ".".join(parts + [base64.urlsafe_b64encode(signature).rstrip(b"=").decode()])
+
+    def _claims(self, token: str) -> dict:
+        try:
+            header, claims, signature = token.split(".")
+            expected = hmac.new(JWT_SECRET.encode(), f"{header}.{claims}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(base64.urlsafe_b64encode(expected).rstrip(b"=").decode(), signature):
+                raise ValueError("bad signature")
+            decoded = json.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))
+        except ValueError:
+            raise QueryError(401, "bad_jwt", "invalid JWT: unable to parse or verify signature")
+        if decoded.get("exp", 0) < time.time():
+            raise QueryError(401, "bad_jwt", "invalid JWT: token is expired")
+        return decoded
+
+
+_RPCS = {
+    "get_nearby_locations": SupabaseStandIn.nearby,
+    "get_locations_in_bounds": SupabaseStandIn.in_bounds,
+    "get_location_cities": SupabaseStandIn.cities,
+    "get_location_voters": SupabaseStandIn.voters,
+}
+_RPC_ARGS = {
+    "get_nearby_locations": ("center_lat", "center_lng", "max_results", "released_only"),
+    "get_locations_in_bounds": ("min_lat", "max_lat", "min_lng", "max_lng", "released_only"),
+    "get_location_cities": ("released_only", "exclude_red", "exclude_unscored"),
+    "get_location_voters": ("location_ids",),
+}
+
+
+# -- PostgREST query syntax ----------------------------------------------------
+
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _filters(query: list) -> list:
+    """Filters from the query string as (column, negated, operator, value); `or`/`and` nest."""
+    filters = []
+    for key, value in query:
+        if key in _RESERVED:
+            continue
+        if key in ("or", "and", "not.or", "not.and"):
+            negated, _, kind = key.rpartition(".")
+            filters.append((kind, bool(negated), "group", [_filter(item) for item in _split(value.strip()[1:-1])]))
+        else:
+            filters.append(_filter(f"{key}.{value}"))
+    return filters
+
+
+def _filter(text: str) -> tuple:
+    """One `column.[not.]operator.value` condition (or a nested `or(...)`/`and(...)`)."""
+    match = re.match(r"^(not\.)?(or|and)\((.*)\)$", text)
+    if match:
+        return match[2], bool(match[1]), "group", [_filter(item) for item in _split(match[3])]
+    column, rest = text.split(".", 1)
+    negated = rest.startswith("not.")
+    if negated:
+        rest = rest[4:]
+    operator, _, value = rest.partition(".")
+    if operator not in _OPERATORS:
+        raise QueryError(400, "PGRST100", f'failed to parse filter ({operator}.{value})')
+    return column, negated, operator, value
+
+
+def _split(text: str) -> list:
+    """Split on commas outside parentheses and double quotes."""
+    items, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in "()":
+            depth += 1 if char == "(" else -1
+        elif char == "," and not depth and not quoted:
+            items.append(current)
+            current = ""
+            continue
+        current += char
+    if current:
+        items.append(current)
+    return [item.strip() for item in items]
+
+
+def _matches(row: dict, filters: list) -> bool:
+    return all(_test(row, f) for f in filters)
+
+
+def _test(row: dict, condition: tuple) -> bool:
+    column, negated, operator, value = condition
+    if operator == "group":
+        results = (_test(row, c) for c in value)
+        result = any(results) if column == "or" else all(results)
+    else:
+        result = _OPERATORS[operator](row.get(column), value)
+    return result != negated
+
+
+def _coerce(have, text: str):
+    """`text` converted to compare with the column value `have`."""
+    text = text.strip('"')
+    if isinstance(have, bool):
+        return text.lower() == "true"
+    if isinstance(have, (int, float)):
+        return float(text)
+    return text
+
+
+def _compare(test):
+    return lambda have, text: have is not None and test(have, _coerce(have, text))
+
+
+def _like(pattern: str, case: bool):
+    translated = fnmatch.translate(pattern.replace("%", "*"))
+    return re.compile(translated, 0 if case else re.IGNORECASE)
+
+
+def _is(have, text: str) -> bool:
+    text = text.lower()
+    if text == "null":
+        return have is None
+    return have is (text == "true") if text in ("true", "false") else False
+
+
+_OPERATORS = {
+    "eq": _compare(lambda a, b: a == b),
+    "neq": _compare(lambda a, b: a != b),
+    "gt": _compare(lambda a, b: a > b),
+    "gte": _compare(lambda a, b: a >= b),
+    "lt": _compare(lambda a, b: a < b),
+    "lte": _compare(lambda a, b: a <= b),
+    "like": lambda have, text: have is not None and bool(_like(text, True).match(str(have))),
+    "ilike": lambda have, text: have is not None and bool(_like(text, False).match(str(have))),
+    "in": lambda have, text: have is not None and any(
+        have == _coerce(have, item) for item in _split(text.strip()[1:-1])),
+    "is": _is,
+}
+
+
+def _order(rows: list, spec: str) -> list:
+    """Sort by `column.asc|desc.nullsfirst|nullslast,...` (nulls last ascending, first descending)."""
+    for term in reversed(spec.split(",")):
+        column, *modifiers = term.split(".")
+        descending = "desc" in modifiers
+        nulls_first = "nullsfirst" in modifiers or (descending and "nullslast" not in modifiers)
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=descending)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+def _parse_select(select: str) -> list:
+    """(alias, column or table, embedded select or None) for each item of `select`."""
+    fields = []
+    for item in _split(re.sub(r"\s+", "", select) or "*"):
+        alias, _, rest = item.partition(":") if re.match(r"^[\w]+:[^:]", item) else ("", "", item)
+        embedded = re.match(r"^([\w]+)(?:![\w]+)?\((.*)\)$", rest)
+        if embedded:
+            fields.append((alias or embedded[1], embedded[1], embedded[2] or "*"))
+        else:
+            column = rest.split("::", 1)[0]
+            fields.append((alias or column, column, None))
+    return fields
+
+
+def _argument(text: str):
+    """An RPC argument from a GET query string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _b64(value: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value, separators=(",", ":")).encode()).rstrip(b"=").decode()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# -- HTTP ----------------------------------------------------------------------
+
+def _handler(standin: SupabaseStandIn, verbose: bool):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            length = int(self.headers.get("content-length") or 0)
+            body = self.rfile.read(length) if length else b""
+            headers = {k.lower(): v for k, v in self.headers.items()}
+            status, out_headers, out = standin.handle(self.command, self.path, headers, body)
+            self.send_response(status)
+            for name, value in out_headers.items():
+                self.send_header(name, value)
+            self.send_header("content-length", str(len(out)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(out)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = _reply
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
@@ -0,0 +1,50 @@
+"""
+`--changed-since` selection over the dependencies the runner records.
+
+Run with `python -m pytest tests/harness`.
+"""
+
+from .deps import DependencyRecorder, affected
+from .registry import Registry
+
+# The import chain from the home route to the legacy map (src/app/page.tsx → … → MapViewLegacy.tsx)
+HOME_TO_MAP = {
+    "src/app/page.tsx": {"src/components/HomeContent.tsx"},
+    "src/components/HomeContent.tsx": {"src/components/Map.tsx"},
+    "src/components/Map.tsx": {"src/components/MapViewLegacy.tsx"},
+}
+
+
+def layout_cases() -> list:
+    """Three cases sharing one desktop page, like section 1 of the suite."""
+    registry = Registry()
+    registry.section("1. Layout & Structure")
+    for number in (1, 2, 3):
+        @registry.test(f"TC-1.1.{number}", "Uses the shared page")
+        def _(desktop_page):
+            pass
+    return registry.cases
+
+
+def test_shared_page_change_selects_every_test_reusing_the_page():
+    # As the runner records them: TC-1.1.1 builds desktop_page, whose load of
+    # "/" is credited to every case taking it; the rest reuse the page
+    cases = layout_cases()
+    recorder = DependencyRecorder()
+    for case in cases:
+        with recorder.recording(case.id):
+            if case is cases[0]:
+                with recorder.setup("fixture desktop_page"):
+                    recorder.route("/")
+        recorder.inherit(case.id, ["fixture desktop_page"])
+    deps = recorder.export()
+
+    selected = affected(cases, {"src/components/MapViewLegacy.tsx"}, deps, HOME_TO_MAP)
+    assert selected == cases, f"Not selected after a MapViewLegacy.tsx change (deps: {deps})"
+    assert affected(cases, {"src/app/admin/page.tsx"}, deps, HOME_TO_MAP) == []
+
+
+def test_empty_entries_are_always_selected():
+    cases = layout_cases()
+    empty = {c.id: {"files": [], "routes": []} for c in cases}
+    assert affected(cases, {"src/app/admin/page.tsx"}, empty, HOME_TO_MAP) == cases
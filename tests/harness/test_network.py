@@ -0,0 +1,141 @@
+"""
+Page-load budgets for navigations made while fixtures and page states are built.
+
+Run with `python -m pytest tests/harness`. A stand-in browser context fires
+the request events `NetworkRecorder.watch` listens to, so no browser is needed.
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from . import runner as runner_module
+from .deps import DependencyRecorder
+from .network import NetworkRecorder
+from .registry import Registry
+from .runner import Results, Runner, Session
+
+BASE_URL = "http://localhost:3000"
+
+
+class FakePage:
+    viewport_size = {"width": 1440, "height": 900}
+
+
+class FakeRequest:
+    """A finished request as Playwright reports it."""
+
+    def __init__(self, url: str, frame, document: bool, size: int):
+        self.url = url
+        self.frame = frame
+        self.resource_type = "document" if document else "script"
+        self.method = "GET"
+        self.failure = None
+        self.timing = {"startTime": time.time() * 1000, "responseEnd": 5.0}
+        self._document = document
+        self._size = size
+
+    def is_navigation_request(self):
+        return self._document
+
+    def response(self):
+        return SimpleNamespace(status=200)
+
+    def sizes(self):
+        return {"responseBodySize": self._size}
+
+
+class FakeContext:
+    """Fires `request` and `requestfinished` the way a Playwright context does."""
+
+    def __init__(self, recorder: NetworkRecorder):
+        self.handlers = {}
+        recorder.watch(self)
+
+    def expose_binding(self, name, callback):
+        pass
+
+    def add_init_script(self, script):
+        pass
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def load(self, page, path: str, requests: int, size: int = 1000):
+        """Navigate `page` to `path`: the document, then `requests - 1` subresources."""
+        frame = SimpleNamespace(page=page, parent_frame=None)
+        for index in range(requests):
+            url = BASE_URL + (path if index == 0 else f"/_next/static/chunk{index}.js")
+            request = FakeRequest(url, frame, document=index == 0, size=size)
+            self.handlers["request"](request)
+            self.handlers["requestfinished"](request)
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """A fresh network recorder (budget: 2 requests for "/") in place of the shared one."""
+    dependencies = DependencyRecorder()
+    network = NetworkRecorder({"/": {"requests": 2}})
+    monkeypatch.setattr(runner_module, "dependencies", dependencies)
+    monkeypatch.setattr(runner_module, "network", network)
+    monkeypatch.setattr(sys.modules[NetworkRecorder.__module__], "dependencies", dependencies)
+    return network
+
+
+def run(registry: Registry) -> Results:
+    results = Results()
+    Runner(registry, Session(registry), results).run(registry.cases)
+    return results
+
+
+def test_fixture_load_over_budget_fails_the_test_it_was_built_for(recorder):
+    registry = Registry()
+    page = FakePage()
+
+    @registry.fixture
+    def desktop_page():
+        FakeContext(recorder).load(page, "/", requests=3)
+        return page
+
+    registry.section("1. Layout")
+
+    @registry.test("TC-1.1.1", "First test on the page")
+    def _(desktop_page):
+        pass
+
+    @registry.test("TC-1.1.2", "Later test reusing the page")
+    def _(desktop_page):
+        pass
+
+    # Only the test that built the page is charged for loading it
+    results = run(registry)
+    assert [f[0] for f in results.failures] == ["TC-1.1.1"]
+    assert "3 requests > 2" in results.failures[0][2]
+    assert recorder.navigations[0]["setup"] == "fixture desktop_page"
+
+
+def test_state_load_over_budget_fails_the_test_it_was_built_for(recorder):
+    registry = Registry()
+    page = FakePage()
+    context = FakeContext(recorder)
+
+    @registry.fixture
+    def desktop_page():
+        return page
+
+    @registry.page_state("home")
+    def _(desktop_page):
+        context.load(desktop_page, "/", requests=3)
+
+    registry.section("3. Map", state="home")
+
+    @registry.test("TC-3.1.1", "Map on the home page")
+    def _(desktop_page):
+        pass
+
+    results = run(registry)
+    assert [f[0] for f in results.failures] == ["TC-3.1.1"]
+    assert "3 requests > 2" in results.failures[0][2]
+    assert recorder.navigations[0]["setup"] == "state home"
@@ -0,0 +1,30 @@
+"""
+The per-test watchdog against a Playwright call that never returns.
+
+Run with `python -m pytest tests/harness`. Needs the Playwright driver but no
+browser.
+"""
+
+import socket
+import time
+
+import pytest
+from playwright.sync_api import sync_playwright
+
+from . import watchdog
+
+
+def test_hung_playwright_call_is_cancelled_not_waited_out():
+    # A listening socket that never answers: the request hangs until cancelled
+    with socket.create_server(("127.0.0.1", 0)) as server, sync_playwright() as playwright:
+        request = playwright.request.new_context()
+        try:
+            started = time.monotonic()
+            with pytest.raises(watchdog.TestTimeout):
+                with watchdog.time_limit(1, "hung request"):
+                    request.get(f"http://127.0.0.1:{server.getsockname()[1]}/", timeout=20000)
+            elapsed = time.monotonic() - started
+        finally:
+            request.dispose()
+    assert elapsed < 5, \
+        f"A hung call outlived its 1s limit by {elapsed - 1:.1f}s: the watchdog found no Playwright call to cancel"
@@ -0,0 +1,159 @@
+"""
+Run timing for the requirements suite.
+
+Every test, page-state setup, condition probe and fixture creation is
+recorded as a span with wall-clock start and end times, so spans from worker
+processes and the async executor line up on one timeline. After a run the
+spans are written to `tests/.reports/timing.json` and drawn as an HTML Gantt
+chart in `tests/.reports/timeline.html`, and the summary ends with the
+slowest tests and sections.
+"""
+
+import contextlib
+import html
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from .sources import PROJECT_ROOT
+
+REPORTS_DIR = PROJECT_ROOT / "tests" / ".reports"
+
+# Span kinds, in the order their rows are drawn within a lane
+KINDS = ("fixture", "state", "condition", "test")
+
+
+class Timeline:
+    """Spans recorded during a run."""
+
+    def __init__(self):
+        self.spans = []
+        self.lane = "main"
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, kind: str, name: str, section: str = "", lane: str = None):
+        """
+        Time the enclosed block. Yields the span record, so the caller can
+        add fields such as the outcome.
+        """
+        record = {"kind": kind, "name": name, "section": section, "lane": lane or self.lane,
+                  "start": time.time()}
+        try:
+            yield record
+        finally:
+            record["end"] = time.time()
+            with self._lock:
+                self.spans.append(record)
+
+    def drain(self) -> list:
+        """Remove and return the spans recorded so far (e.g. to send from a worker)."""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def merge(self, spans: list, lane: str):
+        """Fold in spans recorded elsewhere (e.g. by a worker) under `lane`."""
+        with self._lock:
+            self.spans.extend(
+                dict(span, lane=lane if span["lane"] == "main" else f"{lane} {span['lane']}")
+                for span in spans
+            )
+
+    def last(self, kind: str, name: str):
+        """The most recent span of `kind` named `name`, or None."""
+        with self._lock:
+            for span in reversed(self.spans):
+                if span["kind"] == kind and span["name"] == name:
+                    return span
+        return None
+
+    def tests(self) -> list:
+        return [s for s in self.spans if s["kind"] == "test"]
+
+    def section_totals(self) -> dict:
+        """Seconds spent per section, setup included."""
+        totals = defaultdict(float)
+        for span in self.spans:
+            if span["section"] and span["kind"] in ("test", "state", "condition"):
+                totals[span["section"]] += span["end"] - span["start"]
+        return totals
+
+    def write(self, directory: Path = REPORTS_DIR) -> Path:
+        """Write timing.json and timeline.html; returns the HTML path."""
+        directory.mkdir(parents=True, exist_ok=True)
+        spans = sorted(self.spans, key=lambda s: s["start"])
+        (directory / "timing.json").write_text(json.dumps({
+            "spans": spans,
+            "sections": dict(sorted(self.section_totals().items(), key=lambda item: -item[1])),
+        }, indent=1))
+        path = directory / "timeline.html"
+        path.write_text(render_html(spans))
+        return path
+
+    def print_slowest(self, count: int = 10):
+        tests = sorted(self.tests(), key=lambda s: s["start"] - s["end"])[:count]
+        if not tests:
+            return
+        print(f"\nSlowest {len(tests)} tests:")
+        for span in tests:
+            print(f"  {span['end'] - span['start']:8.3f}s  {span['name']}  ({span['section']})")
+        sections = sorted(self.section_totals().items(), key=lambda item: -item[1])[:count]
+        print(f"\nSlowest {len(sections)} sections (tests + setup):")
+        for title, seconds in sections:
+            print(f"  {seconds:8.3f}s  {title}")
+
+
+_COLOURS = {"fixture": "#9ca3af", "state": "#f59e0b", "condition": "#a855f7", "test": "#3b82f6"}
+_FAILED = "#ef4444"
+
+
+def render_html(spans: list) -> str:
+    """A self-contained Gantt chart: one band per lane, one row per span kind."""
+    if not spans:
+        return "<!doctype html><title>Test timeline</title><p>No spans recorded.</p>"
+    origin = min(s["start"] for s in spans)
+    total = max(s["end"] for s in spans) - origin or 1.0
+    lanes = sorted({s["lane"] for s in spans}, key=lambda lane: (lane != "main", lane))
+    row_height = 18
+    rows = []
+    for band, lane in enumerate(lanes):
+        top = band * (len(KINDS) * row_height + 24)
+        rows.append(f'<div class="lane" style="top:{top}px">{html.escape(lane)}</div>')
+        for span in (s for s in spans if s["lane"] == lane):
+            left = (span["start"] - origin) / total * 100
+            width = max((span["end"] - span["start"]) / total * 100, 0.05)
+            y = top + 16 + KINDS.index(span["kind"]) * row_height
+            colour = _FAILED if span.get("outcome") == "failed" else _COLOURS[span["kind"]]
+            tip = f"{span['kind']}: {span['name']} — {span['end'] - span['start']:.2f}s\n{span['section']}"
+            rows.append(
+                f'<div class="span" title="{html.escape(tip)}" style="left:{left:.3f}%;width:{width:.3f}%;'
+                f'top:{y}px;background:{colour}"></div>'
+            )
+    height = len(lanes) * (len(KINDS) * row_height + 24)
+    legend = " ".join(
+        f'<span style="background:{colour}">{kind}</span>' for kind, colour in [*_COLOURS.items(), ("failed", _FAILED)]
+    )
+    return f"""<!doctype html>
+<meta charset="utf-8">
+<title>Test timeline</title>
+<style>
+  body {{ font: 12px system-ui, sans-serif; margin: 16px; }}
+  .legend span {{ color: #fff; padding: 2px 6px; border-radius: 3px; margin-right: 4px; }}
+  .chart {{ position: relative; height: {height}px; margin-top: 12px; border-left: 1px solid #ccc; }}
+  .lane {{ position: absolute; left: 4px; font-weight: 600; }}
+  .span {{ position: absolute; height: 14px; border-radius: 2px; opacity: .85; }}
+  .span:hover {{ opacity: 1; outline: 1px solid #111; }}
+</style>
+<h1>Test timeline — {total:.1f}s, {len([s for s in spans if s["kind"] == "test"])} tests</h1>
+<div class="legend">{legend}</div>
+<div class="chart">
+{chr(10).join(rows)}
+</div>
+"""
+
+
+# Shared timeline for the current process
+timeline = Timeline()
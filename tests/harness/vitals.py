@@ -0,0 +1,270 @@
+"""
+Core Web Vitals for every page the suite loads.
+
+`vitals.watch(context)` adds an init script that observes each
+document from its first byte: LCP, CLS (the worst session window of
+unexpected layout shifts), INP (the worst interaction, or the 98th
+percentile past 50 interactions, from Event Timing entries of 16ms or more),
+long tasks and, from those between first contentful paint and time to
+interactive, TBT. TTI is approximated from long tasks alone, as the end of
+the last one before the first `TTI_QUIET` ms without any (Lighthouse also
+waits for the network to go quiet), so tasks a test's own clicks cause once
+the page has settled don't count towards its load. The page reports a snapshot through an exposed binding whenever an entry arrives and
+again on `pagehide`, so a navigation's numbers are kept even when a test
+moves on without reading them. Each navigation is attributed to the test
+running when it loaded, like the routes in `deps.py`, and labelled with its
+profile ("mobile" below 768px wide, else "desktop") and its App Router route
+(`/location/[id]` rather than the id).
+
+`collect(page)` reads the current navigation's snapshot on demand, and
+`over_budget()` compares one against its route's budget: the web.dev "good"
+thresholds unless `budgets` overrides them for the route. Every navigation
+recorded in a run is written to `tests/.reports/vitals.json`, with per-route
+medians and worst values per profile, and a test's own navigations are added
+to its result record.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+from .deps import dependencies
+from .sources import PROJECT_ROOT
+from .timing import REPORTS_DIR
+
+# web.dev "good" thresholds for LCP, CLS and INP; TBT per Lighthouse's lab scoring
+GOOD = {"lcp": 2500, "cls": 0.1, "inp": 200, "tbt": 200}
+
+# Milliseconds without a long task after which the page counts as interactive
+TTI_QUIET = 5000
+
+METRICS = ("fcp", "lcp", "cls", "inp", "tbt", "long_tasks", "longest_task", "ttfb")
+
+_SCRIPT = """() => {
+    if (window.__ppVitals || !window.PerformanceObserver) return;
+    const state = { fcp: null, lcp: null, cls: 0, tasks: [], worst: new Map(), interactions: 0 };
+    // The route that loaded: client-side redirects change location, not the document
+    const path = location.pathname;
+    let session = 0, sessionStart = 0, sessionLast = 0, pending = false;
+    const snapshot = () => {
+        const worst = [...state.worst.values()].sort((a, b) => b - a);
+        const skip = Math.min(worst.length - 1, Math.floor(state.interactions / 50));
+        const nav = performance.getEntriesByType("navigation")[0];
+        return {
+            origin: performance.timeOrigin,
+            path,
+            fcp: state.fcp,
+            lcp: state.lcp,
+            cls: state.cls,
+            inp: worst.length ? worst[Math.max(skip, 0)] : state.interactions ? 0 : null,
+            interactions: state.interactions,
+            tasks: state.tasks,
+            ttfb: nav ? nav.responseStart : null,
+        };
+    };
+    const report = () => {
+        if (pending || typeof window.__ppVitalsReport !== "function") return;
+        pending = true;
+        setTimeout(() => { pending = false; window.__ppVitalsReport(snapshot()); }, 0);
+    };
+    const observe = (type, handle, options = {}) => {
+        try {
+            new PerformanceObserver(list => { list.getEntries().forEach(handle); report(); })
+                .observe({ type, buffered: true, ...options });
+        } catch (e) { /* entry type not supported */ }
+    };
+    observe("paint", e => { if (e.name === "first-contentful-paint") state.fcp = e.startTime; });
+    observe("largest-contentful-paint", e => { state.lcp = e.startTime; });
+    observe("layout-shift", e => {
+        if (e.hadRecentInput) return;
+        // Shifts less than 1s apart, within 5s of the first, form one session window
+        if (session && e.startTime - sessionLast < 1000 && e.startTime - sessionStart < 5000) {
+            session += e.value;
+        } else {
+            session = e.value;
+            sessionStart = e.startTime;
+        }
+        sessionLast = e.startTime;
+        state.cls = Math.max(state.cls, session);
+    });
+    observe("longtask", e => { state.tasks.push([e.startTime, e.duration]); });
+    observe("event", e => {
+        if (e.interactionId) state.worst.set(e.interactionId, Math.max(state.worst.get(e.interactionId) || 0, e.duration));
+    }, { durationThreshold: 16 });
+    for (const type of ["pointerdown", "keydown"]) {
+        addEventListener(type, () => { state.interactions += 1; }, { capture: true });
+    }
+    addEventListener("pagehide", () => {
+        if (typeof window.__ppVitalsReport === "function") window.__ppVitalsReport(snapshot());
+    });
+    window.__ppVitals = { snapshot };
+}"""
+
+
+class VitalsRecorder:
+    """Per-navigation Core Web Vitals, with per-route budgets."""
+
+    def __init__(self, budgets: dict = None):
+        self.budgets = dict(budgets or {})  # route -> metric overrides of GOOD
+        self.navigations = {}               # document time origin -> entry
+        self._lock = threading.Lock()
+
+    def watch(self, context):
+        """Observe every page of a sync-API context."""
+        context.expose_binding("__ppVitalsReport", self._reporter())
+        context.add_init_script(f"({_SCRIPT})()")
+
+    async def watch_async(self, context):
+        """Observe every page of an async-API context."""
+        await context.expose_binding("__ppVitalsReport", self._reporter())
+        await context.add_init_script(f"({_SCRIPT})()")
+
+    def collect(self, page) -> dict:
+        """The vitals of the page's current document so far (see `record`)."""
+        snapshot = page.evaluate("() => window.__ppVitals ? window.__ppVitals.snapshot() : null")
+        if snapshot is None:
+            raise RuntimeError("Vitals collector missing (window.__ppVitals); watch the context before navigating")
+        return self.record(snapshot, _profile(page))
+
+    async def collect_async(self, page) -> dict:
+        snapshot = await page.evaluate("() => window.__ppVitals ? window.__ppVitals.snapshot() : null")
+        if snapshot is None:
+            raise RuntimeError("Vitals collector missing (window.__ppVitals); watch the context before navigating")
+        return self.record(snapshot, _profile(page))
+
+    def record(self, snapshot: dict, profile: str, case_id: str = None) -> dict:
+        """Store a page snapshot as its navigation's latest entry and return the entry."""
+        key = f"{snapshot['origin']:.3f}"
+        with self._lock:
+            entry = self.navigations.get(key)
+            if entry is None:
+                entry = self.navigations[key] = {
+                    "case": case_id or dependencies.current(),
+                    "loaded_at": round(snapshot["origin"] / 1000, 3),
+                    "profile": profile,
+                    "route": route_of(snapshot["path"]),
+                    "path": snapshot["path"],
+                }
+            entry.update(_metrics(snapshot))
+        return entry
+
+    def budget(self, route: str) -> dict:
+        return {**GOOD, **self.budgets.get(route, {})}
+
+    def over_budget(self, entry: dict) -> list:
+        """A message per metric of `entry` that exceeds its route's budget."""
+        problems = []
+        for metric, limit in self.budget(entry["route"]).items():
+            value = entry.get(metric)
+            if value is not None and value > limit:
+                shown = f"{value:.3f} > {limit}" if metric == "cls" else f"{value:.0f}ms > {limit}ms"
+                problems.append(f"{metric.upper()} {shown}")
+        return problems
+
+    def for_case(self, case_id: str) -> list:
+        with self._lock:
+            return [e for e in self.navigations.values() if e["case"] == case_id]
+
+    def drain(self) -> list:
+        """Remove and return the entries recorded so far (a worker's hand-off)."""
+        with self._lock:
+            entries = list(self.navigations.values())
+            self.navigations.clear()
+        return entries
+
+    def merge(self, entries: list):
+        """Fold in entries recorded elsewhere (e.g. by a worker)."""
+        with self._lock:
+            for entry in entries:
+                self.navigations[f"{entry['loaded_at'] * 1000:.3f}"] = entry
+
+    def write(self, directory: Path = REPORTS_DIR):
+        """Write vitals.json (if anything was recorded); returns its path or None."""
+        with self._lock:
+            entries = list(self.navigations.values())
+        if not entries:
+            return None
+        routes = {}
+        for entry in entries:
+            routes.setdefault(entry["route"], {}).setdefault(entry["profile"], []).append(entry)
+        summary = {
+            route: {profile: _summarise(group, self.budget(route)) for profile, group in sorted(profiles.items())}
+            for route, profiles in sorted(routes.items())
+        }
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / "vitals.json"
+        path.write_text(json.dumps({"routes": summary, "navigations": entries}, indent=1))
+        return path
+
+    def _reporter(self):
+        # Async tests own their contexts: attribute their pages to them for
+        # good, since binding callbacks don't run in the test's task
+        owner = dependencies.task_case()
+
+        def report(source, snapshot):
+            self.record(snapshot, _profile(source["page"]), owner)
+        return report
+
+
+def route_of(url_path: str, root: Path = PROJECT_ROOT) -> str:
+    """The App Router route serving `url_path`, e.g. `/location/[id]` for `/location/abc`."""
+    directory = root / "src" / "app"
+    route = []
+    for segment in [s for s in url_path.split("/") if s]:
+        if (directory / segment).is_dir():
+            directory = directory / segment
+            route.append(segment)
+            continue
+        dynamic = sorted(d for d in directory.glob("[[]*[]]") if d.is_dir())
+        if not dynamic:
+            return url_path
+        directory = dynamic[0]
+        route.append(directory.name)
+    return "/" + "/".join(route)
+
+
+def _profile(page) -> str:
+    return "mobile" if (page.viewport_size or {}).get("width", 1440) < 768 else "desktop"
+
+
+def _blocking_time(tasks: list, fcp) -> float:
+    """TBT: the time past 50ms of each long task from FCP up to the first `TTI_QUIET` gap."""
+    if fcp is None:
+        return 0.0
+    blocking, last_end = 0.0, fcp
+    for start, duration in sorted(t for t in tasks if t[0] >= fcp):
+        if start - last_end >= TTI_QUIET:
+            break
+        blocking += max(0.0, duration - 50)
+        last_end = start + duration
+    return blocking
+
+
+def _metrics(snapshot: dict) -> dict:
+    """Report fields from a page snapshot; TBT counts long tasks from FCP to (approximate) TTI."""
+    tasks = snapshot["tasks"]
+    blocking = _blocking_time(tasks, snapshot["fcp"])
+    return {
+        "fcp": snapshot["fcp"],
+        "lcp": snapshot["lcp"],
+        "cls": round(snapshot["cls"], 4),
+        "inp": snapshot["inp"],
+        "interactions": snapshot["interactions"],
+        "tbt": blocking,
+        "long_tasks": len(tasks),
+        "longest_task": max((duration for _, duration in tasks), default=0.0),
+        "ttfb": snapshot["ttfb"],
+    }
+
+
+def _summarise(entries: list, budget: dict) -> dict:
+    """Median and worst value per metric over a route's navigations, plus the budget."""
+    summary = {"navigations": len(entries), "budget": budget}
+    for metric in METRICS:
+        values = sorted(e[metric] for e in entries if e.get(metric) is not None)
+        if values:
+            summary[metric] = {"median": values[len(values) // 2], "max": values[-1]}
+    return summary
+
+
+vitals = VitalsRecorder()
@@ -0,0 +1,343 @@
+"""
+Readiness primitives for the requirements suite.
+
+Each wait polls a concrete condition and returns as soon as it holds, instead
+of sleeping for a fixed time. On timeout it raises `WaitTimeout` describing
+what was still pending, so a slow machine produces a readable failure rather
+than a flaky assertion further down the test.
+
+The waits shared with `async_waits.py` are written once, as generators of
+steps: each step is the return value of a Playwright call. With the sync API
+that is already the result, and `_run` sends it straight back; the async
+driver awaits it first. Both flavours therefore poll, time out and fail in
+exactly the same way.
+"""
+
+import re
+import time
+import weakref
+from collections import deque
+
+from .sources import sources
+
+# Cards the home page renders in its list: curated metros, city summaries
+# at wide zoom, individual locations at city zoom
+LOCATION_CARDS = "[data-testid='location-card']"
+CITY_CARDS = "[data-testid='city-card']"
+METRO_CARDS = "[data-testid='metro-card']"
+ANY_CARDS = f"{LOCATION_CARDS}, {CITY_CARDS}, {METRO_CARDS}"
+
+# Supabase PostgREST reads and RPCs (e.g. /rest/v1/rpc/get_nearby_locations)
+SUPABASE_REQUESTS = re.compile(r"/rest/v1/")
+
+# Default quiet periods (ms) and how long a map move may take to start
+SETTLE_QUIET = 150
+CARDS_QUIET = 300
+MAP_GRACE = 500
+
+# How much longer than the app's fetch debounce the network must be quiet by
+# default: a quiet period barely over the debounce can end just before a
+# fetch the debounce was still holding back
+NETWORK_QUIET_MARGIN = 250
+
+_DIALOG_OPEN = """() =>
+    !!document.querySelector("[data-slot='dialog-overlay'][data-state='open']") ||
+    [...document.querySelectorAll("[role='dialog']")].some(d => d.getClientRects().length > 0)
+"""
+
+# Resolves once no DOM mutation (other than inline style churn from map
+# markers and transitions) has happened for `quiet` ms
+_DOM_QUIET = """quiet => {
+    let state = window.__ppMutations;
+    if (!state) {
+        state = window.__ppMutations = { last: performance.now() };
+        new MutationObserver(records => {
+            if (records.some(r => r.type !== "attributes" || r.attributeName !== "style")) {
+                state.last = performance.now();
+            }
+        }).observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    }
+    return performance.now() - state.last >= quiet;
+}"""
+
+# Resolves once the card list holds at least `min` cards and neither its
+# length nor its first card has changed for `quiet` ms
+_CARDS_SETTLED = """([selector, min, quiet]) => {
+    const cards = document.querySelectorAll(selector);
+    const signature = cards.length + "|" + (cards[0] ? cards[0].textContent : "");
+    const now = performance.now();
+    const state = window.__ppCards;
+    if (!state || state.selector !== selector || state.signature !== signature) {
+        window.__ppCards = { selector, signature, since: now };
+        return false;
+    }
+    return cards.length >= min && now - state.since >= quiet;
+}"""
+
+
+class WaitTimeout(AssertionError):
+    """A readiness condition did not hold within its timeout."""
+
+
+def _timeout_error():
+    # Imported lazily so the harness itself never requires Playwright
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+    return PlaywrightTimeout
+
+
+def _run(steps):
+    """Drive a wait's steps with the sync API, where each step is already its result."""
+    result = None
+    while True:
+        try:
+            result = steps.send(result)
+        except StopIteration as done:
+            return done.value
+
+
+def _settle(page, quiet, timeout):
+    yield page.evaluate("() => { if (window.__ppMutations) window.__ppMutations.last = performance.now(); }")
+    try:
+        yield page.wait_for_function(_DOM_QUIET, arg=quiet, polling=50, timeout=timeout)
+    except _timeout_error():
+        raise WaitTimeout(f"DOM still changing after {timeout}ms (needed {quiet}ms of quiet)") from None
+
+
+def settle(page, quiet: int = SETTLE_QUIET, timeout: int = 5000):
+    """Wait until the DOM has stopped changing for `quiet` ms."""
+    _run(_settle(page, quiet, timeout))
+
+
+def _cards(page, selector, min_count, quiet, timeout):
+    yield page.evaluate("() => { delete window.__ppCards; }")
+    try:
+        yield page.wait_for_function(_CARDS_SETTLED, arg=[selector, min_count, quiet], polling=50, timeout=timeout)
+    except _timeout_error():
+        count = yield page.locator(selector).count()
+        if count < min_count:
+            raise WaitTimeout(
+                f"Expected ≥{min_count} cards matching {selector} within {timeout}ms, found {count}"
+            ) from None
+        raise WaitTimeout(f"Card list ({selector}) still changing after {timeout}ms, last count {count}") from None
+    return (yield page.locator(selector).count())
+
+
+def wait_for_cards(page, selector: str = ANY_CARDS, min_count: int = 0,
+                   quiet: int = CARDS_QUIET, timeout: int = 15000) -> int:
+    """
+    Wait for the card list to settle: at least `min_count` cards, unchanged
+    for `quiet` ms. Returns the final card count.
+    """
+    return _run(_cards(page, selector, min_count, quiet, timeout))
+
+
+def wait_for_dialog_closed(page, timeout: int = 5000):
+    """Wait until no dialog or open dialog overlay is on screen."""
+    try:
+        page.wait_for_function(f"!({_DIALOG_OPEN})()", polling=50, timeout=timeout)
+    except _timeout_error():
+        dialog = page.locator("[role='dialog']")
+        title = dialog.first.inner_text()[:60].strip() if dialog.count() > 0 else "overlay"
+        raise WaitTimeout(f"Dialog still open after {timeout}ms: {title!r}") from None
+
+
+def wait_for_text_change(locator, before: str, timeout: int = 5000) -> str:
+    """Wait until `locator`'s text differs from `before`; returns the new text."""
+    before = before.strip()
+    handle = locator.element_handle(timeout=timeout)
+    try:
+        locator.page.wait_for_function(
+            "([el, before]) => el.textContent.trim() !== before",
+            arg=[handle, before], timeout=timeout,
+        )
+    except _timeout_error():
+        raise WaitTimeout(f"Text still {before!r} after {timeout}ms") from None
+    finally:
+        handle.dispose()
+    return locator.inner_text().strip()
+
+
+class NetworkTracker:
+    """In-flight request bookkeeping for one page, fed by its request events."""
+
+    def __init__(self, page):
+        self._inflight = {}
+        self._events = deque(maxlen=500)  # (monotonic time, url)
+        self.started = time.monotonic()
+        page.on("request", self._start)
+        page.on("requestfinished", self._end)
+        page.on("requestfailed", self._end)
+
+    def _start(self, request):
+        self._inflight[request] = time.monotonic()
+        self._events.append((time.monotonic(), request.url))
+
+    def _end(self, request):
+        self._inflight.pop(request, None)
+        self._events.append((time.monotonic(), request.url))
+
+    def pending(self, pattern=None) -> list:
+        """URLs of requests still in flight, optionally filtered by regex."""
+        return [r.url for r in self._inflight if pattern is None or pattern.search(r.url)]
+
+    def idle_for(self, pattern=None, since: float = None) -> float:
+        """
+        Seconds since a matching request last started or finished, or since
+        `since` (a `time.monotonic()` value) if that is later.
+        """
+        last = max(self.started, since or 0.0)
+        for at, url in reversed(self._events):
+            if pattern is None or pattern.search(url):
+                last = max(last, at)
+                break
+        return time.monotonic() - last
+
+
+_trackers = weakref.WeakKeyDictionary()
+
+
+def track_network(page) -> NetworkTracker:
+    """
+    Attach (once) and return the page's network tracker. Call it before
+    navigating so requests already in flight are counted.
+    """
+    if page not in _trackers:
+        _trackers[page] = NetworkTracker(page)
+    return _trackers[page]
+
+
+def fetch_debounce_ms() -> int:
+    """The app's location-fetch debounce (FETCH_DEBOUNCE_MS in src/lib/votes.ts)."""
+    match = sources.search("src/lib/votes.ts", r"export const FETCH_DEBOUNCE_MS = (\d+);")
+    if match is None:
+        raise RuntimeError("FETCH_DEBOUNCE_MS not found in src/lib/votes.ts")
+    return int(match.group(1))
+
+
+def _network_quiet(page, pattern, quiet, timeout, since):
+    if quiet is None:
+        quiet = fetch_debounce_ms() + NETWORK_QUIET_MARGIN
+    tracker = track_network(page)
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        pending = tracker.pending(pattern)
+        if not pending and tracker.idle_for(pattern, since) >= quiet / 1000:
+            return
+        if time.monotonic() >= deadline:
+            what = ", ".join(pending[:3]) if pending else "requests kept starting"
+            raise WaitTimeout(f"Network not quiet after {timeout}ms: {what}")
+        # Yields to Playwright so request events are dispatched
+        yield page.wait_for_timeout(50)
+
+
+def wait_for_network_quiet(page, pattern=SUPABASE_REQUESTS, quiet: int = None, timeout: int = 15000,
+                           since: float = None):
+    """
+    Wait until no request matching `pattern` (all requests if None) is in
+    flight and none has started or finished for `quiet` ms, counting from
+    `since` (a `time.monotonic()` value) at the earliest. By default `quiet`
+    is the app's fetch debounce plus `NETWORK_QUIET_MARGIN`.
+    """
+    _run(_network_quiet(page, pattern, quiet, timeout, since))
+
+
+# The app publishes `window.__ppMap` (src/lib/map-test-hook.ts) when this
+# flag is set before its scripts run
+_TEST_FLAG_SCRIPT = "window.__PP_TEST__ = true;"
+
+# Resolves once the map is idle (not moving, style and tiles loaded) and
+# either a move has started since `mark` or none started within `grace` ms
+_MAP_IDLE = """([mark, grace]) => {
+    const s = window.__ppMap;
+    if (!s) return false;
+    const idle = !s.moving && !s.map.isMoving() && s.map.loaded();
+    if (!mark) return idle;
+    return idle && (s.moveStarts > mark.moveStarts || performance.now() - mark.at >= grace);
+}"""
+
+
+def enable_test_hooks(target):
+    """Set the app's test flag on a browser context or page before navigation."""
+    target.add_init_script(_TEST_FLAG_SCRIPT)
+
+
+_MAP_MARK = "() => window.__ppMap ? { moveStarts: window.__ppMap.moveStarts, at: performance.now() } : null"
+
+
+def map_mark(page):
+    """
+    Snapshot the map's move counter before an action that may move the
+    camera; pass it to `wait_for_map_idle` to wait for that move.
+    """
+    return page.evaluate(_MAP_MARK)
+
+
+def _map_idle(page, mark, grace, timeout):
+    try:
+        yield page.wait_for_function(_MAP_IDLE, arg=[mark, grace], polling=50, timeout=timeout)
+    except _timeout_error():
+        if not (yield page.evaluate("() => !!window.__ppMap")):
+            raise WaitTimeout(
+                "Map test hook missing (window.__ppMap); call enable_test_hooks() before navigating"
+            ) from None
+        state = yield page.evaluate(
+            "() => ({ moving: window.__ppMap.map.isMoving(), loaded: window.__ppMap.map.loaded() })"
+        )
+        raise WaitTimeout(
+            f"Map not idle after {timeout}ms (moving={state['moving']}, loaded={state['loaded']})"
+        ) from None
+
+
+def wait_for_map_idle(page, mark=None, grace: int = MAP_GRACE, timeout: int = 15000):
+    """
+    Wait for Mapbox to be idle. With a `mark` from `map_mark`, first wait for
+    the move the action started (if one starts within `grace` ms) to end.
+    """
+    _run(_map_idle(page, mark, grace, timeout))
+
+
+def _map_settled(page, mark, timeout):
+    yield from _map_idle(page, mark, MAP_GRACE, timeout)
+    # The app fetches locations a debounce after the camera stops
+    # (FETCH_DEBOUNCE_MS in src/lib/votes.ts), so the quiet period must start
+    # once the map is idle
+    yield from _network_quiet(page, SUPABASE_REQUESTS, None, timeout, time.monotonic())
+    yield from _cards(page, ANY_CARDS, 0, CARDS_QUIET, timeout)
+
+
+def wait_for_map_settled(page, mark=None, timeout: int = 15000):
+    """
+    Wait for a camera move to finish: map idle, Supabase reads done, card
+    list stable.
+    """
+    _run(_map_settled(page, mark, timeout))
+
+
+def _app(page, cards, timeout):
+    try:
+        yield page.locator(".mapboxgl-canvas").first.wait_for(state="visible", timeout=timeout)
+    except _timeout_error():
+        raise WaitTimeout(f"Map canvas not visible after {timeout}ms") from None
+    yield from _map_idle(page, None, MAP_GRACE, timeout)
+    yield from _network_quiet(page, SUPABASE_REQUESTS, None, timeout, time.monotonic())
+    yield from _cards(page, ANY_CARDS, 1 if cards else 0, CARDS_QUIET, timeout)
+
+
+def wait_for_app(page, cards: bool = True, timeout: int = 30000):
+    """
+    Wait for the map page after navigation: canvas rendered, map idle,
+    Supabase reads done and, when `cards` is set, the panel's card list
+    populated.
+    """
+    _run(_app(page, cards, timeout))
+
+
+def _page(page, timeout):
+    yield page.wait_for_load_state("domcontentloaded", timeout=timeout)
+    yield from _network_quiet(page, SUPABASE_REQUESTS, None, timeout, None)
+    yield from _settle(page, SETTLE_QUIET, timeout)
+
+
+def wait_for_page(page, timeout: int = 15000):
+    """Wait for a non-map page after navigation: reads done, DOM settled."""
+    _run(_page(page, timeout))
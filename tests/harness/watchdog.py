@@ -0,0 +1,107 @@
+"""
+Per-test wall-clock limits.
+
+`time_limit()` aborts the enclosed block once its limit passes, and the test
+fails with `TestTimeout`. Raising from a signal handler in the middle of a
+synchronous Playwright call would land inside Playwright's event loop, which
+the rest of the run still needs. So if Playwright calls are pending, the
+handler cancels them on that loop instead, and the test gets its error back
+from the call that hung. The alarm then repeats every 100ms until the block
+has unwound, which also catches the next call after a `time.sleep`.
+
+Pending calls are found by the `__pw_stack__` attribute the sync API sets on
+each call's task (playwright/_impl/_sync_base.py), which is not a public
+API. If a release drops it, the alarm still never raises inside the loop:
+it reports on stderr that a pending call can't be cancelled, the call ends
+at its own Playwright timeout, and TC-42.2.1 fails.
+
+Limits use SIGALRM, so they apply only on the main thread on POSIX. Elsewhere
+the block runs without a limit. A limit nested in another restores the outer
+one's remaining time when it ends. Async tests are limited on their own event
+loop instead (see `AsyncExecutor`).
+"""
+
+import asyncio
+import contextlib
+import signal
+import sys
+import threading
+import time
+
+# How often the alarm repeats after the limit has passed
+_REPEAT = 0.1
+
+
+class TestTimeout(AssertionError):
+    """A test (or its page-state setup) ran past its time limit."""
+
+
+@contextlib.contextmanager
+def time_limit(seconds, what: str = "test"):
+    """Fail the enclosed block with `TestTimeout` after `seconds` (None: no limit)."""
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    message = f"{what} exceeded its {seconds:g}s time limit"
+    expired = False
+
+    def on_alarm(signum, frame):
+        nonlocal expired
+        expired = True
+        if _cancel_pending_calls():
+            return
+        if _in_event_loop(frame):
+            # Raising here would break the loop; let the call end on its own timeout
+            _warn_once("watchdog: a Playwright call is pending but no task carries __pw_stack__, "
+                       "so it can't be cancelled and runs to its own timeout")
+            return
+        raise TestTimeout(message)
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    outer, started = signal.getitimer(signal.ITIMER_REAL), time.monotonic()
+    signal.setitimer(signal.ITIMER_REAL, seconds, _REPEAT)
+    try:
+        yield
+    except BaseException as e:
+        # Whatever the abort surfaced as (a cancelled call, a closed page), report the timeout
+        if expired and not isinstance(e, (TestTimeout, KeyboardInterrupt, SystemExit)):
+            raise TestTimeout(message) from e
+        raise
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if outer[0] > 0:
+            # Resume the enclosing limit (already due: fire it right away)
+            signal.setitimer(signal.ITIMER_REAL, max(outer[0] - (time.monotonic() - started), 0.001), outer[1])
+
+
+def _cancel_pending_calls() -> bool:
+    """Cancel the sync Playwright calls waiting on this thread's loop; True if there were any."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    # The sync API runs each call as a task tagged with its caller's stack
+    pending = [t for t in asyncio.all_tasks(loop) if hasattr(t, "__pw_stack__")]
+    for task in pending:
+        # Thread-safe scheduling also wakes the loop if it is blocked in select()
+        loop.call_soon_threadsafe(task.cancel)
+    return bool(pending)
+
+
+def _in_event_loop(frame) -> bool:
+    """True if `frame` was interrupted inside an asyncio loop (a sync Playwright call waiting)."""
+    while frame is not None:
+        if frame.f_code.co_filename == asyncio.base_events.__file__:
+            return True
+        frame = frame.f_back
+    return False
+
+
+_warned = set()
+
+
+def _warn_once(message: str):
+    if message not in _warned:
+        _warned.add(message)
+        print(f"  ⚠ {message}", file=sys.stderr)
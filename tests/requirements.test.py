@@ -7,4224 +7,4062 @@ Requires: Dev server running on localhost:3000
 
 Set BASE_URL environment variable to override the default:
   BASE_URL=http://localhost:3001 python tests/requirements.test.py
+
+Tests are registered, not run, when this module loads. Select a subset by
+TC-ID glob or section number, or list the selection without running it:
+  python tests/requirements.test.py 'TC-27.*'
+  python tests/requirements.test.py --section 27 --section 4
+  python tests/requirements.test.py --list
+
+Shard sections across worker processes, each with its own browser:
+  python tests/requirements.test.py --workers 8
+
+Run the independent `async def` tests (each owns its context) as concurrent
+tasks, at most N at a time, alongside the rest of the suite:
+  python tests/requirements.test.py --concurrency 4
+
+Run only the browser-free code-review tests (no Playwright, no dev server):
+  python tests/requirements.test.py --static-only
+
+Run only the tests whose files or routes changed since a git ref (the map is
+recorded by every run into tests/.cache/deps.json):
+  python tests/requirements.test.py --changed-since origin/main
+
+Stream results as they complete, for CI or to watch a long run:
+  python tests/requirements.test.py --junit tests/.reports/junit.xml --ndjson tests/.reports/results.ndjson
+
+Every page load's Core Web Vitals (LCP, CLS, INP, TBT, long tasks) are
+recorded for the test that made it, in its NDJSON record and in
+tests/.reports/vitals.json with per-route summaries for desktop and mobile.
+Section 10 checks each route against its budget (set after the imports).
+Every request is recorded too (type, origin, transferred and decoded size,
+timing): tests/.reports/network.json totals it per navigation, per test and
+per origin. A test whose page load goes over its route's request or byte
+budget fails.
+
+Retry failing tests (after resetting their page state) N times; tests marked
+@retry keep their own count. A pass on retry is reported as flaky and counted
+in tests/.cache/flakes.json. Failures of TC-IDs listed in tests/quarantine.txt
+are reported but don't fail the run:
+  python tests/requirements.test.py --retries 2
+
+Each test (with its page-state setup) is aborted after --timeout seconds,
+default 120, or its section's own limit; the test fails and its browser
+context is replaced. --budget stops starting tests once the whole run has
+taken that long and lists the ones that didn't run:
+  python tests/requirements.test.py --timeout 60 --budget 900
+
+Voting, suggesting and admin tests run signed in. Each role signs in once
+through the Supabase admin API (SUPABASE_SERVICE_ROLE_KEY) and the session
+is saved in tests/.cache/auth/ for later runs. Settings are read from the
+environment or .env.local; without an account, those tests are skipped:
+  TEST_PARENT_EMAIL=parent@example.com TEST_ADMIN_EMAIL=admin@example.com python tests/requirements.test.py
+Tests that submit a location also need a Supabase whose rows can be thrown
+away (offline mode, the local stand-in below, or --supabase replay), so they
+never add suggestions to the real project.
+
+Record Supabase reads (the map and list RPCs, table reads) from the real
+project into tests/fixtures/supabase/, then serve them from there, so runs
+need no network and see the same data every time (SUPABASE_MODE sets the
+default; replay stops with an error until a set has been recorded):
+  python tests/requirements.test.py --supabase record
+  python tests/requirements.test.py --supabase replay
+
+Run against a local Supabase stand-in over seeded synthetic data (10k, 100k
+or 200k locations, or any number) to see the list, map and city bubbles at
+scale. Start it, then the dev server and the suite with the settings it
+prints (any email can sign in):
+  python tests/supabase_standin.py --locations 100k --seed 1
+  NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=... npm run dev
+
+Draw the map on a minimal bundled basemap instead of downloading the Mapbox
+style, glyphs and tiles (MAPBOX_MODE sets the default):
+  python tests/requirements.test.py --mapbox local
+
+Answer address autocomplete (Mapbox geocoding, /api/places-autocomplete) from
+a canned corpus after an injected delay, which also enables the debounce and
+latency tests (PLACES_MODE, PLACES_LATENCY and PLACES_JITTER set the defaults):
+  python tests/requirements.test.py --places local --places-latency 150 --places-jitter 50
+
+Browser-free tests replay their last result from tests/.cache/results.json
+while their code and the files they read are unchanged; to re-run them:
+  python tests/requirements.test.py --no-cache
+
+The harness's own tests (tests/harness/test_*.py) need no dev server:
+  python -m pytest tests/harness
 """
 
-from playwright.sync_api import sync_playwright, expect
+import argparse
 import sys
 import os
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from harness import (
+    AuthStates, FlakeHistory, JUnitReporter, LocalBasemap, NDJSONReporter,
+    PlacesStandIn, ResultCache, Results, Runner, Session, SupabaseReplay,
+    condition, fixture, load_quarantine, page_state, registry, requires, retry,
+    run_sharded, section, skip, test, touches, use_state,
+)
+from harness import (
+    LOCATION_CARDS, WaitTimeout, enable_test_hooks, fetch_debounce_ms, map_mark, settle,
+    track_network, wait_for_app, wait_for_cards, wait_for_dialog_closed,
+    wait_for_map_idle, wait_for_map_settled, wait_for_network_quiet,
+    wait_for_page, wait_for_text_change,
+)
+from harness import (
+    affected, async_waits, changed_files, dependencies, sources, timeline,
+)
+from harness import (
+    click_latency, first_map_idle, network, reset_rpcs, rpc_stats, scroll_frames, vitals,
+    watch_rpcs,
+)
 
 BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
 
-# Test results tracking
-results = {"passed": 0, "failed": 0, "skipped": 0}
-failures = []
-
-def test(test_id: str, description: str):
-    """Decorator to track test results"""
-    def decorator(func):
-        def wrapper(*args, **kwargs):
-            try:
-                func(*args, **kwargs)
-                results["passed"] += 1
-                print(f"  ✓ {test_id}: {description}")
-                return True
-            except AssertionError as e:
-                results["failed"] += 1
-                failures.append((test_id, description, str(e)))
-                print(f"  ✗ {test_id}: {description}")
-                print(f"    Error: {e}")
-                return False
-            except Exception as e:
-                results["failed"] += 1
-                failures.append((test_id, description, str(e)))
-                print(f"  ✗ {test_id}: {description}")
-                print(f"    Error: {e}")
-                return False
-        return wrapper
-    return decorator
-
-def skip(reason: str):
-    """Decorator to skip tests with a reason"""
-    def decorator(func):
-        def wrapper(*args, **kwargs):
-            results["skipped"] += 1
-            print(f"  ⊘ SKIPPED — {reason}")
-            return None
-        return wrapper
-    return decorator
-
-
-def run_tests():
+# Saved sign-ins per role (anonymous, parent, admin); see harness/auth.py
+auth = AuthStates(BASE_URL)
+
+# Supabase traffic: live, or replayed from / recorded to fixtures; see harness/replay.py
+supabase = SupabaseReplay(os.environ.get("SUPABASE_MODE", "live"))
+
+# Mapbox basemap: live, or a local stand-in style; see harness/basemap.py
+basemap = LocalBasemap(os.environ.get("MAPBOX_MODE", "live"))
+
+# Address autocomplete: live, or a canned corpus with injected latency; see harness/places.py
+places = PlacesStandIn(os.environ.get("PLACES_MODE", "live"),
+                       latency=float(os.environ.get("PLACES_LATENCY", 150)),
+                       jitter=float(os.environ.get("PLACES_JITTER", 50)))
+
+# Core Web Vitals budgets per route, over the web.dev "good" thresholds; see harness/vitals.py
+vitals.budgets.update({
+    # The map pages start mapbox-gl and build the map before the panel settles
+    "/": {"lcp": 4000, "tbt": 600},
+    "/redesign": {"lcp": 4000, "tbt": 600},
+})
+
+# Page-load budgets per route: requests and bytes transferred until the page
+# goes quiet. A test whose page load is over fails with the numbers; see
+# harness/network.py
+network.budgets.update({
+    # mapbox-gl, the style, sprites, glyphs and the tiles in view, plus the location RPCs
+    "/": {"requests": 300, "bytes": 12_000_000},
+    "/redesign": {"requests": 300, "bytes": 12_000_000},
+    "/suggest": {"requests": 150, "bytes": 6_000_000},
+    "/location/[id]": {"requests": 150, "bytes": 6_000_000},
+    "/profile": {"requests": 150, "bytes": 6_000_000},
+    "/admin": {"requests": 150, "bytes": 6_000_000},
+})
+
+
+# ============================================================
+# Fixtures
+# ============================================================
+
+@fixture
+def playwright():
+    # Imported here so browser-free runs never load Playwright
+    from playwright.sync_api import sync_playwright
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-
-        # Desktop context
-        desktop = browser.new_context(viewport={"width": 1440, "height": 900})
-        desktop_page = desktop.new_page()
-
-        # Mobile context (with touch support)
-        mobile = browser.new_context(viewport={"width": 375, "height": 812}, has_touch=True)
-        mobile_page = mobile.new_page()
-
-        print("\n" + "="*60)
-        print("PARENT PICKER - REQUIREMENTS TEST SUITE")
-        print(f"BASE_URL: {BASE_URL}")
-        print("="*60)
-
-        # Helper: dismiss any stuck dialog overlays (auth, suggest, etc.)
-        def dismiss_dialogs():
-            """Press Escape to close any open dialog, with fallback reload."""
-            dialog = desktop_page.locator("[role='dialog']")
-            if dialog.count() > 0 and dialog.first.is_visible():
-                desktop_page.keyboard.press("Escape")
-                desktop_page.wait_for_timeout(500)
-            # Check overlay specifically
-            overlay = desktop_page.locator("[data-slot='dialog-overlay'][data-state='open']")
-            if overlay.count() > 0:
-                desktop_page.keyboard.press("Escape")
-                desktop_page.wait_for_timeout(500)
-
-        # Load pages
-        desktop_page.goto(BASE_URL)
-        desktop_page.wait_for_load_state("networkidle")
-        desktop_page.wait_for_timeout(3000)  # Wait for map
-
-        mobile_page.goto(BASE_URL)
-        mobile_page.wait_for_load_state("networkidle")
-        mobile_page.wait_for_timeout(2000)
-
-        # ============================================================
-        print("\n## 1. Layout & Structure")
-        # ============================================================
-
-        @test("TC-1.1.1", "Map canvas fills viewport")
-        def _():
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            assert box is not None, "Map canvas not found"
-            assert box["width"] >= 1400, f"Canvas width {box['width']} < 1400"
-            assert box["height"] >= 800, f"Canvas height {box['height']} < 800"
-        _()
-
-        @test("TC-1.1.2", "Map is interactive (has controls)")
-        def _():
-            zoom_in = desktop_page.locator(".mapboxgl-ctrl-zoom-in")
-            assert zoom_in.count() > 0, "Zoom controls not found"
-        _()
-
-        @test("TC-1.1.3", "Map loads within 3 seconds")
-        def _():
-            # Map already loaded during setup, just verify it's present
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not found after load"
-        _()
-
-        @test("TC-1.2.1", "Panel visible at ≥1024px")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            assert panel.is_visible(), "Desktop panel not visible"
-        _()
-
-        @test("TC-1.2.2", "Panel has blue background")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            classes = panel.get_attribute("class") or ""
-            assert "bg-blue-600" in classes, f"Panel missing bg-blue-600: {classes}"
-        _()
-
-        @test("TC-1.2.3", "Panel positioned absolute top-4 left-4 bottom-4")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            classes = panel.get_attribute("class") or ""
-            assert "absolute" in classes, "Panel not absolute"
-            assert "top-4" in classes, "Panel missing top-4"
-            assert "left-4" in classes, "Panel missing left-4"
-            assert "bottom-4" in classes, "Panel missing bottom-4"
-        _()
-
-        @test("TC-1.2.4", "Panel width is 380px")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            classes = panel.get_attribute("class") or ""
-            assert "w-[380px]" in classes, f"Panel missing w-[380px]: {classes}"
-        _()
-
-        @test("TC-1.2.5", "Panel has rounded corners and shadow")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            classes = panel.get_attribute("class") or ""
-            assert "rounded-xl" in classes, f"Panel missing rounded-xl: {classes}"
-            assert "shadow" in classes, f"Panel missing shadow: {classes}"
-        _()
-
-        @test("TC-1.3.1", "Bottom sheet visible on mobile")
-        def _():
-            sheet = mobile_page.locator("[data-testid='mobile-bottom-sheet']")
-            assert sheet.is_visible(), "Bottom sheet not visible on mobile"
-        _()
-
-        @test("TC-1.3.2", "Bottom sheet has pull handle")
-        def _():
-            handle = mobile_page.locator("[data-testid='mobile-bottom-sheet'] .rounded-full.bg-gray-300")
-            assert handle.count() > 0, "Pull handle not found"
-        _()
-
-        @test("TC-1.3.3", "Bottom sheet can be expanded/collapsed")
-        def _():
-            toggle_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button").first
-            assert toggle_btn.count() > 0, "Toggle button not found"
-            # Click to expand
-            toggle_btn.click()
-            mobile_page.wait_for_timeout(300)
-            # Check for expanded content (locations list or filter)
-            expanded = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button:has-text('Filters'), [data-testid='mobile-bottom-sheet'] [data-testid='city-card']")
-            assert expanded.count() > 0, "Sheet didn't expand (no content visible)"
-            # Click to collapse
-            toggle_btn.click()
-            mobile_page.wait_for_timeout(300)
-        _()
-
-        @test("TC-1.3.4", "Collapsed shows title, vote count, suggest button")
-        def _():
-            sheet = mobile_page.locator("[data-testid='mobile-bottom-sheet']")
-            title = sheet.locator("text=Alpha School Locations")
-            assert title.count() > 0, "Title not found in collapsed sheet"
-            votes = sheet.locator("text=/\\d+ Votes from Parents/")
-            assert votes.count() > 0, "Vote count not found in collapsed sheet"
-            suggest = sheet.locator("button:has-text('Suggest')")
-            assert suggest.count() > 0, "Suggest button not found in collapsed sheet"
-        _()
-
-        @test("TC-1.3.5", "Expanded shows full locations list with filters")
-        def _():
-            toggle_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button").first
-            toggle_btn.click()
-            mobile_page.wait_for_timeout(300)
-            # Expanded sheet should show filter button or location cards
-            filters_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button:has-text('Filters')")
-            cards = mobile_page.locator("[data-testid='mobile-bottom-sheet'] [data-testid='location-card'], [data-testid='mobile-bottom-sheet'] [data-testid='city-card']")
-            assert filters_btn.count() > 0 or cards.count() > 0, "No filters or cards in expanded sheet"
-            toggle_btn.click()
-            mobile_page.wait_for_timeout(300)
-        _()
-
-        # ============================================================
-        print("\n## 2. Header & Branding")
-        # ============================================================
-
-        @test("TC-2.1.1", "Title 'Alpha School Locations' visible")
-        def _():
-            title = desktop_page.locator("[data-testid='desktop-panel'] h1:has-text('Alpha School Locations')")
-            assert title.is_visible(), "Title not visible"
-        _()
-
-        @test("TC-2.1.2", "Title has location pin icon")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            icon = panel.locator("svg").first
-            assert icon.count() > 0, "Location pin icon not found near title"
-        _()
-
-        @test("TC-2.1.3", "Title is white text on blue background")
-        def _():
-            h1 = desktop_page.locator("[data-testid='desktop-panel'] h1")
-            parent = desktop_page.locator("[data-testid='desktop-panel'] .text-white").first
-            assert parent.count() > 0, "No white text container found"
-        _()
-
-        @test("TC-2.2.1", "Tagline visible")
-        def _():
-            tagline = desktop_page.locator("text=Find & vote on micro school sites")
-            assert tagline.is_visible(), "Tagline not visible"
-        _()
-
-        @test("TC-2.2.2", "Tagline is lighter blue text")
-        def _():
-            tagline = desktop_page.locator("p.text-blue-100").first
-            assert tagline.count() > 0, "Tagline not text-blue-100"
-        _()
-
-        @test("TC-2.3.1", "Vote count displays 'Votes from Parents'")
-        def _():
-            votes = desktop_page.locator("text=/\\d+ Votes from Parents/").first
-            assert votes.count() > 0, "Vote count text not found"
-        _()
-
-        @test("TC-2.3.2", "Vote count updates when voting")
-        def _():
-            # First zoom into a city so we have location cards with vote buttons
-            city_card = desktop_page.locator("[data-testid='city-card']").first
-            if city_card.count() > 0:
-                city_card.click()
-                desktop_page.wait_for_timeout(2000)
-
-            vote_btn = desktop_page.locator("[data-testid='vote-button']").first
-            if vote_btn.count() == 0:
-                assert True, "No vote buttons available at current zoom"
-                return
-
-            votes_el = desktop_page.locator("[data-testid='desktop-panel'] span.text-2xl").first
-            initial_count = int(votes_el.inner_text())
-
-            vote_btn.click(force=True)
-            desktop_page.wait_for_timeout(500)
-
-            # Check if sign-in dialog appeared (voting requires auth)
-            sign_in = desktop_page.locator("text='Sign in to vote'")
-            if sign_in.count() > 0 and sign_in.first.is_visible():
-                dismiss_dialogs()
-                assert True, "Voting requires auth — skipped"
-                return
-
-            updated_count = int(votes_el.inner_text())
-            assert updated_count == initial_count + 1, f"Count didn't update: {initial_count} -> {updated_count}"
-
-            # Unvote to restore state
-            vote_btn.click(force=True)
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        # Close any sign-in dialog that voting may have opened
-        dismiss_dialogs()
-
-        @test("TC-2.3.3", "Count includes people icon")
-        def _():
-            stats = desktop_page.locator("[data-testid='desktop-panel'] .border-b.border-blue-500")
-            icon = stats.locator("svg").first
-            assert icon.count() > 0, "People icon not found in stats section"
-        _()
-
-        # ============================================================
-        print("\n## 3. Map Functionality")
-        # ============================================================
-
-        # Reload to clear any stuck dialogs from Section 2
-        desktop_page.goto(BASE_URL)
-        desktop_page.wait_for_load_state("networkidle")
-        desktop_page.wait_for_timeout(3000)
-
-        @test("TC-3.1.1", "Map uses Mapbox streets style")
-        def _():
-            # Check for Mapbox attribution
-            attribution = desktop_page.locator(".mapboxgl-ctrl-attrib").first
-            assert attribution.count() > 0, "Mapbox attribution not found"
-        _()
-
-        @test("TC-3.2.1", "Initial view shows US-wide before geolocation")
-        def _():
-            # After page load, map should exist with some view
-            map_el = desktop_page.locator(".mapboxgl-map")
-            assert map_el.count() > 0, "Map not found"
-        _()
-
-        @test("TC-3.2.3", "Navigation controls visible")
-        def _():
-            nav = desktop_page.locator(".mapboxgl-ctrl-group").first
-            assert nav.is_visible(), "Navigation controls not visible"
-        _()
-
-        @test("TC-3.3.1", "Each location has a marker or dot layer")
-        def _():
-            # At wide zoom we have city bubbles (canvas layer), at close zoom we have dots
-            # Check for either markers or the map canvas (which renders layers)
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not found (markers rendered as layers)"
-        _()
-
-        @test("TC-3.3.5", "Map dots have white border (stroke)")
-        def _():
-            # Dots are rendered via Mapbox GL layer with circle-stroke-color: #ffffff
-            # We can only verify the map canvas exists (visual test)
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not found"
-        _()
-
-        @test("TC-3.4.1", "Clicking marker/dot selects location")
-        def _():
-            # Click on the map canvas where dots might be
-            # At city zoom, this selects a city bubble
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            # Click roughly in the center of the map
-            canvas.click(position={"x": int(box["width"] * 0.6), "y": int(box["height"] * 0.5)})
-            desktop_page.wait_for_timeout(500)
-            # Test passes if no crash occurred
-            assert True
-        _()
-
-        @test("TC-3.4.3", "Clicking map deselects location")
-        def _():
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            canvas.click(position={"x": 600, "y": 400})
-            desktop_page.wait_for_timeout(300)
-            # Verify no crash
-            assert True
-        _()
-
-        @test("TC-3.5.1", "Map flies to selected location")
-        def _():
-            # Select a location from the list
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)  # wait for fly animation
-            # Just verify no crash
-            assert True
-        _()
-
-        @test("TC-3.5.3", "Zoom changes to 14 when flying to location")
-        def _():
-            # This is verified by the flyToCoords function using zoom: 14
-            # Just ensure a card click doesn't crash
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-            assert True
-        _()
-
-        # ============================================================
-        print("\n## 4. Locations List")
-        # ============================================================
-
-        @test("TC-4.1.1", "List has white background")
-        def _():
-            list_container = desktop_page.locator("[data-testid='desktop-panel'] .bg-white").first
-            assert list_container.count() > 0, "White background container not found"
-        _()
-
-        @test("TC-4.1.2", "List is scrollable when content overflows")
-        def _():
-            scrollable = desktop_page.locator("[data-testid='desktop-panel'] .overflow-y-auto")
-            assert scrollable.count() > 0, "No scrollable container found"
-        _()
-
-        @test("TC-4.1.3", "List fills remaining panel height")
-        def _():
-            flex_container = desktop_page.locator("[data-testid='desktop-panel'] .flex-1.bg-white")
-            assert flex_container.count() > 0, "No flex-1 container for list"
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.1", "Collapsible Filters button visible in list panel")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')")
-            assert filters_btn.count() > 0, "Filters button not found"
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.2", "Clicking Filters expands the filter panel")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            # Should see score category labels
-            overall_label = panel.locator("text=Overall")
-            assert overall_label.count() > 0, "Filter panel didn't expand (no Overall label)"
-            # Collapse again
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.3", "Filter panel shows 5 score categories")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            for cat in ["Overall", "Price", "Regulatory", "Neighborhood", "Building"]:
-                label = panel.locator(f"text={cat}")
-                assert label.count() > 0, f"Category '{cat}' not found in filter panel"
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.4", "Each category has G/Y/R color chip toggles")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            # Look for G/Y/R buttons
-            g_btn = panel.locator("button:has-text('G')").first
-            y_btn = panel.locator("button:has-text('Y')").first
-            r_btn = panel.locator("button:has-text('R')").first
-            assert g_btn.count() > 0, "G chip not found"
-            assert y_btn.count() > 0, "Y chip not found"
-            assert r_btn.count() > 0, "R chip not found"
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.5", "Size filter shows Micro, Micro2, Growth, Full, N/A")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            size_label = panel.locator("text=Size")
-            assert size_label.count() > 0, "Size filter label not found"
-            micro_btn = panel.locator("button:has-text('Micro')").first
-            assert micro_btn.count() > 0, "Micro size button not found"
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.6", "Empty results show 'No locations found' message")
-        def _():
-            # Select only RED for all categories to get empty results
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            # The "No locations found" message appears when no results match
-            # We verify it exists in the component code
-            empty_msg = desktop_page.locator("text=/No locations found/")
-            # May or may not show depending on data, just verify no crash
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            assert True
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.7", "Clicking a color chip toggles it on/off")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            # Click the first G chip (Overall GREEN)
-            g_btn = panel.locator("button[title='GREEN Overall']").first
-            if g_btn.count() > 0:
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-                classes = g_btn.get_attribute("class") or ""
-                assert "ring-2" in classes, "G chip not toggled on (no ring-2)"
-                # Toggle off
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.8", "Active filter count badge shown")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            # Toggle a filter on
-            g_btn = panel.locator("button[title='GREEN Overall']").first
-            if g_btn.count() > 0:
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-                # Check for count badge
-                badge = panel.locator(".bg-blue-500.rounded-full").first
-                assert badge.count() > 0, "Active filter count badge not shown"
-                # Toggle off
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.9", "Clear button resets all filters")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            # Toggle a filter on first
-            g_btn = panel.locator("button[title='GREEN Overall']").first
-            if g_btn.count() > 0:
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-                # Click clear
-                clear_btn = panel.locator("text=Clear").first
-                if clear_btn.count() > 0:
-                    clear_btn.click()
-                    desktop_page.wait_for_timeout(300)
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            assert True
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.10", "Red (Reject) size excluded by default")
-        def _():
-            # Verify Red Reject locations are not shown by default
-            # The N/A button should NOT be active by default
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            na_btn = panel.locator("button:has-text('N/A')").first
-            if na_btn.count() > 0:
-                classes = na_btn.get_attribute("class") or ""
-                assert "ring-2" not in classes, "N/A (Red Reject) should not be active by default"
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.11", "Filters apply to map markers")
-        def _():
-            # Verify map updates when filters change (no crash)
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            g_btn = panel.locator("button[title='GREEN Overall']").first
-            if g_btn.count() > 0:
-                g_btn.click()
-                desktop_page.wait_for_timeout(500)
-                canvas = desktop_page.locator(".mapboxgl-canvas")
-                assert canvas.count() > 0, "Map canvas gone after filter change"
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        @skip("Score filter panel is admin-only (v1.6.0)")
-        @test("TC-4.2.12", "Filters reset pagination to page 1")
-        def _():
-            # Toggle a filter and verify pagination counter resets
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-            g_btn = panel.locator("button[title='GREEN Overall']").first
-            if g_btn.count() > 0:
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-                cards = desktop_page.locator("[data-testid='location-card']").all()
-                assert len(cards) <= 25, "Pagination didn't reset after filter"
-                g_btn.click()
-                desktop_page.wait_for_timeout(300)
-            filters_btn.click()
-            desktop_page.wait_for_timeout(300)
-        _()
-
-        # Helper: zoom into a city so location cards are visible
-        def zoom_to_city():
-            """Reload page, click first city card, wait for location cards."""
-            # Always start fresh to avoid stale filter/dialog state
-            desktop_page.goto(BASE_URL, timeout=60000)
-            desktop_page.wait_for_load_state("domcontentloaded")
-            desktop_page.wait_for_timeout(4000)
-            # If already at city zoom, no need to click
-            if desktop_page.locator("[data-testid='location-card']").count() > 0:
-                return
-            city_cards = desktop_page.locator("[data-testid='city-card']")
-            if city_cards.count() > 0:
-                city_cards.first.click()
-                # Wait for location cards to appear (up to 12s for fly + data load)
-                try:
-                    desktop_page.locator("[data-testid='location-card']").first.wait_for(state="visible", timeout=12000)
-                except:
-                    desktop_page.wait_for_timeout(3000)  # fallback wait
-
-        # Ensure we're at city zoom (individual location cards visible)
-        zoom_to_city()
-
-        @test("TC-4.3.1", "Card shows location name")
-        def _():
-            card_title = desktop_page.locator("[data-testid='location-card'] h3").first
-            assert card_title.count() > 0, "No card titles found"
-            text = card_title.inner_text()
-            assert len(text) > 0, "Card title is empty"
-        _()
-
-        @test("TC-4.3.2", "Card shows address with pin icon")
-        def _():
-            pin = desktop_page.locator("[data-testid='location-card'] .lucide-map-pin").first
-            assert pin.count() > 0, "Pin icon not found on card"
-        _()
-
-        @skip("Card redesign removed separate city/state line — address only (v1.6.0)")
-        @test("TC-4.3.3", "Card shows city and state")
-        def _():
+        yield p
+
+@fixture
+def browser(playwright):
+    browser = playwright.chromium.launch(headless=True)
+    yield browser
+    browser.close()
+
+@fixture
+async def async_browser():
+    # Separate browser on the async executor's event loop
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        yield browser
+        await browser.close()
+
+@fixture(disposable=True)
+def desktop(browser):
+    # Desktop context
+    context = new_context(browser, viewport={"width": 1440, "height": 900})
+    yield context
+    context.close()
+
+@fixture(disposable=True)
+def mobile(browser):
+    # Mobile context (with touch support)
+    context = new_context(browser, viewport={"width": 375, "height": 812}, has_touch=True)
+    yield context
+    context.close()
+
+@fixture(disposable=True)
+def parent(browser):
+    # Desktop context signed in as the test parent (saved storage state, no login UI)
+    context = new_context(browser, viewport={"width": 1440, "height": 900},
+                          storage_state=auth.storage_state("parent"))
+    yield context
+    context.close()
+
+@fixture(disposable=True)
+def admin(browser):
+    # Desktop context signed in as the test admin
+    context = new_context(browser, viewport={"width": 1440, "height": 900},
+                          storage_state=auth.storage_state("admin"))
+    yield context
+    context.close()
+
+@fixture
+def desktop_page(desktop):
+    page = desktop.new_page()
+    page.goto(BASE_URL)
+    wait_for_app(page)
+    return page
+
+@fixture
+def mobile_page(mobile):
+    page = mobile.new_page()
+    page.goto(BASE_URL)
+    wait_for_app(page, cards=False)
+    return page
+
+@fixture
+def parent_page(parent):
+    page = parent.new_page()
+    page.goto(BASE_URL)
+    wait_for_app(page)
+    return page
+
+@fixture
+def admin_page(admin):
+    page = admin.new_page()
+    page.goto(BASE_URL)
+    wait_for_app(page)
+    return page
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+# Helper: browser contexts (sync and async) with the app's test hooks enabled,
+# Supabase, the basemap and autocomplete routed, and network tracking, the
+# vitals collector and the request recorder attached before the first request
+def new_context(browser, **options):
+    context = browser.new_context(**options)
+    enable_test_hooks(context)
+    supabase.attach(context)
+    basemap.attach(context)
+    places.attach(context)
+    vitals.watch(context)
+    network.watch(context)
+    context.on("page", track_network)
+    dependencies.watch(context, BASE_URL)
+    return context
+
+async def new_async_context(browser, **options):
+    context = await browser.new_context(**options)
+    await async_waits.enable_test_hooks(context)
+    await supabase.attach_async(context)
+    await basemap.attach_async(context)
+    await places.attach_async(context)
+    await vitals.watch_async(context)
+    await network.watch_async(context)
+    context.on("page", track_network)
+    dependencies.watch(context, BASE_URL)
+    return context
+
+# Helper: Core Web Vitals of one route, loaded fresh on desktop and on mobile
+def route_vitals(browser, path, role=None, ready=wait_for_page):
+    """
+    Load `path` in new desktop (1440×900) and mobile (375×812, touch)
+    contexts, signed in as `role` if given. Once `ready`, press Tab so INP
+    has an interaction to measure, then return the loads' budget overruns,
+    e.g. "mobile LCP 3120ms > 2500ms".
+    """
+    storage = {"storage_state": auth.storage_state(role)} if role else {}
+    problems = []
+    for options in ({"viewport": {"width": 1440, "height": 900}},
+                    {"viewport": {"width": 375, "height": 812}, "has_touch": True}):
+        context = new_context(browser, **options, **storage)
+        try:
+            page = context.new_page()
+            page.goto(f"{BASE_URL}{path}", timeout=60000)
+            ready(page)
+            page.keyboard.press("Tab")
+            settle(page)
+            entry = vitals.collect(page)
+            problems += [f"{entry['profile']} {problem}" for problem in vitals.over_budget(entry)]
+        finally:
+            context.close()
+    return problems
+
+def map_ready(page):
+    wait_for_app(page, cards=False)
+
+# Helper: dismiss any stuck dialog overlays (auth, suggest, etc.)
+def dismiss_dialogs(page):
+    """Press Escape to close any open dialog, with a second try for the overlay."""
+    dialog = page.locator("[role='dialog']")
+    if dialog.count() > 0 and dialog.first.is_visible():
+        page.keyboard.press("Escape")
+        try:
+            wait_for_dialog_closed(page, timeout=2000)
+        except WaitTimeout:
             pass
-        _()
-
-        @test("TC-4.3.4", "Card shows vote count with heart")
-        def _():
-            heart = desktop_page.locator("[data-testid='vote-button'] .lucide-heart").first
-            assert heart.count() > 0, "Heart icon not found"
-        _()
-
-        @test("TC-4.3.5", "Cards sorted appropriately (viewport-aware)")
-        def _():
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            assert len(cards) > 0, "No location cards found"
-        _()
-
-        @test("TC-4.4.1", "Clicking card selects location")
-        def _():
-            # Deselect first
+    # Check overlay specifically
+    overlay = page.locator("[data-slot='dialog-overlay'][data-state='open']")
+    if overlay.count() > 0:
+        page.keyboard.press("Escape")
+        wait_for_dialog_closed(page)
+
+# Helper: load the main page straight into a view, without UI choreography
+def open_view(page, metro=None, view=None, cards=True, path="/", **store):
+    """
+    Navigate to `path` (the main page, or e.g. "/redesign") with the app's
+    deep-link parameters (src/lib/deep-link.ts): the map jumps to `metro`, a
+    slug from src/lib/active-metros.ts, or to `view`, a (lat, lng, zoom)
+    tuple. Keyword `store` values (e.g. altSizeFilter="all") are then set on
+    the votes store through the test hook.
+    """
+    params = {}
+    if metro:
+        params["metro"] = metro
+    if view:
+        params["view"] = ",".join(str(v) for v in view)
+    page.goto(f"{BASE_URL}{path}?{urlencode(params)}" if params else f"{BASE_URL}{path}", timeout=60000)
+    wait_for_app(page, cards=cards)
+    if store:
+        page.evaluate("values => window.__ppStore.setState(values)", store)
+        wait_for_network_quiet(page)
+        settle(page)
+
+# Helper: zoom into a city so location cards are visible
+def zoom_to_city(page, metro="austin"):
+    """Open the map at a metro (Austin by default) and wait for location cards."""
+    # Always a fresh load, so no stale filter/dialog state carries over
+    open_view(page, metro=metro)
+    try:
+        wait_for_cards(page, LOCATION_CARDS, min_count=1, timeout=12000)
+    except WaitTimeout:
+        pass  # tests guard on card count themselves
+
+# Helper: vote/unvote and wait for the button's own count to update
+def toggle_vote(vote_btn):
+    """Click a vote button and wait for its count to change. Returns the new count."""
+    count_span = vote_btn.locator("span").first
+    before = count_span.inner_text()
+    vote_btn.click()
+    return int(wait_for_text_change(count_span, before))
+
+# Helpers: open and close the "Suggest New Location" dialog from the main page
+def open_suggest_dialog(page):
+    """Open the suggest dialog, returning to the main page first if needed."""
+    trigger = page.locator("button:has-text('Or Suggest New Location')").first
+    if trigger.count() == 0:
+        page.goto(BASE_URL)
+        wait_for_app(page)
+    trigger.click()
+    page.locator("[role='dialog']").first.wait_for(state="visible")
+
+def close_suggest_dialog(page):
+    dismiss_dialogs(page)
+
+# Helper to navigate to suggest page
+def go_to_suggest(page):
+    """Navigate to /suggest and wait for load. Returns True if form is available."""
+    page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(page)
+    form_available = page.locator("#suggest-address").count() > 0
+    return form_available
+
+
+# ============================================================
+# Page states (set up once per section that declares them)
+# ============================================================
+
+@page_state("home")
+def _(desktop_page):
+    """Fresh main page — clears stuck dialogs and filter state."""
+    desktop_page.goto(BASE_URL)
+    wait_for_app(desktop_page)
+
+@page_state("city_zoom")
+def _(desktop_page):
+    """Zoomed into Austin so individual location cards are visible."""
+    zoom_to_city(desktop_page)
+
+@page_state("parent_home")
+def _(parent_page):
+    """Fresh main page, signed in as the test parent."""
+    parent_page.goto(BASE_URL)
+    wait_for_app(parent_page)
+
+@page_state("parent_city_zoom")
+def _(parent_page):
+    """City zoom, signed in as the test parent."""
+    zoom_to_city(parent_page)
+
+@page_state("suggest")
+def _(parent_page):
+    """The /suggest page, signed in as the test parent (the form needs a user)."""
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+
+@page_state("new_ui")
+def _(desktop_page):
+    """Main page with the new UI panel toggled on."""
+    if desktop_page.locator("button:has-text('Back to current')").count() > 0:
+        return
+    desktop_page.goto(BASE_URL)
+    wait_for_app(desktop_page)
+    desktop_page.locator("button:has-text('Try new UI')").click()
+    desktop_page.locator("button:has-text('Back to current')").wait_for(state="visible")
+
+
+# ============================================================
+# Conditions (probed once per run, gate @requires tests)
+# ============================================================
+
+# Sign-in comes from saved storage states (harness/auth.py), so these check
+# settings rather than probing a page
+_PARENT_SKIP = "Requires a parent sign-in — set TEST_PARENT_EMAIL and SUPABASE_SERVICE_ROLE_KEY"
+_SESSION_SKIP = "Requires Supabase auth and a parent sign-in — set TEST_PARENT_EMAIL and SUPABASE_SERVICE_ROLE_KEY"
+_SUPABASE_SKIP = "Requires Supabase auth — in offline mode anyone can vote and suggest"
+_ADMIN_SKIP = "Requires an admin sign-in — set TEST_ADMIN_EMAIL (listed in ADMIN_EMAILS) and SUPABASE_SERVICE_ROLE_KEY"
+_PLACES_SKIP = "Requires the local autocomplete stand-in (run with --places local) and a parent sign-in"
+_SCRATCH_SKIP = ("Submits a location — requires a parent sign-in and a Supabase that isn't the live project "
+                 "(offline mode, the local stand-in, or --supabase replay)")
+
+@condition("as_parent")
+def _():
+    """Parent actions (voting, suggesting) are possible: signed in, or offline mode."""
+    return auth.available("parent")
+
+@condition("parent_session")
+def _():
+    """A real Supabase session for the test parent (not offline mode)."""
+    return auth.signed_in("parent")
+
+@condition("as_admin")
+def _():
+    return auth.available("admin")
+
+@condition("supabase_auth")
+def _():
+    """The app has Supabase configured, so signing in is required to vote or suggest."""
+    return not auth.offline
+
+@condition("parent_places")
+def _():
+    """Parents can suggest, and autocomplete is answered by the local stand-in (known counts and timings)."""
+    return places.mode == "local" and auth.available("parent")
+
+@condition("parent_scratch")
+def _():
+    """Parents can suggest, and the rows they create never reach the live project."""
+    return auth.available("parent") and (auth.local or supabase.mode == "replay")
+
+
+# ============================================================
+section("1. Layout & Structure")
+# ============================================================
+
+@test("TC-1.1.1", "Map canvas fills viewport")
+def _(desktop_page):
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    assert box is not None, "Map canvas not found"
+    assert box["width"] >= 1400, f"Canvas width {box['width']} < 1400"
+    assert box["height"] >= 800, f"Canvas height {box['height']} < 800"
+
+@test("TC-1.1.2", "Map is interactive (has controls)")
+def _(desktop_page):
+    zoom_in = desktop_page.locator(".mapboxgl-ctrl-zoom-in")
+    assert zoom_in.count() > 0, "Zoom controls not found"
+
+@test("TC-1.1.3", "Map loads within 3 seconds")
+def _(desktop_page):
+    # Map already loaded during setup, just verify it's present
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    assert canvas.count() > 0, "Map canvas not found after load"
+
+@test("TC-1.2.1", "Panel visible at ≥1024px")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    assert panel.is_visible(), "Desktop panel not visible"
+
+@test("TC-1.2.2", "Panel has blue background")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    classes = panel.get_attribute("class") or ""
+    assert "bg-blue-600" in classes, f"Panel missing bg-blue-600: {classes}"
+
+@test("TC-1.2.3", "Panel positioned absolute top-4 left-4 bottom-4")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    classes = panel.get_attribute("class") or ""
+    assert "absolute" in classes, "Panel not absolute"
+    assert "top-4" in classes, "Panel missing top-4"
+    assert "left-4" in classes, "Panel missing left-4"
+    assert "bottom-4" in classes, "Panel missing bottom-4"
+
+@test("TC-1.2.4", "Panel width is 380px")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    classes = panel.get_attribute("class") or ""
+    assert "w-[380px]" in classes, f"Panel missing w-[380px]: {classes}"
+
+@test("TC-1.2.5", "Panel has rounded corners and shadow")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    classes = panel.get_attribute("class") or ""
+    assert "rounded-xl" in classes, f"Panel missing rounded-xl: {classes}"
+    assert "shadow" in classes, f"Panel missing shadow: {classes}"
+
+@test("TC-1.3.1", "Bottom sheet visible on mobile")
+def _(mobile_page):
+    sheet = mobile_page.locator("[data-testid='mobile-bottom-sheet']")
+    assert sheet.is_visible(), "Bottom sheet not visible on mobile"
+
+@test("TC-1.3.2", "Bottom sheet has pull handle")
+def _(mobile_page):
+    handle = mobile_page.locator("[data-testid='mobile-bottom-sheet'] .rounded-full.bg-gray-300")
+    assert handle.count() > 0, "Pull handle not found"
+
+@test("TC-1.3.3", "Bottom sheet can be expanded/collapsed")
+def _(mobile_page):
+    toggle_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button").first
+    assert toggle_btn.count() > 0, "Toggle button not found"
+    # Click to expand
+    toggle_btn.click()
+    settle(mobile_page)
+    # Check for expanded content (locations list or filter)
+    expanded = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button:has-text('Filters'), [data-testid='mobile-bottom-sheet'] [data-testid='city-card']")
+    assert expanded.count() > 0, "Sheet didn't expand (no content visible)"
+    # Click to collapse
+    toggle_btn.click()
+    settle(mobile_page)
+
+@test("TC-1.3.4", "Collapsed shows title, vote count, suggest button")
+def _(mobile_page):
+    sheet = mobile_page.locator("[data-testid='mobile-bottom-sheet']")
+    title = sheet.locator("text=Alpha School Locations")
+    assert title.count() > 0, "Title not found in collapsed sheet"
+    votes = sheet.locator("text=/\\d+ Votes from Parents/")
+    assert votes.count() > 0, "Vote count not found in collapsed sheet"
+    suggest = sheet.locator("button:has-text('Suggest')")
+    assert suggest.count() > 0, "Suggest button not found in collapsed sheet"
+
+@test("TC-1.3.5", "Expanded shows full locations list with filters")
+def _(mobile_page):
+    toggle_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button").first
+    toggle_btn.click()
+    settle(mobile_page)
+    # Expanded sheet should show filter button or location cards
+    filters_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button:has-text('Filters')")
+    cards = mobile_page.locator("[data-testid='mobile-bottom-sheet'] [data-testid='location-card'], [data-testid='mobile-bottom-sheet'] [data-testid='city-card']")
+    assert filters_btn.count() > 0 or cards.count() > 0, "No filters or cards in expanded sheet"
+    toggle_btn.click()
+    settle(mobile_page)
+
+# ============================================================
+section("2. Header & Branding")
+# ============================================================
+
+@test("TC-2.1.1", "Title 'Alpha School Locations' visible")
+def _(desktop_page):
+    title = desktop_page.locator("[data-testid='desktop-panel'] h1:has-text('Alpha School Locations')")
+    assert title.is_visible(), "Title not visible"
+
+@test("TC-2.1.2", "Title has location pin icon")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    icon = panel.locator("svg").first
+    assert icon.count() > 0, "Location pin icon not found near title"
+
+@test("TC-2.1.3", "Title is white text on blue background")
+def _(desktop_page):
+    h1 = desktop_page.locator("[data-testid='desktop-panel'] h1")
+    parent = desktop_page.locator("[data-testid='desktop-panel'] .text-white").first
+    assert parent.count() > 0, "No white text container found"
+
+@test("TC-2.2.1", "Tagline visible")
+def _(desktop_page):
+    tagline = desktop_page.locator("text=Find & vote on micro school sites")
+    assert tagline.is_visible(), "Tagline not visible"
+
+@test("TC-2.2.2", "Tagline is lighter blue text")
+def _(desktop_page):
+    tagline = desktop_page.locator("p.text-blue-100").first
+    assert tagline.count() > 0, "Tagline not text-blue-100"
+
+@test("TC-2.3.1", "Vote count displays 'Votes from Parents'")
+def _(desktop_page):
+    votes = desktop_page.locator("text=/\\d+ Votes from Parents/").first
+    assert votes.count() > 0, "Vote count text not found"
+
+@test("TC-2.3.2", "Vote count updates when voting")
+def _(desktop_page):
+    # First zoom into a city so we have location cards with vote buttons
+    zoom_to_city(desktop_page)
+
+    vote_btn = desktop_page.locator("[data-testid='vote-button']").first
+    if vote_btn.count() == 0:
+        assert True, "No vote buttons available at current zoom"
+        return
+
+    votes_el = desktop_page.locator("[data-testid='desktop-panel'] span.text-2xl").first
+    initial_count = int(votes_el.inner_text())
+
+    vote_btn.click(force=True)
+    settle(desktop_page)
+
+    # Check if sign-in dialog appeared (voting requires auth)
+    sign_in = desktop_page.locator("text='Sign in to vote'")
+    if sign_in.count() > 0 and sign_in.first.is_visible():
+        dismiss_dialogs(desktop_page)
+        assert True, "Voting requires auth — skipped"
+        return
+
+    updated_count = int(wait_for_text_change(votes_el, str(initial_count)))
+    assert updated_count == initial_count + 1, f"Count didn't update: {initial_count} -> {updated_count}"
+
+    # Unvote to restore state
+    vote_btn.click(force=True)
+    wait_for_text_change(votes_el, str(updated_count))
+
+@test("TC-2.3.3", "Count includes people icon")
+def _(desktop_page):
+    # Close any sign-in dialog that voting may have opened
+    dismiss_dialogs(desktop_page)
+    stats = desktop_page.locator("[data-testid='desktop-panel'] .border-b.border-blue-500")
+    icon = stats.locator("svg").first
+    assert icon.count() > 0, "People icon not found in stats section"
+
+# ============================================================
+# Reload to clear any stuck dialogs from Section 2
+section("3. Map Functionality", state="home")
+# ============================================================
+
+@test("TC-3.1.1", "Map uses Mapbox streets style")
+def _(desktop_page):
+    # Check for Mapbox attribution
+    attribution = desktop_page.locator(".mapboxgl-ctrl-attrib").first
+    assert attribution.count() > 0, "Mapbox attribution not found"
+
+@test("TC-3.2.1", "Initial view shows US-wide before geolocation")
+def _(desktop_page):
+    # After page load, map should exist with some view
+    map_el = desktop_page.locator(".mapboxgl-map")
+    assert map_el.count() > 0, "Map not found"
+
+@test("TC-3.2.3", "Navigation controls visible")
+def _(desktop_page):
+    nav = desktop_page.locator(".mapboxgl-ctrl-group").first
+    assert nav.is_visible(), "Navigation controls not visible"
+
+@test("TC-3.3.1", "Each location has a marker or dot layer")
+def _(desktop_page):
+    # At wide zoom we have city bubbles (canvas layer), at close zoom we have dots
+    # Check for either markers or the map canvas (which renders layers)
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    assert canvas.count() > 0, "Map canvas not found (markers rendered as layers)"
+
+@test("TC-3.3.5", "Map dots have white border (stroke)")
+def _(desktop_page):
+    # Dots are rendered via Mapbox GL layer with circle-stroke-color: #ffffff
+    # We can only verify the map canvas exists (visual test)
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    assert canvas.count() > 0, "Map canvas not found"
+
+@test("TC-3.4.1", "Clicking marker/dot selects location")
+def _(desktop_page):
+    # Click on the map canvas where dots might be
+    # At city zoom, this selects a city bubble
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    # Click roughly in the center of the map
+    mark = map_mark(desktop_page)
+    canvas.click(position={"x": int(box["width"] * 0.6), "y": int(box["height"] * 0.5)})
+    wait_for_map_settled(desktop_page, mark)
+    # Test passes if no crash occurred
+    assert True
+
+@test("TC-3.4.3", "Clicking map deselects location")
+def _(desktop_page):
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    mark = map_mark(desktop_page)
+    canvas.click(position={"x": 600, "y": 400})
+    wait_for_map_settled(desktop_page, mark)
+    # Verify no crash
+    assert True
+
+@test("TC-3.5.1", "Map flies to selected location")
+def _(desktop_page):
+    # Select a location from the list
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+    # Just verify no crash
+    assert True
+
+@test("TC-3.5.3", "Zoom changes to 14 when flying to location")
+def _(desktop_page):
+    # This is verified by the flyToCoords function using zoom: 14
+    # Just ensure a card click doesn't crash
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+    assert True
+
+# ============================================================
+section("4. Locations List")
+# ============================================================
+
+@test("TC-4.1.1", "List has white background")
+def _(desktop_page):
+    list_container = desktop_page.locator("[data-testid='desktop-panel'] .bg-white").first
+    assert list_container.count() > 0, "White background container not found"
+
+@test("TC-4.1.2", "List is scrollable when content overflows")
+def _(desktop_page):
+    scrollable = desktop_page.locator("[data-testid='desktop-panel'] .overflow-y-auto")
+    assert scrollable.count() > 0, "No scrollable container found"
+
+@test("TC-4.1.3", "List fills remaining panel height")
+def _(desktop_page):
+    flex_container = desktop_page.locator("[data-testid='desktop-panel'] .flex-1.bg-white")
+    assert flex_container.count() > 0, "No flex-1 container for list"
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.1", "Collapsible Filters button visible in list panel")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')")
+    assert filters_btn.count() > 0, "Filters button not found"
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.2", "Clicking Filters expands the filter panel")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    # Should see score category labels
+    overall_label = panel.locator("text=Overall")
+    assert overall_label.count() > 0, "Filter panel didn't expand (no Overall label)"
+    # Collapse again
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.3", "Filter panel shows 5 score categories")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    for cat in ["Overall", "Price", "Regulatory", "Neighborhood", "Building"]:
+        label = panel.locator(f"text={cat}")
+        assert label.count() > 0, f"Category '{cat}' not found in filter panel"
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.4", "Each category has G/Y/R color chip toggles")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    # Look for G/Y/R buttons
+    g_btn = panel.locator("button:has-text('G')").first
+    y_btn = panel.locator("button:has-text('Y')").first
+    r_btn = panel.locator("button:has-text('R')").first
+    assert g_btn.count() > 0, "G chip not found"
+    assert y_btn.count() > 0, "Y chip not found"
+    assert r_btn.count() > 0, "R chip not found"
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.5", "Size filter shows Micro, Micro2, Growth, Full, N/A")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    size_label = panel.locator("text=Size")
+    assert size_label.count() > 0, "Size filter label not found"
+    micro_btn = panel.locator("button:has-text('Micro')").first
+    assert micro_btn.count() > 0, "Micro size button not found"
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.6", "Empty results show 'No locations found' message")
+def _(desktop_page):
+    # Select only RED for all categories to get empty results
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    # The "No locations found" message appears when no results match
+    # We verify it exists in the component code
+    empty_msg = desktop_page.locator("text=/No locations found/")
+    # May or may not show depending on data, just verify no crash
+    filters_btn.click()
+    settle(desktop_page)
+    assert True
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.7", "Clicking a color chip toggles it on/off")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    # Click the first G chip (Overall GREEN)
+    g_btn = panel.locator("button[title='GREEN Overall']").first
+    if g_btn.count() > 0:
+        g_btn.click()
+        settle(desktop_page)
+        classes = g_btn.get_attribute("class") or ""
+        assert "ring-2" in classes, "G chip not toggled on (no ring-2)"
+        # Toggle off
+        g_btn.click()
+        settle(desktop_page)
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.8", "Active filter count badge shown")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    # Toggle a filter on
+    g_btn = panel.locator("button[title='GREEN Overall']").first
+    if g_btn.count() > 0:
+        g_btn.click()
+        settle(desktop_page)
+        # Check for count badge
+        badge = panel.locator(".bg-blue-500.rounded-full").first
+        assert badge.count() > 0, "Active filter count badge not shown"
+        # Toggle off
+        g_btn.click()
+        settle(desktop_page)
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.9", "Clear button resets all filters")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    # Toggle a filter on first
+    g_btn = panel.locator("button[title='GREEN Overall']").first
+    if g_btn.count() > 0:
+        g_btn.click()
+        settle(desktop_page)
+        # Click clear
+        clear_btn = panel.locator("text=Clear").first
+        if clear_btn.count() > 0:
+            clear_btn.click()
+            settle(desktop_page)
+    filters_btn.click()
+    settle(desktop_page)
+    assert True
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.10", "Red (Reject) size excluded by default")
+def _(desktop_page):
+    # Verify Red Reject locations are not shown by default
+    # The N/A button should NOT be active by default
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    na_btn = panel.locator("button:has-text('N/A')").first
+    if na_btn.count() > 0:
+        classes = na_btn.get_attribute("class") or ""
+        assert "ring-2" not in classes, "N/A (Red Reject) should not be active by default"
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.11", "Filters apply to map markers")
+def _(desktop_page):
+    # Verify map updates when filters change (no crash)
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    g_btn = panel.locator("button[title='GREEN Overall']").first
+    if g_btn.count() > 0:
+        g_btn.click()
+        settle(desktop_page)
+        canvas = desktop_page.locator(".mapboxgl-canvas")
+        assert canvas.count() > 0, "Map canvas gone after filter change"
+        g_btn.click()
+        settle(desktop_page)
+    filters_btn.click()
+    settle(desktop_page)
+
+@skip("Score filter panel is admin-only (v1.6.0)")
+@test("TC-4.2.12", "Filters reset pagination to page 1")
+def _(desktop_page):
+    # Toggle a filter and verify pagination counter resets
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    filters_btn.click()
+    settle(desktop_page)
+    g_btn = panel.locator("button[title='GREEN Overall']").first
+    if g_btn.count() > 0:
+        g_btn.click()
+        settle(desktop_page)
+        cards = desktop_page.locator("[data-testid='location-card']").all()
+        assert len(cards) <= 25, "Pagination didn't reset after filter"
+        g_btn.click()
+        settle(desktop_page)
+    filters_btn.click()
+    settle(desktop_page)
+
+# Ensure we're at city zoom (individual location cards visible)
+use_state("city_zoom")
+
+@test("TC-4.3.1", "Card shows location name")
+def _(desktop_page):
+    card_title = desktop_page.locator("[data-testid='location-card'] h3").first
+    assert card_title.count() > 0, "No card titles found"
+    text = card_title.inner_text()
+    assert len(text) > 0, "Card title is empty"
+
+@test("TC-4.3.2", "Card shows address with pin icon")
+def _(desktop_page):
+    pin = desktop_page.locator("[data-testid='location-card'] .lucide-map-pin").first
+    assert pin.count() > 0, "Pin icon not found on card"
+
+@skip("Card redesign removed separate city/state line — address only (v1.6.0)")
+@test("TC-4.3.3", "Card shows city and state")
+def _():
+    pass
+
+@test("TC-4.3.4", "Card shows vote count with heart")
+def _(desktop_page):
+    heart = desktop_page.locator("[data-testid='vote-button'] .lucide-heart").first
+    assert heart.count() > 0, "Heart icon not found"
+
+@test("TC-4.3.5", "Cards sorted appropriately (viewport-aware)")
+def _(desktop_page):
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    assert len(cards) > 0, "No location cards found"
+
+@test("TC-4.4.1", "Clicking card selects location")
+def _(desktop_page):
+    # Deselect first
+    desktop_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 400})
+    settle(desktop_page)
+
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        card.click()
+        settle(desktop_page)
+        selected = desktop_page.locator("[data-testid='location-card'].ring-2")
+        assert selected.count() > 0 or True, "No ring on selected card (may be CSS class variation)"
+
+@test("TC-4.4.4", "Clicking card centers map on location")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+    # Verify no crash - fly animation should have started
+    assert True
+
+@test("TC-4.5.1", "Only on-screen locations appear in list")
+def _(desktop_page):
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    # At city zoom should have cards (from clicking into a city earlier)
+    assert len(cards) >= 0, "List check completed"
+
+@test("TC-4.5.2", "Locations sorted by vote count (highest first)")
+@retry(2)
+def _(desktop_page):
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    if len(cards) >= 2:
+        # Get vote counts from vote buttons
+        btn0 = cards[0].locator("[data-testid='vote-button'] span").first
+        btn1 = cards[1].locator("[data-testid='vote-button'] span").first
+        v0 = int(btn0.inner_text())
+        v1 = int(btn1.inner_text())
+        assert v0 >= v1, f"Not sorted by votes: {v0} < {v1}"
+
+@test("TC-4.5.5", "List updates when user pans map")
+def _(desktop_page):
+    # Pan the map
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    mark = map_mark(desktop_page)
+    canvas.hover(position={"x": box["width"]/2, "y": box["height"]/2})
+    desktop_page.mouse.down()
+    desktop_page.mouse.move(box["width"]/2 - 300, box["height"]/2 - 200)
+    desktop_page.mouse.up()
+    wait_for_map_settled(desktop_page, mark)
+
+    # Locations should still exist after pan
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    assert True, "Pan completed without crash"
+
+@test("TC-4.5.7", "List sorted by votes then distance on initial load")
+def _(desktop_page):
+    desktop_page.goto(BASE_URL)
+    wait_for_app(desktop_page)
+
+    # At initial load, either city cards or location cards should exist
+    city_cards = desktop_page.locator("[data-testid='city-card']").all()
+    loc_cards = desktop_page.locator("[data-testid='location-card']").all()
+    assert len(city_cards) > 0 or len(loc_cards) > 0, "No cards found on initial load"
+
+# Pan/zoom storms: rapid gestures must coalesce into few location fetches.
+# The app waits FETCH_DEBOUNCE_MS after the camera stops before fetching
+# (scheduleFetchNearby in src/lib/votes.ts, used by both map layouts) and
+# aborts a fetch still in flight when a newer starts.
+STORM_PATHS = ("/", "/redesign")  # MapViewLegacy, MapViewRedesign
+STORM_VIEW = (30.2672, -97.7431, 12)  # downtown Austin, street level
+STORM_GESTURES = 12
+STORM_MAX_ROUNDS = 3            # fetch rounds per storm (Playwright may pause past the debounce once or twice)
+STORM_MAX_INFLIGHT = 1          # location RPCs in flight at once
+STORM_MAX_BYTES = 4_000_000     # location RPC response bytes per storm
+
+# Helper: run a gesture storm on a fresh instrumented page and report its location RPCs
+def storm_rpcs(context, gesture, path="/"):
+    """
+    Open STORM_VIEW at `path` on a new page whose location RPCs are recorded, call
+    `gesture(page, i, x, y)` STORM_GESTURES times back to back with the
+    pointer at the map's centre (x, y), wait for the map to settle and
+    return `rpc_stats` plus `fresh`: whether the last fetch covers the
+    bounds now on screen, i.e. no stale response landed after it.
+    """
+    page = context.new_page()
+    try:
+        watch_rpcs(page)
+        open_view(page, view=STORM_VIEW, cards=False, path=path)
+        reset_rpcs(page)
+        box = page.locator(".mapboxgl-canvas").first.bounding_box()
+        x, y = box["x"] + box["width"] / 2, box["y"] + box["height"] / 2
+        mark = map_mark(page)
+        for i in range(STORM_GESTURES):
+            page.mouse.move(x, y)
+            gesture(page, i, x, y)
+        wait_for_map_settled(page, mark)
+        stats = rpc_stats(page)
+        stats["fresh"] = page.evaluate("""() => {
+            const b = window.__ppStore.getState().lastFetchBounds, m = window.__ppMap.map.getBounds();
+            return !!b && b.north >= m.getNorth() && b.south <= m.getSouth() && b.east >= m.getEast() && b.west <= m.getWest();
+        }""")
+        return stats
+    finally:
+        page.close()
+
+def assert_storm(stats, what):
+    """The storm's RPC numbers are within the STORM_* limits."""
+    debounce = fetch_debounce_ms()
+    summary = (f"{stats['rounds']} rounds, {stats['calls']} RPCs, {stats['aborted']} aborted, "
+               f"{stats['received']} bytes received")
+    assert stats["rounds"] >= 1, f"{what} ended outside the fetched bounds but fetched nothing ({summary})"
+    assert stats["rounds"] <= STORM_MAX_ROUNDS, \
+        f"{what} fired {stats['rounds']} fetch rounds, limit {STORM_MAX_ROUNDS} ({summary})"
+    assert stats["min_gap"] is None or stats["min_gap"] >= debounce, \
+        f"{what}: fetch rounds started {stats['min_gap']:.0f}ms apart, under the {debounce}ms debounce ({summary})"
+    assert stats["max_inflight"] <= STORM_MAX_INFLIGHT, \
+        f"{what}: {stats['max_inflight']} location RPCs in flight at once, limit {STORM_MAX_INFLIGHT} ({summary})"
+    assert stats["pending"] == 0 and stats["errors"] == 0, \
+        f"{what}: {stats['pending']} RPCs still pending and {stats['errors']} failed after the map settled ({summary})"
+    assert stats["received"] <= STORM_MAX_BYTES, \
+        f"{what} received {stats['received']} bytes of locations, limit {STORM_MAX_BYTES} ({summary})"
+    assert stats["fresh"], f"{what}: locations on screen are from an older fetch than the current bounds ({summary})"
+
+@test("TC-4.5.8", "Pan storm: rapid drags coalesce into few location fetches, superseded fetches cancelled", state=None)
+def _(desktop):
+    def drag(page, i, x, y):
+        # Alternate directions with a net drift, so the storm ends outside the last fetch
+        dx, dy = (160, 90) if i % 2 == 0 else (-120, -60)
+        page.mouse.down()
+        page.mouse.move(x + dx, y + dy, steps=4)
+        page.mouse.up()
+    for path in STORM_PATHS:
+        assert_storm(storm_rpcs(desktop, drag, path), f"{STORM_GESTURES} drags on {path}")
+
+@test("TC-4.5.9", "Zoom storm: rapid wheel zooms coalesce into few location fetches, superseded fetches cancelled", state=None)
+def _(desktop):
+    def wheel(page, i, x, y):
+        # Alternate out and in with a net zoom-out that stays at street level
+        page.mouse.wheel(0, 300 if i % 2 == 0 else -200)
+    for path in STORM_PATHS:
+        assert_storm(storm_rpcs(desktop, wheel, path), f"{STORM_GESTURES} wheel zooms on {path}")
+
+# ============================================================
+# Ensure location cards are visible (need city zoom)
+section("5. Voting System", state="city_zoom")
+# ============================================================
+
+@test("TC-5.1.1", "Vote button has heart icon")
+def _(desktop_page):
+    heart_btn = desktop_page.locator("[data-testid='vote-button'] .lucide-heart").first
+    assert heart_btn.count() > 0, "Vote button heart not found"
+
+@test("TC-5.1.2", "Vote button displays current vote count")
+def _(desktop_page):
+    btn = desktop_page.locator("[data-testid='vote-button']").first
+    count_span = btn.locator("span").first
+    text = count_span.inner_text()
+    assert text.isdigit(), f"Vote count not a number: {text}"
+
+# Voting needs a signed-in parent (or offline mode)
+use_state("parent_city_zoom")
+
+@test("TC-5.1.3", "Vote button clickable without selecting card")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # Deselect first
+    parent_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 400})
+    settle(parent_page)
+
+    btn = parent_page.locator("[data-testid='vote-button']").first
+    toggle_vote(btn)
+    # Verify no card got selected (click stopped propagation)
+    # Unvote to restore
+    toggle_vote(btn)
+
+@test("TC-5.2.1", "Voting increments count")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    btn = parent_page.locator("[data-testid='vote-button']").first
+    count_span = btn.locator("span").first
+    before = int(count_span.inner_text())
+
+    after = toggle_vote(btn)
+    assert after == before + 1, f"Vote didn't increment: {before} -> {after}"
+
+    # Unvote
+    toggle_vote(btn)
+
+@test("TC-5.2.3", "Unvoting decrements count")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    btn = parent_page.locator("[data-testid='vote-button']").first
+
+    # Vote first
+    after_vote = toggle_vote(btn)
+
+    # Unvote
+    after_unvote = toggle_vote(btn)
+    assert after_unvote == after_vote - 1, f"Unvote didn't decrement: {after_vote} -> {after_unvote}"
+
+@test("TC-5.2.5", "Vote state persists during session")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    btn = parent_page.locator("[data-testid='vote-button']").first
+    toggle_vote(btn)
+
+    # Scroll away and back
+    parent_page.locator("[data-testid='desktop-panel'] .overflow-y-auto").evaluate("el => el.scrollTop = 200")
+    settle(parent_page)
+    parent_page.locator("[data-testid='desktop-panel'] .overflow-y-auto").evaluate("el => el.scrollTop = 0")
+    settle(parent_page)
+
+    # Heart should still be filled
+    heart = btn.locator(".lucide-heart")
+    classes = heart.get_attribute("class") or ""
+    assert "fill-current" in classes, "Vote state didn't persist (heart not filled)"
+
+    # Unvote to restore
+    toggle_vote(btn)
+
+@test("TC-5.2.6", "Can vote on multiple locations")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    btns = parent_page.locator("[data-testid='vote-button']").all()
+    if len(btns) >= 2:
+        toggle_vote(btns[0])
+        toggle_vote(btns[1])
+
+        # Both should have filled hearts
+        h0 = btns[0].locator(".lucide-heart")
+        h1 = btns[1].locator(".lucide-heart")
+        c0 = h0.get_attribute("class") or ""
+        c1 = h1.get_attribute("class") or ""
+        assert "fill-current" in c0, "First vote not persisted"
+        assert "fill-current" in c1, "Second vote not persisted"
+
+        # Unvote both
+        toggle_vote(btns[0])
+        toggle_vote(btns[1])
+
+@test("TC-5.3.1", "Count updates immediately (optimistic)")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    btn = parent_page.locator("[data-testid='vote-button']").first
+    count_span = btn.locator("span").first
+    before = int(count_span.inner_text())
+    btn.click()
+    # Check immediately (no wait)
+    after = int(count_span.inner_text())
+    assert after == before + 1, f"Not optimistic: {before} -> {after}"
+    toggle_vote(btn)
+
+# ============================================================
+section("6. Suggest Location")
+# ============================================================
+
+@test("TC-6.1.1", "Suggest button text correct")
+def _(desktop_page):
+    btn = desktop_page.locator("button:has-text('Suggest')").first
+    text = btn.inner_text()
+    assert "Suggest" in text, f"Button text incorrect: {text}"
+
+@test("TC-6.1.2", "Suggest button has plus icon")
+def _(desktop_page):
+    btn = desktop_page.locator("button:has-text('Suggest')").first
+    icon = btn.locator(".lucide-plus")
+    assert icon.count() > 0, "Plus icon not found on suggest button"
+
+@test("TC-6.1.3", "Suggest button is amber colored")
+def _(desktop_page):
+    btn = desktop_page.locator("button:has-text('Suggest')").first
+    classes = btn.get_attribute("class") or ""
+    assert "amber" in classes, f"Button not amber: {classes}"
+
+@test("TC-6.1.4", "Suggest button visible on desktop and mobile")
+def _(desktop_page, mobile_page):
+    desktop_btn = desktop_page.locator("button:has-text('Suggest')").first
+    assert desktop_btn.is_visible(), "Suggest button not visible on desktop"
+    # Fresh mobile page to avoid stale state from earlier tests
+    mobile_page.goto(BASE_URL)
+    wait_for_app(mobile_page, cards=False)
+    # Target the mobile bottom sheet's button specifically — the desktop
+    # panel's button is hidden on mobile and .first would pick it up
+    mobile_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button:has-text('Suggest')").first
+    mobile_btn.wait_for(state="visible", timeout=5000)
+    assert mobile_btn.is_visible(), "Suggest button not visible on mobile"
+
+@test("TC-6.2.1", "Suggest button links to /suggest page")
+def _(desktop_page):
+    link = desktop_page.locator("a[href='/suggest']").first
+    assert link.count() > 0, "No link to /suggest found"
+
+@test("TC-6.2.2", "/suggest page has title")
+def _(desktop_page):
+    desktop_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(desktop_page)
+    title = desktop_page.locator("text=Suggest a Location").first
+    assert title.is_visible(), "Suggest page title not visible"
+
+@test("TC-6.2.3", "/suggest page has Back to Map link")
+def _(desktop_page):
+    back_link = desktop_page.locator("text=Back to Map").first
+    assert back_link.count() > 0, "Back to Map link not found"
+
+# The form needs a signed-in parent
+use_state("suggest")
+
+@test("TC-6.3.1", "Form has Street Address field")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    address_input = parent_page.locator("#suggest-address").first
+    assert address_input.count() > 0, "Address input not found"
+
+@test("TC-6.3.2", "Form has City field")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    city_input = parent_page.locator("#suggest-city").first
+    assert city_input.count() > 0, "City input not found"
+
+@test("TC-6.3.3", "Form has State field with maxlength 2")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    state_input = parent_page.locator("#suggest-state").first
+    assert state_input.count() > 0, "State input not found"
+    maxlen = state_input.get_attribute("maxlength")
+    assert maxlen == "2", f"State maxlength is {maxlen}, expected 2"
+
+@test("TC-6.3.4", "Form has Notes field (optional)")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    notes_input = parent_page.locator("#suggest-notes").first
+    assert notes_input.count() > 0, "Notes input not found"
+
+@test("TC-6.3.5", "Form has Back to Map link")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    back = parent_page.locator("a:has-text('Back to Map')")
+    assert back.count() > 0, "Back to Map link not found"
+
+@test("TC-6.3.6", "Form has Submit button")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    submit = parent_page.locator("button[type='submit']")
+    assert submit.count() > 0, "Submit button not found"
+
+@test("TC-6.4.2", "Submitted location shows confirmation")
+@requires("parent_scratch", _SCRATCH_SKIP)
+def _(parent_page):
+    go_to_suggest(parent_page)
+    parent_page.locator("#suggest-address").fill("999 Test Street")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    parent_page.locator("button[type='submit']").click()
+    wait_for_network_quiet(parent_page, pattern=None)
+    settle(parent_page)
+    # Check for success state (checkmark or success message)
+    success = parent_page.locator("text=/submitted|success|thank/i").first
+    assert success.count() > 0, "Success confirmation not found after submission"
+
+# Navigate back to main page for remaining tests
+section("7. How It Works Section", state="home")
+# ============================================================
+
+@test("TC-7.1.1", "How It Works heading visible")
+def _(desktop_page):
+    heading = desktop_page.locator("text=How It Works").first
+    assert heading.is_visible(), "How It Works heading not visible"
+
+@test("TC-7.1.2", "Three numbered steps displayed")
+def _(desktop_page):
+    step1 = desktop_page.locator("text=/Browse locations/").first
+    step2 = desktop_page.locator("text=/Vote for locations/").first
+    step3 = desktop_page.locator("text=/prioritized/").first
+    assert step1.count() > 0, "Step 1 not found"
+    assert step2.count() > 0, "Step 2 not found"
+    assert step3.count() > 0, "Step 3 not found"
+
+@test("TC-7.1.3", "Steps have numbered circles")
+def _(desktop_page):
+    circles = desktop_page.locator("[data-testid='desktop-panel'] .bg-blue-500.rounded-full").all()
+    assert len(circles) >= 3, f"Expected 3 numbered circles, found {len(circles)}"
+
+@test("TC-7.1.4", "Step text is readable (blue-100 on blue background)")
+def _(desktop_page):
+    steps = desktop_page.locator("[data-testid='desktop-panel'] ol.text-blue-100")
+    assert steps.count() > 0, "Steps list not using text-blue-100"
+
+# ============================================================
+section("8. Responsive Design")
+# ============================================================
+
+@test("TC-8.1.1", "Overlay panel visible at 1024px")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1024, "height": 768}) as ctx:
+        page_1024 = await ctx.new_page()
+        await page_1024.goto(BASE_URL)
+        await async_waits.wait_for_app(page_1024)
+        panel = page_1024.locator("[data-testid='desktop-panel']")
+        assert await panel.is_visible(), "Panel not visible at 1024px"
+
+@test("TC-8.1.2", "Overlay panel visible at 1440px")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    assert panel.is_visible(), "Panel not visible at 1440px"
+
+@test("TC-8.1.3", "Bottom sheet hidden on desktop")
+def _(desktop_page):
+    sheet = desktop_page.locator("[data-testid='mobile-bottom-sheet']")
+    assert not sheet.is_visible(), "Bottom sheet should be hidden on desktop"
+
+@test("TC-8.2.1", "Bottom sheet visible at 375px")
+def _(mobile_page):
+    sheet = mobile_page.locator("[data-testid='mobile-bottom-sheet']")
+    assert sheet.is_visible(), "Bottom sheet not visible at 375px"
+
+@test("TC-8.2.2", "Bottom sheet visible at 768px (tablet)")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 768, "height": 1024}) as ctx:
+        page_768 = await ctx.new_page()
+        await page_768.goto(BASE_URL)
+        await async_waits.wait_for_app(page_768, cards=False)
+        sheet = page_768.locator("[data-testid='mobile-bottom-sheet']")
+        assert await sheet.is_visible(), "Bottom sheet not visible at 768px"
+
+@test("TC-8.2.3", "Overlay panel hidden on mobile")
+def _(mobile_page):
+    panel = mobile_page.locator("[data-testid='desktop-panel']")
+    assert not panel.is_visible(), "Desktop panel should be hidden on mobile"
+
+@test("TC-8.2.4", "Map fills entire screen behind bottom sheet")
+def _(mobile_page):
+    canvas = mobile_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    assert box is not None, "Map canvas not found on mobile"
+    assert box["width"] >= 370, f"Map not full width: {box['width']}"
+
+@test("TC-8.3.3", "Tap on marker selects (mobile)")
+def _(mobile_page):
+    mobile_page.reload()
+    wait_for_app(mobile_page, cards=False)
+    # Tap on map area
+    canvas = mobile_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    if box:
+        canvas.tap(position={"x": int(box["width"]/2), "y": int(box["height"]/2)})
+        settle(mobile_page)
+    assert True
+
+# ============================================================
+section("9. Data Layer")
+# ============================================================
+
+@test("TC-9.2.1", "App loads with locations")
+def _(desktop_page):
+    # Either city cards (wide zoom) or location cards (close zoom) should exist
+    city_cards = desktop_page.locator("[data-testid='city-card']").all()
+    loc_cards = desktop_page.locator("[data-testid='location-card']").all()
+    total = len(city_cards) + len(loc_cards)
+    assert total >= 1, f"Expected ≥1 items, found {total}"
+
+@test("TC-9.3.2", "Selection syncs between map and list")
+def _(desktop_page):
+    desktop_page.reload()
+    wait_for_app(desktop_page)
+
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        card.click()
+        settle(desktop_page)
+        # Popup should appear on map for selected location
+        popup = desktop_page.locator(".mapboxgl-popup")
+        assert popup.count() > 0, "No popup on map after selecting list item"
+
+# ============================================================
+section("10. Performance", timeout=30)
+# ============================================================
+
+# Budgets (ms). A test over budget fails with the number it measured.
+MAP_IDLE_BUDGET = 3000        # navigation start to the map's first idle
+FRAME_P95_BUDGET = 34         # 95th-percentile frame interval while scrolling (two 60Hz frames)
+FRAME_MAX_BUDGET = 100        # worst single frame while scrolling
+FILTER_RESPONSE_BUDGET = 100  # click to the filter's DOM update
+
+@test("TC-10.1.3", "Map tiles begin loading within 3 seconds")
+def _(desktop_page):
+    desktop_page.goto(BASE_URL, timeout=60000)
+    idle = first_map_idle(desktop_page)
+    wait_for_app(desktop_page)
+    assert idle <= MAP_IDLE_BUDGET, \
+        f"Map first idle {idle:.0f}ms after navigation (budget {MAP_IDLE_BUDGET}ms)"
+
+use_state("city_zoom")
+
+@test("TC-10.2.2", "List scrolling is smooth")
+def _(desktop_page):
+    scrollable = desktop_page.locator("[data-testid='desktop-panel'] .overflow-y-auto").first
+    assert scrollable.count() > 0, "Panel list container not found"
+    overflow = scrollable.evaluate("el => el.scrollHeight - el.clientHeight")
+    assert overflow > 0, "Panel list is not scrollable at city zoom"
+    frames = scroll_frames(scrollable)
+    assert frames["travelled"] > 0, "Programmatic scroll did not move the list"
+    assert frames["p95"] <= FRAME_P95_BUDGET, \
+        f"p95 frame {frames['p95']:.1f}ms over {frames['frames']} frames (budget {FRAME_P95_BUDGET}ms)"
+    assert frames["max"] <= FRAME_MAX_BUDGET, \
+        f"Longest frame {frames['max']:.1f}ms while scrolling (budget {FRAME_MAX_BUDGET}ms)"
+
+@test("TC-10.2.3", "Filter toggle responds quickly")
+def _(desktop_page):
+    # The panel's filter control is the Size pill; it opens a popover of size tiers
+    panel = "[data-testid='desktop-panel']"
+    size_pill = desktop_page.locator(f"{panel} button:has-text('students')").first
+    assert size_pill.count() > 0, "Size filter pill not found"
+    try:
+        opened = click_latency(desktop_page, size_pill, panel)
+        assert opened["update"] <= FILTER_RESPONSE_BUDGET, \
+            f"Size popover opened {opened['update']:.0f}ms after the click (budget {FILTER_RESPONSE_BUDGET}ms)"
+        tier = desktop_page.locator(f"{panel} button:has-text('100-200 students')").first
+        applied = click_latency(desktop_page, tier, panel)
+        assert applied["update"] <= FILTER_RESPONSE_BUDGET, \
+            f"Size filter applied {applied['update']:.0f}ms after the click (budget {FILTER_RESPONSE_BUDGET}ms)"
+    finally:
+        desktop_page.evaluate("() => window.__ppStore.setState({ altSizeFilter: 'micro' })")
+        settle(desktop_page)
+
+# Each route is loaded in fresh contexts, so these need no page state
+@test("TC-10.3.1", "Home page Core Web Vitals within budget on desktop and mobile", state=None)
+def _(browser):
+    problems = route_vitals(browser, "/", ready=map_ready)
+    assert not problems, f"/: {'; '.join(problems)}"
+
+@test("TC-10.3.2", "Suggest page Core Web Vitals within budget on desktop and mobile", state=None)
+def _(browser):
+    problems = route_vitals(browser, "/suggest")
+    assert not problems, f"/suggest: {'; '.join(problems)}"
+
+@test("TC-10.3.3", "Location detail Core Web Vitals within budget on desktop and mobile")
+def _(browser, desktop_page):
+    location_id = desktop_page.evaluate("() => (window.__ppStore.getState().locations[0] || {}).id")
+    assert location_id, "No location loaded at city zoom to open"
+    problems = route_vitals(browser, f"/location/{location_id}")
+    assert not problems, f"/location/{location_id}: {'; '.join(problems)}"
+
+@test("TC-10.3.4", "Profile page Core Web Vitals within budget on desktop and mobile", state=None)
+@requires("parent_session", _SESSION_SKIP)
+def _(browser):
+    problems = route_vitals(browser, "/profile", role="parent")
+    assert not problems, f"/profile: {'; '.join(problems)}"
+
+@test("TC-10.3.5", "Admin page Core Web Vitals within budget on desktop and mobile", state=None)
+@requires("as_admin", _ADMIN_SKIP)
+def _(browser):
+    problems = route_vitals(browser, "/admin", role="admin")
+    assert not problems, f"/admin: {'; '.join(problems)}"
+
+@test("TC-10.3.6", "Redesign page Core Web Vitals within budget on desktop and mobile", state=None)
+def _(browser):
+    problems = route_vitals(browser, "/redesign", ready=map_ready)
+    assert not problems, f"/redesign: {'; '.join(problems)}"
+
+# ============================================================
+section("11. Accessibility")
+# ============================================================
+
+@test("TC-11.1.3", "Escape key works for dismissing overlays")
+def _(desktop_page):
+    # Escape behavior is valid for any open overlay/dialog
+    desktop_page.keyboard.press("Escape")
+    settle(desktop_page)
+    assert True, "Escape key handled"
+
+@test("TC-11.1.4", "Buttons activate with Enter/Space")
+def _(desktop_page):
+    # Vote buttons are the primary interactive buttons on the page
+    btn = desktop_page.locator("[data-testid='desktop-panel'] button").first
+    btn.focus()
+    assert True, "Button can receive focus"
+
+@test("TC-11.2.1", "Map has aria-label")
+def _(desktop_page):
+    map_el = desktop_page.locator("[aria-label='Map']").first
+    assert map_el.count() > 0, "Map missing aria-label"
+
+@test("TC-11.2.2", "Buttons have descriptive text")
+def _(desktop_page):
+    btns = desktop_page.locator("[data-testid='desktop-panel'] button").all()
+    for b in btns[:5]:
+        text = b.inner_text().strip()
+        aria = b.get_attribute("aria-label") or ""
+        assert len(text) > 0 or len(aria) > 0, "Button has no text or aria-label"
+
+@test("TC-11.2.3", "Suggest link navigates to /suggest page")
+def _(desktop_page):
+    link = desktop_page.locator("a[href='/suggest']").first
+    assert link.count() > 0, "Suggest link not found"
+
+@test("TC-11.2.4", "Form inputs have associated labels", state="parent_home")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    labels = parent_page.locator("[role='dialog'] label").all()
+    assert len(labels) >= 3, f"Expected ≥3 form labels, found {len(labels)}"
+    close_suggest_dialog(parent_page)
+
+@test("TC-11.3.2", "Interactive elements have visible focus states")
+def _(desktop_page):
+    # Tab to first interactive element and verify no crash
+    desktop_page.keyboard.press("Tab")
+    settle(desktop_page)
+    assert True
+
+# ============================================================
+section("12. Error Handling")
+# ============================================================
+
+@test("TC-12.1.1", "App doesn't crash (basic smoke test)")
+def _(desktop_page):
+    title = desktop_page.locator("text=Alpha School Locations").first
+    assert title.is_visible(), "App appears to have crashed"
+
+@test("TC-12.1.2", "Missing token shows error message (verified in code)")
+def _(desktop_page):
+    # The MapView component renders a "Map Unavailable" message when
+    # NEXT_PUBLIC_MAPBOX_TOKEN is missing. Since we have a token configured,
+    # we verify the map loaded instead.
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    assert canvas.count() > 0, "Map not loaded (token seems working)"
+
+# ============================================================
+section("13. Environment & Configuration")
+# ============================================================
+
+@test("TC-13.1.2", ".env.local is in .gitignore")
+@touches(".gitignore")
+def _():
+    import subprocess
+    result = subprocess.run(
+        ["git", "check-ignore", ".env.local"],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    assert result.returncode == 0, ".env.local not in .gitignore"
+
+@test("TC-13.1.3", "App provides .env template or docs")
+def _():
+    has_template = sources.exists(".env.example") or sources.exists(".env.local.example")
+    has_readme = sources.exists("README.md")
+    assert has_template or has_readme, "No .env template or README found"
+
+# ============================================================
+section("14. Tech Stack")
+# ============================================================
+
+@test("TC-14.1.1", "App uses Next.js App Router")
+def _():
+    assert sources.path("src/app").is_dir(), "src/app directory not found"
+
+@test("TC-14.2.1", "Tailwind CSS classes used throughout")
+def _(desktop_page):
+    classes = desktop_page.locator("[class*='bg-']").all()
+    assert len(classes) > 5, "Few Tailwind classes found"
+
+@test("TC-14.3.1", "react-map-gl used for map")
+def _(desktop_page):
+    mapbox_map = desktop_page.locator(".mapboxgl-map")
+    assert mapbox_map.count() > 0, "Mapbox GL map not found"
+
+@test("TC-14.3.2", "Map is client-side rendered")
+def _(desktop_page):
+    mapbox = desktop_page.locator(".mapboxgl-map").first
+    assert mapbox.count() > 0, "Mapbox not loaded (dynamic import may have failed)"
+
+@test("TC-14.3.3", "Mapbox GL CSS imported")
+def _(desktop_page):
+    # Check for mapbox-gl CSS by looking for its classes
+    ctrl = desktop_page.locator(".mapboxgl-ctrl").first
+    assert ctrl.count() > 0, "Mapbox GL CSS not loaded (no .mapboxgl-ctrl found)"
+
+# ============================================================
+# Reload to guarantee clean state before autocomplete tests
+section("15. Address Autocomplete & Geocoding", state="parent_home")
+# ============================================================
+
+@test("TC-15.1.1", "Typing 3+ chars shows autocomplete dropdown")
+@retry(2)
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    address_input.fill("123 Main")
+    parent_page.locator("[data-testid='autocomplete-dropdown']").first.wait_for(state="visible")
+
+    dropdown = parent_page.locator("[data-testid='autocomplete-dropdown']").first
+    assert dropdown.is_visible(), "Autocomplete dropdown not visible"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.1.2", "Dropdown shows up to 5 suggestions")
+@retry(2)
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    address_input.fill("Congress Ave Austin")
+    parent_page.locator("[data-testid='autocomplete-dropdown']").first.wait_for(state="visible")
+
+    suggestions = parent_page.locator("[data-testid='autocomplete-option']").all()
+    assert 0 < len(suggestions) <= 5, f"Expected 1-5 suggestions, got {len(suggestions)}"
+    if places.mode == "local":
+        # The stand-in corpus has more than 5 matches, so the cap must apply
+        assert len(suggestions) == 5, f"Expected the cap of 5 suggestions, got {len(suggestions)}"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.1.4", "Clicking suggestion populates address")
+@retry(2)
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    address_input.fill("401 Congress")
+    parent_page.locator("[data-testid='autocomplete-dropdown']").first.wait_for(state="visible")
+
+    suggestion = parent_page.locator("[data-testid='autocomplete-option']").first
+    suggestion.click()
+    settle(parent_page)
+
+    value = address_input.input_value()
+    assert len(value) > 10, f"Address not populated: {value}"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.1.7", "Pressing Escape closes dropdown")
+@retry(2)
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    address_input.fill("Main St")
+    parent_page.locator("[data-testid='autocomplete-dropdown']").first.wait_for(state="visible")
+
+    dropdown = parent_page.locator("[data-testid='autocomplete-dropdown']").first
+    assert dropdown.is_visible(), "Dropdown should be visible"
+
+    parent_page.keyboard.press("Escape")
+    settle(parent_page)
+    assert True
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.1.9", "Typing sends one autocomplete request per pause (debounced)")
+@requires("parent_places", _PLACES_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    # Keys 50ms apart stay inside the 300ms debounce window
+    stats = places.typing_stats(parent_page, address_input, "401 Congress Ave", delay=50)
+    assert stats["queries"] == ["401 Congress Ave"], \
+        f"Expected one request for the full text, got {stats['requests']}: {stats['queries']}"
+    assert stats["limits"] == [5], f"Expected the request to ask for 5 results, got {stats['limits']}"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.1.10", "Dropdown appears within debounce + backend latency")
+@requires("parent_places", _PLACES_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    stats = places.typing_stats(parent_page, address_input, "Main St", delay=50)
+    assert stats["latency"] is not None, "Dropdown never showed the answer"
+    # 300ms debounce + backend delay, plus 300ms to render
+    allowed = 300 + places.latency + places.jitter + 300
+    assert stats["latency"] <= allowed, \
+        f"Keystroke-to-dropdown took {stats['latency']:.0f}ms (allowed {allowed:.0f}ms)"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.2.1", "Suggest modal address field has autocomplete")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    autocomplete = parent_page.locator("[data-testid='address-autocomplete']").first
+    assert autocomplete.count() > 0, "Address autocomplete not found in suggest modal"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.2.2", "Selecting suggestion auto-fills city and state")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    address_input.fill("401 Congress Ave Austin TX")
+    parent_page.locator("[data-testid='autocomplete-dropdown']").first.wait_for(state="visible")
+
+    suggestion = parent_page.locator("[data-testid='autocomplete-option']").first
+    if suggestion.count() > 0:
+        suggestion.click()
+        settle(parent_page)
+
+        city_val = parent_page.locator("#city").input_value()
+        state_val = parent_page.locator("#state").input_value()
+
+        assert len(city_val) > 0, "City not auto-filled"
+        assert len(state_val) > 0, "State not auto-filled"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.2.4", "New location marker at correct geocoded position")
+@requires("parent_scratch", _SCRATCH_SKIP)
+def _(parent_page):
+    open_suggest_dialog(parent_page)
+
+    address_input = parent_page.locator("[data-testid='address-autocomplete']").first
+    address_input.fill("100 Congress Ave Austin TX")
+    parent_page.locator("[data-testid='autocomplete-dropdown']").first.wait_for(state="visible")
+
+    suggestion = parent_page.locator("[data-testid='autocomplete-option']").first
+    if suggestion.count() > 0:
+        suggestion.click()
+        settle(parent_page)
+
+    # Ensure city/state filled
+    city_input = parent_page.locator("#city")
+    state_input = parent_page.locator("#state")
+    if not city_input.input_value():
+        city_input.fill("Austin")
+    if not state_input.input_value():
+        state_input.fill("TX")
+
+    parent_page.locator("[role='dialog'] button[type='submit']").click()
+    wait_for_network_quiet(parent_page, pattern=None)
+    settle(parent_page)
+
+    badge = parent_page.locator("text=Parent Suggested").first
+    assert badge.count() > 0, "Parent Suggested badge not found"
+    close_suggest_dialog(parent_page)
+
+@test("TC-15.3.1", "Search autocomplete (removed — filters replaced search)")
+@skip("Search bar removed in favor of score/size filters — REQ-4.2 updated")
+def _():
+    pass
+
+@test("TC-15.3.3", "Search filters existing locations (removed — filters replaced search)")
+@skip("Search bar removed in favor of score/size filters — REQ-4.2 updated")
+def _():
+    pass
+
+@test("TC-15.4.1", "Mock locations at correct map positions")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    canvas = parent_page.locator(".mapboxgl-canvas")
+    assert canvas.count() > 0, "Map canvas not found"
+
+# ============================================================
+section("16. Authentication")
+# ============================================================
+
+@test("TC-16.2.3", "Unauthenticated users can browse locations and map freely")
+async def _(async_browser):
+    # Open a fresh incognito context
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as ctx:
+        page = await ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+
+        # Map should be visible
+        canvas = page.locator(".mapboxgl-canvas")
+        assert await canvas.count() > 0, "Map not visible for unauthenticated user"
+
+        # Either city cards or location cards should show
+        city_cards = await page.locator("[data-testid='city-card']").all()
+        loc_cards = await page.locator("[data-testid='location-card']").all()
+        assert len(city_cards) + len(loc_cards) > 0, "No cards for unauthenticated user"
+
+@test("TC-16.1.1", "Sign-in button visible in panel header")
+def _(desktop_page):
+    # In demo mode (no Supabase), shows "Demo Mode" badge
+    # With Supabase, shows "Sign In" button
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    sign_in = panel.locator("text=Sign In")
+    demo = panel.locator("text=Demo Mode")
+    assert sign_in.count() > 0 or demo.count() > 0, "Neither Sign In button nor Demo Mode badge found"
+
+@test("TC-16.1.2", "Sign-in dialog shows email input")
+@skip("Requires Supabase auth — Sign In button only visible when Supabase configured")
+def _():
+    pass
+
+@test("TC-16.1.3", "Magic link flow sends email")
+@skip("Requires Supabase auth + valid email delivery")
+def _():
+    pass
+
+@test("TC-16.1.4", "Auth state persists across refresh", state="parent_home")
+@requires("parent_session", _SESSION_SKIP)
+def _(parent_page):
+    parent_page.reload()
+    wait_for_app(parent_page)
+    profile = parent_page.locator("a[href='/profile']").first
+    profile.wait_for(state="visible")
+    email = auth.env["TEST_PARENT_EMAIL"].lower()
+    assert email in profile.inner_text().lower(), "Signed-in email not shown after refresh"
+
+@test("TC-16.2.1", "Voting requires sign-in")
+@requires("supabase_auth", _SUPABASE_SKIP)
+def _(desktop_page):
+    zoom_to_city(desktop_page)
+    vote_btn = desktop_page.locator("[data-testid='vote-button']").first
+    assert vote_btn.count() > 0, "No vote button found"
+    vote_btn.click(force=True)
+    desktop_page.locator("text='Sign in to vote'").first.wait_for(state="visible")
+    dismiss_dialogs(desktop_page)
+
+@test("TC-16.2.2", "Suggesting requires sign-in")
+@requires("supabase_auth", _SUPABASE_SKIP)
+def _(desktop_page):
+    open_suggest_dialog(desktop_page)
+    prompt = desktop_page.locator("[role='dialog'] >> text='Sign in to suggest'").first
+    prompt.wait_for(state="visible")
+    assert desktop_page.locator("[role='dialog'] #suggest-address").count() == 0, "Form shown without sign-in"
+    close_suggest_dialog(desktop_page)
+
+@test("TC-16.3.1", "Votes persist for authenticated users")
+@skip("Requires Supabase auth + RLS")
+def _():
+    pass
+
+@test("TC-16.3.2", "Users can only modify own votes (RLS)")
+@skip("Requires Supabase auth + RLS verification")
+def _():
+    pass
+
+@test("TC-16.3.3", "Vote counts aggregate across users")
+@skip("Requires Supabase with multiple user sessions")
+def _():
+    pass
+
+# ============================================================
+section("17. Admin Review Workflow")
+# ============================================================
+
+@test("TC-17.1.1", "Non-admin sees Access Denied on /admin")
+@requires("as_parent", _PARENT_SKIP)
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900},
+                                       storage_state=auth.storage_state("parent")) as ctx:
+        page = await ctx.new_page()
+        await page.goto(f"{BASE_URL}/admin")
+        await async_waits.wait_for_page(page)
+
+        denied = page.locator("text=Access Denied")
+        assert await denied.count() > 0, "Access Denied not shown for non-admin"
+
+@test("TC-17.1.2", "Unauthenticated user sees Access Denied on /admin")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as ctx:
+        page = await ctx.new_page()
+        await page.goto(f"{BASE_URL}/admin")
+        await async_waits.wait_for_page(page)
+
+        denied = page.locator("text=Access Denied")
+        assert await denied.count() > 0, "Access Denied not shown for unauthenticated user"
+
+@test("TC-17.1.3", "Admin page has back link to home")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as ctx:
+        page = await ctx.new_page()
+        await page.goto(f"{BASE_URL}/admin")
+        await async_waits.wait_for_page(page)
+
+        back_link = page.locator("a[href='/']")
+        assert await back_link.count() > 0, "Back to home link not found on admin page"
+
+@test("TC-17.1.4", "API returns 401 for non-admin")
+@requires("parent_session", _SESSION_SKIP)
+async def _(async_browser):
+    async with await new_async_context(async_browser) as ctx:
+        token = auth.access_token("parent")
+        response = await ctx.request.get(f"{BASE_URL}/api/admin/locations",
+                                         headers={"Authorization": f"Bearer {token}"})
+        assert response.status == 401, f"Admin API returned {response.status} for a non-admin token"
+
+@test("TC-17.2.1", "Pending locations appear in review queue")
+@skip("Requires Supabase admin auth + pending locations in DB")
+def _():
+    pass
+
+@test("TC-17.2.2", "Card shows location details")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.2.3", "Card shows suggestor email and date")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.2.4", "Parent notes displayed when present")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.2.5", "Score badges displayed when scores exist")
+@skip("Requires Supabase admin auth + scored locations")
+def _():
+    pass
+
+@test("TC-17.2.6", "Empty state shown when no pending locations")
+@skip("Requires Supabase admin auth with empty queue")
+def _():
+    pass
+
+@test("TC-17.4.1", "Approve changes status to active")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.4.2", "Approved location appears in main app")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.4.3", "Card removed from queue after approval")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.4.4", "Approval email sent to suggestor")
+@skip("Requires Supabase admin auth + Resend email service")
+def _():
+    pass
+
+@test("TC-17.4.5", "Location retains scores after approval")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.5.1", "Reject changes status to rejected")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.5.2", "Rejected location not in main app")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.5.3", "Card removed from queue after rejection")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-17.5.4", "Rejection email sent to suggestor")
+@skip("Requires Supabase admin auth + Resend email service")
+def _():
+    pass
+
+# ============================================================
+# Ensure we're zoomed into a city with location cards visible
+section("18. Score Display", state="city_zoom")
+# ============================================================
+
+@test("TC-18.1.1", "Scored location cards have background tint")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        classes = card.get_attribute("class") or ""
+        has_tint = any(c in classes for c in ["bg-green-50", "bg-yellow-50", "bg-amber-50", "bg-red-50"])
+        # Not all cards may have scores, so check at least the card rendered
+        assert card.count() > 0, "No location cards found"
+
+@skip("Upstream scoring bug — most locations lack overallColor, no card tinting")
+@test("TC-18.1.2", "Card tint matches overall score color")
+def _(desktop_page):
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    found_tinted = False
+    for card in cards[:10]:
+        classes = card.get_attribute("class") or ""
+        if any(c in classes for c in ["bg-green-50", "bg-yellow-50", "bg-amber-50", "bg-red-50"]):
+            found_tinted = True
+            break
+    assert found_tinted, "No tinted cards found among first 10"
+
+@test("TC-18.1.3", "Unscored locations have no background tint")
+def _(desktop_page):
+    # Verify cards exist - unscored ones won't have bg-*-50 class
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    assert len(cards) > 0, "No location cards found"
+
+@skip("Upstream scoring bug — ScoreDetails returns null when overallColor missing")
+@test("TC-18.1.4", "4 sub-score icons displayed")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        # Look for the 4 lucide icons: map-pin, landmark, building-2, dollar-sign
+        icons = card.locator("svg").all()
+        # Card has MapPin (address), Heart (vote), plus 4 sub-score icons + help icon
+        assert len(icons) >= 4, f"Expected ≥4 icons, found {len(icons)}"
+
+@skip("Upstream scoring bug — ScoreDetails returns null when overallColor missing")
+@test("TC-18.1.5", "Sub-scores have colored dots")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        dots = card.locator(".w-2.h-2.rounded-full").all()
+        assert len(dots) >= 4, f"Expected ≥4 score dots, found {len(dots)}"
+
+@test("TC-18.1.6", "Score legend popup opens on ? icon click")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        help_btn = card.locator(".lucide-help-circle, .lucide-circle-help").first
+        if help_btn.count() > 0:
+            help_btn.click()
+            settle(desktop_page)
+            legend = desktop_page.locator("text=Score Key")
+            assert legend.count() > 0, "Score legend popup not shown"
+            # Close by clicking elsewhere
             desktop_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 400})
-            desktop_page.wait_for_timeout(300)
-
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(500)
-                selected = desktop_page.locator("[data-testid='location-card'].ring-2")
-                assert selected.count() > 0 or True, "No ring on selected card (may be CSS class variation)"
-        _()
-
-        @test("TC-4.4.4", "Clicking card centers map on location")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-            # Verify no crash - fly animation should have started
-            assert True
-        _()
-
-        @test("TC-4.5.1", "Only on-screen locations appear in list")
-        def _():
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            # At city zoom should have cards (from clicking into a city earlier)
-            assert len(cards) >= 0, "List check completed"
-        _()
-
-        @test("TC-4.5.2", "Locations sorted by vote count (highest first)")
-        def _():
+            settle(desktop_page)
+
+@test("TC-18.1.7", "ArtifactLink shown when details URL exists")
+def _(desktop_page):
+    # Look for external-link icons in cards
+    ext_links = desktop_page.locator("[data-testid='location-card'] .lucide-external-link").all()
+    # Some cards may have artifact links if they have details URLs
+    assert True, "ArtifactLink check completed (depends on data)"
+
+@test("TC-18.1.8", "SizeLabel shown with student counts")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        # Size labels now include student counts: "Micro (25)", "Growth (250)", etc.
+        card_text = card.inner_text()
+        has_size = any(s in card_text for s in ["Micro (25)", "Micro2 (50-100)", "Growth (250)", "Flagship (1000)", "Red (Reject)"])
+        # May or may not exist depending on score data
+        assert True, f"SizeLabel check completed (depends on data). Card text sample: {card_text[:100]}"
+
+@test("TC-18.1.9", "ArtifactLink opens in new tab")
+def _(desktop_page):
+    ext_link = desktop_page.locator("[data-testid='location-card'] a[target='_blank']").first
+    if ext_link.count() > 0:
+        rel = ext_link.get_attribute("rel") or ""
+        assert "noopener" in rel, f"ArtifactLink missing rel=noopener: {rel}"
+
+@test("TC-18.2.1", "Map dots use score-based colors")
+def _(desktop_page):
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    assert canvas.count() > 0, "Map canvas not found for score-colored dots"
+
+@test("TC-18.3.1", "V1 popup shows Street View image")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+        popup = desktop_page.locator(".mapboxgl-popup")
+        if popup.count() > 0:
+            # V1 popup should have a Street View img element
+            img = popup.locator("img[alt^='Street view']")
+            assert img.count() > 0, "V1 popup missing Street View image"
+
+@test("TC-18.3.2", "V1 popup shows address and city/state")
+def _(desktop_page):
+    popup = desktop_page.locator(".mapboxgl-popup")
+    if popup.count() > 0:
+        # Address line with comma (city, state)
+        address_text = popup.locator("text=/,/").first
+        assert address_text.count() > 0, "Popup missing address"
+
+@test("TC-18.3.3", "V1 popup shows Detailed Info blue hyperlink")
+def _(desktop_page):
+    popup = desktop_page.locator(".mapboxgl-popup")
+    if popup.count() > 0:
+        # Look for "Detailed Info" link (may not exist for all locations)
+        link = popup.locator("a:has-text('Detailed Info')")
+        # Pass if link exists OR if location has no details URL
+        assert True, "Detailed Info link check completed (depends on data)"
+
+@test("TC-18.3.4", "Popup border tinted by overall score color")
+def _(desktop_page):
+    popup = desktop_page.locator(".mapboxgl-popup")
+    if popup.count() > 0:
+        # The popup container div should have a border-* class
+        container = popup.locator("div.border-\\[3px\\]").first
+        if container.count() > 0:
+            classes = container.get_attribute("class") or ""
+            assert "border-" in classes, "Popup missing score-colored border"
+
+@test("TC-18.3.5", "Popup dismissed by clicking dot again")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+        popup = desktop_page.locator(".mapboxgl-popup")
+        # Click same location again should dismiss
+        card.click()
+        settle(desktop_page)
+    assert True, "Popup dismiss test completed"
+
+@test("TC-18.3.6", "Popup dismissed by clicking map background")
+def _(desktop_page):
+    # Clean up any stuck dialogs first
+    dismiss_dialogs(desktop_page)
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+    # Click map background
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    canvas.click(position={"x": 600, "y": 100}, force=True)
+    settle(desktop_page)
+    popup = desktop_page.locator(".mapboxgl-popup")
+    # Popup should be dismissed
+    assert popup.count() == 0, "Popup not dismissed by map click"
+
+@test("TC-18.3.7", "Popup has close button")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+        popup = desktop_page.locator(".mapboxgl-popup")
+        if popup.count() > 0:
+            close_btn = popup.locator(".mapboxgl-popup-close-button, button:has-text('×')")
+            assert close_btn.count() > 0, "Popup missing close button"
+            # Dismiss
+            desktop_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 100})
+            settle(desktop_page)
+
+@test("TC-18.3.8", "V1 popup does NOT show sub-score icons row")
+def _():
+    # Code review: MapView V1 popup path should not render ScoreDetails/SubScoresRow
+    # Find the V1 popup section (between "Popup V1" and the closing of the ternary)
+    v1_section = sources.section("src/components/MapView.tsx", "Popup V1", "Popup V2")
+    # V1 should NOT have ScoreDetails or SubScoresRow
+    assert "ScoreDetails" not in v1_section, "V1 popup should not contain ScoreDetails"
+
+@test("TC-18.3.9", "V1 popup shows size label with student counts")
+def _():
+    # Code review: V1 popup renders SizeLabel component
+    v1_section = sources.section("src/components/MapView.tsx", "Popup V1", "Popup V2")
+    assert "SizeLabel" in v1_section, "V1 popup should contain SizeLabel"
+
+@test("TC-18.3.10", "V2 popup shows sub-score icons row (admin only)")
+def _():
+    # Code review: V2 popup path includes ScoreDetails
+    v2_section = sources.section("src/components/MapView.tsx", "Popup V2", "</Popup>")
+    assert "ScoreDetails" in v2_section, "V2 popup should contain ScoreDetails"
+
+# ============================================================
+section("18.4 Card V1/V2 Toggle")
+# ============================================================
+
+@test("TC-18.4.1", "Non-admin always sees V1 card layout")
+def _():
+    # Code review: LocationsList passes cardVersion={isAdmin ? cardVersion : "v1"} to LocationCard
+    content = sources.read("src/components/LocationsList.tsx")
+    assert 'isAdmin ? cardVersion : "v1"' in content, \
+        "LocationsList should pass v1 to non-admin LocationCard"
+
+@test("TC-18.4.2", "Detailed Info link opens details URL in new tab")
+def _():
+    # Code review: DetailedInfoLink has target="_blank"
+    content = sources.read("src/components/ScoreBadge.tsx")
+    assert "DetailedInfoLink" in content, "DetailedInfoLink component not found"
+    assert 'target="_blank"' in content, "DetailedInfoLink should open in new tab"
+
+@test("TC-18.4.3", "V1 left-panel card has no sub-score icons row")
+def _():
+    # Code review: CardContentV1 does not use ScoreDetails
+    v1_section = sources.section("src/components/LocationCard.tsx", "CardContentV1", "CardContentV2")
+    assert "ScoreDetails" not in v1_section, "V1 card should not contain ScoreDetails"
+
+@test("TC-18.4.4", "V1 left-panel card bottom row: Size | I can help | Detailed Info")
+def _():
+    # Code review: CardContentV1 renders SizeLabel, HelpModal, DetailedInfoLink in a row
+    v1_section = sources.section("src/components/LocationCard.tsx", "CardContentV1", "CardContentV2")
+    assert "SizeLabel" in v1_section, "V1 card bottom row should have SizeLabel"
+    assert "HelpModal" in v1_section, "V1 card bottom row should have HelpModal"
+    assert "DetailedInfoLink" in v1_section, "V1 card bottom row should have DetailedInfoLink"
+
+# ============================================================
+section("19. Two-Tier Zoom Model")
+# ============================================================
+
+@test("TC-19.1.1", "At wide zoom, city bubbles visible")
+def _(desktop_page):
+    # Navigate to US-wide view
+    desktop_page.goto(BASE_URL)
+    wait_for_app(desktop_page)
+
+    # At initial load, city cards should be in the list (zoom < 9)
+    city_cards = desktop_page.locator("[data-testid='city-card']").all()
+    # City bubbles are rendered as Mapbox GL layers (canvas)
+    assert len(city_cards) > 0, "No city cards at wide zoom — two-tier model not active"
+
+@test("TC-19.1.5", "Clicking city card zooms into city")
+def _(desktop_page):
+    city_card = desktop_page.locator("[data-testid='city-card']").first
+    if city_card.count() > 0:
+        mark = map_mark(desktop_page)
+        city_card.click()
+        # Wait for the fly to end, then for location cards to load and settle
+        wait_for_map_idle(desktop_page, mark)
+        wait_for_cards(desktop_page, LOCATION_CARDS, min_count=1, timeout=11000)
+
+        # After clicking, should transition to individual dots view
+        loc_cards = desktop_page.locator("[data-testid='location-card']").all()
+        assert len(loc_cards) > 0, "No location cards after clicking city card"
+
+@test("TC-19.2.1", "At city zoom, individual dots visible")
+def _(desktop_page):
+    # After zooming in from previous test
+    loc_cards = desktop_page.locator("[data-testid='location-card']").all()
+    assert len(loc_cards) > 0, "No individual location cards at city zoom"
+
+@test("TC-19.2.2", "Clicking dot selects location")
+def _(desktop_page):
+    # Click on map canvas where dots should be
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    if box:
+        mark = map_mark(desktop_page)
+        canvas.click(position={"x": int(box["width"] * 0.6), "y": int(box["height"] * 0.5)})
+        wait_for_map_settled(desktop_page, mark)
+    assert True, "Click on dot area didn't crash"
+
+@test("TC-19.2.3", "Selected dot shows popup")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='location-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+        popup = desktop_page.locator(".mapboxgl-popup")
+        assert popup.count() > 0, "No popup after selecting location"
+
+@test("TC-19.3.1", "Zooming out switches to city bubbles")
+def _(desktop_page):
+    # Zoom out by scrolling or using controls
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    # Use zoom control to zoom out multiple times
+    zoom_out = desktop_page.locator(".mapboxgl-ctrl-zoom-out")
+    for _ in range(8):
+        mark = map_mark(desktop_page)
+        zoom_out.click()
+        wait_for_map_idle(desktop_page, mark)
+    wait_for_map_settled(desktop_page)
+
+    # City cards should now appear
+    city_cards = desktop_page.locator("[data-testid='city-card']").all()
+    assert len(city_cards) > 0, "City cards didn't appear after zooming out"
+
+# ============================================================
+section("20. City Summaries List")
+# ============================================================
+
+@test("TC-20.1.1", "At wide zoom, city cards appear in list")
+def _(desktop_page):
+    city_cards = desktop_page.locator("[data-testid='city-card']").all()
+    assert len(city_cards) > 0, "No city cards at wide zoom"
+
+@test("TC-20.1.2", "City card shows 'City, State' name")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    text = card.locator("p.font-semibold").inner_text()
+    assert "," in text, f"City card name missing comma: {text}"
+
+@test("TC-20.1.3", "City card shows location count")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    count_text = card.locator("text=/location/").first
+    assert count_text.count() > 0, "Location count not found on city card"
+
+@test("TC-20.1.4", "City card shows vote count")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    votes = card.locator("text=votes")
+    assert votes.count() > 0, "Vote count label not found on city card"
+
+@test("TC-20.1.5", "City cards sorted by total votes descending")
+def _(desktop_page):
+    cards = desktop_page.locator("[data-testid='city-card']").all()
+    if len(cards) >= 2:
+        vote0 = int(cards[0].locator("p.font-bold").inner_text())
+        vote1 = int(cards[1].locator("p.font-bold").inner_text())
+        assert vote0 >= vote1, f"City cards not sorted by votes: {vote0} < {vote1}"
+
+@test("TC-20.1.6", "Clicking city card flies map and fetches locations")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        # Wait for the fly to end, then for location cards to load and settle
+        wait_for_map_idle(desktop_page, mark)
+        wait_for_cards(desktop_page, LOCATION_CARDS, min_count=1, timeout=11000)
+        # Should now show location cards
+        loc_cards = desktop_page.locator("[data-testid='location-card']").all()
+        assert len(loc_cards) > 0, "No locations loaded after clicking city"
+
+# ============================================================
+section("21. Geolocation")
+# ============================================================
+
+@test("TC-21.1.1", "Geolocation requested on page load")
+async def _(async_browser):
+    # Create a context with geolocation permission granted
+    async with await new_async_context(
+        async_browser,
+        viewport={"width": 1440, "height": 900},
+        geolocation={"latitude": 30.2672, "longitude": -97.7431},
+        permissions=["geolocation"]
+    ) as geo_ctx:
+        page = await geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+
+        # Map should have loaded and be interactive
+        canvas = page.locator(".mapboxgl-canvas")
+        assert await canvas.count() > 0, "Map not loaded with geolocation"
+
+@test("TC-21.1.2", "If granted, map flies to user location")
+@retry(2)
+async def _(async_browser):
+    # Grant geolocation at Austin, TX
+    async with await new_async_context(
+        async_browser,
+        viewport={"width": 1440, "height": 900},
+        geolocation={"latitude": 30.2672, "longitude": -97.7431},
+        permissions=["geolocation"]
+    ) as geo_ctx:
+        page = await geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await page.wait_for_load_state("networkidle")
+
+        # Async flow: geo resolve → citySummaries load → getInitialMapView →
+        # flyTo (1.5s animation) → handleMoveEnd sets zoomLevel → fetchNearbyForce → render
+        # Step 1: Wait for city cards (initial US-wide view while citySummaries load)
+        try:
+            await page.locator("[data-testid='city-card']").first.wait_for(state="visible", timeout=10000)
+        except:
+            pass  # may skip city view if geo+citySummaries both resolve fast
+
+        # Step 2: Wait for city cards to disappear (map zooming from US-wide to city-level)
+        try:
+            await page.locator("[data-testid='city-card']").first.wait_for(state="hidden", timeout=15000)
+        except:
+            pass  # if no city cards appeared, they won't need to hide
+
+        # Step 3: Wait for location cards to appear (fetched for Austin area)
+        await async_waits.wait_for_cards(page, LOCATION_CARDS, min_count=1, timeout=18000)
+
+        # After geolocation resolves, should show location cards (not city cards)
+        loc_cards = await page.locator("[data-testid='location-card']").all()
+        assert len(loc_cards) > 0, "Map didn't fly to user location (no location cards)"
+
+@test("TC-21.1.3", "If denied, map stays at US-wide view")
+async def _(async_browser):
+    # Create context without geolocation permission
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as no_geo_ctx:
+        page = await no_geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+
+        # Should still show city cards at wide zoom
+        city_cards = await page.locator("[data-testid='city-card']").all()
+        assert len(city_cards) > 0, "City cards not shown when geolocation denied"
+
+@test("TC-21.1.5", "Geolocation timeout doesn't block app")
+async def _(async_browser):
+    # Just verify the app works fine without geolocation
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as ctx:
+        page = await ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+
+        title = page.locator("text=Alpha School Locations")
+        assert await title.count() > 0, "App didn't load without geolocation"
+
+# ============================================================
+section("22. List Pagination")
+# ============================================================
+
+@test("TC-22.1.1", "At most 25 location cards shown initially")
+def _(desktop_page):
+    # Ensure we're at city zoom with many locations
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    if len(cards) > 0:
+        assert len(cards) <= 25, f"Expected ≤25 cards initially, found {len(cards)}"
+
+@test("TC-22.1.2", "'Showing X of Y locations' counter displayed")
+def _(desktop_page):
+    counter = desktop_page.locator("[data-testid='location-count']")
+    if counter.count() > 0:
+        text = counter.inner_text()
+        assert "Showing" in text, f"Counter text unexpected: {text}"
+        assert "of" in text, f"Counter missing 'of': {text}"
+
+@test("TC-22.1.3", "'Next' button appears when more than 25 locations")
+def _(desktop_page):
+    next_btn = desktop_page.locator("[data-testid='pagination-next']")
+    counter = desktop_page.locator("[data-testid='location-count']")
+    if counter.count() > 0:
+        text = counter.inner_text()
+        # Parse "Showing X of Y" to check if Y > 25
+        parts = text.split()
+        # e.g. "Showing 25 of 50 locations"
+        if len(parts) >= 4:
+            total = int(parts[3])
+            if total > 25:
+                assert next_btn.count() > 0, "Next button missing when >25 locations"
+
+@test("TC-22.1.4", "Clicking Next loads more cards")
+def _(desktop_page):
+    next_btn = desktop_page.locator("[data-testid='pagination-next']")
+    if next_btn.count() > 0:
+        cards_before = len(desktop_page.locator("[data-testid='location-card']").all())
+        next_btn.click()
+        settle(desktop_page)
+        cards_after = len(desktop_page.locator("[data-testid='location-card']").all())
+        assert cards_after > cards_before, f"Next didn't load more: {cards_before} -> {cards_after}"
+
+@test("TC-22.1.5", "Pagination resets when filters change")
+def _(desktop_page):
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    filters_btn = panel.locator("button:has-text('Filters')").first
+    if filters_btn.count() > 0:
+        filters_btn.click()
+        settle(desktop_page)
+        g_btn = panel.locator("button[title='GREEN Overall']").first
+        if g_btn.count() > 0:
+            g_btn.click()
+            settle(desktop_page)
             cards = desktop_page.locator("[data-testid='location-card']").all()
-            if len(cards) >= 2:
-                # Get vote counts from vote buttons
-                btn0 = cards[0].locator("[data-testid='vote-button'] span").first
-                btn1 = cards[1].locator("[data-testid='vote-button'] span").first
-                v0 = int(btn0.inner_text())
-                v1 = int(btn1.inner_text())
-                assert v0 >= v1, f"Not sorted by votes: {v0} < {v1}"
-        _()
-
-        @test("TC-4.5.5", "List updates when user pans map")
-        def _():
-            # Pan the map
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            canvas.hover(position={"x": box["width"]/2, "y": box["height"]/2})
-            desktop_page.mouse.down()
-            desktop_page.mouse.move(box["width"]/2 - 300, box["height"]/2 - 200)
-            desktop_page.mouse.up()
-            desktop_page.wait_for_timeout(500)
-
-            # Locations should still exist after pan
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            assert True, "Pan completed without crash"
-        _()
-
-        @test("TC-4.5.7", "List sorted by votes then distance on initial load")
-        def _():
-            desktop_page.goto(BASE_URL)
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(5000)
-
-            # At initial load, either city cards or location cards should exist
-            city_cards = desktop_page.locator("[data-testid='city-card']").all()
-            loc_cards = desktop_page.locator("[data-testid='location-card']").all()
-            assert len(city_cards) > 0 or len(loc_cards) > 0, "No cards found on initial load"
-        _()
-
-        # ============================================================
-        print("\n## 5. Voting System")
-        # ============================================================
-
-        # Ensure location cards are visible (need city zoom)
-        zoom_to_city()
-
-        # Detect if voting requires auth by trying a vote click
-        _vote_requires_auth = False
-        _test_vote_btn = desktop_page.locator("[data-testid='vote-button']").first
-        if _test_vote_btn.count() > 0:
-            _test_vote_btn.click(force=True)
-            desktop_page.wait_for_timeout(500)
-            _sign_in_dialog = desktop_page.locator("text='Sign in to vote'")
-            if _sign_in_dialog.count() > 0 and _sign_in_dialog.first.is_visible():
-                _vote_requires_auth = True
-            dismiss_dialogs()
-
-        @test("TC-5.1.1", "Vote button has heart icon")
-        def _():
-            heart_btn = desktop_page.locator("[data-testid='vote-button'] .lucide-heart").first
-            assert heart_btn.count() > 0, "Vote button heart not found"
-        _()
-
-        @test("TC-5.1.2", "Vote button displays current vote count")
-        def _():
-            btn = desktop_page.locator("[data-testid='vote-button']").first
-            count_span = btn.locator("span").first
-            text = count_span.inner_text()
-            assert text.isdigit(), f"Vote count not a number: {text}"
-        _()
-
-        if not _vote_requires_auth:
-            @test("TC-5.1.3", "Vote button clickable without selecting card")
-            def _():
-                # Deselect first
-                desktop_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 400})
-                desktop_page.wait_for_timeout(300)
-
-                btn = desktop_page.locator("[data-testid='vote-button']").first
-                btn.click()
-                desktop_page.wait_for_timeout(300)
-                # Verify no card got selected (click stopped propagation)
-                # Unvote to restore
-                btn.click()
-                desktop_page.wait_for_timeout(300)
-            _()
-        else:
-            @skip("Requires auth — voting opens sign-in dialog without authentication")
-            @test("TC-5.1.3", "Vote button clickable without selecting card")
-            def _(): pass
-            _()
-
-        if not _vote_requires_auth:
-            @test("TC-5.2.1", "Voting increments count")
-            def _():
-                btn = desktop_page.locator("[data-testid='vote-button']").first
-                count_span = btn.locator("span").first
-                before = int(count_span.inner_text())
-
-                btn.click()
-                desktop_page.wait_for_timeout(300)
-                after = int(count_span.inner_text())
-                assert after == before + 1, f"Vote didn't increment: {before} -> {after}"
-
-                # Unvote
-                btn.click()
-                desktop_page.wait_for_timeout(300)
-            _()
-
-            @test("TC-5.2.3", "Unvoting decrements count")
-            def _():
-                btn = desktop_page.locator("[data-testid='vote-button']").first
-                count_span = btn.locator("span").first
-
-                # Vote first
-                btn.click()
-                desktop_page.wait_for_timeout(200)
-                after_vote = int(count_span.inner_text())
-
-                # Unvote
-                btn.click()
-                desktop_page.wait_for_timeout(200)
-                after_unvote = int(count_span.inner_text())
-                assert after_unvote == after_vote - 1, f"Unvote didn't decrement: {after_vote} -> {after_unvote}"
-            _()
-
-            @test("TC-5.2.5", "Vote state persists during session")
-            def _():
-                btn = desktop_page.locator("[data-testid='vote-button']").first
-                btn.click()
-                desktop_page.wait_for_timeout(300)
-
-                # Scroll away and back
-                desktop_page.locator("[data-testid='desktop-panel'] .overflow-y-auto").evaluate("el => el.scrollTop = 200")
-                desktop_page.wait_for_timeout(200)
-                desktop_page.locator("[data-testid='desktop-panel'] .overflow-y-auto").evaluate("el => el.scrollTop = 0")
-                desktop_page.wait_for_timeout(200)
-
-                # Heart should still be filled
-                heart = btn.locator(".lucide-heart")
-                classes = heart.get_attribute("class") or ""
-                assert "fill-current" in classes, "Vote state didn't persist (heart not filled)"
-
-                # Unvote to restore
-                btn.click()
-                desktop_page.wait_for_timeout(300)
-            _()
-
-            @test("TC-5.2.6", "Can vote on multiple locations")
-            def _():
-                btns = desktop_page.locator("[data-testid='vote-button']").all()
-                if len(btns) >= 2:
-                    btns[0].click()
-                    desktop_page.wait_for_timeout(200)
-                    btns[1].click()
-                    desktop_page.wait_for_timeout(200)
-
-                    # Both should have filled hearts
-                    h0 = btns[0].locator(".lucide-heart")
-                    h1 = btns[1].locator(".lucide-heart")
-                    c0 = h0.get_attribute("class") or ""
-                    c1 = h1.get_attribute("class") or ""
-                    assert "fill-current" in c0, "First vote not persisted"
-                    assert "fill-current" in c1, "Second vote not persisted"
-
-                    # Unvote both
-                    btns[0].click()
-                    desktop_page.wait_for_timeout(200)
-                    btns[1].click()
-                    desktop_page.wait_for_timeout(200)
-            _()
-
-            @test("TC-5.3.1", "Count updates immediately (optimistic)")
-            def _():
-                btn = desktop_page.locator("[data-testid='vote-button']").first
-                count_span = btn.locator("span").first
-                before = int(count_span.inner_text())
-                btn.click()
-                # Check immediately (no wait)
-                after = int(count_span.inner_text())
-                assert after == before + 1, f"Not optimistic: {before} -> {after}"
-                btn.click()
-                desktop_page.wait_for_timeout(200)
-            _()
-        else:
-            _auth_skip = "Requires auth — voting opens sign-in dialog without authentication"
-            @skip(_auth_skip)
-            @test("TC-5.2.1", "Voting increments count")
-            def _(): pass
-            _()
-            @skip(_auth_skip)
-            @test("TC-5.2.3", "Unvoting decrements count")
-            def _(): pass
-            _()
-            @skip(_auth_skip)
-            @test("TC-5.2.5", "Vote state persists during session")
-            def _(): pass
-            _()
-            @skip(_auth_skip)
-            @test("TC-5.2.6", "Can vote on multiple locations")
-            def _(): pass
-            _()
-            @skip(_auth_skip)
-            @test("TC-5.3.1", "Count updates immediately (optimistic)")
-            def _(): pass
-            _()
-
-        # ============================================================
-        print("\n## 6. Suggest Location")
-        # ============================================================
-
-        @test("TC-6.1.1", "Suggest button text correct")
-        def _():
-            btn = desktop_page.locator("button:has-text('Suggest')").first
-            text = btn.inner_text()
-            assert "Suggest" in text, f"Button text incorrect: {text}"
-        _()
-
-        @test("TC-6.1.2", "Suggest button has plus icon")
-        def _():
-            btn = desktop_page.locator("button:has-text('Suggest')").first
-            icon = btn.locator(".lucide-plus")
-            assert icon.count() > 0, "Plus icon not found on suggest button"
-        _()
-
-        @test("TC-6.1.3", "Suggest button is amber colored")
-        def _():
-            btn = desktop_page.locator("button:has-text('Suggest')").first
-            classes = btn.get_attribute("class") or ""
-            assert "amber" in classes, f"Button not amber: {classes}"
-        _()
-
-        @test("TC-6.1.4", "Suggest button visible on desktop and mobile")
-        def _():
-            desktop_btn = desktop_page.locator("button:has-text('Suggest')").first
-            assert desktop_btn.is_visible(), "Suggest button not visible on desktop"
-            # Fresh mobile page to avoid stale state from earlier tests
-            mobile_page.goto(BASE_URL)
-            mobile_page.wait_for_load_state("networkidle")
-            mobile_page.wait_for_timeout(2000)
-            # Target the mobile bottom sheet's button specifically — the desktop
-            # panel's button is hidden on mobile and .first would pick it up
-            mobile_btn = mobile_page.locator("[data-testid='mobile-bottom-sheet'] button:has-text('Suggest')").first
-            mobile_btn.wait_for(state="visible", timeout=5000)
-            assert mobile_btn.is_visible(), "Suggest button not visible on mobile"
-        _()
-
-        @test("TC-6.2.1", "Suggest button links to /suggest page")
-        def _():
-            link = desktop_page.locator("a[href='/suggest']").first
-            assert link.count() > 0, "No link to /suggest found"
-        _()
-
-        @test("TC-6.2.2", "/suggest page has title")
-        def _():
-            desktop_page.goto(f"{BASE_URL}/suggest")
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(1000)
-            title = desktop_page.locator("text=Suggest a Location").first
-            assert title.is_visible(), "Suggest page title not visible"
-        _()
-
-        @test("TC-6.2.3", "/suggest page has Back to Map link")
-        def _():
-            back_link = desktop_page.locator("text=Back to Map").first
-            assert back_link.count() > 0, "Back to Map link not found"
-        _()
-
-        # Helper to navigate to suggest page
-        def go_to_suggest():
-            """Navigate to /suggest and wait for load. Returns True if form is available."""
-            desktop_page.goto(f"{BASE_URL}/suggest")
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(1000)
-            form_available = desktop_page.locator("#suggest-address").count() > 0
-            return form_available
-
-        def go_back_to_main():
-            """Navigate back to main page."""
-            desktop_page.goto(BASE_URL)
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(2000)
-
-        # Check if suggest form is available (requires auth or offline mode)
-        _suggest_form_available = go_to_suggest()
-
-        if _suggest_form_available:
-            @test("TC-6.3.1", "Form has Street Address field")
-            def _():
-                go_to_suggest()
-                address_input = desktop_page.locator("#suggest-address").first
-                assert address_input.count() > 0, "Address input not found"
-            _()
-
-            @test("TC-6.3.2", "Form has City field")
-            def _():
-                city_input = desktop_page.locator("#suggest-city").first
-                assert city_input.count() > 0, "City input not found"
-            _()
-
-            @test("TC-6.3.3", "Form has State field with maxlength 2")
-            def _():
-                state_input = desktop_page.locator("#suggest-state").first
-                assert state_input.count() > 0, "State input not found"
-                maxlen = state_input.get_attribute("maxlength")
-                assert maxlen == "2", f"State maxlength is {maxlen}, expected 2"
-            _()
-
-            @test("TC-6.3.4", "Form has Notes field (optional)")
-            def _():
-                notes_input = desktop_page.locator("#suggest-notes").first
-                assert notes_input.count() > 0, "Notes input not found"
-            _()
-
-            @test("TC-6.3.5", "Form has Back to Map link")
-            def _():
-                back = desktop_page.locator("a:has-text('Back to Map')")
-                assert back.count() > 0, "Back to Map link not found"
-            _()
-        else:
-            for tc_id, tc_desc in [("TC-6.3.1", "Form has Street Address field"),
-                                    ("TC-6.3.2", "Form has City field"),
-                                    ("TC-6.3.3", "Form has State field with maxlength 2"),
-                                    ("TC-6.3.4", "Form has Notes field (optional)"),
-                                    ("TC-6.3.5", "Form has Back to Map link")]:
-                @test(tc_id, tc_desc)
-                @skip("Requires auth — suggest form shows sign-in prompt without authentication")
-                def _(): pass
-                _()
-
-        @test("TC-6.3.6", "Form has Submit button")
-        def _():
-            go_to_suggest()
-            submit = desktop_page.locator("button[type='submit']")
-            assert submit.count() > 0, "Submit button not found"
-        _()
-
-        if _suggest_form_available:
-            @test("TC-6.4.2", "Submitted location shows confirmation")
-            def _():
-                go_to_suggest()
-                desktop_page.locator("#suggest-address").fill("999 Test Street")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(2000)
-                # Check for success state (checkmark or success message)
-                success = desktop_page.locator("text=/submitted|success|thank/i").first
-                assert success.count() > 0, "Success confirmation not found after submission"
-            _()
+            assert len(cards) <= 25, "Pagination didn't reset on filter change"
+            g_btn.click()
+            settle(desktop_page)
+        filters_btn.click()
+        settle(desktop_page)
+
+@test("TC-22.1.6", "Pagination resets when map viewport changes")
+def _(desktop_page):
+    # Reload zoomed into a city to reset pagination state, then pan
+    zoom_to_city(desktop_page)
+    # Now pan the map
+    desktop_page.keyboard.press("Escape")
+    settle(desktop_page)
+    canvas = desktop_page.locator(".mapboxgl-canvas")
+    box = canvas.bounding_box()
+    if box:
+        mark = map_mark(desktop_page)
+        canvas.hover(position={"x": box["width"]/2, "y": box["height"]/2}, force=True)
+        desktop_page.mouse.down()
+        desktop_page.mouse.move(box["width"]/2 + 200, box["height"]/2)
+        desktop_page.mouse.up()
+        wait_for_map_settled(desktop_page, mark)
+    cards = desktop_page.locator("[data-testid='location-card']").all()
+    if len(cards) > 0:
+        assert len(cards) <= 25, f"Pagination didn't reset on viewport change ({len(cards)} cards)"
+
+# ============================================================
+section("23. TODO-Based Parent Assistance Emails")
+# ============================================================
+
+@test("TC-23.1.1", "Zoning TODO generated when zoning.color === RED")
+@skip("Requires Supabase admin auth + RED zoning location")
+def _():
+    pass
+
+@test("TC-23.1.2", "Zoning TODO includes zone code when available")
+@skip("Requires Supabase admin auth + scored data")
+def _():
+    pass
+
+@test("TC-23.1.3", "Zoning TODO omits zone code gracefully")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.1.4", "No zoning TODO when score is GREEN/YELLOW/AMBER")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.2.1", "M1 scenario: metro max enrollment >= 2500 AND wealth >= 2500")
+@skip("Requires Supabase admin auth + metro data")
+def _():
+    pass
+
+@test("TC-23.2.2", "M2 scenario: metro max >= 1000 but < 2500")
+@skip("Requires Supabase admin auth + metro data")
+def _():
+    pass
+
+@test("TC-23.2.3", "M3 scenario: metro max < 1000")
+@skip("Requires Supabase admin auth + metro data")
+def _():
+    pass
+
+@test("TC-23.2.4", "Generic fallback when metrics unavailable")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.2.5", "No demographics TODO when score is GREEN/YELLOW/AMBER")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.3.1", "P1/P2 scenario: existing Alpha in metro")
+@skip("Requires Supabase admin auth + metro info")
+def _():
+    pass
+
+@test("TC-23.3.2", "P3 scenario: new metro and RED at 25 students")
+@skip("Requires Supabase admin auth + metro info")
+def _():
+    pass
+
+@test("TC-23.3.3", "Dollar math correct: students = space/100")
+@skip("Requires Supabase admin auth + scored data")
+def _():
+    pass
+
+@test("TC-23.3.4", "Generic fallback when rent/space data unavailable")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.3.5", "No pricing TODO when score is GREEN/YELLOW/AMBER")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.4.1", "Email preview shows TODO sections when RED scores present")
+@skip("Requires Supabase admin auth + scored location with RED")
+def _():
+    pass
+
+@test("TC-23.4.2", "Standard approval email when no RED scores")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.4.3", "TODO count badge on admin card after score sync")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+@test("TC-23.4.4", "Approval email subject changes with TODOs")
+@skip("Requires Supabase admin auth")
+def _():
+    pass
+
+# ============================================================
+section("24. Admin vs Non-Admin Filters")
+# ============================================================
+
+@test("TC-24.1.1", "Non-admin does NOT see red toggle or filter controls")
+def _(desktop_page):
+    # SimpleRedToggle component was removed — verify it's gone from source
+    content = sources.read("src/components/LocationsList.tsx")
+    assert "SimpleRedToggle" not in content, "SimpleRedToggle should be removed from LocationsList"
+    # Non-admin should NOT see the admin ScoreFilterPanel either
+    filters_btn = desktop_page.locator("text=Filters").first
+    assert filters_btn.count() == 0, "Non-admin should not see admin Filters button"
+
+@test("TC-24.1.2", "Non-admin sees all scored locations including RED")
+def _(desktop_page):
+    # RED locations should be visible by default (no toggle needed)
+    # Verify cards exist — they include RED-scored ones
+    cards = desktop_page.locator("[data-testid='location-card']")
+    card_count = cards.count()
+    # If we have cards and some have red borders, RED is shown
+    red_cards = desktop_page.locator("[data-testid='location-card'].border-red-600")
+    # Just verify the page loads locations (RED inclusion is tested by absence of filter)
+    assert True, f"Non-admin sees {card_count} cards (RED included, no toggle)"
+
+@test("TC-24.1.3", "Non-admin sees rank numbers on location cards")
+def _(desktop_page):
+    # Cards should show #1, #2, etc.
+    first_card = desktop_page.locator("[data-testid='location-card']").first
+    if first_card.count() > 0:
+        rank_span = first_card.locator("text=#1")
+        assert rank_span.count() > 0, "First card should show rank #1"
+
+@skip("Requires admin auth to see ScoreFilterPanel")
+@test("TC-24.2.1", "Admin sees ScoreFilterPanel with color and size filters")
+def _():
+    pass
+
+@skip("Requires admin auth to test filter interactions")
+@test("TC-24.2.2", "Admin color filters are AND across categories, OR within")
+def _():
+    pass
+
+@skip("Requires admin auth to test size filter")
+@test("TC-24.2.3", "Admin size filter excludes Red (Reject) by default")
+def _():
+    pass
+
+@test("TC-24.3.1", "filteredLocations() shows all scored locations for non-admin")
+def _(desktop_page):
+    # Non-admin: no filter controls visible, all scored locations shown
+    cards = desktop_page.locator("[data-testid='location-card']")
+    assert cards.count() >= 0, "Card list renders for non-admin"
+
+@test("TC-24.3.2", "Admin View as Parent toggle switches to parent experience")
+@requires("as_admin", _ADMIN_SKIP)
+def _(admin_page):
+    toggle = admin_page.locator("button:has(.lucide-eye)").first
+    toggle.wait_for(state="visible")
+    assert toggle.inner_text().strip() == "Admin", f"Admin view expected, toggle shows {toggle.inner_text()!r}"
+    toggle.click()
+    assert wait_for_text_change(toggle, "Admin").strip() == "Parent", "Toggle didn't switch to Parent view"
+
+@test("TC-24.3.3", "View as Parent toggle reverts to admin experience")
+@requires("as_admin", _ADMIN_SKIP)
+def _(admin_page):
+    # Continues from TC-24.3.2's Parent view
+    toggle = admin_page.locator("button:has(.lucide-eye)").first
+    if toggle.inner_text().strip() == "Admin":
+        toggle.click()
+        wait_for_text_change(toggle, "Admin")
+    toggle.click()
+    assert wait_for_text_change(toggle, "Parent").strip() == "Admin", "Toggle didn't revert to Admin view"
+
+@test("TC-24.3.4", "Map dots use filteredLocations for score colors")
+def _(desktop_page):
+    # At city zoom, map should show colored dots based on filteredLocations
+    # Verify the Source/Layer structure exists for location dots
+    zoom_to_city(desktop_page)
+    # Map canvas should be present
+    canvas = desktop_page.locator("canvas.mapboxgl-canvas")
+    assert canvas.count() > 0, "Map canvas not found"
+
+# ============================================================
+# Navigate back to wide zoom for city bubble tests
+section("25. Metro City Bubbles", state="home")
+# ============================================================
+
+@test("TC-25.1.1", "City bubbles consolidate to metro level")
+def _(desktop_page):
+    # At wide zoom, should show metro-level bubbles (not individual cities)
+    cards = desktop_page.locator("[data-testid='city-card']").all()
+    assert len(cards) >= 1, "No city cards found at wide zoom"
+
+@test("TC-25.1.2", "Metro bubbles show location count")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    if card.count() > 0:
+        text = card.inner_text()
+        assert "location" in text.lower(), f"City card missing location count: {text}"
+
+@test("TC-25.1.3", "Metro bubbles show vote count")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    if card.count() > 0:
+        text = card.inner_text()
+        assert "vote" in text.lower(), f"City card missing vote count: {text}"
+
+@test("TC-25.2.1", "Clicking city card zooms to metro area")
+def _(desktop_page):
+    card = desktop_page.locator("[data-testid='city-card']").first
+    if card.count() > 0:
+        mark = map_mark(desktop_page)
+        card.click()
+        wait_for_map_settled(desktop_page, mark)
+        # After clicking, should see location cards (zoomed in)
+        loc_cards = desktop_page.locator("[data-testid='location-card']").all()
+        assert len(loc_cards) >= 1, "No location cards after clicking city card"
+
+@test("TC-25.2.2", "Metro centroid is density-weighted")
+def _():
+    # Verify metros.ts module exists and exports consolidateToMetros
+    assert sources.exists("src/lib/metros.ts"), "metros.ts module not found"
+    content = sources.read("src/lib/metros.ts")
+    assert "consolidateToMetros" in content, "consolidateToMetros function not found"
+    assert "weightedLat" in content or "weighted" in content.lower(), "Density weighting not found"
+
+@skip("Requires Supabase to verify exact metro count")
+@test("TC-25.2.3", "Approximately 85 US metros defined")
+def _():
+    pass
+
+@test("TC-25.3.1", "Non-admin city bubbles only count released locations")
+def _():
+    # Verify getCitySummaries accepts releasedOnly param
+    content = sources.read("src/lib/locations.ts")
+    assert "excludeRed" in content, "getCitySummaries should accept excludeRed param"
+
+# ============================================================
+section("26. Released/Unreleased Locations")
+# ============================================================
+
+@skip("Requires Supabase DB access to verify schema")
+@test("TC-26.1.1", "Released column exists in pp_locations")
+def _():
+    assert sources.exists("sql/released-migration.sql"), "released-migration.sql not found"
+    content = sources.read("sql/released-migration.sql")
+    assert "released boolean" in content.lower(), "Released column definition not found"
+
+@skip("Requires Supabase DB access to verify default")
+@test("TC-26.1.2", "Released defaults to false")
+def _():
+    content = sources.read("sql/released-migration.sql")
+    assert "DEFAULT false" in content, "Released default false not found"
+
+@skip("Requires Supabase DB access to verify released cities")
+@test("TC-26.1.3", "Austin/Palo Alto/Palm Beach set as released")
+def _():
+    content = sources.read("sql/released-migration.sql")
+    assert "Austin" in content, "Austin not in released migration"
+    assert "Palo Alto" in content, "Palo Alto not in released migration"
+    assert "Boca Raton" in content, "Boca Raton not in released migration"
+
+@test("TC-26.2.1", "Non-admin only sees released locations")
+def _():
+    # Verify filteredLocations filters by released for non-admins
+    content = sources.read("src/lib/votes.ts")
+    assert "loc.released === true" in content, "Released filter not found in filteredLocations"
+
+@test("TC-26.2.2", "Non-admin never sees unreleased locations")
+def _():
+    # The non-admin path always filters to released=true
+    content = sources.read("src/lib/votes.ts")
+    # Check both server-side (releasedOnly) and client-side filtering
+    assert "releasedOnly" in content or "released_only" in content, "Server-side released filter not found"
+
+@skip("Requires admin auth to access Released filter")
+@test("TC-26.3.1", "Admin 'all' filter shows both released and unreleased")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "releasedFilter" in content, "Released filter state not found"
+
+@skip("Requires admin auth to access Released filter")
+@test("TC-26.3.2", "Admin 'released' filter shows only released")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "released" in content, "Released filter logic not found"
+
+@skip("Requires admin auth to access Released filter")
+@test("TC-26.3.3", "Admin 'unreleased' filter shows only unreleased")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "unreleased" in content.lower(), "Unreleased filter logic not found"
+
+@skip("Requires Supabase to verify RPC parameters")
+@test("TC-26.4.1", "Server-side released_only param on RPCs")
+def _():
+    content = sources.read("sql/released-migration.sql")
+    assert "released_only" in content, "released_only param not found in SQL"
+
+@test("TC-26.4.2", "Client-side belt-and-suspenders filtering")
+def _():
+    # Verify client-side also filters by released (belt-and-suspenders)
+    content = sources.read("src/lib/votes.ts")
+    # Both server-side param AND client-side filter should exist
+    assert "released_only" in content or "releasedOnly" in content, "Server param missing"
+    assert "loc.released" in content, "Client-side released check missing"
+
+# ============================================================
+# Navigate to /suggest page for validation tests
+section("27. Suggest Form Validation & Sanitization", state="suggest")
+# ============================================================
+
+@test("TC-27.1.1", "Empty submit shows errors on address, city, state")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    # Clear any pre-filled values
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("")
+    parent_page.locator("#suggest-city").fill("")
+    parent_page.locator("#suggest-state").fill("")
+    # Click submit
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    addr_err = parent_page.locator("[data-testid='error-address']")
+    city_err = parent_page.locator("[data-testid='error-city']")
+    state_err = parent_page.locator("[data-testid='error-state']")
+    assert addr_err.count() > 0, "Address error not shown"
+    assert city_err.count() > 0, "City error not shown"
+    assert state_err.count() > 0, "State error not shown"
+
+@test("TC-27.1.2", "Address error says 'Street address is required'")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    addr_err = parent_page.locator("[data-testid='error-address']")
+    if addr_err.count() > 0:
+        text = addr_err.inner_text()
+        assert "required" in text.lower(), f"Address error text unexpected: {text}"
+
+@test("TC-27.1.3", "City error says 'City is required'")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    city_err = parent_page.locator("[data-testid='error-city']")
+    if city_err.count() > 0:
+        text = city_err.inner_text()
+        assert "required" in text.lower(), f"City error text unexpected: {text}"
+
+@test("TC-27.1.4", "State error says 'State is required'")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    state_err = parent_page.locator("[data-testid='error-state']")
+    if state_err.count() > 0:
+        text = state_err.inner_text()
+        assert "required" in text.lower(), f"State error text unexpected: {text}"
+
+@test("TC-27.1.5", "Fixing fields and resubmitting clears errors")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # Fill in valid data
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    settle(parent_page)
+    # After typing with hasAttemptedSubmit=true, errors should clear
+    addr_err = parent_page.locator("[data-testid='error-address']")
+    city_err = parent_page.locator("[data-testid='error-city']")
+    state_err = parent_page.locator("[data-testid='error-state']")
+    assert addr_err.count() == 0, "Address error still shown after fix"
+    assert city_err.count() == 0, "City error still shown after fix"
+    assert state_err.count() == 0, "State error still shown after fix"
+
+@test("TC-27.1.6", "Errors render as red text below field")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # Navigate fresh and trigger errors
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("")
+    parent_page.locator("#suggest-city").fill("")
+    parent_page.locator("#suggest-state").fill("")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    addr_err = parent_page.locator("[data-testid='error-address']")
+    if addr_err.count() > 0:
+        classes = addr_err.get_attribute("class") or ""
+        assert "text-red" in classes, f"Error not red: {classes}"
+        assert "text-xs" in classes, f"Error not small text: {classes}"
+
+@test("TC-27.2.1", "State 'TX' accepted")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    state_err = parent_page.locator("[data-testid='error-state']")
+    assert state_err.count() == 0, "State error shown for valid 'TX'"
+
+@test("TC-27.2.2", "State 'tx' auto-uppercased to 'TX'")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    state_input = parent_page.locator("#suggest-state")
+    state_input.fill("tx")
+    settle(parent_page)
+    val = state_input.input_value()
+    assert val == "TX", f"State not auto-uppercased: {val}"
+
+@test("TC-27.2.3", "State 'T' shows error")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("T")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    state_err = parent_page.locator("[data-testid='error-state']")
+    assert state_err.count() > 0, "No error for single-char state"
+
+@test("TC-27.2.4", "State '12' shows error")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("12")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    state_err = parent_page.locator("[data-testid='error-state']")
+    assert state_err.count() > 0, "No error for numeric state"
+
+@test("TC-27.2.5", "State field has maxLength=2")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    state_input = parent_page.locator("#suggest-state")
+    maxlen = state_input.get_attribute("maxlength")
+    assert maxlen == "2", f"State maxlength is {maxlen}, expected 2"
+
+@test("TC-27.3.1", "Sqft '3500' accepted")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    parent_page.locator("#suggest-sqft").fill("3500")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    sqft_err = parent_page.locator("[data-testid='error-sqft']")
+    assert sqft_err.count() == 0, "Sqft error shown for valid '3500'"
+
+@test("TC-27.3.2", "Sqft '3,500' accepted")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    parent_page.locator("#suggest-sqft").fill("3,500")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    sqft_err = parent_page.locator("[data-testid='error-sqft']")
+    assert sqft_err.count() == 0, "Sqft error shown for valid '3,500'"
+
+@test("TC-27.3.3", "Sqft 'abc' shows error")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    parent_page.locator("#suggest-sqft").fill("abc")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    sqft_err = parent_page.locator("[data-testid='error-sqft']")
+    assert sqft_err.count() > 0, "No error for non-numeric sqft"
+
+@test("TC-27.3.4", "Empty sqft accepted (optional)")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    # Leave sqft empty
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    sqft_err = parent_page.locator("[data-testid='error-sqft']")
+    assert sqft_err.count() == 0, "Sqft error shown for empty (optional) field"
+
+@test("TC-27.4.1", "Notes under 2000 chars accepted")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    parent_page.locator("#suggest-notes").fill("This is a great location.")
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    notes_err = parent_page.locator("[data-testid='error-notes']")
+    assert notes_err.count() == 0, "Notes error shown for short notes"
+
+@test("TC-27.4.2", "Notes over 2000 chars shows error")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    addr = parent_page.locator("[data-testid='address-autocomplete']").first
+    if addr.count() > 0:
+        addr.fill("123 Main St")
+    parent_page.locator("#suggest-city").fill("Austin")
+    parent_page.locator("#suggest-state").fill("TX")
+    long_notes = "A" * 2001
+    parent_page.locator("#suggest-notes").fill(long_notes)
+    parent_page.locator("button[type='submit']").click()
+    settle(parent_page)
+    notes_err = parent_page.locator("[data-testid='error-notes']")
+    assert notes_err.count() > 0, "No error for notes over 2000 chars"
+
+@test("TC-27.5.1", "<script> tags stripped from input")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    import os, sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "lib"))
+    # Test via source code verification
+    content = sources.read("src/lib/validation.ts")
+    assert "replace(/<[^>]*>/g" in content, "sanitizeText regex not found"
+
+@test("TC-27.5.2", "<b>bold</b> stripped to 'bold'")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    # Verify sanitizeText regex strips tags
+    import re
+    test_input = "<b>bold</b>"
+    result = re.sub(r'<[^>]*>', '', test_input).strip()
+    assert result == "bold", f"Expected 'bold', got '{result}'"
+
+@test("TC-27.5.3", "Normal text unchanged")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    import re
+    test_input = "123 Main Street, Austin TX"
+    result = re.sub(r'<[^>]*>', '', test_input).strip()
+    assert result == test_input, f"Normal text was modified: '{result}'"
+
+@test("TC-27.5.4", "suggestLocation() sanitizes before DB insert")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/lib/locations.ts")
+    assert "sanitizeText(address)" in content, "suggestLocation doesn't sanitize address"
+    assert "sanitizeText(city)" in content, "suggestLocation doesn't sanitize city"
+    assert "sanitizeText(state)" in content, "suggestLocation doesn't sanitize state"
+    assert "sanitizeText(notes)" in content, "suggestLocation doesn't sanitize notes"
+
+@test("TC-27.6.1", "Network error shows error banner")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    # Verify the submit-error testid exists in the component
+    content = sources.read("src/app/suggest/page.tsx")
+    assert "data-testid=\"submit-error\"" in content, "submit-error testid not found"
+    assert "submitError" in content, "submitError state not found"
+
+@test("TC-27.6.2", "Error banner has red styling")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/app/suggest/page.tsx")
+    assert "bg-red-50" in content and "text-red-700" in content, "Error banner missing red styling"
+
+@test("TC-27.6.3", "Error clears on next submit attempt")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/app/suggest/page.tsx")
+    assert "setSubmitError(null)" in content, "submitError not cleared on submit"
+
+@test("TC-27.6.4", "Submit button re-enables after failure")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/app/suggest/page.tsx")
+    # The finally block should set isSubmitting to false
+    assert "setIsSubmitting(false)" in content, "isSubmitting not reset in finally"
+
+# --------------------------------------------------------
+# REQ-27.7: School Type Tabs on Suggest Page
+# --------------------------------------------------------
+
+@test("TC-27.7.1", "Three school type tab buttons visible (Micro, Growth, Flagship)")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.goto(f"{BASE_URL}/suggest")
+    wait_for_page(parent_page)
+    micro_btn = parent_page.locator("button:has-text('Micro')")
+    growth_btn = parent_page.locator("button:has-text('Growth')")
+    flagship_btn = parent_page.locator("button:has-text('Flagship')")
+    assert micro_btn.count() > 0, "Micro tab button not found"
+    assert growth_btn.count() > 0, "Growth tab button not found"
+    assert flagship_btn.count() > 0, "Flagship tab button not found"
+
+@test("TC-27.7.2", "Micro tab is selected by default (has active styling)")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # Micro tab should have white bg / active styling
+    micro_btn = parent_page.locator("button:has-text('Micro')").first
+    classes = micro_btn.get_attribute("class") or ""
+    assert "bg-white" in classes or "text-blue-700" in classes, f"Micro tab not active: {classes}"
+
+@test("TC-27.7.3", "Micro tab has FOCUS badge")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # FOCUS badge should be within the Micro tab button
+    focus_badge = parent_page.locator("button:has-text('Micro') >> text=FOCUS")
+    assert focus_badge.count() > 0 or parent_page.locator("button:has-text('Micro') span:has-text('Focus')").count() > 0, "FOCUS badge not found on Micro tab"
+
+@test("TC-27.7.4", "Clicking Growth tab switches content to Growth criteria")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # Click Growth tab
+    parent_page.locator("button:has-text('Growth')").first.click()
+    settle(parent_page)
+    # Growth tagline or criteria should appear
+    page_text = parent_page.locator(".bg-white.rounded-xl").first.inner_text()
+    assert "Growth" in page_text or "Mid-size" in page_text or "proven demand" in page_text, "Growth content not displayed after clicking Growth tab"
+
+@test("TC-27.7.5", "Clicking Flagship tab switches content to Flagship criteria")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    parent_page.locator("button:has-text('Flagship')").first.click()
+    settle(parent_page)
+    page_text = parent_page.locator(".bg-white.rounded-xl").first.inner_text()
+    assert "Flagship" in page_text or "Full-scale" in page_text or "high-demand" in page_text, "Flagship content not displayed after clicking Flagship tab"
+
+@test("TC-27.7.6", "Each tab shows criteria sections (Physical, Neighborhood, Economics)")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    # Switch back to Micro
+    parent_page.locator("button:has-text('Micro')").first.click()
+    settle(parent_page)
+    physical = parent_page.locator("text=Physical Criteria")
+    neighborhood = parent_page.locator("h3:has-text('Neighborhood')")
+    economics = parent_page.locator("text=Economics")
+    assert physical.count() > 0, "'Physical Criteria' heading not found"
+    assert neighborhood.count() > 0, "'Neighborhood' heading not found"
+    assert economics.count() > 0, "'Economics' heading not found"
+
+@test("TC-27.7.7", "Each tab shows tagline in colored callout")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    tagline = parent_page.locator("text=Small, nimble locations")
+    assert tagline.count() > 0, "Micro tagline not found"
+
+@test("TC-27.7.8", "Each tab shows a timeline")
+@requires("as_parent", _PARENT_SKIP)
+def _(parent_page):
+    timeline = parent_page.locator("text=Timeline")
+    assert timeline.count() > 0, "Timeline label not found"
+
+@test("TC-27.7.9", "Submitted notes start with 'School type: Micro' when Micro tab active")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/app/suggest/page.tsx")
+    assert "School type:" in content, "School type prefix not found in suggest page"
+    assert "SCHOOL_TYPES[activeTab].label" in content, "School type label not used in notes"
+
+@test("TC-27.7.10", "Submitted notes start with 'School type: Growth' when Growth tab active")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    # Covered by code review: same code path as TC-27.7.9 with different activeTab
+    content = sources.read("src/app/suggest/page.tsx")
+    assert "detailLines.unshift(schoolTypePrefix)" in content, "School type not prepended to notes"
+
+@test("TC-27.7.11", "Submitted notes start with 'School type: Flagship' when Flagship tab active")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    # Covered by code review: same code path as TC-27.7.9 with different activeTab
+    content = sources.read("src/app/suggest/page.tsx")
+    assert "SCHOOL_TYPES" in content and "activeTab" in content, "School type tab state not used"
+
+# --------------------------------------------------------
+# REQ-27.8: Suggest Button Links to /suggest (modal removed)
+# --------------------------------------------------------
+
+@test("TC-27.8.1", "Main page suggest button links to /suggest")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/app/page.tsx")
+    assert 'href="/suggest"' in content, "Suggest button does not link to /suggest"
+    assert "SuggestLocationModal" not in content, "SuggestLocationModal should be removed from main page"
+
+@test("TC-27.8.2", "Suggest button has amber styling and plus icon")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/app/page.tsx")
+    assert "bg-amber-400" in content, "Suggest button missing amber background"
+    assert "Plus" in content, "Suggest button missing Plus icon"
+
+# --------------------------------------------------------
+# REQ-27.9: School Type Badge on Admin Cards
+# --------------------------------------------------------
+
+@test("TC-27.9.1", "parseSchoolType extracts school type from 'School type: Micro\\nrest'")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    import re
+    # Replicate parseSchoolType logic
+    notes = "School type: Micro\nSquare footage: 3500"
+    match = re.match(r'^School type: (.+?)(?:\n|$)', notes)
+    assert match is not None, "Regex did not match school type prefix"
+    assert match.group(1) == "Micro", f"Expected 'Micro', got '{match.group(1)}'"
+    remaining = notes[match.end():].strip()
+    assert remaining == "Square footage: 3500", f"Remaining notes wrong: '{remaining}'"
+
+@test("TC-27.9.2", "parseSchoolType returns null for notes without school type prefix")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    import re
+    notes = "Just some regular notes here"
+    match = re.match(r'^School type: (.+?)(?:\n|$)', notes)
+    assert match is None, "Regex should not match notes without prefix"
+
+@test("TC-27.9.3", "parseSchoolType returns null for empty/null notes")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    import re
+    for notes in [None, "", "   "]:
+        if not notes or not notes.strip():
+            pass  # parseSchoolType returns null for falsy notes
         else:
-            @test("TC-6.4.2", "Submitted location shows confirmation")
-            @skip("Requires auth — suggest form shows sign-in prompt without authentication")
-            def _(): pass
-            _()
-
-        # Navigate back to main page for remaining tests
-        go_back_to_main()
-
-        # ============================================================
-        print("\n## 7. How It Works Section")
-        # ============================================================
-
-        @test("TC-7.1.1", "How It Works heading visible")
-        def _():
-            heading = desktop_page.locator("text=How It Works").first
-            assert heading.is_visible(), "How It Works heading not visible"
-        _()
-
-        @test("TC-7.1.2", "Three numbered steps displayed")
-        def _():
-            step1 = desktop_page.locator("text=/Browse locations/").first
-            step2 = desktop_page.locator("text=/Vote for locations/").first
-            step3 = desktop_page.locator("text=/prioritized/").first
-            assert step1.count() > 0, "Step 1 not found"
-            assert step2.count() > 0, "Step 2 not found"
-            assert step3.count() > 0, "Step 3 not found"
-        _()
-
-        @test("TC-7.1.3", "Steps have numbered circles")
-        def _():
-            circles = desktop_page.locator("[data-testid='desktop-panel'] .bg-blue-500.rounded-full").all()
-            assert len(circles) >= 3, f"Expected 3 numbered circles, found {len(circles)}"
-        _()
-
-        @test("TC-7.1.4", "Step text is readable (blue-100 on blue background)")
-        def _():
-            steps = desktop_page.locator("[data-testid='desktop-panel'] ol.text-blue-100")
-            assert steps.count() > 0, "Steps list not using text-blue-100"
-        _()
-
-        # ============================================================
-        print("\n## 8. Responsive Design")
-        # ============================================================
-
-        @test("TC-8.1.1", "Overlay panel visible at 1024px")
-        def _():
-            page_1024 = browser.new_page(viewport={"width": 1024, "height": 768})
-            page_1024.goto(BASE_URL)
-            page_1024.wait_for_load_state("networkidle")
-            page_1024.wait_for_timeout(2000)
-            panel = page_1024.locator("[data-testid='desktop-panel']")
-            assert panel.is_visible(), "Panel not visible at 1024px"
-            page_1024.close()
-        _()
-
-        @test("TC-8.1.2", "Overlay panel visible at 1440px")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            assert panel.is_visible(), "Panel not visible at 1440px"
-        _()
-
-        @test("TC-8.1.3", "Bottom sheet hidden on desktop")
-        def _():
-            sheet = desktop_page.locator("[data-testid='mobile-bottom-sheet']")
-            assert not sheet.is_visible(), "Bottom sheet should be hidden on desktop"
-        _()
-
-        @test("TC-8.2.1", "Bottom sheet visible at 375px")
-        def _():
-            sheet = mobile_page.locator("[data-testid='mobile-bottom-sheet']")
-            assert sheet.is_visible(), "Bottom sheet not visible at 375px"
-        _()
-
-        @test("TC-8.2.2", "Bottom sheet visible at 768px (tablet)")
-        def _():
-            page_768 = browser.new_page(viewport={"width": 768, "height": 1024})
-            page_768.goto(BASE_URL)
-            page_768.wait_for_load_state("networkidle")
-            page_768.wait_for_timeout(2000)
-            sheet = page_768.locator("[data-testid='mobile-bottom-sheet']")
-            assert sheet.is_visible(), "Bottom sheet not visible at 768px"
-            page_768.close()
-        _()
-
-        @test("TC-8.2.3", "Overlay panel hidden on mobile")
-        def _():
-            panel = mobile_page.locator("[data-testid='desktop-panel']")
-            assert not panel.is_visible(), "Desktop panel should be hidden on mobile"
-        _()
-
-        @test("TC-8.2.4", "Map fills entire screen behind bottom sheet")
-        def _():
-            canvas = mobile_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            assert box is not None, "Map canvas not found on mobile"
-            assert box["width"] >= 370, f"Map not full width: {box['width']}"
-        _()
-
-        @test("TC-8.3.3", "Tap on marker selects (mobile)")
-        def _():
-            mobile_page.reload()
-            mobile_page.wait_for_load_state("networkidle")
-            mobile_page.wait_for_timeout(2000)
-            # Tap on map area
-            canvas = mobile_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            if box:
-                canvas.tap(position={"x": int(box["width"]/2), "y": int(box["height"]/2)})
-                mobile_page.wait_for_timeout(500)
-            assert True
-        _()
-
-        # ============================================================
-        print("\n## 9. Data Layer")
-        # ============================================================
-
-        @test("TC-9.2.1", "App loads with locations")
-        def _():
-            # Either city cards (wide zoom) or location cards (close zoom) should exist
-            city_cards = desktop_page.locator("[data-testid='city-card']").all()
-            loc_cards = desktop_page.locator("[data-testid='location-card']").all()
-            total = len(city_cards) + len(loc_cards)
-            assert total >= 1, f"Expected ≥1 items, found {total}"
-        _()
-
-        @test("TC-9.3.2", "Selection syncs between map and list")
-        def _():
-            desktop_page.reload()
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(3000)
-
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(500)
-                # Popup should appear on map for selected location
-                popup = desktop_page.locator(".mapboxgl-popup")
-                assert popup.count() > 0, "No popup on map after selecting list item"
-        _()
-
-        # ============================================================
-        print("\n## 10. Performance")
-        # ============================================================
-
-        @test("TC-10.1.3", "Map tiles begin loading within 3 seconds")
-        def _():
-            # Already loaded - verify map exists
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not present"
-        _()
-
-        @test("TC-10.2.2", "List scrolling is smooth")
-        def _():
-            scrollable = desktop_page.locator("[data-testid='desktop-panel'] .overflow-y-auto").first
-            if scrollable.count() > 0:
-                scrollable.evaluate("el => el.scrollTop = 100")
-                desktop_page.wait_for_timeout(100)
-                scrollable.evaluate("el => el.scrollTop = 0")
-            assert True
-        _()
-
-        @test("TC-10.2.3", "Filter toggle responds quickly")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            if filters_btn.count() > 0:
-                filters_btn.click()
-                desktop_page.wait_for_timeout(200)
-                filters_btn.click()
-                desktop_page.wait_for_timeout(200)
-            assert True
-        _()
-
-        # ============================================================
-        print("\n## 11. Accessibility")
-        # ============================================================
-
-        @test("TC-11.1.3", "Escape key works for dismissing overlays")
-        def _():
-            # Escape behavior is valid for any open overlay/dialog
-            desktop_page.keyboard.press("Escape")
-            desktop_page.wait_for_timeout(300)
-            assert True, "Escape key handled"
-        _()
-
-        @test("TC-11.1.4", "Buttons activate with Enter/Space")
-        def _():
-            # Vote buttons are the primary interactive buttons on the page
-            btn = desktop_page.locator("[data-testid='desktop-panel'] button").first
-            btn.focus()
-            assert True, "Button can receive focus"
-        _()
-
-        @test("TC-11.2.1", "Map has aria-label")
-        def _():
-            map_el = desktop_page.locator("[aria-label='Map']").first
-            assert map_el.count() > 0, "Map missing aria-label"
-        _()
-
-        @test("TC-11.2.2", "Buttons have descriptive text")
-        def _():
-            btns = desktop_page.locator("[data-testid='desktop-panel'] button").all()
-            for b in btns[:5]:
-                text = b.inner_text().strip()
-                aria = b.get_attribute("aria-label") or ""
-                assert len(text) > 0 or len(aria) > 0, "Button has no text or aria-label"
-        _()
-
-        @test("TC-11.2.3", "Suggest link navigates to /suggest page")
-        def _():
-            link = desktop_page.locator("a[href='/suggest']").first
-            assert link.count() > 0, "Suggest link not found"
-        _()
-
-        if _suggest_form_available:
-            @test("TC-11.2.4", "Form inputs have associated labels")
-            def _():
-                open_suggest_dialog()
-                labels = desktop_page.locator("[role='dialog'] label").all()
-                assert len(labels) >= 3, f"Expected ≥3 form labels, found {len(labels)}"
-                close_suggest_dialog()
-            _()
-        else:
-            @test("TC-11.2.4", "Form inputs have associated labels")
-            @skip("Requires auth — suggest form shows sign-in prompt without authentication")
-            def _(): pass
-            _()
-
-        @test("TC-11.3.2", "Interactive elements have visible focus states")
-        def _():
-            # Tab to first interactive element and verify no crash
-            desktop_page.keyboard.press("Tab")
-            desktop_page.wait_for_timeout(100)
-            assert True
-        _()
-
-        # ============================================================
-        print("\n## 12. Error Handling")
-        # ============================================================
-
-        @test("TC-12.1.1", "App doesn't crash (basic smoke test)")
-        def _():
-            title = desktop_page.locator("text=Alpha School Locations").first
-            assert title.is_visible(), "App appears to have crashed"
-        _()
-
-        @test("TC-12.1.2", "Missing token shows error message (verified in code)")
-        def _():
-            # The MapView component renders a "Map Unavailable" message when
-            # NEXT_PUBLIC_MAPBOX_TOKEN is missing. Since we have a token configured,
-            # we verify the map loaded instead.
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map not loaded (token seems working)"
-        _()
-
-        # ============================================================
-        print("\n## 13. Environment & Configuration")
-        # ============================================================
-
-        @test("TC-13.1.2", ".env.local is in .gitignore")
-        def _():
-            import subprocess
-            result = subprocess.run(
-                ["git", "check-ignore", ".env.local"],
-                capture_output=True, text=True,
-                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            )
-            assert result.returncode == 0, ".env.local not in .gitignore"
-        _()
-
-        @test("TC-13.1.3", "App provides .env template or docs")
-        def _():
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            has_template = os.path.exists(os.path.join(project_root, ".env.example")) or \
-                           os.path.exists(os.path.join(project_root, ".env.local.example"))
-            has_readme = os.path.exists(os.path.join(project_root, "README.md"))
-            assert has_template or has_readme, "No .env template or README found"
-        _()
-
-        # ============================================================
-        print("\n## 14. Tech Stack")
-        # ============================================================
-
-        @test("TC-14.1.1", "App uses Next.js App Router")
-        def _():
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            assert os.path.isdir(os.path.join(project_root, "src", "app")), "src/app directory not found"
-        _()
-
-        @test("TC-14.2.1", "Tailwind CSS classes used throughout")
-        def _():
-            classes = desktop_page.locator("[class*='bg-']").all()
-            assert len(classes) > 5, "Few Tailwind classes found"
-        _()
-
-        @test("TC-14.3.1", "react-map-gl used for map")
-        def _():
-            mapbox_map = desktop_page.locator(".mapboxgl-map")
-            assert mapbox_map.count() > 0, "Mapbox GL map not found"
-        _()
-
-        @test("TC-14.3.2", "Map is client-side rendered")
-        def _():
-            mapbox = desktop_page.locator(".mapboxgl-map").first
-            assert mapbox.count() > 0, "Mapbox not loaded (dynamic import may have failed)"
-        _()
-
-        @test("TC-14.3.3", "Mapbox GL CSS imported")
-        def _():
-            # Check for mapbox-gl CSS by looking for its classes
-            ctrl = desktop_page.locator(".mapboxgl-ctrl").first
-            assert ctrl.count() > 0, "Mapbox GL CSS not loaded (no .mapboxgl-ctrl found)"
-        _()
-
-        # ============================================================
-        print("\n## 15. Address Autocomplete & Geocoding")
-        # ============================================================
-
-        if _suggest_form_available:
-            # Reload to guarantee clean state before autocomplete tests
-            desktop_page.reload()
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(2000)
-
-            @test("TC-15.1.1", "Typing 3+ chars shows autocomplete dropdown")
-            def _():
-                open_suggest_dialog()
-                address_input = desktop_page.locator("[data-testid='address-autocomplete']").first
-                address_input.fill("123 Main")
-                desktop_page.wait_for_timeout(1000)
-
-                dropdown = desktop_page.locator("[data-testid='autocomplete-dropdown']").first
-                assert dropdown.is_visible(), "Autocomplete dropdown not visible"
-                close_suggest_dialog()
-            _()
-
-            @test("TC-15.1.2", "Dropdown shows up to 5 suggestions")
-            def _():
-                open_suggest_dialog()
-                address_input = desktop_page.locator("[data-testid='address-autocomplete']").first
-                address_input.fill("Congress Ave Austin")
-                desktop_page.wait_for_timeout(1000)
-
-                suggestions = desktop_page.locator("[data-testid='autocomplete-option']").all()
-                assert 0 < len(suggestions) <= 5, f"Expected 1-5 suggestions, got {len(suggestions)}"
-                close_suggest_dialog()
-            _()
-
-            @test("TC-15.1.4", "Clicking suggestion populates address")
-            def _():
-                open_suggest_dialog()
-                address_input = desktop_page.locator("[data-testid='address-autocomplete']").first
-                address_input.fill("401 Congress")
-                desktop_page.wait_for_timeout(1000)
-
-                suggestion = desktop_page.locator("[data-testid='autocomplete-option']").first
-                suggestion.click()
-                desktop_page.wait_for_timeout(300)
-
-                value = address_input.input_value()
-                assert len(value) > 10, f"Address not populated: {value}"
-                close_suggest_dialog()
-            _()
-
-            @test("TC-15.1.7", "Pressing Escape closes dropdown")
-            def _():
-                open_suggest_dialog()
-                address_input = desktop_page.locator("[data-testid='address-autocomplete']").first
-                address_input.fill("Main St")
-                desktop_page.wait_for_timeout(1000)
-
-                dropdown = desktop_page.locator("[data-testid='autocomplete-dropdown']").first
-                assert dropdown.is_visible(), "Dropdown should be visible"
-
-                desktop_page.keyboard.press("Escape")
-                desktop_page.wait_for_timeout(300)
-                assert True
-                close_suggest_dialog()
-            _()
-
-            @test("TC-15.2.1", "Suggest modal address field has autocomplete")
-            def _():
-                open_suggest_dialog()
-                autocomplete = desktop_page.locator("[data-testid='address-autocomplete']").first
-                assert autocomplete.count() > 0, "Address autocomplete not found in suggest modal"
-                close_suggest_dialog()
-            _()
-
-            @test("TC-15.2.2", "Selecting suggestion auto-fills city and state")
-            def _():
-                open_suggest_dialog()
-                address_input = desktop_page.locator("[data-testid='address-autocomplete']").first
-                address_input.fill("401 Congress Ave Austin TX")
-                desktop_page.wait_for_timeout(1000)
-
-                suggestion = desktop_page.locator("[data-testid='autocomplete-option']").first
-                if suggestion.count() > 0:
-                    suggestion.click()
-                    desktop_page.wait_for_timeout(500)
-
-                    city_val = desktop_page.locator("#city").input_value()
-                    state_val = desktop_page.locator("#state").input_value()
-
-                    assert len(city_val) > 0, "City not auto-filled"
-                    assert len(state_val) > 0, "State not auto-filled"
-                close_suggest_dialog()
-            _()
-        else:
-            _auth_skip = "Requires auth — suggest form shows sign-in prompt without authentication"
-            for tc_id, tc_desc in [("TC-15.1.1", "Typing 3+ chars shows autocomplete dropdown"),
-                                    ("TC-15.1.2", "Dropdown shows up to 5 suggestions"),
-                                    ("TC-15.1.4", "Clicking suggestion populates address"),
-                                    ("TC-15.1.7", "Pressing Escape closes dropdown"),
-                                    ("TC-15.2.1", "Suggest modal address field has autocomplete"),
-                                    ("TC-15.2.2", "Selecting suggestion auto-fills city and state")]:
-                @test(tc_id, tc_desc)
-                @skip(_auth_skip)
-                def _(): pass
-                _()
-
-        if _suggest_form_available:
-            @test("TC-15.2.4", "New location marker at correct geocoded position")
-            def _():
-                open_suggest_dialog()
-
-                address_input = desktop_page.locator("[data-testid='address-autocomplete']").first
-                address_input.fill("100 Congress Ave Austin TX")
-                desktop_page.wait_for_timeout(1500)
-
-                suggestion = desktop_page.locator("[data-testid='autocomplete-option']").first
-                if suggestion.count() > 0:
-                    suggestion.click()
-                    desktop_page.wait_for_timeout(500)
-
-                # Ensure city/state filled
-                city_input = desktop_page.locator("#city")
-                state_input = desktop_page.locator("#state")
-                if not city_input.input_value():
-                    city_input.fill("Austin")
-                if not state_input.input_value():
-                    state_input.fill("TX")
-
-                desktop_page.locator("[role='dialog'] button[type='submit']").click()
-                desktop_page.wait_for_timeout(2000)
-
-                badge = desktop_page.locator("text=Parent Suggested").first
-                assert badge.count() > 0, "Parent Suggested badge not found"
-                close_suggest_dialog()
-            _()
-        else:
-            @test("TC-15.2.4", "New location marker at correct geocoded position")
-            @skip("Requires auth — suggest form shows sign-in prompt without authentication")
-            def _(): pass
-            _()
-
-        @test("TC-15.3.1", "Search autocomplete (removed — filters replaced search)")
-        @skip("Search bar removed in favor of score/size filters — REQ-4.2 updated")
-        def _():
-            pass
-        _()
-
-        @test("TC-15.3.3", "Search filters existing locations (removed — filters replaced search)")
-        @skip("Search bar removed in favor of score/size filters — REQ-4.2 updated")
-        def _():
-            pass
-        _()
-
-        @test("TC-15.4.1", "Mock locations at correct map positions")
-        def _():
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not found"
-        _()
-
-        # ============================================================
-        print("\n## 16. Authentication")
-        # ============================================================
-
-        @test("TC-16.2.3", "Unauthenticated users can browse locations and map freely")
-        def _():
-            # Open a fresh incognito context
-            ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(3000)
-
-            # Map should be visible
-            canvas = page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map not visible for unauthenticated user"
-
-            # Either city cards or location cards should show
-            city_cards = page.locator("[data-testid='city-card']").all()
-            loc_cards = page.locator("[data-testid='location-card']").all()
-            assert len(city_cards) + len(loc_cards) > 0, "No cards for unauthenticated user"
-
-            ctx.close()
-        _()
-
-        @test("TC-16.1.1", "Sign-in button visible in panel header")
-        def _():
-            # In demo mode (no Supabase), shows "Demo Mode" badge
-            # With Supabase, shows "Sign In" button
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            sign_in = panel.locator("text=Sign In")
-            demo = panel.locator("text=Demo Mode")
-            assert sign_in.count() > 0 or demo.count() > 0, "Neither Sign In button nor Demo Mode badge found"
-        _()
-
-        @test("TC-16.1.2", "Sign-in dialog shows email input")
-        @skip("Requires Supabase auth — Sign In button only visible when Supabase configured")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.1.3", "Magic link flow sends email")
-        @skip("Requires Supabase auth + valid email delivery")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.1.4", "Auth state persists across refresh")
-        @skip("Requires Supabase auth session")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.2.1", "Voting requires sign-in")
-        @skip("Requires Supabase auth — in offline mode voting is allowed without auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.2.2", "Suggesting requires sign-in")
-        @skip("Requires Supabase auth — in offline mode suggesting is allowed without auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.3.1", "Votes persist for authenticated users")
-        @skip("Requires Supabase auth + RLS")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.3.2", "Users can only modify own votes (RLS)")
-        @skip("Requires Supabase auth + RLS verification")
-        def _():
-            pass
-        _()
-
-        @test("TC-16.3.3", "Vote counts aggregate across users")
-        @skip("Requires Supabase with multiple user sessions")
-        def _():
-            pass
-        _()
-
-        # ============================================================
-        print("\n## 17. Admin Review Workflow")
-        # ============================================================
-
-        @test("TC-17.1.1", "Non-admin sees Access Denied on /admin")
-        def _():
-            ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = ctx.new_page()
-            page.goto(f"{BASE_URL}/admin")
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(2000)
-
-            denied = page.locator("text=Access Denied")
-            assert denied.count() > 0, "Access Denied not shown for non-admin"
-            ctx.close()
-        _()
-
-        @test("TC-17.1.2", "Unauthenticated user sees Access Denied on /admin")
-        def _():
-            ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = ctx.new_page()
-            page.goto(f"{BASE_URL}/admin")
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(2000)
-
-            denied = page.locator("text=Access Denied")
-            assert denied.count() > 0, "Access Denied not shown for unauthenticated user"
-            ctx.close()
-        _()
-
-        @test("TC-17.1.3", "Admin page has back link to home")
-        def _():
-            ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = ctx.new_page()
-            page.goto(f"{BASE_URL}/admin")
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(2000)
-
-            back_link = page.locator("a[href='/']")
-            assert back_link.count() > 0, "Back to home link not found on admin page"
-            ctx.close()
-        _()
-
-        @test("TC-17.1.4", "API returns 401 for non-admin")
-        @skip("Requires Supabase admin auth to test API routes")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.2.1", "Pending locations appear in review queue")
-        @skip("Requires Supabase admin auth + pending locations in DB")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.2.2", "Card shows location details")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.2.3", "Card shows suggestor email and date")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.2.4", "Parent notes displayed when present")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.2.5", "Score badges displayed when scores exist")
-        @skip("Requires Supabase admin auth + scored locations")
-        def _():
+            match = re.match(r'^School type: (.+?)(?:\n|$)', notes)
+            assert match is None, f"Regex should not match for '{notes}'"
+
+@test("TC-27.9.4", "AdminLocationCard source includes parseSchoolType import")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/components/AdminLocationCard.tsx")
+    assert "parseSchoolType" in content, "parseSchoolType not imported in AdminLocationCard"
+    assert "from" in content and "school-types" in content, "school-types import not found"
+
+@test("TC-27.9.5", "AdminLocationCard renders school type badge with color classes (blue/purple/amber)")
+@requires("as_parent", _PARENT_SKIP)
+def _():
+    content = sources.read("src/components/AdminLocationCard.tsx")
+    assert "bg-blue-100" in content and "text-blue-700" in content, "Blue badge colors missing (Micro)"
+    assert "bg-purple-100" in content and "text-purple-700" in content, "Purple badge colors missing (Growth)"
+    assert "bg-amber-100" in content and "text-amber-700" in content, "Amber badge colors missing (Flagship)"
+
+# ============================================================
+section("28. Help Requests")
+# ============================================================
+
+@test("TC-28.1.1", "HelpModal calls fetch to POST /api/help-request on submit")
+def _():
+    content = sources.read("src/components/HelpModal.tsx")
+    assert "fetch(" in content, "fetch call not found in HelpModal"
+    assert "/api/help-request" in content, "API endpoint not found in HelpModal"
+    assert "POST" in content, "POST method not found in HelpModal"
+
+@test("TC-28.1.2", "API route inserts row into pp_help_requests table")
+def _():
+    content = sources.read("src/app/api/help-request/route.ts")
+    assert "pp_help_requests" in content, "pp_help_requests table not referenced in route"
+    assert ".insert(" in content, "insert call not found in route"
+
+@test("TC-28.1.3", "API route calls sendEmail with generateHelpGuideHtml")
+def _():
+    content = sources.read("src/app/api/help-request/route.ts")
+    assert "sendEmail" in content, "sendEmail not found in route"
+    assert "generateHelpGuideHtml" in content, "generateHelpGuideHtml not found in route"
+
+@test("TC-28.1.4", "Unauthenticated user provides email in form")
+def _():
+    content = sources.read("src/components/HelpModal.tsx")
+    assert 'type="email"' in content, "Email input field not found"
+    assert "help-email" in content, "Email input id not found"
+
+@test("TC-28.1.5", "Authenticated user uses session email")
+def _():
+    content = sources.read("src/components/HelpModal.tsx")
+    assert "user?.email" in content or "user.email" in content, "user.email reference not found"
+
+@test("TC-28.2.1", "Admin page has three tabs (Suggestions, Likes, Help Requests)")
+def _():
+    content = sources.read("src/app/admin/page.tsx")
+    assert "Suggestions" in content, "Suggestions tab not found"
+    assert "Likes" in content, "Likes tab not found"
+    assert "Help Requests" in content, "Help Requests tab not found"
+    assert '"help"' in content, "help tab type not found"
+
+@test("TC-28.2.2", "Help Requests tab shows count badge")
+def _():
+    content = sources.read("src/app/admin/page.tsx")
+    assert "helpRequests.length" in content, "helpRequests.length not found for badge"
+    assert "bg-blue-100" in content, "Blue badge styling not found for help tab"
+
+@test("TC-28.2.3", "Each card shows email and date (AdminHelpRequestCard)")
+def _():
+    content = sources.read("src/components/AdminHelpRequestCard.tsx")
+    assert "request.email" in content, "email display not found in card"
+    assert "created_at" in content or "dateStr" in content, "date display not found in card"
+
+@test("TC-28.2.4", "Location-specific requests show address")
+def _():
+    content = sources.read("src/components/AdminHelpRequestCard.tsx")
+    assert "location_address" in content, "location_address not found in card"
+    assert "MapPin" in content, "MapPin icon not found for location display"
+
+@test("TC-28.2.5", "Empty state when no requests")
+def _():
+    content = sources.read("src/app/admin/page.tsx")
+    assert "No help requests yet" in content, "Empty state text not found"
+
+@test("TC-28.3.1", "generateHelpGuideHtml exists with location-specific variant")
+def _():
+    content = sources.read("src/lib/email.ts")
+    assert "generateHelpGuideHtml" in content, "generateHelpGuideHtml not found"
+    assert "location.address" in content or "location?.address" in content, "Location-specific variant not found"
+
+@test("TC-28.3.2", "generateHelpGuideHtml exists with general variant")
+def _():
+    content = sources.read("src/lib/email.ts")
+    assert "bring Alpha to your area" in content, "General variant text not found"
+
+@test("TC-28.3.3", "Email includes 4 help action items")
+def _():
+    content = sources.read("src/lib/email.ts")
+    assert "property owners" in content.lower(), "Property owners action item not found"
+    assert "zoning" in content.lower(), "Zoning action item not found"
+    assert "Rally other parents" in content or "rally other parents" in content.lower(), "Rally parents action item not found"
+    assert "government contacts" in content.lower(), "Government contacts action item not found"
+
+# ============================================================
+section("29. Mobile UX")
+# ============================================================
+
+@test("TC-29.1.1", "Mobile bottom sheet has AuthButton")
+def _():
+    content = sources.read("src/app/page.tsx")
+    # Check that AuthButton appears inside the mobile bottom sheet section
+    mobile_section = content[content.index("mobile-bottom-sheet"):]
+    assert "AuthButton" in mobile_section, "AuthButton not found in mobile bottom sheet"
+
+@test("TC-29.1.2", "Mobile collapsed view has HelpModal")
+def _():
+    content = sources.read("src/app/page.tsx")
+    # The collapsed summary section is between "Collapsed summary" and "Expanded panel"
+    collapsed_start = content.index("Collapsed summary")
+    collapsed_end = content.index("Expanded panel")
+    collapsed = content[collapsed_start:collapsed_end]
+    assert "HelpModal" in collapsed, "HelpModal not found in mobile collapsed view"
+
+@test("TC-29.1.3", "Mobile collapsed view has Suggest button")
+def _():
+    content = sources.read("src/app/page.tsx")
+    collapsed_start = content.index("Collapsed summary")
+    collapsed_end = content.index("Expanded panel")
+    collapsed = content[collapsed_start:collapsed_end]
+    assert "Suggest a Location" in collapsed, "Suggest button not found in mobile collapsed view"
+
+@test("TC-29.1.4", "AuthButton accepts darkBg prop")
+def _():
+    content = sources.read("src/components/AuthButton.tsx")
+    assert "darkBg" in content, "darkBg prop not found in AuthButton"
+    assert "darkBg = true" in content or "darkBg=true" in content, "darkBg default not set to true"
+
+@test("TC-29.1.5", "Mobile expanded panel is max-h-[50vh]")
+def _():
+    content = sources.read("src/app/page.tsx")
+    assert "max-h-[50vh]" in content, "max-h-[50vh] not found in page.tsx"
+    assert "max-h-[70vh]" not in content, "Old max-h-[70vh] still present in page.tsx"
+
+@test("TC-29.2.1", "VoteButton has min-h-[44px] on mobile")
+def _():
+    content = sources.read("src/components/VoteButton.tsx")
+    assert "min-h-[44px]" in content, "min-h-[44px] not found in VoteButton"
+    assert "lg:min-h-0" in content, "lg:min-h-0 not found in VoteButton"
+
+@test("TC-29.2.2", "SizeLabel uses small text size")
+def _():
+    content = sources.read("src/components/ScoreBadge.tsx")
+    # SizeLabel uses text-[10px], DetailedInfoLink and ScoreLegend use text-[11px]
+    assert "text-[10px]" in content, "text-[10px] not found in ScoreBadge"
+    assert "text-[11px]" in content, "text-[11px] not found in ScoreBadge"
+
+@test("TC-29.2.3", "ScoreLegend uses fixed positioning on mobile")
+def _():
+    content = sources.read("src/components/ScoreBadge.tsx")
+    assert "lg:hidden fixed inset-0" in content, "Mobile fixed legend not found in ScoreBadge"
+    assert "hidden lg:block absolute" in content, "Desktop absolute legend not found in ScoreBadge"
+
+@test("TC-29.2.4", "flyToCoords includes bottom padding on mobile")
+def _():
+    content = sources.read("src/components/MapView.tsx")
+    assert "window.innerWidth < 1024" in content, "Mobile detection not found in flyToCoords"
+    assert "bottom: 120" in content, "Bottom padding not found in flyToCoords"
+
+# ============================================================
+section("30. Vote Comments")
+# ============================================================
+
+@test("TC-30.1.1", "VoteButton shows comment dialog on authenticated vote click")
+def _():
+    content = sources.read("src/components/VoteButton.tsx")
+    assert "showComment" in content, "showComment state not found in VoteButton"
+    assert "setShowComment(true)" in content, "Comment dialog not opened on vote click"
+
+@test("TC-30.1.2", "Comment textarea has 500 character max with counter")
+def _():
+    content = sources.read("src/components/VoteButton.tsx")
+    assert "maxLength={500}" in content, "maxLength={500} not found on textarea"
+    assert "/500" in content, "Character counter not found"
+
+@test("TC-30.1.3", "Just vote button votes without comment")
+def _():
+    content = sources.read("src/components/VoteButton.tsx")
+    assert "handleSkip" in content, "handleSkip not found in VoteButton"
+    assert "Just vote" in content, "Just vote button label not found"
+
+@test("TC-30.1.4", "Vote with comment sends comment through onVote")
+def _():
+    content = sources.read("src/components/VoteButton.tsx")
+    assert "handleVoteWithComment" in content, "handleVoteWithComment not found"
+    assert "Vote with comment" in content, "Vote with comment button label not found"
+
+@test("TC-30.1.5", "onVote accepts optional comment parameter threaded through stack")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "vote: (locationId: string, comment?: string)" in content, "vote() signature missing comment param"
+    assert "if (comment) row.comment = comment" in content, "comment not passed to Supabase insert"
+
+@test("TC-30.2.1", "Likes API returns voter_comments array")
+def _():
+    content = sources.read("src/app/api/admin/likes/route.ts")
+    assert "voter_comments" in content, "voter_comments not returned from likes API"
+    assert "comment" in content, "comment field not selected in likes API"
+
+@test("TC-30.2.2", "Admin likes tab shows comments alongside voter emails")
+def _():
+    content = sources.read("src/components/AdminLocationCard.tsx")
+    assert "voter_comments" in content, "voter_comments not referenced in AdminLocationCard"
+
+@test("TC-30.2.3", "Votes without comments display email only")
+def _():
+    content = sources.read("src/components/AdminLocationCard.tsx")
+    assert "vc.comment" in content, "Comment conditional check not found"
+    assert ".filter(vc => vc.comment)" in content, "Filter for comments not found — only votes with comments should show"
+
+# ============================================================
+# Reload to start from clean state on main page
+section("31. New UI Toggle", state="home")
+# ============================================================
+
+@test("TC-31.1.1", "Try new UI button visible to all users on desktop")
+def _(desktop_page):
+    toggle = desktop_page.locator("button:has-text('Try new UI')")
+    assert toggle.count() > 0, "Try new UI button not found"
+    assert toggle.is_visible(), "Try new UI button not visible"
+
+@test("TC-31.1.2", "Clicking toggle switches panel to new UI (white bg, 400px width)")
+def _(desktop_page):
+    toggle = desktop_page.locator("button:has-text('Try new UI')")
+    toggle.click()
+    desktop_page.locator("button:has-text('Back to current')").wait_for(state="visible")
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    classes = panel.get_attribute("class") or ""
+    assert "bg-white" in classes, f"New UI panel missing bg-white: {classes}"
+    assert "w-[400px]" in classes, f"New UI panel missing w-[400px]: {classes}"
+
+@test("TC-31.1.3", "Back to current button appears after switching")
+def _(desktop_page):
+    back_btn = desktop_page.locator("button:has-text('Back to current')")
+    assert back_btn.count() > 0, "Back to current button not found"
+    assert back_btn.is_visible(), "Back to current button not visible"
+
+@test("TC-31.1.4", "Clicking Back to current restores old UI")
+def _(desktop_page):
+    back_btn = desktop_page.locator("button:has-text('Back to current')")
+    back_btn.click()
+    desktop_page.locator("button:has-text('Try new UI')").wait_for(state="visible")
+    panel = desktop_page.locator("[data-testid='desktop-panel']")
+    classes = panel.get_attribute("class") or ""
+    assert "bg-blue-600" in classes, f"Old UI panel missing bg-blue-600: {classes}"
+    assert "w-[380px]" in classes, f"Old UI panel missing w-[380px]: {classes}"
+    # Switch back to new UI for remaining tests
+    toggle = desktop_page.locator("button:has-text('Try new UI')")
+    toggle.click()
+    desktop_page.locator("button:has-text('Back to current')").wait_for(state="visible")
+
+# ============================================================
+section("32. New UI Panel Header", state="new_ui")
+# ============================================================
+
+@test("TC-32.1.1", "ALPHA SCHOOL eyebrow text visible")
+def _(desktop_page):
+    eyebrow = desktop_page.locator("text=ALPHA SCHOOL")
+    assert eyebrow.count() > 0, "ALPHA SCHOOL eyebrow text not found"
+    assert eyebrow.first.is_visible(), "ALPHA SCHOOL eyebrow text not visible"
+
+@test("TC-32.1.2", "Heading 'Choose where your kid goes to school' visible")
+def _(desktop_page):
+    heading = desktop_page.locator("h1:has-text('Choose where your kid goes to school')")
+    assert heading.count() > 0, "Main heading not found"
+    assert heading.first.is_visible(), "Main heading not visible"
+
+@test("TC-32.1.3", "Auth button visible in header")
+def _():
+    # AuthButton is rendered inside the new UI header
+    content = sources.read("src/components/AltPanel.tsx")
+    assert "AuthButton" in content, "AuthButton not found in AltPanel"
+    assert "darkBg={false}" in content, "AuthButton should use darkBg={false} on white background"
+
+# ============================================================
+section("33. Action Boxes (3 unified blue-50 cards)", state="new_ui")
+# ============================================================
+
+@test("TC-33.1.1", "What Alpha Feels Like box present with WHAT ALPHA FEELS LIKE eyebrow")
+def _(desktop_page):
+    eyebrow = desktop_page.locator("text=WHAT ALPHA FEELS LIKE")
+    assert eyebrow.count() > 0, "WHAT ALPHA FEELS LIKE eyebrow not found"
+    assert eyebrow.first.is_visible(), "WHAT ALPHA FEELS LIKE eyebrow not visible"
+
+@test("TC-33.1.2", "Three stat boxes (2 hrs, 2x, 100%) inside Alpha card")
+def _(desktop_page):
+    stat_2hrs = desktop_page.locator("text=2 hrs")
+    stat_2x = desktop_page.locator("text=2×")
+    stat_100 = desktop_page.locator("text=100%")
+    assert stat_2hrs.count() > 0, "2 hrs stat not found"
+    assert stat_2x.count() > 0, "2x stat not found"
+    assert stat_100.count() > 0, "100% stat not found"
+
+@test("TC-33.2.1", "Invite box present with INVITE eyebrow")
+def _(desktop_page):
+    eyebrow = desktop_page.locator("text=INVITE")
+    assert eyebrow.count() > 0, "INVITE eyebrow not found"
+    assert eyebrow.first.is_visible(), "INVITE eyebrow not visible"
+
+@test("TC-33.2.2", "Invite box has 'Invite a family →' link")
+def _(desktop_page):
+    link = desktop_page.locator("text=Invite a family")
+    assert link.count() > 0, "Invite a family link not found"
+    assert link.first.is_visible(), "Invite a family link not visible"
+
+@test("TC-33.3.1", "Suggest box present with SUGGEST eyebrow")
+def _(desktop_page):
+    eyebrow = desktop_page.locator("text=SUGGEST")
+    assert eyebrow.count() > 0, "SUGGEST eyebrow not found"
+    assert eyebrow.first.is_visible(), "SUGGEST eyebrow not visible"
+
+@test("TC-33.3.2", "Suggest box links to /suggest")
+def _(desktop_page):
+    suggest_link = desktop_page.locator("a[href='/suggest']")
+    assert suggest_link.count() > 0, "Suggest link with href=/suggest not found"
+    suggest_text = desktop_page.locator("a[href='/suggest'] >> text=Suggest a location")
+    assert suggest_text.count() > 0, "Suggest a location text not found in suggest link"
+
+# ============================================================
+section("34. Sort Pills")
+# ============================================================
+
+@test("TC-34.1.1", "Sort pills visible when zoomed into a city (zoom >= 9)")
+def _():
+    # Source code check — sort pills only render when !showCityCards (zoomLevel >= 9)
+    content = sources.read("src/components/AltPanel.tsx")
+    assert "showCityCards" in content, "showCityCards conditional not found"
+    assert "zoomLevel < 9" in content, "zoomLevel < 9 threshold not found"
+    assert "Sort" in content, "Sort label not found in panel"
+
+@test("TC-34.1.2", "Most support and Most viable options present")
+def _():
+    content = sources.read("src/components/AltPanel.tsx")
+    assert "Most support" in content, "Most support option not found"
+    assert "Most viable" in content, "Most viable option not found"
+
+@test("TC-34.1.3", "One sort pill is active (bg-blue-600)")
+def _():
+    content = sources.read("src/components/AltPanel.tsx")
+    assert "bg-blue-600 text-white" in content, "Active sort pill style (bg-blue-600 text-white) not found"
+    assert "bg-gray-100 text-gray-600" in content, "Inactive sort pill style not found"
+
+# ============================================================
+section("35. Location Cards (AltLocationCard)")
+# ============================================================
+
+@test("TC-35.1.1", "Location cards render in scrollable list")
+def _():
+    content = sources.read("src/components/AltPanel.tsx")
+    assert "overflow-y-auto" in content, "Scrollable container (overflow-y-auto) not found"
+    assert "AltLocationCard" in content, "AltLocationCard not rendered in panel"
+
+@test("TC-35.1.2", "Cards show street name as title")
+def _():
+    content = sources.read("src/components/AltLocationCard.tsx")
+    assert "extractStreet" in content, "extractStreet not used for card title"
+    assert "<h3" in content, "h3 heading not found for card title"
+
+@test("TC-35.1.3", "Cards show status badge (Promising/Viable/Concerning)")
+def _():
+    content = sources.read("src/components/AltLocationCard.tsx")
+    assert "statusBadge" in content, "statusBadge not imported/used in AltLocationCard"
+    assert "badge.label" in content, "badge.label not rendered in card"
+
+@test("TC-35.2.1", "I'm in button present on cards")
+def _():
+    content = sources.read("src/components/AltLocationCard.tsx")
+    assert "I\u2019m in" in content or "I'm in" in content or "I&apos;m in" in content, "I'm in button text not found"
+
+@test("TC-35.2.2", "Not here button present on cards")
+def _():
+    content = sources.read("src/components/AltLocationCard.tsx")
+    assert "Not here" in content, "Not here button text not found"
+
+# ============================================================
+section("36. Location Detail View")
+# ============================================================
+
+@test("TC-36.1.1", "LocationDetailView component has back arrow button")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "ArrowLeft" in content, "ArrowLeft icon not found in LocationDetailView"
+    assert "Back to locations" in content, "Back to locations text not found"
+    assert "onBack" in content, "onBack handler not found"
+
+@test("TC-36.1.2", "LocationDetailView has street view hero image section")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "maps.googleapis.com/maps/api/streetview" in content, "Google Street View URL not found"
+    assert "h-48" in content, "Hero image height class (h-48) not found"
+
+@test("TC-36.1.3", "LocationDetailView has status badge and size tier")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "statusBadge" in content, "statusBadge not used in LocationDetailView"
+    assert "sizeTierLabel" in content, "sizeTierLabel not used in LocationDetailView"
+    assert "badge.label" in content, "badge.label not rendered"
+    assert "sizeLabel" in content, "sizeLabel not rendered"
+
+@test("TC-36.1.4", "LocationDetailView has vote section with VOTE eyebrow")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "VOTE" in content, "VOTE eyebrow text not found in LocationDetailView"
+
+@test("TC-36.1.5", "Vote section has I'm in and Not here buttons")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "I&apos;m in" in content or "I'm in" in content, "I'm in button not found in detail view"
+    assert "Not here" in content, "Not here button not found in detail view"
+
+@test("TC-36.2.1", "Contribute section has CONTRIBUTE eyebrow")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "CONTRIBUTE" in content, "CONTRIBUTE eyebrow text not found"
+
+@test("TC-36.2.2", "Contribute section has textarea for comments")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "<textarea" in content, "textarea not found in LocationDetailView"
+    assert "contribution" in content, "contribution state not found"
+    assert "Zoning issues" in content or "zoning" in content.lower(), "Placeholder mentioning zoning not found"
+
+@test("TC-36.3.1", "Who's in / Concerns tabs present")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "Who" in content and "in" in content, "Who's in tab not found"
+    assert "Concerns" in content, "Concerns tab not found"
+    assert "activeTab" in content, "activeTab state not found for tab switching"
+
+@test("TC-36.3.2", "Tabs show count of voters")
+def _():
+    content = sources.read("src/components/LocationDetailView.tsx")
+    assert "inVoters.length" in content, "inVoters.length count not shown in tab"
+    assert "concernVoters.length" in content, "concernVoters.length count not shown in tab"
+
+# ============================================================
+section("37. Not Here Reason Modal")
+# ============================================================
+
+@test("TC-37.1.1", "NotHereReasonModal component exists with textarea")
+def _():
+    content = sources.read("src/components/NotHereReasonModal.tsx")
+    assert "NotHereReasonModal" in content, "NotHereReasonModal component not found"
+    assert "<textarea" in content, "textarea not found in NotHereReasonModal"
+    assert "reason" in content, "reason state not found in NotHereReasonModal"
+
+@test("TC-37.1.2", "Modal has Skip and Submit concern buttons")
+def _():
+    content = sources.read("src/components/NotHereReasonModal.tsx")
+    assert "Skip" in content, "Skip button text not found in NotHereReasonModal"
+    assert "Submit" in content, "Submit button text not found in NotHereReasonModal"
+
+# ============================================================
+section("38. Vote Comment Flow (contributions → pp_votes.comment)")
+# ============================================================
+
+@test("TC-38.1.1", "Contributions API writes to pp_votes.comment (not pp_contributions)")
+def _():
+    content = sources.read("src/app/api/contributions/route.ts")
+    assert "pp_votes" in content, "pp_votes table not referenced in contributions API"
+    assert "pp_contributions" not in content, "pp_contributions table should not be used — contributions go to pp_votes.comment"
+    assert ".update({ comment:" in content or '.update({ comment:' in content, "comment update on pp_votes not found"
+
+@test("TC-38.1.2", "API appends comments (newline separator)")
+def _():
+    content = sources.read("src/app/api/contributions/route.ts")
+    assert "vote.comment" in content, "Existing comment fetch not found"
+    assert "\\n" in content, "Newline separator for appending comments not found"
+
+@test("TC-38.1.3", "API requires auth")
+def _():
+    content = sources.read("src/app/api/contributions/route.ts")
+    assert "authorization" in content.lower(), "Authorization header check not found"
+    assert "401" in content, "401 status code not returned for unauthorized requests"
+    assert "Auth required" in content or "auth required" in content.lower(), "Auth required error message not found"
+
+# ============================================================
+section("39. Voter List (loadLocationVoters)")
+# ============================================================
+
+@test("TC-39.1.1", "loadLocationVoters has force parameter")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "loadLocationVoters: async (locationIds, force)" in content, "force parameter not found in loadLocationVoters signature"
+
+@test("TC-39.1.2", "Post-vote calls use force=true")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "loadLocationVoters([locationId], true)" in content, "Post-vote force=true call not found"
+
+@test("TC-39.1.3", "RPC function name is get_location_voters")
+def _():
+    content = sources.read("src/lib/votes.ts")
+    assert "get_location_voters" in content, "get_location_voters RPC function name not found"
+
+# ============================================================
+section("40. Status & Size Utilities")
+# ============================================================
+
+@test("TC-40.1.1", "statusBadge maps GREEN to Promising")
+def _():
+    content = sources.read("src/lib/status.ts")
+    assert '"GREEN"' in content, "GREEN color key not found"
+    assert '"Promising"' in content, "Promising label not found"
+    # Verify the mapping
+    green_line = [l for l in content.split('\n') if 'GREEN' in l and 'Promising' in l]
+    assert len(green_line) > 0, "GREEN → Promising mapping not found on same line"
+
+@test("TC-40.1.2", "statusBadge maps YELLOW/AMBER to Viable")
+def _():
+    content = sources.read("src/lib/status.ts")
+    assert '"YELLOW"' in content, "YELLOW color key not found"
+    assert '"AMBER"' in content, "AMBER color key not found"
+    assert '"Viable"' in content, "Viable label not found"
+    amber_line = [l for l in content.split('\n') if 'AMBER' in l and 'Viable' in l]
+    assert len(amber_line) > 0, "AMBER → Viable mapping not found on same line"
+
+@test("TC-40.1.3", "statusBadge maps RED to Concerning")
+def _():
+    content = sources.read("src/lib/status.ts")
+    assert '"RED"' in content, "RED color key not found"
+    assert '"Concerning"' in content, "Concerning label not found"
+    red_line = [l for l in content.split('\n') if 'RED' in l and 'Concerning' in l]
+    assert len(red_line) > 0, "RED → Concerning mapping not found on same line"
+
+@test("TC-40.2.1", "sizeTierLabel maps Micro to 'Micro (25 students)'")
+def _():
+    content = sources.read("src/lib/status.ts")
+    assert "Micro (25 students)" in content, "Micro → Micro (25 students) mapping not found"
+
+@test("TC-40.2.2", "sizeTierLabel maps Full Size to 'Flagship (1000 students)'")
+def _():
+    content = sources.read("src/lib/status.ts")
+    assert "Flagship (1000 students)" in content, "Full Size → Flagship (1000 students) mapping not found"
+    assert "full size" in content.lower(), "full size key not found in sizeTierLabel"
+
+# ============================================================
+section("41. Curated Metros (R-METRO-FIXED)")
+# ============================================================
+
+@test("TC-41.1.1", "Curated metro cards render at nationwide zoom")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as no_geo_ctx:
+        page = await no_geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+        cards = page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']")
+        count = await cards.count()
+        assert count >= 10, f"Expected >=10 curated metro cards, got {count}"
+        # First card should be Austin (matches ACTIVE_METROS declared order)
+        first_slug = await cards.first.get_attribute("data-metro-slug")
+        assert first_slug == "austin", f"Expected first metro slug 'austin', got '{first_slug}'"
+
+@test("TC-41.1.2", "Card click flies to metro and hides the card list")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as no_geo_ctx:
+        page = await no_geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+        await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card'][data-metro-slug='nyc']").click()
+        # Cards should disappear after fly-in
+        await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="hidden", timeout=10000)
+
+@test("TC-41.1.3", "Geolocation inside Austin auto-flies to Austin")
+@retry(2)
+async def _(async_browser):
+    async with await new_async_context(
+        async_browser,
+        viewport={"width": 1440, "height": 900},
+        geolocation={"latitude": 30.2672, "longitude": -97.7431},
+        permissions=["geolocation"],
+    ) as geo_ctx:
+        page = await geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await page.wait_for_load_state("networkidle")
+        # Card list should hide once the auto-fly completes
+        try:
+            await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="hidden", timeout=15000)
+        except Exception:
             pass
-        _()
-
-        @test("TC-17.2.6", "Empty state shown when no pending locations")
-        @skip("Requires Supabase admin auth with empty queue")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.4.1", "Approve changes status to active")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.4.2", "Approved location appears in main app")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.4.3", "Card removed from queue after approval")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.4.4", "Approval email sent to suggestor")
-        @skip("Requires Supabase admin auth + Resend email service")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.4.5", "Location retains scores after approval")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.5.1", "Reject changes status to rejected")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.5.2", "Rejected location not in main app")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.5.3", "Card removed from queue after rejection")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-17.5.4", "Rejection email sent to suggestor")
-        @skip("Requires Supabase admin auth + Resend email service")
-        def _():
-            pass
-        _()
-
-        # ============================================================
-        print("\n## 18. Score Display")
-        # ============================================================
-
-        # Ensure we're zoomed into a city with location cards visible
-        zoom_to_city()
-
-        @test("TC-18.1.1", "Scored location cards have background tint")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                classes = card.get_attribute("class") or ""
-                has_tint = any(c in classes for c in ["bg-green-50", "bg-yellow-50", "bg-amber-50", "bg-red-50"])
-                # Not all cards may have scores, so check at least the card rendered
-                assert card.count() > 0, "No location cards found"
-        _()
-
-        @skip("Upstream scoring bug — most locations lack overallColor, no card tinting")
-        @test("TC-18.1.2", "Card tint matches overall score color")
-        def _():
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            found_tinted = False
-            for card in cards[:10]:
-                classes = card.get_attribute("class") or ""
-                if any(c in classes for c in ["bg-green-50", "bg-yellow-50", "bg-amber-50", "bg-red-50"]):
-                    found_tinted = True
-                    break
-            assert found_tinted, "No tinted cards found among first 10"
-        _()
-
-        @test("TC-18.1.3", "Unscored locations have no background tint")
-        def _():
-            # Verify cards exist - unscored ones won't have bg-*-50 class
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            assert len(cards) > 0, "No location cards found"
-        _()
-
-        @skip("Upstream scoring bug — ScoreDetails returns null when overallColor missing")
-        @test("TC-18.1.4", "4 sub-score icons displayed")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                # Look for the 4 lucide icons: map-pin, landmark, building-2, dollar-sign
-                icons = card.locator("svg").all()
-                # Card has MapPin (address), Heart (vote), plus 4 sub-score icons + help icon
-                assert len(icons) >= 4, f"Expected ≥4 icons, found {len(icons)}"
-        _()
-
-        @skip("Upstream scoring bug — ScoreDetails returns null when overallColor missing")
-        @test("TC-18.1.5", "Sub-scores have colored dots")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                dots = card.locator(".w-2.h-2.rounded-full").all()
-                assert len(dots) >= 4, f"Expected ≥4 score dots, found {len(dots)}"
-        _()
-
-        @test("TC-18.1.6", "Score legend popup opens on ? icon click")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                help_btn = card.locator(".lucide-help-circle, .lucide-circle-help").first
-                if help_btn.count() > 0:
-                    help_btn.click()
-                    desktop_page.wait_for_timeout(300)
-                    legend = desktop_page.locator("text=Score Key")
-                    assert legend.count() > 0, "Score legend popup not shown"
-                    # Close by clicking elsewhere
-                    desktop_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 400})
-                    desktop_page.wait_for_timeout(300)
-        _()
-
-        @test("TC-18.1.7", "ArtifactLink shown when details URL exists")
-        def _():
-            # Look for external-link icons in cards
-            ext_links = desktop_page.locator("[data-testid='location-card'] .lucide-external-link").all()
-            # Some cards may have artifact links if they have details URLs
-            assert True, "ArtifactLink check completed (depends on data)"
-        _()
-
-        @test("TC-18.1.8", "SizeLabel shown with student counts")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                # Size labels now include student counts: "Micro (25)", "Growth (250)", etc.
-                card_text = card.inner_text()
-                has_size = any(s in card_text for s in ["Micro (25)", "Micro2 (50-100)", "Growth (250)", "Flagship (1000)", "Red (Reject)"])
-                # May or may not exist depending on score data
-                assert True, f"SizeLabel check completed (depends on data). Card text sample: {card_text[:100]}"
-        _()
-
-        @test("TC-18.1.9", "ArtifactLink opens in new tab")
-        def _():
-            ext_link = desktop_page.locator("[data-testid='location-card'] a[target='_blank']").first
-            if ext_link.count() > 0:
-                rel = ext_link.get_attribute("rel") or ""
-                assert "noopener" in rel, f"ArtifactLink missing rel=noopener: {rel}"
-        _()
-
-        @test("TC-18.2.1", "Map dots use score-based colors")
-        def _():
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not found for score-colored dots"
-        _()
-
-        @test("TC-18.3.1", "V1 popup shows Street View image")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-                popup = desktop_page.locator(".mapboxgl-popup")
-                if popup.count() > 0:
-                    # V1 popup should have a Street View img element
-                    img = popup.locator("img[alt^='Street view']")
-                    assert img.count() > 0, "V1 popup missing Street View image"
-        _()
-
-        @test("TC-18.3.2", "V1 popup shows address and city/state")
-        def _():
-            popup = desktop_page.locator(".mapboxgl-popup")
-            if popup.count() > 0:
-                # Address line with comma (city, state)
-                address_text = popup.locator("text=/,/").first
-                assert address_text.count() > 0, "Popup missing address"
-        _()
-
-        @test("TC-18.3.3", "V1 popup shows Detailed Info blue hyperlink")
-        def _():
-            popup = desktop_page.locator(".mapboxgl-popup")
-            if popup.count() > 0:
-                # Look for "Detailed Info" link (may not exist for all locations)
-                link = popup.locator("a:has-text('Detailed Info')")
-                # Pass if link exists OR if location has no details URL
-                assert True, "Detailed Info link check completed (depends on data)"
-        _()
-
-        @test("TC-18.3.4", "Popup border tinted by overall score color")
-        def _():
-            popup = desktop_page.locator(".mapboxgl-popup")
-            if popup.count() > 0:
-                # The popup container div should have a border-* class
-                container = popup.locator("div.border-\\[3px\\]").first
-                if container.count() > 0:
-                    classes = container.get_attribute("class") or ""
-                    assert "border-" in classes, "Popup missing score-colored border"
-        _()
-
-        @test("TC-18.3.5", "Popup dismissed by clicking dot again")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-                popup = desktop_page.locator(".mapboxgl-popup")
-                # Click same location again should dismiss
-                card.click()
-                desktop_page.wait_for_timeout(500)
-            assert True, "Popup dismiss test completed"
-        _()
-
-        @test("TC-18.3.6", "Popup dismissed by clicking map background")
-        def _():
-            # Clean up any stuck dialogs first
-            dismiss_dialogs()
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-            # Click map background
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            canvas.click(position={"x": 600, "y": 100}, force=True)
-            desktop_page.wait_for_timeout(500)
-            popup = desktop_page.locator(".mapboxgl-popup")
-            # Popup should be dismissed
-            assert popup.count() == 0, "Popup not dismissed by map click"
-        _()
-
-        @test("TC-18.3.7", "Popup has close button")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-                popup = desktop_page.locator(".mapboxgl-popup")
-                if popup.count() > 0:
-                    close_btn = popup.locator(".mapboxgl-popup-close-button, button:has-text('×')")
-                    assert close_btn.count() > 0, "Popup missing close button"
-                    # Dismiss
-                    desktop_page.locator(".mapboxgl-canvas").click(position={"x": 600, "y": 100})
-                    desktop_page.wait_for_timeout(300)
-        _()
-
-        @test("TC-18.3.8", "V1 popup does NOT show sub-score icons row")
-        def _():
-            # Code review: MapView V1 popup path should not render ScoreDetails/SubScoresRow
-            import os
-            mapview_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "MapView.tsx")
-            with open(mapview_path) as f:
-                content = f.read()
-            # Find the V1 popup section (between "Popup V1" and the closing of the ternary)
-            v1_start = content.find("Popup V1")
-            v1_end = content.find("Popup V2") if content.find("Popup V2") > v1_start else len(content)
-            v1_section = content[v1_start:v1_end] if v1_start >= 0 else ""
-            # V1 should NOT have ScoreDetails or SubScoresRow
-            assert "ScoreDetails" not in v1_section, "V1 popup should not contain ScoreDetails"
-        _()
-
-        @test("TC-18.3.9", "V1 popup shows size label with student counts")
-        def _():
-            # Code review: V1 popup renders SizeLabel component
-            import os
-            mapview_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "MapView.tsx")
-            with open(mapview_path) as f:
-                content = f.read()
-            v1_start = content.find("Popup V1")
-            v1_end = content.find("Popup V2") if content.find("Popup V2") > v1_start else len(content)
-            v1_section = content[v1_start:v1_end] if v1_start >= 0 else ""
-            assert "SizeLabel" in v1_section, "V1 popup should contain SizeLabel"
-        _()
-
-        @test("TC-18.3.10", "V2 popup shows sub-score icons row (admin only)")
-        def _():
-            # Code review: V2 popup path includes ScoreDetails
-            import os
-            mapview_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "MapView.tsx")
-            with open(mapview_path) as f:
-                content = f.read()
-            v2_start = content.find("Popup V2")
-            v2_end = content.find("</Popup>", v2_start) if v2_start >= 0 else len(content)
-            v2_section = content[v2_start:v2_end] if v2_start >= 0 else ""
-            assert "ScoreDetails" in v2_section, "V2 popup should contain ScoreDetails"
-        _()
-
-        # ============================================================
-        print("\n## 18.4 Card V1/V2 Toggle")
-        # ============================================================
-
-        @test("TC-18.4.1", "Non-admin always sees V1 card layout")
-        def _():
-            # Code review: LocationsList passes cardVersion={isAdmin ? cardVersion : "v1"} to LocationCard
-            import os
-            list_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationsList.tsx")
-            with open(list_path) as f:
-                content = f.read()
-            assert 'isAdmin ? cardVersion : "v1"' in content, \
-                "LocationsList should pass v1 to non-admin LocationCard"
-        _()
-
-        @test("TC-18.4.2", "Detailed Info link opens details URL in new tab")
-        def _():
-            # Code review: DetailedInfoLink has target="_blank"
-            import os
-            sb_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "ScoreBadge.tsx")
-            with open(sb_path) as f:
-                content = f.read()
-            assert "DetailedInfoLink" in content, "DetailedInfoLink component not found"
-            assert 'target="_blank"' in content, "DetailedInfoLink should open in new tab"
-        _()
-
-        @test("TC-18.4.3", "V1 left-panel card has no sub-score icons row")
-        def _():
-            # Code review: CardContentV1 does not use ScoreDetails
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            v1_start = content.find("CardContentV1")
-            v1_end = content.find("CardContentV2") if content.find("CardContentV2") > v1_start else len(content)
-            v1_section = content[v1_start:v1_end] if v1_start >= 0 else ""
-            assert "ScoreDetails" not in v1_section, "V1 card should not contain ScoreDetails"
-        _()
-
-        @test("TC-18.4.4", "V1 left-panel card bottom row: Size | I can help | Detailed Info")
-        def _():
-            # Code review: CardContentV1 renders SizeLabel, HelpModal, DetailedInfoLink in a row
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            v1_start = content.find("CardContentV1")
-            v1_end = content.find("CardContentV2") if content.find("CardContentV2") > v1_start else len(content)
-            v1_section = content[v1_start:v1_end] if v1_start >= 0 else ""
-            assert "SizeLabel" in v1_section, "V1 card bottom row should have SizeLabel"
-            assert "HelpModal" in v1_section, "V1 card bottom row should have HelpModal"
-            assert "DetailedInfoLink" in v1_section, "V1 card bottom row should have DetailedInfoLink"
-        _()
-
-        # ============================================================
-        print("\n## 19. Two-Tier Zoom Model")
-        # ============================================================
-
-        @test("TC-19.1.1", "At wide zoom, city bubbles visible")
-        def _():
-            # Navigate to US-wide view
-            desktop_page.goto(BASE_URL)
-            desktop_page.wait_for_load_state("networkidle")
-            desktop_page.wait_for_timeout(3000)
-
-            # At initial load, city cards should be in the list (zoom < 9)
-            city_cards = desktop_page.locator("[data-testid='city-card']").all()
-            # City bubbles are rendered as Mapbox GL layers (canvas)
-            assert len(city_cards) > 0, "No city cards at wide zoom — two-tier model not active"
-        _()
-
-        @test("TC-19.1.5", "Clicking city card zooms into city")
-        def _():
-            city_card = desktop_page.locator("[data-testid='city-card']").first
-            if city_card.count() > 0:
-                city_card.click()
-                # Wait for location cards to appear (up to 8s)
-                try:
-                    desktop_page.locator("[data-testid='location-card']").first.wait_for(state="visible", timeout=8000)
-                except:
-                    desktop_page.wait_for_timeout(3000)
-
-                # After clicking, should transition to individual dots view
-                loc_cards = desktop_page.locator("[data-testid='location-card']").all()
-                assert len(loc_cards) > 0, "No location cards after clicking city card"
-        _()
-
-        @test("TC-19.2.1", "At city zoom, individual dots visible")
-        def _():
-            # After zooming in from previous test
-            loc_cards = desktop_page.locator("[data-testid='location-card']").all()
-            assert len(loc_cards) > 0, "No individual location cards at city zoom"
-        _()
-
-        @test("TC-19.2.2", "Clicking dot selects location")
-        def _():
-            # Click on map canvas where dots should be
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            if box:
-                canvas.click(position={"x": int(box["width"] * 0.6), "y": int(box["height"] * 0.5)})
-                desktop_page.wait_for_timeout(500)
-            assert True, "Click on dot area didn't crash"
-        _()
-
-        @test("TC-19.2.3", "Selected dot shows popup")
-        def _():
-            card = desktop_page.locator("[data-testid='location-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(1200)
-                popup = desktop_page.locator(".mapboxgl-popup")
-                assert popup.count() > 0, "No popup after selecting location"
-        _()
-
-        @test("TC-19.3.1", "Zooming out switches to city bubbles")
-        def _():
-            # Zoom out by scrolling or using controls
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            # Use zoom control to zoom out multiple times
-            zoom_out = desktop_page.locator(".mapboxgl-ctrl-zoom-out")
-            for _ in range(8):
-                zoom_out.click()
-                desktop_page.wait_for_timeout(200)
-            desktop_page.wait_for_timeout(1500)
-
-            # City cards should now appear
-            city_cards = desktop_page.locator("[data-testid='city-card']").all()
-            assert len(city_cards) > 0, "City cards didn't appear after zooming out"
-        _()
-
-        # ============================================================
-        print("\n## 20. City Summaries List")
-        # ============================================================
-
-        @test("TC-20.1.1", "At wide zoom, city cards appear in list")
-        def _():
-            city_cards = desktop_page.locator("[data-testid='city-card']").all()
-            assert len(city_cards) > 0, "No city cards at wide zoom"
-        _()
-
-        @test("TC-20.1.2", "City card shows 'City, State' name")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            text = card.locator("p.font-semibold").inner_text()
-            assert "," in text, f"City card name missing comma: {text}"
-        _()
-
-        @test("TC-20.1.3", "City card shows location count")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            count_text = card.locator("text=/location/").first
-            assert count_text.count() > 0, "Location count not found on city card"
-        _()
-
-        @test("TC-20.1.4", "City card shows vote count")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            votes = card.locator("text=votes")
-            assert votes.count() > 0, "Vote count label not found on city card"
-        _()
-
-        @test("TC-20.1.5", "City cards sorted by total votes descending")
-        def _():
-            cards = desktop_page.locator("[data-testid='city-card']").all()
-            if len(cards) >= 2:
-                vote0 = int(cards[0].locator("p.font-bold").inner_text())
-                vote1 = int(cards[1].locator("p.font-bold").inner_text())
-                assert vote0 >= vote1, f"City cards not sorted by votes: {vote0} < {vote1}"
-        _()
-
-        @test("TC-20.1.6", "Clicking city card flies map and fetches locations")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            if card.count() > 0:
-                card.click()
-                # Wait for location cards to appear (up to 8s)
-                try:
-                    desktop_page.locator("[data-testid='location-card']").first.wait_for(state="visible", timeout=8000)
-                except:
-                    desktop_page.wait_for_timeout(3000)
-                # Should now show location cards
-                loc_cards = desktop_page.locator("[data-testid='location-card']").all()
-                assert len(loc_cards) > 0, "No locations loaded after clicking city"
-        _()
-
-        # ============================================================
-        print("\n## 21. Geolocation")
-        # ============================================================
-
-        @test("TC-21.1.1", "Geolocation requested on page load")
-        def _():
-            # Create a context with geolocation permission granted
-            geo_ctx = browser.new_context(
-                viewport={"width": 1440, "height": 900},
-                geolocation={"latitude": 30.2672, "longitude": -97.7431},
-                permissions=["geolocation"]
-            )
-            page = geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(3000)
-
-            # Map should have loaded and be interactive
-            canvas = page.locator(".mapboxgl-canvas")
-            assert canvas.count() > 0, "Map not loaded with geolocation"
-            geo_ctx.close()
-        _()
-
-        @test("TC-21.1.2", "If granted, map flies to user location")
-        def _():
-            # Grant geolocation at Austin, TX
-            geo_ctx = browser.new_context(
-                viewport={"width": 1440, "height": 900},
-                geolocation={"latitude": 30.2672, "longitude": -97.7431},
-                permissions=["geolocation"]
-            )
-            page = geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-
-            # Async flow: geo resolve → citySummaries load → getInitialMapView →
-            # flyTo (1.5s animation) → handleMoveEnd sets zoomLevel → fetchNearbyForce → render
-            # Step 1: Wait for city cards (initial US-wide view while citySummaries load)
-            try:
-                page.locator("[data-testid='city-card']").first.wait_for(state="visible", timeout=10000)
-            except:
-                pass  # may skip city view if geo+citySummaries both resolve fast
-
-            # Step 2: Wait for city cards to disappear (map zooming from US-wide to city-level)
-            try:
-                page.locator("[data-testid='city-card']").first.wait_for(state="hidden", timeout=15000)
-            except:
-                pass  # if no city cards appeared, they won't need to hide
-
-            # Step 3: Wait for location cards to appear (fetched for Austin area)
-            try:
-                page.locator("[data-testid='location-card']").first.wait_for(state="visible", timeout=15000)
-            except:
-                page.wait_for_timeout(3000)
-
-            # After geolocation resolves, should show location cards (not city cards)
-            loc_cards = page.locator("[data-testid='location-card']").all()
-            assert len(loc_cards) > 0, "Map didn't fly to user location (no location cards)"
-            geo_ctx.close()
-        _()
-
-        @test("TC-21.1.3", "If denied, map stays at US-wide view")
-        def _():
-            # Create context without geolocation permission
-            no_geo_ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = no_geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(4000)
-
-            # Should still show city cards at wide zoom
-            city_cards = page.locator("[data-testid='city-card']").all()
-            assert len(city_cards) > 0, "City cards not shown when geolocation denied"
-            no_geo_ctx.close()
-        _()
-
-        @test("TC-21.1.5", "Geolocation timeout doesn't block app")
-        def _():
-            # Just verify the app works fine without geolocation
-            page = browser.new_page(viewport={"width": 1440, "height": 900})
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(3000)
-
-            title = page.locator("text=Alpha School Locations")
-            assert title.count() > 0, "App didn't load without geolocation"
-            page.close()
-        _()
-
-        # ============================================================
-        print("\n## 22. List Pagination")
-        # ============================================================
-
-        @test("TC-22.1.1", "At most 25 location cards shown initially")
-        def _():
-            # Ensure we're at city zoom with many locations
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            if len(cards) > 0:
-                assert len(cards) <= 25, f"Expected ≤25 cards initially, found {len(cards)}"
-        _()
-
-        @test("TC-22.1.2", "'Showing X of Y locations' counter displayed")
-        def _():
-            counter = desktop_page.locator("[data-testid='location-count']")
-            if counter.count() > 0:
-                text = counter.inner_text()
-                assert "Showing" in text, f"Counter text unexpected: {text}"
-                assert "of" in text, f"Counter missing 'of': {text}"
-        _()
-
-        @test("TC-22.1.3", "'Next' button appears when more than 25 locations")
-        def _():
-            next_btn = desktop_page.locator("[data-testid='pagination-next']")
-            counter = desktop_page.locator("[data-testid='location-count']")
-            if counter.count() > 0:
-                text = counter.inner_text()
-                # Parse "Showing X of Y" to check if Y > 25
-                parts = text.split()
-                # e.g. "Showing 25 of 50 locations"
-                if len(parts) >= 4:
-                    total = int(parts[3])
-                    if total > 25:
-                        assert next_btn.count() > 0, "Next button missing when >25 locations"
-        _()
-
-        @test("TC-22.1.4", "Clicking Next loads more cards")
-        def _():
-            next_btn = desktop_page.locator("[data-testid='pagination-next']")
-            if next_btn.count() > 0:
-                cards_before = len(desktop_page.locator("[data-testid='location-card']").all())
-                next_btn.click()
-                desktop_page.wait_for_timeout(500)
-                cards_after = len(desktop_page.locator("[data-testid='location-card']").all())
-                assert cards_after > cards_before, f"Next didn't load more: {cards_before} -> {cards_after}"
-        _()
-
-        @test("TC-22.1.5", "Pagination resets when filters change")
-        def _():
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            filters_btn = panel.locator("button:has-text('Filters')").first
-            if filters_btn.count() > 0:
-                filters_btn.click()
-                desktop_page.wait_for_timeout(300)
-                g_btn = panel.locator("button[title='GREEN Overall']").first
-                if g_btn.count() > 0:
-                    g_btn.click()
-                    desktop_page.wait_for_timeout(300)
-                    cards = desktop_page.locator("[data-testid='location-card']").all()
-                    assert len(cards) <= 25, "Pagination didn't reset on filter change"
-                    g_btn.click()
-                    desktop_page.wait_for_timeout(300)
-                filters_btn.click()
-                desktop_page.wait_for_timeout(300)
-        _()
-
-        @test("TC-22.1.6", "Pagination resets when map viewport changes")
-        def _():
-            # Reload page to reset pagination state, then pan
-            desktop_page.goto(BASE_URL)
-            desktop_page.wait_for_timeout(4000)
-            # Zoom into a city first
-            cc = desktop_page.locator("[data-testid='city-card']").first
-            if cc.count() > 0:
-                cc.click()
-                desktop_page.wait_for_timeout(3000)
-            # Now pan the map
-            desktop_page.keyboard.press("Escape")
-            desktop_page.wait_for_timeout(200)
-            canvas = desktop_page.locator(".mapboxgl-canvas")
-            box = canvas.bounding_box()
-            if box:
-                canvas.hover(position={"x": box["width"]/2, "y": box["height"]/2}, force=True)
-                desktop_page.mouse.down()
-                desktop_page.mouse.move(box["width"]/2 + 200, box["height"]/2)
-                desktop_page.mouse.up()
-                desktop_page.wait_for_timeout(2000)
-            cards = desktop_page.locator("[data-testid='location-card']").all()
-            if len(cards) > 0:
-                assert len(cards) <= 25, f"Pagination didn't reset on viewport change ({len(cards)} cards)"
-        _()
-
-        # ============================================================
-        print("\n## 23. TODO-Based Parent Assistance Emails")
-        # ============================================================
-
-        @test("TC-23.1.1", "Zoning TODO generated when zoning.color === RED")
-        @skip("Requires Supabase admin auth + RED zoning location")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.1.2", "Zoning TODO includes zone code when available")
-        @skip("Requires Supabase admin auth + scored data")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.1.3", "Zoning TODO omits zone code gracefully")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.1.4", "No zoning TODO when score is GREEN/YELLOW/AMBER")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.2.1", "M1 scenario: metro max enrollment >= 2500 AND wealth >= 2500")
-        @skip("Requires Supabase admin auth + metro data")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.2.2", "M2 scenario: metro max >= 1000 but < 2500")
-        @skip("Requires Supabase admin auth + metro data")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.2.3", "M3 scenario: metro max < 1000")
-        @skip("Requires Supabase admin auth + metro data")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.2.4", "Generic fallback when metrics unavailable")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.2.5", "No demographics TODO when score is GREEN/YELLOW/AMBER")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.3.1", "P1/P2 scenario: existing Alpha in metro")
-        @skip("Requires Supabase admin auth + metro info")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.3.2", "P3 scenario: new metro and RED at 25 students")
-        @skip("Requires Supabase admin auth + metro info")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.3.3", "Dollar math correct: students = space/100")
-        @skip("Requires Supabase admin auth + scored data")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.3.4", "Generic fallback when rent/space data unavailable")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.3.5", "No pricing TODO when score is GREEN/YELLOW/AMBER")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.4.1", "Email preview shows TODO sections when RED scores present")
-        @skip("Requires Supabase admin auth + scored location with RED")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.4.2", "Standard approval email when no RED scores")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.4.3", "TODO count badge on admin card after score sync")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        @test("TC-23.4.4", "Approval email subject changes with TODOs")
-        @skip("Requires Supabase admin auth")
-        def _():
-            pass
-        _()
-
-        # ============================================================
-        print("\n## 24. Admin vs Non-Admin Filters")
-        # ============================================================
-
-        @test("TC-24.1.1", "Non-admin does NOT see red toggle or filter controls")
-        def _():
-            # SimpleRedToggle component was removed — verify it's gone from source
-            import os
-            list_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationsList.tsx")
-            with open(list_path) as f:
-                content = f.read()
-            assert "SimpleRedToggle" not in content, "SimpleRedToggle should be removed from LocationsList"
-            # Non-admin should NOT see the admin ScoreFilterPanel either
-            filters_btn = desktop_page.locator("text=Filters").first
-            assert filters_btn.count() == 0, "Non-admin should not see admin Filters button"
-        _()
-
-        @test("TC-24.1.2", "Non-admin sees all scored locations including RED")
-        def _():
-            # RED locations should be visible by default (no toggle needed)
-            # Verify cards exist — they include RED-scored ones
-            cards = desktop_page.locator("[data-testid='location-card']")
-            card_count = cards.count()
-            # If we have cards and some have red borders, RED is shown
-            red_cards = desktop_page.locator("[data-testid='location-card'].border-red-600")
-            # Just verify the page loads locations (RED inclusion is tested by absence of filter)
-            assert True, f"Non-admin sees {card_count} cards (RED included, no toggle)"
-        _()
-
-        @test("TC-24.1.3", "Non-admin sees rank numbers on location cards")
-        def _():
-            # Cards should show #1, #2, etc.
-            first_card = desktop_page.locator("[data-testid='location-card']").first
-            if first_card.count() > 0:
-                rank_span = first_card.locator("text=#1")
-                assert rank_span.count() > 0, "First card should show rank #1"
-        _()
-
-        @skip("Requires admin auth to see ScoreFilterPanel")
-        @test("TC-24.2.1", "Admin sees ScoreFilterPanel with color and size filters")
-        def _():
-            pass
-        _()
-
-        @skip("Requires admin auth to test filter interactions")
-        @test("TC-24.2.2", "Admin color filters are AND across categories, OR within")
-        def _():
-            pass
-        _()
-
-        @skip("Requires admin auth to test size filter")
-        @test("TC-24.2.3", "Admin size filter excludes Red (Reject) by default")
-        def _():
-            pass
-        _()
-
-        @test("TC-24.3.1", "filteredLocations() shows all scored locations for non-admin")
-        def _():
-            # Non-admin: no filter controls visible, all scored locations shown
-            cards = desktop_page.locator("[data-testid='location-card']")
-            assert cards.count() >= 0, "Card list renders for non-admin"
-        _()
-
-        @skip("Requires admin auth to test View as Parent toggle")
-        @test("TC-24.3.2", "Admin View as Parent toggle switches to parent experience")
-        def _():
-            pass
-        _()
-
-        @skip("Requires admin auth to test View as Parent toggle")
-        @test("TC-24.3.3", "View as Parent toggle reverts to admin experience")
-        def _():
-            pass
-        _()
-
-        @test("TC-24.3.4", "Map dots use filteredLocations for score colors")
-        def _():
-            # At city zoom, map should show colored dots based on filteredLocations
-            # Verify the Source/Layer structure exists for location dots
-            cc = desktop_page.locator("[data-testid='city-card']").first
-            if cc.count() > 0:
-                cc.click()
-                desktop_page.wait_for_timeout(2000)
-            # Map canvas should be present
-            canvas = desktop_page.locator("canvas.mapboxgl-canvas")
-            assert canvas.count() > 0, "Map canvas not found"
-        _()
-
-        # ============================================================
-        print("\n## 25. Metro City Bubbles")
-        # ============================================================
-
-        # Navigate back to wide zoom for city bubble tests
-        desktop_page.goto(BASE_URL)
-        desktop_page.wait_for_timeout(3000)
-
-        @test("TC-25.1.1", "City bubbles consolidate to metro level")
-        def _():
-            # At wide zoom, should show metro-level bubbles (not individual cities)
-            cards = desktop_page.locator("[data-testid='city-card']").all()
-            assert len(cards) >= 1, "No city cards found at wide zoom"
-        _()
-
-        @test("TC-25.1.2", "Metro bubbles show location count")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            if card.count() > 0:
-                text = card.inner_text()
-                assert "location" in text.lower(), f"City card missing location count: {text}"
-        _()
-
-        @test("TC-25.1.3", "Metro bubbles show vote count")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            if card.count() > 0:
-                text = card.inner_text()
-                assert "vote" in text.lower(), f"City card missing vote count: {text}"
-        _()
-
-        @test("TC-25.2.1", "Clicking city card zooms to metro area")
-        def _():
-            card = desktop_page.locator("[data-testid='city-card']").first
-            if card.count() > 0:
-                card.click()
-                desktop_page.wait_for_timeout(2000)
-                # After clicking, should see location cards (zoomed in)
-                loc_cards = desktop_page.locator("[data-testid='location-card']").all()
-                assert len(loc_cards) >= 1, "No location cards after clicking city card"
-        _()
-
-        @test("TC-25.2.2", "Metro centroid is density-weighted")
-        def _():
-            # Verify metros.ts module exists and exports consolidateToMetros
-            import os
-            metros_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "metros.ts")
-            assert os.path.exists(metros_path), "metros.ts module not found"
-            with open(metros_path) as f:
-                content = f.read()
-            assert "consolidateToMetros" in content, "consolidateToMetros function not found"
-            assert "weightedLat" in content or "weighted" in content.lower(), "Density weighting not found"
-        _()
-
-        @skip("Requires Supabase to verify exact metro count")
-        @test("TC-25.2.3", "Approximately 85 US metros defined")
-        def _():
-            pass
-        _()
-
-        @test("TC-25.3.1", "Non-admin city bubbles only count released locations")
-        def _():
-            # Verify getCitySummaries accepts releasedOnly param
-            import os
-            locations_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "locations.ts")
-            with open(locations_path) as f:
-                content = f.read()
-            assert "excludeRed" in content, "getCitySummaries should accept excludeRed param"
-        _()
-
-        # ============================================================
-        print("\n## 26. Released/Unreleased Locations")
-        # ============================================================
-
-        @skip("Requires Supabase DB access to verify schema")
-        @test("TC-26.1.1", "Released column exists in pp_locations")
-        def _():
-            import os
-            sql_path = os.path.join(os.path.dirname(__file__), "..", "sql", "released-migration.sql")
-            assert os.path.exists(sql_path), "released-migration.sql not found"
-            with open(sql_path) as f:
-                content = f.read()
-            assert "released boolean" in content.lower(), "Released column definition not found"
-        _()
-
-        @skip("Requires Supabase DB access to verify default")
-        @test("TC-26.1.2", "Released defaults to false")
-        def _():
-            import os
-            sql_path = os.path.join(os.path.dirname(__file__), "..", "sql", "released-migration.sql")
-            with open(sql_path) as f:
-                content = f.read()
-            assert "DEFAULT false" in content, "Released default false not found"
-        _()
-
-        @skip("Requires Supabase DB access to verify released cities")
-        @test("TC-26.1.3", "Austin/Palo Alto/Palm Beach set as released")
-        def _():
-            import os
-            sql_path = os.path.join(os.path.dirname(__file__), "..", "sql", "released-migration.sql")
-            with open(sql_path) as f:
-                content = f.read()
-            assert "Austin" in content, "Austin not in released migration"
-            assert "Palo Alto" in content, "Palo Alto not in released migration"
-            assert "Boca Raton" in content, "Boca Raton not in released migration"
-        _()
-
-        @test("TC-26.2.1", "Non-admin only sees released locations")
-        def _():
-            # Verify filteredLocations filters by released for non-admins
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "loc.released === true" in content, "Released filter not found in filteredLocations"
-        _()
-
-        @test("TC-26.2.2", "Non-admin never sees unreleased locations")
-        def _():
-            # The non-admin path always filters to released=true
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            # Check both server-side (releasedOnly) and client-side filtering
-            assert "releasedOnly" in content or "released_only" in content, "Server-side released filter not found"
-        _()
-
-        @skip("Requires admin auth to access Released filter")
-        @test("TC-26.3.1", "Admin 'all' filter shows both released and unreleased")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "releasedFilter" in content, "Released filter state not found"
-        _()
-
-        @skip("Requires admin auth to access Released filter")
-        @test("TC-26.3.2", "Admin 'released' filter shows only released")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "released" in content, "Released filter logic not found"
-        _()
-
-        @skip("Requires admin auth to access Released filter")
-        @test("TC-26.3.3", "Admin 'unreleased' filter shows only unreleased")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "unreleased" in content.lower(), "Unreleased filter logic not found"
-        _()
-
-        @skip("Requires Supabase to verify RPC parameters")
-        @test("TC-26.4.1", "Server-side released_only param on RPCs")
-        def _():
-            import os
-            sql_path = os.path.join(os.path.dirname(__file__), "..", "sql", "released-migration.sql")
-            with open(sql_path) as f:
-                content = f.read()
-            assert "released_only" in content, "released_only param not found in SQL"
-        _()
-
-        @test("TC-26.4.2", "Client-side belt-and-suspenders filtering")
-        def _():
-            # Verify client-side also filters by released (belt-and-suspenders)
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            # Both server-side param AND client-side filter should exist
-            assert "released_only" in content or "releasedOnly" in content, "Server param missing"
-            assert "loc.released" in content, "Client-side released check missing"
-        _()
-
-        # ============================================================
-        print("\n## 27. Suggest Form Validation & Sanitization")
-        # ============================================================
-
-        # Navigate to /suggest page for validation tests
-        desktop_page.goto(f"{BASE_URL}/suggest")
-        desktop_page.wait_for_load_state("networkidle")
-        desktop_page.wait_for_timeout(2000)
-
-        # Check if suggest form is available (requires auth or offline mode)
-        _suggest_page_form_available = desktop_page.locator("#suggest-address, [data-testid='address-autocomplete']").count() > 0
-
-        if _suggest_page_form_available:
-            @test("TC-27.1.1", "Empty submit shows errors on address, city, state")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                # Clear any pre-filled values
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("")
-                desktop_page.locator("#suggest-city").fill("")
-                desktop_page.locator("#suggest-state").fill("")
-                # Click submit
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                addr_err = desktop_page.locator("[data-testid='error-address']")
-                city_err = desktop_page.locator("[data-testid='error-city']")
-                state_err = desktop_page.locator("[data-testid='error-state']")
-                assert addr_err.count() > 0, "Address error not shown"
-                assert city_err.count() > 0, "City error not shown"
-                assert state_err.count() > 0, "State error not shown"
-            _()
-
-            @test("TC-27.1.2", "Address error says 'Street address is required'")
-            def _():
-                addr_err = desktop_page.locator("[data-testid='error-address']")
-                if addr_err.count() > 0:
-                    text = addr_err.inner_text()
-                    assert "required" in text.lower(), f"Address error text unexpected: {text}"
-            _()
-
-            @test("TC-27.1.3", "City error says 'City is required'")
-            def _():
-                city_err = desktop_page.locator("[data-testid='error-city']")
-                if city_err.count() > 0:
-                    text = city_err.inner_text()
-                    assert "required" in text.lower(), f"City error text unexpected: {text}"
-            _()
-
-            @test("TC-27.1.4", "State error says 'State is required'")
-            def _():
-                state_err = desktop_page.locator("[data-testid='error-state']")
-                if state_err.count() > 0:
-                    text = state_err.inner_text()
-                    assert "required" in text.lower(), f"State error text unexpected: {text}"
-            _()
-
-            @test("TC-27.1.5", "Fixing fields and resubmitting clears errors")
-            def _():
-                # Fill in valid data
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.wait_for_timeout(300)
-                # After typing with hasAttemptedSubmit=true, errors should clear
-                addr_err = desktop_page.locator("[data-testid='error-address']")
-                city_err = desktop_page.locator("[data-testid='error-city']")
-                state_err = desktop_page.locator("[data-testid='error-state']")
-                assert addr_err.count() == 0, "Address error still shown after fix"
-                assert city_err.count() == 0, "City error still shown after fix"
-                assert state_err.count() == 0, "State error still shown after fix"
-            _()
-
-            @test("TC-27.1.6", "Errors render as red text below field")
-            def _():
-                # Navigate fresh and trigger errors
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("")
-                desktop_page.locator("#suggest-city").fill("")
-                desktop_page.locator("#suggest-state").fill("")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                addr_err = desktop_page.locator("[data-testid='error-address']")
-                if addr_err.count() > 0:
-                    classes = addr_err.get_attribute("class") or ""
-                    assert "text-red" in classes, f"Error not red: {classes}"
-                    assert "text-xs" in classes, f"Error not small text: {classes}"
-            _()
-
-            @test("TC-27.2.1", "State 'TX' accepted")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                state_err = desktop_page.locator("[data-testid='error-state']")
-                assert state_err.count() == 0, "State error shown for valid 'TX'"
-            _()
-
-            @test("TC-27.2.2", "State 'tx' auto-uppercased to 'TX'")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                state_input = desktop_page.locator("#suggest-state")
-                state_input.fill("tx")
-                desktop_page.wait_for_timeout(200)
-                val = state_input.input_value()
-                assert val == "TX", f"State not auto-uppercased: {val}"
-            _()
-
-            @test("TC-27.2.3", "State 'T' shows error")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("T")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                state_err = desktop_page.locator("[data-testid='error-state']")
-                assert state_err.count() > 0, "No error for single-char state"
-            _()
-
-            @test("TC-27.2.4", "State '12' shows error")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("12")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                state_err = desktop_page.locator("[data-testid='error-state']")
-                assert state_err.count() > 0, "No error for numeric state"
-            _()
-
-            @test("TC-27.2.5", "State field has maxLength=2")
-            def _():
-                state_input = desktop_page.locator("#suggest-state")
-                maxlen = state_input.get_attribute("maxlength")
-                assert maxlen == "2", f"State maxlength is {maxlen}, expected 2"
-            _()
-
-            @test("TC-27.3.1", "Sqft '3500' accepted")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.locator("#suggest-sqft").fill("3500")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                sqft_err = desktop_page.locator("[data-testid='error-sqft']")
-                assert sqft_err.count() == 0, "Sqft error shown for valid '3500'"
-            _()
-
-            @test("TC-27.3.2", "Sqft '3,500' accepted")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.locator("#suggest-sqft").fill("3,500")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                sqft_err = desktop_page.locator("[data-testid='error-sqft']")
-                assert sqft_err.count() == 0, "Sqft error shown for valid '3,500'"
-            _()
-
-            @test("TC-27.3.3", "Sqft 'abc' shows error")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.locator("#suggest-sqft").fill("abc")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                sqft_err = desktop_page.locator("[data-testid='error-sqft']")
-                assert sqft_err.count() > 0, "No error for non-numeric sqft"
-            _()
-
-            @test("TC-27.3.4", "Empty sqft accepted (optional)")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                # Leave sqft empty
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                sqft_err = desktop_page.locator("[data-testid='error-sqft']")
-                assert sqft_err.count() == 0, "Sqft error shown for empty (optional) field"
-            _()
-
-            @test("TC-27.4.1", "Notes under 2000 chars accepted")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                desktop_page.locator("#suggest-notes").fill("This is a great location.")
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                notes_err = desktop_page.locator("[data-testid='error-notes']")
-                assert notes_err.count() == 0, "Notes error shown for short notes"
-            _()
-
-            @test("TC-27.4.2", "Notes over 2000 chars shows error")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                addr = desktop_page.locator("[data-testid='address-autocomplete']").first
-                if addr.count() > 0:
-                    addr.fill("123 Main St")
-                desktop_page.locator("#suggest-city").fill("Austin")
-                desktop_page.locator("#suggest-state").fill("TX")
-                long_notes = "A" * 2001
-                desktop_page.locator("#suggest-notes").fill(long_notes)
-                desktop_page.locator("button[type='submit']").click()
-                desktop_page.wait_for_timeout(500)
-                notes_err = desktop_page.locator("[data-testid='error-notes']")
-                assert notes_err.count() > 0, "No error for notes over 2000 chars"
-            _()
-
-            @test("TC-27.5.1", "<script> tags stripped from input")
-            def _():
-                import os, sys
-                sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "lib"))
-                # Test via source code verification
-                validation_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "validation.ts")
-                with open(validation_path) as f:
-                    content = f.read()
-                assert "replace(/<[^>]*>/g" in content, "sanitizeText regex not found"
-            _()
-
-            @test("TC-27.5.2", "<b>bold</b> stripped to 'bold'")
-            def _():
-                # Verify sanitizeText regex strips tags
-                import re
-                test_input = "<b>bold</b>"
-                result = re.sub(r'<[^>]*>', '', test_input).strip()
-                assert result == "bold", f"Expected 'bold', got '{result}'"
-            _()
-
-            @test("TC-27.5.3", "Normal text unchanged")
-            def _():
-                import re
-                test_input = "123 Main Street, Austin TX"
-                result = re.sub(r'<[^>]*>', '', test_input).strip()
-                assert result == test_input, f"Normal text was modified: '{result}'"
-            _()
-
-            @test("TC-27.5.4", "suggestLocation() sanitizes before DB insert")
-            def _():
-                import os
-                locations_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "locations.ts")
-                with open(locations_path) as f:
-                    content = f.read()
-                assert "sanitizeText(address)" in content, "suggestLocation doesn't sanitize address"
-                assert "sanitizeText(city)" in content, "suggestLocation doesn't sanitize city"
-                assert "sanitizeText(state)" in content, "suggestLocation doesn't sanitize state"
-                assert "sanitizeText(notes)" in content, "suggestLocation doesn't sanitize notes"
-            _()
-
-            @test("TC-27.6.1", "Network error shows error banner")
-            def _():
-                # Verify the submit-error testid exists in the component
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "data-testid=\"submit-error\"" in content, "submit-error testid not found"
-                assert "submitError" in content, "submitError state not found"
-            _()
-
-            @test("TC-27.6.2", "Error banner has red styling")
-            def _():
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "bg-red-50" in content and "text-red-700" in content, "Error banner missing red styling"
-            _()
-
-            @test("TC-27.6.3", "Error clears on next submit attempt")
-            def _():
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "setSubmitError(null)" in content, "submitError not cleared on submit"
-            _()
-
-            @test("TC-27.6.4", "Submit button re-enables after failure")
-            def _():
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                # The finally block should set isSubmitting to false
-                assert "setIsSubmitting(false)" in content, "isSubmitting not reset in finally"
-            _()
-
-            # --------------------------------------------------------
-            # REQ-27.7: School Type Tabs on Suggest Page
-            # --------------------------------------------------------
-
-            @test("TC-27.7.1", "Three school type tab buttons visible (Micro, Growth, Flagship)")
-            def _():
-                desktop_page.goto(f"{BASE_URL}/suggest")
-                desktop_page.wait_for_load_state("networkidle")
-                desktop_page.wait_for_timeout(1000)
-                micro_btn = desktop_page.locator("button:has-text('Micro')")
-                growth_btn = desktop_page.locator("button:has-text('Growth')")
-                flagship_btn = desktop_page.locator("button:has-text('Flagship')")
-                assert micro_btn.count() > 0, "Micro tab button not found"
-                assert growth_btn.count() > 0, "Growth tab button not found"
-                assert flagship_btn.count() > 0, "Flagship tab button not found"
-            _()
-
-            @test("TC-27.7.2", "Micro tab is selected by default (has active styling)")
-            def _():
-                # Micro tab should have white bg / active styling
-                micro_btn = desktop_page.locator("button:has-text('Micro')").first
-                classes = micro_btn.get_attribute("class") or ""
-                assert "bg-white" in classes or "text-blue-700" in classes, f"Micro tab not active: {classes}"
-            _()
-
-            @test("TC-27.7.3", "Micro tab has FOCUS badge")
-            def _():
-                # FOCUS badge should be within the Micro tab button
-                focus_badge = desktop_page.locator("button:has-text('Micro') >> text=FOCUS")
-                assert focus_badge.count() > 0 or desktop_page.locator("button:has-text('Micro') span:has-text('Focus')").count() > 0, "FOCUS badge not found on Micro tab"
-            _()
-
-            @test("TC-27.7.4", "Clicking Growth tab switches content to Growth criteria")
-            def _():
-                # Click Growth tab
-                desktop_page.locator("button:has-text('Growth')").first.click()
-                desktop_page.wait_for_timeout(300)
-                # Growth tagline or criteria should appear
-                page_text = desktop_page.locator(".bg-white.rounded-xl").first.inner_text()
-                assert "Growth" in page_text or "Mid-size" in page_text or "proven demand" in page_text, "Growth content not displayed after clicking Growth tab"
-            _()
-
-            @test("TC-27.7.5", "Clicking Flagship tab switches content to Flagship criteria")
-            def _():
-                desktop_page.locator("button:has-text('Flagship')").first.click()
-                desktop_page.wait_for_timeout(300)
-                page_text = desktop_page.locator(".bg-white.rounded-xl").first.inner_text()
-                assert "Flagship" in page_text or "Full-scale" in page_text or "high-demand" in page_text, "Flagship content not displayed after clicking Flagship tab"
-            _()
-
-            @test("TC-27.7.6", "Each tab shows criteria sections (Physical, Neighborhood, Economics)")
-            def _():
-                # Switch back to Micro
-                desktop_page.locator("button:has-text('Micro')").first.click()
-                desktop_page.wait_for_timeout(300)
-                physical = desktop_page.locator("text=Physical Criteria")
-                neighborhood = desktop_page.locator("h3:has-text('Neighborhood')")
-                economics = desktop_page.locator("text=Economics")
-                assert physical.count() > 0, "'Physical Criteria' heading not found"
-                assert neighborhood.count() > 0, "'Neighborhood' heading not found"
-                assert economics.count() > 0, "'Economics' heading not found"
-            _()
-
-            @test("TC-27.7.7", "Each tab shows tagline in colored callout")
-            def _():
-                tagline = desktop_page.locator("text=Small, nimble locations")
-                assert tagline.count() > 0, "Micro tagline not found"
-            _()
-
-            @test("TC-27.7.8", "Each tab shows a timeline")
-            def _():
-                timeline = desktop_page.locator("text=Timeline")
-                assert timeline.count() > 0, "Timeline label not found"
-            _()
-
-            @test("TC-27.7.9", "Submitted notes start with 'School type: Micro' when Micro tab active")
-            def _():
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "School type:" in content, "School type prefix not found in suggest page"
-                assert "SCHOOL_TYPES[activeTab].label" in content, "School type label not used in notes"
-            _()
-
-            @test("TC-27.7.10", "Submitted notes start with 'School type: Growth' when Growth tab active")
-            def _():
-                # Covered by code review: same code path as TC-27.7.9 with different activeTab
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "detailLines.unshift(schoolTypePrefix)" in content, "School type not prepended to notes"
-            _()
-
-            @test("TC-27.7.11", "Submitted notes start with 'School type: Flagship' when Flagship tab active")
-            def _():
-                # Covered by code review: same code path as TC-27.7.9 with different activeTab
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "suggest", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "SCHOOL_TYPES" in content and "activeTab" in content, "School type tab state not used"
-            _()
-
-            # --------------------------------------------------------
-            # REQ-27.8: Suggest Button Links to /suggest (modal removed)
-            # --------------------------------------------------------
-
-            @test("TC-27.8.1", "Main page suggest button links to /suggest")
-            def _():
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert 'href="/suggest"' in content, "Suggest button does not link to /suggest"
-                assert "SuggestLocationModal" not in content, "SuggestLocationModal should be removed from main page"
-            _()
-
-            @test("TC-27.8.2", "Suggest button has amber styling and plus icon")
-            def _():
-                import os
-                page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "page.tsx")
-                with open(page_path) as f:
-                    content = f.read()
-                assert "bg-amber-400" in content, "Suggest button missing amber background"
-                assert "Plus" in content, "Suggest button missing Plus icon"
-            _()
-
-            # --------------------------------------------------------
-            # REQ-27.9: School Type Badge on Admin Cards
-            # --------------------------------------------------------
-
-            @test("TC-27.9.1", "parseSchoolType extracts school type from 'School type: Micro\\nrest'")
-            def _():
-                import re
-                # Replicate parseSchoolType logic
-                notes = "School type: Micro\nSquare footage: 3500"
-                match = re.match(r'^School type: (.+?)(?:\n|$)', notes)
-                assert match is not None, "Regex did not match school type prefix"
-                assert match.group(1) == "Micro", f"Expected 'Micro', got '{match.group(1)}'"
-                remaining = notes[match.end():].strip()
-                assert remaining == "Square footage: 3500", f"Remaining notes wrong: '{remaining}'"
-            _()
-
-            @test("TC-27.9.2", "parseSchoolType returns null for notes without school type prefix")
-            def _():
-                import re
-                notes = "Just some regular notes here"
-                match = re.match(r'^School type: (.+?)(?:\n|$)', notes)
-                assert match is None, "Regex should not match notes without prefix"
-            _()
-
-            @test("TC-27.9.3", "parseSchoolType returns null for empty/null notes")
-            def _():
-                import re
-                for notes in [None, "", "   "]:
-                    if not notes or not notes.strip():
-                        pass  # parseSchoolType returns null for falsy notes
-                    else:
-                        match = re.match(r'^School type: (.+?)(?:\n|$)', notes)
-                        assert match is None, f"Regex should not match for '{notes}'"
-            _()
-
-            @test("TC-27.9.4", "AdminLocationCard source includes parseSchoolType import")
-            def _():
-                import os
-                admin_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AdminLocationCard.tsx")
-                with open(admin_path) as f:
-                    content = f.read()
-                assert "parseSchoolType" in content, "parseSchoolType not imported in AdminLocationCard"
-                assert "from" in content and "school-types" in content, "school-types import not found"
-            _()
-
-            @test("TC-27.9.5", "AdminLocationCard renders school type badge with color classes (blue/purple/amber)")
-            def _():
-                import os
-                admin_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AdminLocationCard.tsx")
-                with open(admin_path) as f:
-                    content = f.read()
-                assert "bg-blue-100" in content and "text-blue-700" in content, "Blue badge colors missing (Micro)"
-                assert "bg-purple-100" in content and "text-purple-700" in content, "Purple badge colors missing (Growth)"
-                assert "bg-amber-100" in content and "text-amber-700" in content, "Amber badge colors missing (Flagship)"
-            _()
+        cards = await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']").count()
+        assert cards == 0, f"Cards should hide after auto-fly to Austin, found {cards}"
+
+@test("TC-41.1.4", "Geolocation outside any active metro stays at nationwide")
+async def _(async_browser):
+    # Middle of Wyoming — outside every active metro radius
+    async with await new_async_context(
+        async_browser,
+        viewport={"width": 1440, "height": 900},
+        geolocation={"latitude": 43.0, "longitude": -107.5},
+        permissions=["geolocation"],
+    ) as geo_ctx:
+        page = await geo_ctx.new_page()
+        await page.goto(BASE_URL)
+        await async_waits.wait_for_app(page)
+        cards = await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']").count()
+        assert cards >= 10, f"Cards should remain visible for non-active-metro geo, got {cards}"
+
+@test("TC-41.1.5", "Back-to-metros button restores curated cards from metro view")
+async def _(async_browser):
+    async with await new_async_context(async_browser, viewport={"width": 1440, "height": 900}) as no_geo_ctx:
+        page = await no_geo_ctx.new_page()
+        # Open straight into the NYC metro view
+        await page.goto(f"{BASE_URL}/?metro=nyc")
+        await async_waits.wait_for_app(page, cards=False)
+        await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="hidden", timeout=10000)
+        # Click the back chevron in the header ("‹ · NEW YORK") — title-attribute selector is stable
+        await page.locator("[data-testid='desktop-panel'] button[title='Back to all metros']").click()
+        # Curated cards should reappear
+        await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="visible", timeout=10000)
+        cards = await page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']").count()
+        assert cards >= 10, f"Curated cards should reappear after back-to-metros, got {cards}"
+
+# ============================================================
+# Runner
+# ============================================================
+
+def run_tests(cases, workers=1, concurrency=1, use_cache=True, slowest=10, reporters=(), retries=0,
+              quarantine=frozenset(), timeout=None, budget=None):
+    deadline = time.time() + budget if budget else None
+    results = Results(reporters)
+    cache = ResultCache() if use_cache else None
+
+    print("\n" + "="*60)
+    print("PARENT PICKER - REQUIREMENTS TEST SUITE")
+    print(f"BASE_URL: {BASE_URL}")
+    if workers > 1:
+        print(f"Workers: {workers}")
+    if concurrency > 1:
+        print(f"Async concurrency: {concurrency}")
+    if retries:
+        print(f"Retries: {retries}")
+    if quarantine:
+        print(f"Quarantined: {len(quarantine)} tests")
+    if budget:
+        print(f"Time budget: {budget:g}s")
+    if supabase.mode != "live":
+        print(f"Supabase: {supabase.mode} ({supabase.directory})")
+    if basemap.mode != "live":
+        print(f"Mapbox basemap: {basemap.mode}")
+    if places.mode != "live":
+        print(f"Autocomplete: {places.mode} ({places.latency:g}ms ± {places.jitter:g}ms)")
+    print("="*60)
 
+    try:
+        if workers > 1:
+            # Each worker process launches its own browser and contexts
+            run_sharded(cases, workers, os.path.abspath(__file__), results, concurrency=concurrency,
+                        cache=cache, retries=retries, quarantine=quarantine, timeout=timeout,
+                        deadline=deadline)
         else:
-            _auth_skip = "Requires auth — suggest form shows sign-in prompt without authentication"
-            for tc_id, tc_desc in [
-                ("TC-27.1.1", "Empty submit shows errors on address, city, state"),
-                ("TC-27.1.2", "Address error says 'Street address is required'"),
-                ("TC-27.1.3", "City error says 'City is required'"),
-                ("TC-27.1.4", "State error says 'State is required'"),
-                ("TC-27.1.5", "Fixing fields and resubmitting clears errors"),
-                ("TC-27.1.6", "Errors render as red text below field"),
-                ("TC-27.2.1", "State 'TX' accepted"),
-                ("TC-27.2.2", "State 'tx' auto-uppercased to 'TX'"),
-                ("TC-27.2.3", "State 'T' shows error"),
-                ("TC-27.2.4", "State '12' shows error"),
-                ("TC-27.2.5", "State field has maxLength=2"),
-                ("TC-27.3.1", "Sqft '3500' accepted"),
-                ("TC-27.3.2", "Sqft '3,500' accepted"),
-                ("TC-27.3.3", "Sqft 'abc' shows error"),
-                ("TC-27.3.4", "Empty sqft accepted (optional)"),
-                ("TC-27.4.1", "Notes under 2000 chars accepted"),
-                ("TC-27.4.2", "Notes over 2000 chars shows error"),
-                ("TC-27.5.1", "<script> tags stripped from input"),
-                ("TC-27.5.2", "<b>bold</b> stripped to 'bold'"),
-                ("TC-27.5.3", "Normal text unchanged"),
-                ("TC-27.5.4", "suggestLocation() sanitizes before DB insert"),
-                ("TC-27.6.1", "Network error shows error banner"),
-                ("TC-27.6.2", "Error banner has red styling"),
-                ("TC-27.6.3", "Error clears on next submit attempt"),
-                ("TC-27.6.4", "Submit button re-enables after failure"),
-                ("TC-27.7.1", "Three school type tab buttons visible (Micro, Growth, Flagship)"),
-                ("TC-27.7.2", "Micro tab is selected by default (has active styling)"),
-                ("TC-27.7.3", "Micro tab has FOCUS badge"),
-                ("TC-27.7.4", "Clicking Growth tab switches content to Growth criteria"),
-                ("TC-27.7.5", "Clicking Flagship tab switches content to Flagship criteria"),
-                ("TC-27.7.6", "Each tab shows criteria sections (Physical, Neighborhood, Economics)"),
-                ("TC-27.7.7", "Each tab shows tagline in colored callout"),
-                ("TC-27.7.8", "Each tab shows a timeline"),
-                ("TC-27.7.9", "Submitted notes start with 'School type: Micro' when Micro tab active"),
-                ("TC-27.7.10", "Submitted notes start with 'School type: Growth' when Growth tab active"),
-                ("TC-27.7.11", "Submitted notes start with 'School type: Flagship' when Flagship tab active"),
-                ("TC-27.8.1", "Main page suggest button links to /suggest"),
-                ("TC-27.8.2", "Suggest button has amber styling and plus icon"),
-                ("TC-27.9.1", "parseSchoolType extracts school type from 'School type: Micro\\nrest'"),
-                ("TC-27.9.2", "parseSchoolType returns null for notes without school type prefix"),
-                ("TC-27.9.3", "parseSchoolType returns null for empty/null notes"),
-                ("TC-27.9.4", "AdminLocationCard source includes parseSchoolType import"),
-                ("TC-27.9.5", "AdminLocationCard renders school type badge with color classes (blue/purple/amber)"),
-            ]:
-                @test(tc_id, tc_desc)
-                @skip(_auth_skip)
-                def _(): pass
-                _()
-
-        # ============================================================
-        print("\n## 28. Help Requests")
-        # ============================================================
-
-        @test("TC-28.1.1", "HelpModal calls fetch to POST /api/help-request on submit")
-        def _():
-            import os
-            modal_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "HelpModal.tsx")
-            with open(modal_path) as f:
-                content = f.read()
-            assert "fetch(" in content, "fetch call not found in HelpModal"
-            assert "/api/help-request" in content, "API endpoint not found in HelpModal"
-            assert "POST" in content, "POST method not found in HelpModal"
-        _()
-
-        @test("TC-28.1.2", "API route inserts row into pp_help_requests table")
-        def _():
-            import os
-            route_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "api", "help-request", "route.ts")
-            with open(route_path) as f:
-                content = f.read()
-            assert "pp_help_requests" in content, "pp_help_requests table not referenced in route"
-            assert ".insert(" in content, "insert call not found in route"
-        _()
-
-        @test("TC-28.1.3", "API route calls sendEmail with generateHelpGuideHtml")
-        def _():
-            import os
-            route_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "api", "help-request", "route.ts")
-            with open(route_path) as f:
-                content = f.read()
-            assert "sendEmail" in content, "sendEmail not found in route"
-            assert "generateHelpGuideHtml" in content, "generateHelpGuideHtml not found in route"
-        _()
-
-        @test("TC-28.1.4", "Unauthenticated user provides email in form")
-        def _():
-            import os
-            modal_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "HelpModal.tsx")
-            with open(modal_path) as f:
-                content = f.read()
-            assert 'type="email"' in content, "Email input field not found"
-            assert "help-email" in content, "Email input id not found"
-        _()
-
-        @test("TC-28.1.5", "Authenticated user uses session email")
-        def _():
-            import os
-            modal_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "HelpModal.tsx")
-            with open(modal_path) as f:
-                content = f.read()
-            assert "user?.email" in content or "user.email" in content, "user.email reference not found"
-        _()
-
-        @test("TC-28.2.1", "Admin page has three tabs (Suggestions, Likes, Help Requests)")
-        def _():
-            import os
-            admin_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "admin", "page.tsx")
-            with open(admin_path) as f:
-                content = f.read()
-            assert "Suggestions" in content, "Suggestions tab not found"
-            assert "Likes" in content, "Likes tab not found"
-            assert "Help Requests" in content, "Help Requests tab not found"
-            assert '"help"' in content, "help tab type not found"
-        _()
-
-        @test("TC-28.2.2", "Help Requests tab shows count badge")
-        def _():
-            import os
-            admin_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "admin", "page.tsx")
-            with open(admin_path) as f:
-                content = f.read()
-            assert "helpRequests.length" in content, "helpRequests.length not found for badge"
-            assert "bg-blue-100" in content, "Blue badge styling not found for help tab"
-        _()
-
-        @test("TC-28.2.3", "Each card shows email and date (AdminHelpRequestCard)")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AdminHelpRequestCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "request.email" in content, "email display not found in card"
-            assert "created_at" in content or "dateStr" in content, "date display not found in card"
-        _()
-
-        @test("TC-28.2.4", "Location-specific requests show address")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AdminHelpRequestCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "location_address" in content, "location_address not found in card"
-            assert "MapPin" in content, "MapPin icon not found for location display"
-        _()
-
-        @test("TC-28.2.5", "Empty state when no requests")
-        def _():
-            import os
-            admin_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "admin", "page.tsx")
-            with open(admin_path) as f:
-                content = f.read()
-            assert "No help requests yet" in content, "Empty state text not found"
-        _()
-
-        @test("TC-28.3.1", "generateHelpGuideHtml exists with location-specific variant")
-        def _():
-            import os
-            email_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "email.ts")
-            with open(email_path) as f:
-                content = f.read()
-            assert "generateHelpGuideHtml" in content, "generateHelpGuideHtml not found"
-            assert "location.address" in content or "location?.address" in content, "Location-specific variant not found"
-        _()
-
-        @test("TC-28.3.2", "generateHelpGuideHtml exists with general variant")
-        def _():
-            import os
-            email_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "email.ts")
-            with open(email_path) as f:
-                content = f.read()
-            assert "bring Alpha to your area" in content, "General variant text not found"
-        _()
-
-        @test("TC-28.3.3", "Email includes 4 help action items")
-        def _():
-            import os
-            email_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "email.ts")
-            with open(email_path) as f:
-                content = f.read()
-            assert "property owners" in content.lower(), "Property owners action item not found"
-            assert "zoning" in content.lower(), "Zoning action item not found"
-            assert "Rally other parents" in content or "rally other parents" in content.lower(), "Rally parents action item not found"
-            assert "government contacts" in content.lower(), "Government contacts action item not found"
-        _()
-
-        # ============================================================
-        print("\n## 29. Mobile UX")
-        # ============================================================
-
-        @test("TC-29.1.1", "Mobile bottom sheet has AuthButton")
-        def _():
-            import os
-            page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "page.tsx")
-            with open(page_path) as f:
-                content = f.read()
-            # Check that AuthButton appears inside the mobile bottom sheet section
-            mobile_section = content[content.index("mobile-bottom-sheet"):]
-            assert "AuthButton" in mobile_section, "AuthButton not found in mobile bottom sheet"
-        _()
-
-        @test("TC-29.1.2", "Mobile collapsed view has HelpModal")
-        def _():
-            import os
-            page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "page.tsx")
-            with open(page_path) as f:
-                content = f.read()
-            # The collapsed summary section is between "Collapsed summary" and "Expanded panel"
-            collapsed_start = content.index("Collapsed summary")
-            collapsed_end = content.index("Expanded panel")
-            collapsed = content[collapsed_start:collapsed_end]
-            assert "HelpModal" in collapsed, "HelpModal not found in mobile collapsed view"
-        _()
-
-        @test("TC-29.1.3", "Mobile collapsed view has Suggest button")
-        def _():
-            import os
-            page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "page.tsx")
-            with open(page_path) as f:
-                content = f.read()
-            collapsed_start = content.index("Collapsed summary")
-            collapsed_end = content.index("Expanded panel")
-            collapsed = content[collapsed_start:collapsed_end]
-            assert "Suggest a Location" in collapsed, "Suggest button not found in mobile collapsed view"
-        _()
-
-        @test("TC-29.1.4", "AuthButton accepts darkBg prop")
-        def _():
-            import os
-            auth_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AuthButton.tsx")
-            with open(auth_path) as f:
-                content = f.read()
-            assert "darkBg" in content, "darkBg prop not found in AuthButton"
-            assert "darkBg = true" in content or "darkBg=true" in content, "darkBg default not set to true"
-        _()
-
-        @test("TC-29.1.5", "Mobile expanded panel is max-h-[50vh]")
-        def _():
-            import os
-            page_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "page.tsx")
-            with open(page_path) as f:
-                content = f.read()
-            assert "max-h-[50vh]" in content, "max-h-[50vh] not found in page.tsx"
-            assert "max-h-[70vh]" not in content, "Old max-h-[70vh] still present in page.tsx"
-        _()
-
-        @test("TC-29.2.1", "VoteButton has min-h-[44px] on mobile")
-        def _():
-            import os
-            vote_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "VoteButton.tsx")
-            with open(vote_path) as f:
-                content = f.read()
-            assert "min-h-[44px]" in content, "min-h-[44px] not found in VoteButton"
-            assert "lg:min-h-0" in content, "lg:min-h-0 not found in VoteButton"
-        _()
-
-        @test("TC-29.2.2", "SizeLabel uses small text size")
-        def _():
-            import os
-            score_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "ScoreBadge.tsx")
-            with open(score_path) as f:
-                content = f.read()
-            # SizeLabel uses text-[10px], DetailedInfoLink and ScoreLegend use text-[11px]
-            assert "text-[10px]" in content, "text-[10px] not found in ScoreBadge"
-            assert "text-[11px]" in content, "text-[11px] not found in ScoreBadge"
-        _()
-
-        @test("TC-29.2.3", "ScoreLegend uses fixed positioning on mobile")
-        def _():
-            import os
-            score_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "ScoreBadge.tsx")
-            with open(score_path) as f:
-                content = f.read()
-            assert "lg:hidden fixed inset-0" in content, "Mobile fixed legend not found in ScoreBadge"
-            assert "hidden lg:block absolute" in content, "Desktop absolute legend not found in ScoreBadge"
-        _()
-
-        @test("TC-29.2.4", "flyToCoords includes bottom padding on mobile")
-        def _():
-            import os
-            map_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "MapView.tsx")
-            with open(map_path) as f:
-                content = f.read()
-            assert "window.innerWidth < 1024" in content, "Mobile detection not found in flyToCoords"
-            assert "bottom: 120" in content, "Bottom padding not found in flyToCoords"
-        _()
-
-        # ============================================================
-        # Section 30: Vote Comments
-        # ============================================================
-
-        @test("TC-30.1.1", "VoteButton shows comment dialog on authenticated vote click")
-        def _():
-            import os
-            vb_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "VoteButton.tsx")
-            with open(vb_path) as f:
-                content = f.read()
-            assert "showComment" in content, "showComment state not found in VoteButton"
-            assert "setShowComment(true)" in content, "Comment dialog not opened on vote click"
-        _()
-
-        @test("TC-30.1.2", "Comment textarea has 500 character max with counter")
-        def _():
-            import os
-            vb_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "VoteButton.tsx")
-            with open(vb_path) as f:
-                content = f.read()
-            assert "maxLength={500}" in content, "maxLength={500} not found on textarea"
-            assert "/500" in content, "Character counter not found"
-        _()
-
-        @test("TC-30.1.3", "Just vote button votes without comment")
-        def _():
-            import os
-            vb_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "VoteButton.tsx")
-            with open(vb_path) as f:
-                content = f.read()
-            assert "handleSkip" in content, "handleSkip not found in VoteButton"
-            assert "Just vote" in content, "Just vote button label not found"
-        _()
-
-        @test("TC-30.1.4", "Vote with comment sends comment through onVote")
-        def _():
-            import os
-            vb_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "VoteButton.tsx")
-            with open(vb_path) as f:
-                content = f.read()
-            assert "handleVoteWithComment" in content, "handleVoteWithComment not found"
-            assert "Vote with comment" in content, "Vote with comment button label not found"
-        _()
-
-        @test("TC-30.1.5", "onVote accepts optional comment parameter threaded through stack")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "vote: (locationId: string, comment?: string)" in content, "vote() signature missing comment param"
-            assert "if (comment) row.comment = comment" in content, "comment not passed to Supabase insert"
-        _()
-
-        @test("TC-30.2.1", "Likes API returns voter_comments array")
-        def _():
-            import os
-            likes_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "api", "admin", "likes", "route.ts")
-            with open(likes_path) as f:
-                content = f.read()
-            assert "voter_comments" in content, "voter_comments not returned from likes API"
-            assert "comment" in content, "comment field not selected in likes API"
-        _()
-
-        @test("TC-30.2.2", "Admin likes tab shows comments alongside voter emails")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AdminLocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "voter_comments" in content, "voter_comments not referenced in AdminLocationCard"
-        _()
-
-        @test("TC-30.2.3", "Votes without comments display email only")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AdminLocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "vc.comment" in content, "Comment conditional check not found"
-            assert ".filter(vc => vc.comment)" in content, "Filter for comments not found — only votes with comments should show"
-        _()
-
-
-        # ============================================================
-        print("\n## 31. New UI Toggle")
-        # ============================================================
-
-        # Reload to start from clean state on main page
-        desktop_page.goto(BASE_URL)
-        desktop_page.wait_for_load_state("networkidle")
-        desktop_page.wait_for_timeout(3000)
-
-        @test("TC-31.1.1", "Try new UI button visible to all users on desktop")
-        def _():
-            toggle = desktop_page.locator("button:has-text('Try new UI')")
-            assert toggle.count() > 0, "Try new UI button not found"
-            assert toggle.is_visible(), "Try new UI button not visible"
-        _()
-
-        @test("TC-31.1.2", "Clicking toggle switches panel to new UI (white bg, 400px width)")
-        def _():
-            toggle = desktop_page.locator("button:has-text('Try new UI')")
-            toggle.click()
-            desktop_page.wait_for_timeout(1000)
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            classes = panel.get_attribute("class") or ""
-            assert "bg-white" in classes, f"New UI panel missing bg-white: {classes}"
-            assert "w-[400px]" in classes, f"New UI panel missing w-[400px]: {classes}"
-        _()
-
-        @test("TC-31.1.3", "Back to current button appears after switching")
-        def _():
-            back_btn = desktop_page.locator("button:has-text('Back to current')")
-            assert back_btn.count() > 0, "Back to current button not found"
-            assert back_btn.is_visible(), "Back to current button not visible"
-        _()
-
-        @test("TC-31.1.4", "Clicking Back to current restores old UI")
-        def _():
-            back_btn = desktop_page.locator("button:has-text('Back to current')")
-            back_btn.click()
-            desktop_page.wait_for_timeout(1000)
-            panel = desktop_page.locator("[data-testid='desktop-panel']")
-            classes = panel.get_attribute("class") or ""
-            assert "bg-blue-600" in classes, f"Old UI panel missing bg-blue-600: {classes}"
-            assert "w-[380px]" in classes, f"Old UI panel missing w-[380px]: {classes}"
-            # Switch back to new UI for remaining tests
-            toggle = desktop_page.locator("button:has-text('Try new UI')")
-            toggle.click()
-            desktop_page.wait_for_timeout(1000)
-        _()
-
-        # ============================================================
-        print("\n## 32. New UI Panel Header")
-        # ============================================================
-
-        @test("TC-32.1.1", "ALPHA SCHOOL eyebrow text visible")
-        def _():
-            eyebrow = desktop_page.locator("text=ALPHA SCHOOL")
-            assert eyebrow.count() > 0, "ALPHA SCHOOL eyebrow text not found"
-            assert eyebrow.first.is_visible(), "ALPHA SCHOOL eyebrow text not visible"
-        _()
-
-        @test("TC-32.1.2", "Heading 'Choose where your kid goes to school' visible")
-        def _():
-            heading = desktop_page.locator("h1:has-text('Choose where your kid goes to school')")
-            assert heading.count() > 0, "Main heading not found"
-            assert heading.first.is_visible(), "Main heading not visible"
-        _()
-
-        @test("TC-32.1.3", "Auth button visible in header")
-        def _():
-            # AuthButton is rendered inside the new UI header
-            import os
-            panel_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltPanel.tsx")
-            with open(panel_path) as f:
-                content = f.read()
-            assert "AuthButton" in content, "AuthButton not found in AltPanel"
-            assert "darkBg={false}" in content, "AuthButton should use darkBg={false} on white background"
-        _()
-
-        # ============================================================
-        print("\n## 33. Action Boxes (3 unified blue-50 cards)")
-        # ============================================================
-
-        @test("TC-33.1.1", "What Alpha Feels Like box present with WHAT ALPHA FEELS LIKE eyebrow")
-        def _():
-            eyebrow = desktop_page.locator("text=WHAT ALPHA FEELS LIKE")
-            assert eyebrow.count() > 0, "WHAT ALPHA FEELS LIKE eyebrow not found"
-            assert eyebrow.first.is_visible(), "WHAT ALPHA FEELS LIKE eyebrow not visible"
-        _()
-
-        @test("TC-33.1.2", "Three stat boxes (2 hrs, 2x, 100%) inside Alpha card")
-        def _():
-            stat_2hrs = desktop_page.locator("text=2 hrs")
-            stat_2x = desktop_page.locator("text=2×")
-            stat_100 = desktop_page.locator("text=100%")
-            assert stat_2hrs.count() > 0, "2 hrs stat not found"
-            assert stat_2x.count() > 0, "2x stat not found"
-            assert stat_100.count() > 0, "100% stat not found"
-        _()
-
-        @test("TC-33.2.1", "Invite box present with INVITE eyebrow")
-        def _():
-            eyebrow = desktop_page.locator("text=INVITE")
-            assert eyebrow.count() > 0, "INVITE eyebrow not found"
-            assert eyebrow.first.is_visible(), "INVITE eyebrow not visible"
-        _()
-
-        @test("TC-33.2.2", "Invite box has 'Invite a family →' link")
-        def _():
-            link = desktop_page.locator("text=Invite a family")
-            assert link.count() > 0, "Invite a family link not found"
-            assert link.first.is_visible(), "Invite a family link not visible"
-        _()
-
-        @test("TC-33.3.1", "Suggest box present with SUGGEST eyebrow")
-        def _():
-            eyebrow = desktop_page.locator("text=SUGGEST")
-            assert eyebrow.count() > 0, "SUGGEST eyebrow not found"
-            assert eyebrow.first.is_visible(), "SUGGEST eyebrow not visible"
-        _()
-
-        @test("TC-33.3.2", "Suggest box links to /suggest")
-        def _():
-            suggest_link = desktop_page.locator("a[href='/suggest']")
-            assert suggest_link.count() > 0, "Suggest link with href=/suggest not found"
-            suggest_text = desktop_page.locator("a[href='/suggest'] >> text=Suggest a location")
-            assert suggest_text.count() > 0, "Suggest a location text not found in suggest link"
-        _()
-
-        # ============================================================
-        print("\n## 34. Sort Pills")
-        # ============================================================
-
-        @test("TC-34.1.1", "Sort pills visible when zoomed into a city (zoom >= 9)")
-        def _():
-            # Source code check — sort pills only render when !showCityCards (zoomLevel >= 9)
-            import os
-            panel_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltPanel.tsx")
-            with open(panel_path) as f:
-                content = f.read()
-            assert "showCityCards" in content, "showCityCards conditional not found"
-            assert "zoomLevel < 9" in content, "zoomLevel < 9 threshold not found"
-            assert "Sort" in content, "Sort label not found in panel"
-        _()
-
-        @test("TC-34.1.2", "Most support and Most viable options present")
-        def _():
-            import os
-            panel_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltPanel.tsx")
-            with open(panel_path) as f:
-                content = f.read()
-            assert "Most support" in content, "Most support option not found"
-            assert "Most viable" in content, "Most viable option not found"
-        _()
-
-        @test("TC-34.1.3", "One sort pill is active (bg-blue-600)")
-        def _():
-            import os
-            panel_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltPanel.tsx")
-            with open(panel_path) as f:
-                content = f.read()
-            assert "bg-blue-600 text-white" in content, "Active sort pill style (bg-blue-600 text-white) not found"
-            assert "bg-gray-100 text-gray-600" in content, "Inactive sort pill style not found"
-        _()
-
-        # ============================================================
-        print("\n## 35. Location Cards (AltLocationCard)")
-        # ============================================================
-
-        @test("TC-35.1.1", "Location cards render in scrollable list")
-        def _():
-            import os
-            panel_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltPanel.tsx")
-            with open(panel_path) as f:
-                content = f.read()
-            assert "overflow-y-auto" in content, "Scrollable container (overflow-y-auto) not found"
-            assert "AltLocationCard" in content, "AltLocationCard not rendered in panel"
-        _()
-
-        @test("TC-35.1.2", "Cards show street name as title")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltLocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "extractStreet" in content, "extractStreet not used for card title"
-            assert "<h3" in content, "h3 heading not found for card title"
-        _()
-
-        @test("TC-35.1.3", "Cards show status badge (Promising/Viable/Concerning)")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltLocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "statusBadge" in content, "statusBadge not imported/used in AltLocationCard"
-            assert "badge.label" in content, "badge.label not rendered in card"
-        _()
-
-        @test("TC-35.2.1", "I'm in button present on cards")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltLocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "I\u2019m in" in content or "I'm in" in content or "I&apos;m in" in content, "I'm in button text not found"
-        _()
-
-        @test("TC-35.2.2", "Not here button present on cards")
-        def _():
-            import os
-            card_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "AltLocationCard.tsx")
-            with open(card_path) as f:
-                content = f.read()
-            assert "Not here" in content, "Not here button text not found"
-        _()
-
-        # ============================================================
-        print("\n## 36. Location Detail View")
-        # ============================================================
-
-        @test("TC-36.1.1", "LocationDetailView component has back arrow button")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "ArrowLeft" in content, "ArrowLeft icon not found in LocationDetailView"
-            assert "Back to locations" in content, "Back to locations text not found"
-            assert "onBack" in content, "onBack handler not found"
-        _()
-
-        @test("TC-36.1.2", "LocationDetailView has street view hero image section")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "maps.googleapis.com/maps/api/streetview" in content, "Google Street View URL not found"
-            assert "h-48" in content, "Hero image height class (h-48) not found"
-        _()
-
-        @test("TC-36.1.3", "LocationDetailView has status badge and size tier")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "statusBadge" in content, "statusBadge not used in LocationDetailView"
-            assert "sizeTierLabel" in content, "sizeTierLabel not used in LocationDetailView"
-            assert "badge.label" in content, "badge.label not rendered"
-            assert "sizeLabel" in content, "sizeLabel not rendered"
-        _()
-
-        @test("TC-36.1.4", "LocationDetailView has vote section with VOTE eyebrow")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "VOTE" in content, "VOTE eyebrow text not found in LocationDetailView"
-        _()
-
-        @test("TC-36.1.5", "Vote section has I'm in and Not here buttons")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "I&apos;m in" in content or "I'm in" in content, "I'm in button not found in detail view"
-            assert "Not here" in content, "Not here button not found in detail view"
-        _()
-
-        @test("TC-36.2.1", "Contribute section has CONTRIBUTE eyebrow")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "CONTRIBUTE" in content, "CONTRIBUTE eyebrow text not found"
-        _()
-
-        @test("TC-36.2.2", "Contribute section has textarea for comments")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "<textarea" in content, "textarea not found in LocationDetailView"
-            assert "contribution" in content, "contribution state not found"
-            assert "Zoning issues" in content or "zoning" in content.lower(), "Placeholder mentioning zoning not found"
-        _()
-
-        @test("TC-36.3.1", "Who's in / Concerns tabs present")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "Who" in content and "in" in content, "Who's in tab not found"
-            assert "Concerns" in content, "Concerns tab not found"
-            assert "activeTab" in content, "activeTab state not found for tab switching"
-        _()
-
-        @test("TC-36.3.2", "Tabs show count of voters")
-        def _():
-            import os
-            detail_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "LocationDetailView.tsx")
-            with open(detail_path) as f:
-                content = f.read()
-            assert "inVoters.length" in content, "inVoters.length count not shown in tab"
-            assert "concernVoters.length" in content, "concernVoters.length count not shown in tab"
-        _()
-
-        # ============================================================
-        print("\n## 37. Not Here Reason Modal")
-        # ============================================================
-
-        @test("TC-37.1.1", "NotHereReasonModal component exists with textarea")
-        def _():
-            import os
-            modal_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "NotHereReasonModal.tsx")
-            with open(modal_path) as f:
-                content = f.read()
-            assert "NotHereReasonModal" in content, "NotHereReasonModal component not found"
-            assert "<textarea" in content, "textarea not found in NotHereReasonModal"
-            assert "reason" in content, "reason state not found in NotHereReasonModal"
-        _()
-
-        @test("TC-37.1.2", "Modal has Skip and Submit concern buttons")
-        def _():
-            import os
-            modal_path = os.path.join(os.path.dirname(__file__), "..", "src", "components", "NotHereReasonModal.tsx")
-            with open(modal_path) as f:
-                content = f.read()
-            assert "Skip" in content, "Skip button text not found in NotHereReasonModal"
-            assert "Submit" in content, "Submit button text not found in NotHereReasonModal"
-        _()
-
-        # ============================================================
-        print("\n## 38. Vote Comment Flow (contributions → pp_votes.comment)")
-        # ============================================================
-
-        @test("TC-38.1.1", "Contributions API writes to pp_votes.comment (not pp_contributions)")
-        def _():
-            import os
-            api_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "api", "contributions", "route.ts")
-            with open(api_path) as f:
-                content = f.read()
-            assert "pp_votes" in content, "pp_votes table not referenced in contributions API"
-            assert "pp_contributions" not in content, "pp_contributions table should not be used — contributions go to pp_votes.comment"
-            assert ".update({ comment:" in content or '.update({ comment:' in content, "comment update on pp_votes not found"
-        _()
-
-        @test("TC-38.1.2", "API appends comments (newline separator)")
-        def _():
-            import os
-            api_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "api", "contributions", "route.ts")
-            with open(api_path) as f:
-                content = f.read()
-            assert "vote.comment" in content, "Existing comment fetch not found"
-            assert "\\n" in content, "Newline separator for appending comments not found"
-        _()
-
-        @test("TC-38.1.3", "API requires auth")
-        def _():
-            import os
-            api_path = os.path.join(os.path.dirname(__file__), "..", "src", "app", "api", "contributions", "route.ts")
-            with open(api_path) as f:
-                content = f.read()
-            assert "authorization" in content.lower(), "Authorization header check not found"
-            assert "401" in content, "401 status code not returned for unauthorized requests"
-            assert "Auth required" in content or "auth required" in content.lower(), "Auth required error message not found"
-        _()
-
-        # ============================================================
-        print("\n## 39. Voter List (loadLocationVoters)")
-        # ============================================================
-
-        @test("TC-39.1.1", "loadLocationVoters has force parameter")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "loadLocationVoters: async (locationIds, force)" in content, "force parameter not found in loadLocationVoters signature"
-        _()
-
-        @test("TC-39.1.2", "Post-vote calls use force=true")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "loadLocationVoters([locationId], true)" in content, "Post-vote force=true call not found"
-        _()
-
-        @test("TC-39.1.3", "RPC function name is get_location_voters")
-        def _():
-            import os
-            votes_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "votes.ts")
-            with open(votes_path) as f:
-                content = f.read()
-            assert "get_location_voters" in content, "get_location_voters RPC function name not found"
-        _()
-
-        # ============================================================
-        print("\n## 40. Status & Size Utilities")
-        # ============================================================
-
-        @test("TC-40.1.1", "statusBadge maps GREEN to Promising")
-        def _():
-            import os
-            status_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "status.ts")
-            with open(status_path) as f:
-                content = f.read()
-            assert '"GREEN"' in content, "GREEN color key not found"
-            assert '"Promising"' in content, "Promising label not found"
-            # Verify the mapping
-            green_line = [l for l in content.split('\n') if 'GREEN' in l and 'Promising' in l]
-            assert len(green_line) > 0, "GREEN → Promising mapping not found on same line"
-        _()
-
-        @test("TC-40.1.2", "statusBadge maps YELLOW/AMBER to Viable")
-        def _():
-            import os
-            status_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "status.ts")
-            with open(status_path) as f:
-                content = f.read()
-            assert '"YELLOW"' in content, "YELLOW color key not found"
-            assert '"AMBER"' in content, "AMBER color key not found"
-            assert '"Viable"' in content, "Viable label not found"
-            amber_line = [l for l in content.split('\n') if 'AMBER' in l and 'Viable' in l]
-            assert len(amber_line) > 0, "AMBER → Viable mapping not found on same line"
-        _()
-
-        @test("TC-40.1.3", "statusBadge maps RED to Concerning")
-        def _():
-            import os
-            status_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "status.ts")
-            with open(status_path) as f:
-                content = f.read()
-            assert '"RED"' in content, "RED color key not found"
-            assert '"Concerning"' in content, "Concerning label not found"
-            red_line = [l for l in content.split('\n') if 'RED' in l and 'Concerning' in l]
-            assert len(red_line) > 0, "RED → Concerning mapping not found on same line"
-        _()
-
-        @test("TC-40.2.1", "sizeTierLabel maps Micro to 'Micro (25 students)'")
-        def _():
-            import os
-            status_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "status.ts")
-            with open(status_path) as f:
-                content = f.read()
-            assert "Micro (25 students)" in content, "Micro → Micro (25 students) mapping not found"
-        _()
-
-        @test("TC-40.2.2", "sizeTierLabel maps Full Size to 'Flagship (1000 students)'")
-        def _():
-            import os
-            status_path = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "status.ts")
-            with open(status_path) as f:
-                content = f.read()
-            assert "Flagship (1000 students)" in content, "Full Size → Flagship (1000 students) mapping not found"
-            assert "full size" in content.lower(), "full size key not found in sizeTierLabel"
-        _()
-
-        # Restore old UI after new UI tests
-        back_btn = desktop_page.locator("button:has-text('Back to current')")
-        if back_btn.count() > 0 and back_btn.is_visible():
-            back_btn.click()
-            desktop_page.wait_for_timeout(1000)
-
-        # ============================================================
-        print("\n## 41. Curated Metros (R-METRO-FIXED)")
-        # ============================================================
-
-        @test("TC-41.1.1", "Curated metro cards render at nationwide zoom")
-        def _():
-            no_geo_ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = no_geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(4000)
-            cards = page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']")
-            count = cards.count()
-            assert count >= 10, f"Expected >=10 curated metro cards, got {count}"
-            # First card should be Austin (matches ACTIVE_METROS declared order)
-            first_slug = cards.first.get_attribute("data-metro-slug")
-            assert first_slug == "austin", f"Expected first metro slug 'austin', got '{first_slug}'"
-            no_geo_ctx.close()
-        _()
-
-        @test("TC-41.1.2", "Card click flies to metro and hides the card list")
-        def _():
-            no_geo_ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = no_geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(4000)
-            page.locator("[data-testid='desktop-panel'] [data-testid='metro-card'][data-metro-slug='nyc']").click()
-            # Cards should disappear after fly-in
-            page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="hidden", timeout=10000)
-            no_geo_ctx.close()
-        _()
-
-        @test("TC-41.1.3", "Geolocation inside Austin auto-flies to Austin")
-        def _():
-            geo_ctx = browser.new_context(
-                viewport={"width": 1440, "height": 900},
-                geolocation={"latitude": 30.2672, "longitude": -97.7431},
-                permissions=["geolocation"],
-            )
-            page = geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            # Card list should hide once the auto-fly completes
+            # Playwright, the browser and each context start on first use, so a
+            # selection only pays for the pages its tests actually need
+            session = Session(registry)
+            runner = Runner(registry, session, results, concurrency, cache, retries, quarantine, timeout,
+                            deadline)
             try:
-                page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="hidden", timeout=15000)
-            except Exception:
-                pass
-            cards = page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']").count()
-            assert cards == 0, f"Cards should hide after auto-fly to Austin, found {cards}"
-            geo_ctx.close()
-        _()
-
-        @test("TC-41.1.4", "Geolocation outside any active metro stays at nationwide")
-        def _():
-            # Middle of Wyoming — outside every active metro radius
-            geo_ctx = browser.new_context(
-                viewport={"width": 1440, "height": 900},
-                geolocation={"latitude": 43.0, "longitude": -107.5},
-                permissions=["geolocation"],
-            )
-            page = geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(5000)
-            cards = page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']").count()
-            assert cards >= 10, f"Cards should remain visible for non-active-metro geo, got {cards}"
-            geo_ctx.close()
-        _()
-
-        @test("TC-41.1.5", "Back-to-metros button restores curated cards from metro view")
-        def _():
-            no_geo_ctx = browser.new_context(viewport={"width": 1440, "height": 900})
-            page = no_geo_ctx.new_page()
-            page.goto(BASE_URL)
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(4000)
-            # Enter NYC metro
-            page.locator("[data-testid='desktop-panel'] [data-testid='metro-card'][data-metro-slug='nyc']").click()
-            page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="hidden", timeout=10000)
-            # Click the back chevron in the header ("‹ · NEW YORK") — title-attribute selector is stable
-            page.locator("[data-testid='desktop-panel'] button[title='Back to all metros']").click()
-            # Curated cards should reappear
-            page.locator("[data-testid='desktop-panel'] [data-testid='metro-card-list']").wait_for(state="visible", timeout=10000)
-            cards = page.locator("[data-testid='desktop-panel'] [data-testid='metro-card']").count()
-            assert cards >= 10, f"Curated cards should reappear after back-to-metros, got {cards}"
-            no_geo_ctx.close()
-        _()
-
-        # Cleanup
-        desktop.close()
-        mobile.close()
-        browser.close()
-
-        # ============================================================
-        # Summary
-        # ============================================================
-        print("\n" + "="*60)
-        print("TEST RESULTS SUMMARY")
-        print("="*60)
-        print(f"Passed:  {results['passed']}")
-        print(f"Failed:  {results['failed']}")
-        print(f"Skipped: {results['skipped']}")
-        total = results['passed'] + results['failed'] + results['skipped']
-        print(f"Total:   {total}")
-        if total > 0:
-            coverage = (results['passed'] + results['skipped']) / total * 100
-            print(f"Coverage: {coverage:.0f}% ({results['passed']} pass + {results['skipped']} skip of {total})")
-        print("="*60)
-
-        if failures:
-            print("\nFailed Tests:")
-            for test_id, desc, error in failures:
-                print(f"  - {test_id}: {desc}")
-                print(f"    {error}")
-
-        return results["failed"] == 0
+                runner.run(cases)
+            finally:
+                runner.close()
+                session.close()
+    finally:
+        # Reporters have streamed every result already; this finalizes them
+        results.close()
+
+    dependencies.save()
+    if cache is not None:
+        cache.save()
+    supabase.save()
+    history = FlakeHistory()
+    history.update(results.records)
+    history.save()
+    report = timeline.write()
+    vitals_report = vitals.write()
+    network_report = network.write()
+    results.print_summary()
+    suggest = [i for i in history.flaky() if i not in quarantine]
+    if suggest:
+        print(f"\nRepeatedly flaky (consider adding to tests/quarantine.txt): {', '.join(suggest)}")
+    if supabase.misses:
+        print(f"\n{len(supabase.misses)} Supabase requests had no fixture (answered 503); re-record with --supabase record")
+    timeline.print_slowest(slowest)
+    print(f"\nTimeline: {report}")
+    if vitals_report:
+        print(f"Vitals: {vitals_report}")
+    if network_report:
+        print(f"Network: {network_report}")
+    return results.ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parent Picker requirements test suite")
+    parser.add_argument("patterns", nargs="*", metavar="PATTERN",
+                        help="TC-ID or glob to run, e.g. TC-4.3.1 or 'TC-27.*'")
+    parser.add_argument("--section", action="append", default=[],
+                        help="run only this section number (repeatable), e.g. 27 or 18.4")
+    parser.add_argument("--list", action="store_true",
+                        help="list the selected tests without running them")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="shard sections across N processes, each with its own browser")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="run async (context-owning) tests as concurrent tasks, at most N at a time")
+    parser.add_argument("--static-only", action="store_true",
+                        help="run only the browser-free code-review tests; never starts Playwright")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-run browser-free tests instead of replaying cached results")
+    parser.add_argument("--slowest", type=int, default=10, metavar="N",
+                        help="list the N slowest tests and sections after the summary")
+    parser.add_argument("--ndjson", metavar="PATH",
+                        help="stream one JSON line per result to PATH")
+    parser.add_argument("--junit", metavar="PATH",
+                        help="write JUnit XML to PATH, kept valid after every result")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="run only tests whose recorded files or routes changed since git REF")
+    parser.add_argument("--retries", type=int, default=0, metavar="N",
+                        help="re-run a failing test up to N more times (tests marked @retry keep theirs)")
+    parser.add_argument("--quarantine", default=None, metavar="PATH",
+                        help="file of TC-IDs whose failures don't fail the run (default: tests/quarantine.txt)")
+    parser.add_argument("--timeout", type=float, default=120, metavar="SECONDS",
+                        help="abort a test after SECONDS unless its section sets a limit (0: no limit)")
+    parser.add_argument("--budget", type=float, default=None, metavar="SECONDS",
+                        help="start no new tests after SECONDS of wall-clock time; report the rest as not run")
+    parser.add_argument("--supabase", choices=("live", "replay", "record"), default=supabase.mode,
+                        help="talk to the real Supabase project, replay recorded fixtures, or record them")
+    parser.add_argument("--mapbox", choices=("live", "local"), default=basemap.mode,
+                        help="load the real Mapbox basemap or a minimal local stand-in")
+    parser.add_argument("--places", choices=("live", "local"), default=places.mode,
+                        help="use the real autocomplete backends or a canned local corpus")
+    parser.add_argument("--places-latency", type=float, default=places.latency, metavar="MS",
+                        help="delay before the local autocomplete answers (default: %(default)g)")
+    parser.add_argument("--places-jitter", type=float, default=places.jitter, metavar="MS",
+                        help="extra random delay, up to MS, for the local autocomplete (default: %(default)g)")
+    args = parser.parse_args(argv)
+
+    cases = registry.select(patterns=args.patterns, sections=args.section, static_only=args.static_only)
+    if args.changed_since:
+        selected = len(cases)
+        cases = affected(cases, changed_files(args.changed_since))
+        print(f"Changed since {args.changed_since}: {len(cases)} of {selected} tests affected")
+    if args.list:
+        for case in cases:
+            print(f"{case.id}\t{case.section}\t{case.description}")
+        print(f"\n{len(cases)} of {len(registry.cases)} tests selected")
+        return 0
+    if not cases:
+        print("No tests match the selection")
+        return 1
+    reporters = []
+    if args.ndjson:
+        reporters.append(NDJSONReporter(args.ndjson))
+    if args.junit:
+        reporters.append(JUnitReporter(args.junit))
+    quarantine = load_quarantine(Path(args.quarantine)) if args.quarantine else load_quarantine()
+    # Workers read these on import
+    supabase.mode = os.environ["SUPABASE_MODE"] = args.supabase
+    basemap.mode = os.environ["MAPBOX_MODE"] = args.mapbox
+    places.mode = os.environ["PLACES_MODE"] = args.places
+    places.latency = args.places_latency
+    places.jitter = args.places_jitter
+    os.environ["PLACES_LATENCY"], os.environ["PLACES_JITTER"] = str(args.places_latency), str(args.places_jitter)
+    if not all(case.is_static for case in cases):
+        supabase.check()
+    if args.supabase == "record" and args.workers > 1:
+        print("Recording fixtures in one process (--workers ignored)")
+        args.workers = 1
+    ok = run_tests(cases, workers=args.workers, concurrency=args.concurrency,
+                   use_cache=not args.no_cache, slowest=args.slowest, reporters=reporters,
+                   retries=args.retries, quarantine=quarantine, timeout=args.timeout, budget=args.budget)
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
     try:
-        success = run_tests()
-        sys.exit(0 if success else 1)
+        sys.exit(main())
     except Exception as e:
         print(f"\nTest suite error: {e}")
         sys.exit(1)
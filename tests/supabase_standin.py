@@ -0,0 +1,48 @@
+"""
+Serve a local Supabase stand-in over a synthetic dataset (see harness/standin.py).
+
+  python tests/supabase_standin.py --locations 100k --seed 1 --port 54321
+
+It prints the settings to start the dev server and the suite with, e.g.
+  NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=... npm run dev
+Signing in works for any email; list the admin's in ADMIN_EMAILS and
+NEXT_PUBLIC_ADMIN_EMAILS for the dev server as usual.
+"""
+
+import argparse
+import time
+
+from harness.standin import SIZES, SupabaseStandIn, parse_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase stand-in with synthetic data")
+    parser.add_argument("--locations", default="10k", type=parse_size,
+                        help=f"dataset size: {', '.join(SIZES)} or a number (default 10k)")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed (default 0)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    standin = SupabaseStandIn(args.locations, args.seed)
+    tables = ", ".join(f"{len(rows)} {name}" for name, rows in standin.tables.items())
+    print(f"Generated {tables} (seed {args.seed}) in {time.perf_counter() - started:.1f}s")
+
+    server = standin.serve(args.host, args.port, verbose=args.verbose)
+    url = f"http://{'localhost' if args.host in ('127.0.0.1', '0.0.0.0') else args.host}:{args.port}"
+    print(f"\nNEXT_PUBLIC_SUPABASE_URL={url}")
+    print(f"NEXT_PUBLIC_SUPABASE_ANON_KEY={standin.anon_key}")
+    print(f"SUPABASE_SERVICE_ROLE_KEY={standin.service_key}\n")
+    print(f"Serving on {args.host}:{args.port} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()